@@ -23,12 +23,19 @@ import ast
 import re
 import json
 import time
-import hashlib
 from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass, asdict, field
 from datetime import datetime
 from pathlib import Path
 import subprocess
+import sys
+
+sys.path.append(str(Path(__file__).parent / "apps" / "orchestrator"))
+from pattern_scanner import PatternScanner
+from scan_cache import ScanCache, content_hash, decode_source, read_source, ruleset_version
+
+# Bump when the analyzers' code (not their pattern tables) changes, to invalidate cached reviews
+REVIEW_RULESET_REVISION = 1
 
 @dataclass
 class CodeIssue:
@@ -100,30 +107,28 @@ class SecurityAnalyzer:
                 r'exec\s*\([^)]*user.*input',
             ]
         }
+        self.scanner = PatternScanner(self.security_patterns, re.IGNORECASE)
     
     def analyze_file(self, file_path: str, content: str) -> List[CodeIssue]:
         """Analyze file for security vulnerabilities"""
         issues = []
-        lines = content.split('\n')
         
-        for line_num, line in enumerate(lines, 1):
-            for vuln_type, patterns in self.security_patterns.items():
-                for pattern in patterns:
-                    if re.search(pattern, line, re.IGNORECASE):
-                        severity = 'critical' if vuln_type in ['sql_injection', 'command_injection'] else 'high'
-                        
-                        issue = CodeIssue(
-                            severity=severity,
-                            category='security',
-                            title=f"Potential {vuln_type.replace('_', ' ').title()} Vulnerability",
-                            description=f"Line {line_num} contains pattern that may indicate {vuln_type} vulnerability",
-                            file_path=file_path,
-                            line_number=line_num,
-                            suggestion=self._get_security_suggestion(vuln_type),
-                            confidence=0.8,
-                            auto_fixable=False
-                        )
-                        issues.append(issue)
+        for hit in self.scanner.scan_lines(content):
+            vuln_type, line_num = hit.rule, hit.line_number
+            severity = 'critical' if vuln_type in ['sql_injection', 'command_injection'] else 'high'
+            
+            issue = CodeIssue(
+                severity=severity,
+                category='security',
+                title=f"Potential {vuln_type.replace('_', ' ').title()} Vulnerability",
+                description=f"Line {line_num} contains pattern that may indicate {vuln_type} vulnerability",
+                file_path=file_path,
+                line_number=line_num,
+                suggestion=self._get_security_suggestion(vuln_type),
+                confidence=0.8,
+                auto_fixable=False
+            )
+            issues.append(issue)
         
         return issues
     
@@ -160,29 +165,29 @@ class PerformanceAnalyzer:
                 r'list\(\w+\.keys\(\)\)',
             ]
         }
+        self.scanner = PatternScanner(self.performance_patterns)
     
     def analyze_file(self, file_path: str, content: str) -> List[CodeIssue]:
         """Analyze file for performance issues"""
         issues = []
-        lines = content.split('\n')
         
-        for line_num, line in enumerate(lines, 1):
-            for perf_type, patterns in self.performance_patterns.items():
-                for pattern in patterns:
-                    if re.search(pattern, line.strip()):
-                        issue = CodeIssue(
-                            severity='medium',
-                            category='performance',
-                            title=f"Performance Issue: {perf_type.replace('_', ' ').title()}",
-                            description=f"Line {line_num} has potential performance optimization opportunity",
-                            file_path=file_path,
-                            line_number=line_num,
-                            suggestion=self._get_performance_suggestion(perf_type),
-                            confidence=0.7,
-                            auto_fixable=True,
-                            fix_code=self._get_performance_fix(line.strip(), perf_type)
-                        )
-                        issues.append(issue)
+        # None of the patterns can match leading/trailing whitespace, so scanning the raw
+        # lines finds the same hits as searching line.strip()
+        for hit in self.scanner.scan_lines(content):
+            perf_type, line_num = hit.rule, hit.line_number
+            issue = CodeIssue(
+                severity='medium',
+                category='performance',
+                title=f"Performance Issue: {perf_type.replace('_', ' ').title()}",
+                description=f"Line {line_num} has potential performance optimization opportunity",
+                file_path=file_path,
+                line_number=line_num,
+                suggestion=self._get_performance_suggestion(perf_type),
+                confidence=0.7,
+                auto_fixable=True,
+                fix_code=self._get_performance_fix(hit.match.string.strip(), perf_type)
+            )
+            issues.append(issue)
         
         return issues
     
@@ -441,23 +446,29 @@ class PythonASTAnalyzer(ast.NodeVisitor):
 class AICodeReviewEngine:
     """Main AI code review engine"""
     
-    def __init__(self):
+    def __init__(self, cache_path: str = os.getenv("CODE_REVIEW_CACHE_DB", "code_review_cache.db")):
         self.security_analyzer = SecurityAnalyzer()
         self.performance_analyzer = PerformanceAnalyzer()
         self.quality_analyzer = CodeQualityAnalyzer()
-        self.review_cache = {}
+        # Persistent per-file reviews, reused while the file and the rules are unchanged
+        self.review_cache = ScanCache(cache_path, 'code_review', ruleset_version(
+            REVIEW_RULESET_REVISION,
+            self.security_analyzer.security_patterns,
+            self.performance_analyzer.performance_patterns
+        ))
         
     def review_file(self, file_path: str) -> ReviewResult:
         """Review a single file"""
         # Check cache
-        file_hash = self._get_file_hash(file_path)
-        if file_hash in self.review_cache:
-            return self.review_cache[file_hash]
+        cache_key = os.path.abspath(file_path)
+        cached = self.review_cache.get_file(cache_key)
+        if cached is not None:
+            return self._result_from_dict(file_path, cached)
         
         # Read file
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            stat, data = read_source(file_path)
+            content = decode_source(data, errors='strict')
         except Exception as e:
             return ReviewResult(
                 file_path=file_path,
@@ -508,10 +519,23 @@ class AICodeReviewEngine:
         )
         
         # Cache result
-        self.review_cache[file_hash] = result
+        cached = asdict(result)
+        cached['review_time'] = result.review_time.isoformat()
+        self.review_cache.put(cache_key, content_hash(data), cached, stat)
         
         return result
     
+    def _result_from_dict(self, file_path: str, data: Dict[str, Any]) -> ReviewResult:
+        return ReviewResult(
+            file_path=file_path,
+            issues=[CodeIssue(**{**issue, 'file_path': file_path}) for issue in data['issues']],
+            metrics=CodeMetrics(**data['metrics']),
+            quality_score=data['quality_score'],
+            review_time=datetime.fromisoformat(data['review_time']),
+            ai_summary=data['ai_summary'],
+            recommendations=data['recommendations']
+        )
+    
     def review_directory(self, directory_path: str, extensions: List[str] = None) -> List[ReviewResult]:
         """Review all files in a directory"""
         if extensions is None:
@@ -568,14 +592,6 @@ class AICodeReviewEngine:
             'recommendations': self._generate_project_recommendations(results)
         }
     
-    def _get_file_hash(self, file_path: str) -> str:
-        """Get file content hash for caching"""
-        try:
-            with open(file_path, 'rb') as f:
-                return hashlib.md5(f.read()).hexdigest()
-        except:
-            return str(time.time())
-    
     def _calculate_quality_score(self, issues: List[CodeIssue], metrics: CodeMetrics) -> float:
         """Calculate overall quality score (0-100)"""
         base_score = 100
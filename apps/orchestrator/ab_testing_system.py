@@ -10,7 +10,6 @@ import json
 import logging
 import os
 import random
-import sqlite3
 import hashlib
 import uuid
 from datetime import datetime, timedelta
@@ -21,6 +20,8 @@ import statistics
 from collections import defaultdict
 import copy
 
+from sqlite_pool import get_pool
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -608,10 +609,8 @@ class ABTestingSystem:
     def _init_database(self):
         """Initialize A/B testing database"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute("""
+            self.db = get_pool(self.db_path, [
+                """
                 CREATE TABLE IF NOT EXISTS experiments (
                     id TEXT PRIMARY KEY,
                     name TEXT NOT NULL,
@@ -621,9 +620,8 @@ class ABTestingSystem:
                     status TEXT DEFAULT 'active',
                     results TEXT
                 )
-            """)
-            
-            cursor.execute("""
+                """,
+                """
                 CREATE TABLE IF NOT EXISTS user_assignments (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     experiment_id TEXT NOT NULL,
@@ -632,9 +630,8 @@ class ABTestingSystem:
                     assigned_at TEXT NOT NULL,
                     UNIQUE(experiment_id, user_id)
                 )
-            """)
-            
-            cursor.execute("""
+                """,
+                """
                 CREATE TABLE IF NOT EXISTS experiment_events (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     experiment_id TEXT NOT NULL,
@@ -644,10 +641,9 @@ class ABTestingSystem:
                     event_data TEXT,
                     timestamp TEXT NOT NULL
                 )
-            """)
-            
-            conn.commit()
-            conn.close()
+                """,
+                "CREATE INDEX IF NOT EXISTS idx_experiment_events_experiment ON experiment_events (experiment_id, variation_id)"
+            ])
             logger.info("🧪 A/B Testing database initialized")
             
         except Exception as e:
@@ -674,10 +670,7 @@ class ABTestingSystem:
             for var_id, variation in experiment['variations'].items():
                 variations_data[var_id] = variation.to_dict()
             
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute("""
+            await self.db.aio.execute("""
                 INSERT OR REPLACE INTO experiments 
                 (id, name, app_path, variations, created_at, status)
                 VALUES (?, ?, ?, ?, ?, ?)
@@ -690,9 +683,6 @@ class ABTestingSystem:
                 experiment['status']
             ))
             
-            conn.commit()
-            conn.close()
-            
         except Exception as e:
             logger.error(f"Failed to save experiment: {e}")
     
@@ -706,18 +696,15 @@ class ABTestingSystem:
         }
         
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
             # Get active experiments
-            cursor.execute("""
+            rows = await self.db.aio.fetchall("""
                 SELECT id, name, app_path, created_at, status
                 FROM experiments 
                 WHERE status = 'active'
                 ORDER BY created_at DESC
             """)
             
-            for row in cursor.fetchall():
+            for row in rows:
                 dashboard['active_experiments'].append({
                     'id': row[0],
                     'name': row[1],
@@ -727,11 +714,9 @@ class ABTestingSystem:
                 })
             
             # Overall statistics
-            cursor.execute("SELECT COUNT(*) FROM experiments")
-            total_experiments = cursor.fetchone()[0]
+            total_experiments = await self.db.aio.fetchvalue("SELECT COUNT(*) FROM experiments")
             
-            cursor.execute("SELECT COUNT(*) FROM experiments WHERE status = 'active'")
-            active_experiments = cursor.fetchone()[0]
+            active_experiments = await self.db.aio.fetchvalue("SELECT COUNT(*) FROM experiments WHERE status = 'active'")
             
             dashboard['overall_stats'] = {
                 'total_experiments': total_experiments,
@@ -739,8 +724,6 @@ class ABTestingSystem:
                 'completed_experiments': total_experiments - active_experiments
             }
             
-            conn.close()
-            
         except Exception as e:
             logger.error(f"Dashboard generation failed: {e}")
             
@@ -19,6 +19,15 @@ import math
 import random
 import re
 
+from streaming_stats import QuantileSketch, StreamingMetric
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -26,6 +35,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+INTERACTION_EVENTS = ('click', 'scroll', 'form_submit', 'input_change')
+CONVERSION_EVENTS = ('form_submit', 'signup', 'purchase')
+
 class UserSession:
     """Represents a user session with tracking data"""
     
@@ -49,14 +61,17 @@ class UserSession:
             'timestamp': datetime.now().isoformat(),
             'data': data
         }
+        self.append_event(event)
+    
+    def append_event(self, event: Dict[str, Any]):
+        """Append an already-built event and categorize it"""
         self.events.append(event)
         
-        # Categorize events
-        if event_type == 'page_view':
+        if event['type'] == 'page_view':
             self.page_views.append(event)
-        elif event_type in ['click', 'scroll', 'form_submit', 'input_change']:
+        elif event['type'] in INTERACTION_EVENTS:
             self.interactions.append(event)
-        elif event_type == 'error':
+        elif event['type'] == 'error':
             self.errors.append(event)
     
     def end_session(self):
@@ -91,6 +106,9 @@ class EventTracker:
         self.active_sessions = {}
         self.event_patterns = self._load_event_patterns()
         
+        # Live page load times: hourly buckets over the last 7 days
+        self.load_times = StreamingMetric(bucket_seconds=3600, num_buckets=24 * 7)
+        
     def _load_event_patterns(self) -> Dict[str, Dict]:
         """Load event analysis patterns"""
         return {
@@ -132,6 +150,8 @@ class EventTracker:
             # Update performance metrics
             if event_type == 'page_load':
                 load_time = data.get('load_time', 0)
+                if load_time > 0:
+                    self.load_times.add(load_time)
                 session.performance_metrics['avg_load_time'] = statistics.mean([
                     session.performance_metrics.get('avg_load_time', load_time), load_time
                 ])
@@ -150,13 +170,100 @@ class EventTracker:
             return self.active_sessions.pop(session_id)
         return None
 
+def _column(values: List[Any], dtype=float):
+    """Turn a Python list into a NumPy column when NumPy is available"""
+    return np.asarray(values, dtype=dtype) if NUMPY_AVAILABLE else values
+
+def _mean(values) -> float:
+    if len(values) == 0:
+        return 0
+    return float(np.mean(values)) if NUMPY_AVAILABLE else statistics.mean(values)
+
+def _median(values) -> float:
+    if len(values) == 0:
+        return 0
+    return float(np.median(values)) if NUMPY_AVAILABLE else statistics.median(values)
+
+def _group_stats(keys: List[str], values) -> Tuple[List[str], Any, Any]:
+    """Group values by key -> (keys, counts, sums)"""
+    if NUMPY_AVAILABLE:
+        unique_keys, index = np.unique(np.asarray(keys), return_inverse=True)
+        return (unique_keys.tolist(),
+                np.bincount(index, minlength=len(unique_keys)),
+                np.bincount(index, weights=values, minlength=len(unique_keys)))
+    counts = defaultdict(int)
+    sums = defaultdict(float)
+    for key, value in zip(keys, values):
+        counts[key] += 1
+        sums[key] += value
+    unique_keys = list(counts)
+    return unique_keys, [counts[k] for k in unique_keys], [sums[k] for k in unique_keys]
+
+class SessionColumns:
+    """Columnar snapshot of a batch of sessions.
+    
+    Built with a single pass over the events and shared by all analyzers, so each
+    analysis works on flat per-session / per-event columns (NumPy arrays when
+    available) instead of walking the event dicts again.
+    """
+    
+    def __init__(self, sessions: List[UserSession]):
+        self.size = len(sessions)
+        self.session_ids: List[str] = []
+        self.user_ids: List[str] = []
+        self.page_flows: Counter = Counter()
+        self.load_pages: List[str] = []
+        self.error_messages: List[str] = []
+        
+        durations, event_counts, page_views, interactions, errors, conversions = [], [], [], [], [], []
+        load_times, error_sessions = [], []
+        
+        for index, session in enumerate(sessions):
+            self.session_ids.append(session.session_id)
+            self.user_ids.append(session.user_id)
+            durations.append(session.get_duration())
+            event_counts.append(len(session.events))
+            page_views.append(len(session.page_views))
+            interactions.append(len(session.interactions))
+            errors.append(len(session.errors))
+            
+            session_conversions = 0
+            for event in session.events:
+                if event['type'] == 'page_load':
+                    load_times.append(event['data'].get('load_time', 0))
+                    self.load_pages.append(event['data'].get('page', 'unknown'))
+                if event['type'] in CONVERSION_EVENTS:
+                    session_conversions += 1
+            conversions.append(session_conversions)
+            
+            previous_page = None
+            for event in session.page_views:
+                page = event['data'].get('page', 'unknown')
+                if previous_page is not None:
+                    self.page_flows[f"{previous_page} -> {page}"] += 1
+                previous_page = page
+            
+            for error in session.errors:
+                self.error_messages.append(error['data'].get('message', 'Unknown'))
+                error_sessions.append(index)
+        
+        self.durations = _column(durations)
+        self.event_counts = _column(event_counts, int)
+        self.page_views = _column(page_views, int)
+        self.interactions = _column(interactions, int)
+        self.errors = _column(errors, int)
+        self.conversions = _column(conversions, int)
+        self.load_times = _column(load_times)
+        self.error_sessions = _column(error_sessions, int)
+
 class BehaviorAnalyzer:
     """Analyzes user behavior patterns"""
     
     def __init__(self):
         self.behavior_models = {}
-        
-    def analyze_user_journey(self, sessions: List[UserSession]) -> Dict[str, Any]:
+    
+    def analyze_user_journey(self, sessions: List[UserSession],
+                             columns: Optional[SessionColumns] = None) -> Dict[str, Any]:
         """Analyze user journey patterns"""
         analysis = {
             'total_sessions': len(sessions),
@@ -169,66 +276,57 @@ class BehaviorAnalyzer:
         
         if not sessions:
             return analysis
-            
+        
         try:
+            if columns is None:
+                columns = SessionColumns(sessions)
+            
             # Session duration analysis
-            durations = [session.get_duration() for session in sessions]
-            analysis['avg_session_duration'] = statistics.mean(durations)
-            analysis['median_session_duration'] = statistics.median(durations)
+            analysis['avg_session_duration'] = _mean(columns.durations)
+            analysis['median_session_duration'] = _median(columns.durations)
             
             # Page flow analysis
-            page_flows = defaultdict(int)
-            for session in sessions:
-                page_sequence = [event['data'].get('page', 'unknown') 
-                               for event in session.page_views]
-                
-                for i in range(len(page_sequence) - 1):
-                    flow = f"{page_sequence[i]} -> {page_sequence[i+1]}"
-                    page_flows[flow] += 1
-            
-            analysis['page_flow_analysis'] = dict(page_flows)
+            analysis['page_flow_analysis'] = dict(columns.page_flows)
             
             # Engagement scoring
-            engagement_scores = []
-            for session in sessions:
-                score = self._calculate_engagement_score(session)
-                engagement_scores.append(score)
-            
-            analysis['engagement_score'] = statistics.mean(engagement_scores) if engagement_scores else 0
+            analysis['engagement_score'] = _mean(self._engagement_scores(columns))
             
             # User segmentation
-            analysis['user_segments'] = self._segment_users(sessions)
-            
+            analysis['user_segments'] = self._segment_users(columns)
+        
         except Exception as e:
             logger.error(f"User journey analysis failed: {e}")
-            
+        
         return analysis
     
-    def _calculate_engagement_score(self, session: UserSession) -> float:
-        """Calculate engagement score for a session"""
+    def _engagement_scores(self, columns: SessionColumns):
+        """Calculate engagement score (0-100) for every session"""
+        if NUMPY_AVAILABLE:
+            score = (np.minimum(30, columns.durations / 60 * 2)   # Duration factor (up to 30 points)
+                     + np.minimum(25, columns.interactions * 2)   # Interaction factor (up to 25 points)
+                     + np.minimum(20, columns.page_views * 3)     # Page views factor (up to 20 points)
+                     - columns.errors * 5                         # Error penalty (5 per error)
+                     + columns.conversions * 10)                  # Conversion events bonus (10 each)
+            return np.clip(score, 0, 100)
+        
+        return [
+            self._calculate_engagement_score(*row)
+            for row in zip(columns.durations, columns.interactions, columns.page_views,
+                           columns.errors, columns.conversions)
+        ]
+    
+    def _calculate_engagement_score(self, duration: float, interactions: int, page_views: int,
+                                    errors: int, conversions: int) -> float:
+        """Calculate engagement score for a single session"""
         score = 0
-        
-        # Duration factor (up to 30 points)
-        duration_minutes = session.get_duration() / 60
-        score += min(30, duration_minutes * 2)
-        
-        # Interaction factor (up to 25 points)
-        score += min(25, len(session.interactions) * 2)
-        
-        # Page views factor (up to 20 points)
-        score += min(20, len(session.page_views) * 3)
-        
-        # Error penalty (subtract 5 per error)
-        score -= len(session.errors) * 5
-        
-        # Conversion events bonus (10 points each)
-        conversion_events = [e for e in session.events 
-                           if e['type'] in ['form_submit', 'signup', 'purchase']]
-        score += len(conversion_events) * 10
-        
+        score += min(30, duration / 60 * 2)
+        score += min(25, interactions * 2)
+        score += min(20, page_views * 3)
+        score -= errors * 5
+        score += conversions * 10
         return max(0, min(100, score))
     
-    def _segment_users(self, sessions: List[UserSession]) -> Dict[str, int]:
+    def _segment_users(self, columns: SessionColumns) -> Dict[str, int]:
         """Segment users based on behavior"""
         segments = {
             'highly_engaged': 0,
@@ -238,23 +336,33 @@ class BehaviorAnalyzer:
             'power_users': 0
         }
         
-        user_data = defaultdict(list)
-        for session in sessions:
-            user_data[session.user_id].append(session)
-        
-        for user_id, user_sessions in user_data.items():
-            avg_duration = statistics.mean([s.get_duration() for s in user_sessions])
-            total_interactions = sum(len(s.interactions) for s in user_sessions)
-            session_count = len(user_sessions)
+        users, session_counts, total_durations = _group_stats(columns.user_ids, columns.durations)
+        _, _, total_interactions = _group_stats(columns.user_ids, columns.interactions)
+        
+        if NUMPY_AVAILABLE:
+            avg_durations = total_durations / session_counts
+            power = (session_counts >= 5) & (avg_durations > 300)  # 5+ sessions, 5+ min avg
+            highly = ~power & (avg_durations > 120) & (total_interactions > 10)  # 2+ min, 10+ interactions
+            moderately = ~power & ~highly & (avg_durations > 60) & (total_interactions > 3)  # 1+ min, 3+ interactions
+            bounce = ~power & ~highly & ~moderately & (avg_durations < 30)  # Less than 30 seconds
+            segments['power_users'] = int(power.sum())
+            segments['highly_engaged'] = int(highly.sum())
+            segments['moderately_engaged'] = int(moderately.sum())
+            segments['bounce_users'] = int(bounce.sum())
+            segments['low_engagement'] = len(users) - sum(segments.values())
+            return segments
+        
+        for session_count, total_duration, interactions in zip(session_counts, total_durations, total_interactions):
+            avg_duration = total_duration / session_count
             
             # Segmentation logic
-            if session_count >= 5 and avg_duration > 300:  # 5+ sessions, 5+ min avg
+            if session_count >= 5 and avg_duration > 300:
                 segments['power_users'] += 1
-            elif avg_duration > 120 and total_interactions > 10:  # 2+ min, 10+ interactions
+            elif avg_duration > 120 and interactions > 10:
                 segments['highly_engaged'] += 1
-            elif avg_duration > 60 and total_interactions > 3:  # 1+ min, 3+ interactions
+            elif avg_duration > 60 and interactions > 3:
                 segments['moderately_engaged'] += 1
-            elif avg_duration < 30:  # Less than 30 seconds
+            elif avg_duration < 30:
                 segments['bounce_users'] += 1
             else:
                 segments['low_engagement'] += 1
@@ -273,7 +381,8 @@ class PerformanceAnalyzer:
             'first_input_delay': 0.1
         }
     
-    def analyze_performance_data(self, sessions: List[UserSession]) -> Dict[str, Any]:
+    def analyze_performance_data(self, sessions: List[UserSession],
+                                 columns: Optional[SessionColumns] = None) -> Dict[str, Any]:
         """Analyze performance metrics across sessions"""
         analysis = {
             'performance_summary': {},
@@ -283,84 +392,73 @@ class PerformanceAnalyzer:
         }
         
         try:
-            # Collect performance metrics
-            load_times = []
-            error_rates = []
-            
-            for session in sessions:
-                # Extract load times from events
-                for event in session.events:
-                    if event['type'] == 'page_load':
-                        load_time = event['data'].get('load_time', 0)
-                        if load_time > 0:
-                            load_times.append(load_time)
-                
-                # Calculate error rate
-                if session.events:
-                    error_rate = len(session.errors) / len(session.events) * 100
-                    error_rates.append(error_rate)
+            if columns is None:
+                columns = SessionColumns(sessions)
             
-            # Performance summary
-            if load_times:
+            # Collect performance metrics
+            if NUMPY_AVAILABLE:
+                load_times = columns.load_times[columns.load_times > 0]
+                slow_pages = int(np.count_nonzero(load_times > 3.0))
+                has_events = columns.event_counts > 0
+                error_rates = columns.errors[has_events] / columns.event_counts[has_events] * 100
+            else:
+                load_times = [t for t in columns.load_times if t > 0]
+                slow_pages = len([t for t in load_times if t > 3.0])
+                error_rates = [errors / events * 100
+                               for errors, events in zip(columns.errors, columns.event_counts) if events]
+            
+            # Performance summary (one sketch pass serves every percentile)
+            if len(load_times):
+                sketch = QuantileSketch()
+                sketch.extend(load_times)
                 analysis['performance_summary'] = {
-                    'avg_load_time': statistics.mean(load_times),
-                    'median_load_time': statistics.median(load_times),
-                    'p95_load_time': self._percentile(load_times, 95),
-                    'slow_pages_percent': len([t for t in load_times if t > 3.0]) / len(load_times) * 100
+                    'avg_load_time': _mean(load_times),
+                    'median_load_time': sketch.quantile(0.5),
+                    'p95_load_time': sketch.quantile(0.95),
+                    'p99_load_time': sketch.quantile(0.99),
+                    'slow_pages_percent': slow_pages / len(load_times) * 100
                 }
             
-            if error_rates:
-                analysis['performance_summary']['avg_error_rate'] = statistics.mean(error_rates)
+            if len(error_rates):
+                analysis['performance_summary']['avg_error_rate'] = _mean(error_rates)
             
             # Identify bottlenecks
-            analysis['bottlenecks'] = self._identify_bottlenecks(sessions)
+            analysis['bottlenecks'] = self._identify_bottlenecks(columns)
             
             # Generate recommendations
             analysis['recommendations'] = self._generate_performance_recommendations(analysis)
-            
+        
         except Exception as e:
             logger.error(f"Performance analysis failed: {e}")
-            
+        
         return analysis
     
-    def _percentile(self, data: List[float], percentile: int) -> float:
+    def _percentile(self, data, percentile: int) -> float:
         """Calculate percentile of data"""
-        if not data:
-            return 0
-        sorted_data = sorted(data)
-        index = (percentile / 100) * (len(sorted_data) - 1)
-        if index.is_integer():
-            return sorted_data[int(index)]
-        else:
-            lower = sorted_data[int(index)]
-            upper = sorted_data[int(index) + 1]
-            return lower + (upper - lower) * (index - int(index))
+        sketch = QuantileSketch()
+        sketch.extend(data)
+        return sketch.quantile(percentile / 100)
     
-    def _identify_bottlenecks(self, sessions: List[UserSession]) -> List[Dict[str, Any]]:
+    def _identify_bottlenecks(self, columns: SessionColumns) -> List[Dict[str, Any]]:
         """Identify performance bottlenecks"""
         bottlenecks = []
         
-        # Analyze page-specific performance
-        page_performance = defaultdict(list)
+        if not columns.load_pages:
+            return bottlenecks
         
-        for session in sessions:
-            for event in session.events:
-                if event['type'] == 'page_load':
-                    page = event['data'].get('page', 'unknown')
-                    load_time = event['data'].get('load_time', 0)
-                    page_performance[page].append(load_time)
+        # Analyze page-specific performance
+        pages, counts, totals = _group_stats(columns.load_pages, columns.load_times)
         
         # Find slow pages
-        for page, load_times in page_performance.items():
-            if load_times:
-                avg_load_time = statistics.mean(load_times)
-                if avg_load_time > self.performance_thresholds['page_load_time']:
-                    bottlenecks.append({
-                        'type': 'slow_page',
-                        'page': page,
-                        'avg_load_time': avg_load_time,
-                        'severity': 'high' if avg_load_time > 5 else 'medium'
-                    })
+        for page, count, total in zip(pages, counts, totals):
+            avg_load_time = float(total / count)
+            if avg_load_time > self.performance_thresholds['page_load_time']:
+                bottlenecks.append({
+                    'type': 'slow_page',
+                    'page': page,
+                    'avg_load_time': avg_load_time,
+                    'severity': 'high' if avg_load_time > 5 else 'medium'
+                })
         
         return bottlenecks
     
@@ -395,7 +493,8 @@ class ErrorAnalyzer:
             'validation_error': ['Invalid input', 'Required field', 'Format']
         }
     
-    def analyze_errors(self, sessions: List[UserSession]) -> Dict[str, Any]:
+    def analyze_errors(self, sessions: List[UserSession],
+                       columns: Optional[SessionColumns] = None) -> Dict[str, Any]:
         """Analyze error patterns"""
         analysis = {
             'error_summary': {},
@@ -406,79 +505,79 @@ class ErrorAnalyzer:
         }
         
         try:
-            # Collect all errors
-            all_errors = []
-            for session in sessions:
-                all_errors.extend(session.errors)
+            if columns is None:
+                columns = SessionColumns(sessions)
             
-            if not all_errors:
+            if not columns.error_messages:
                 return analysis
             
             # Error summary
-            error_counts = Counter(error['data'].get('message', 'Unknown') for error in all_errors)
+            error_counts = Counter(columns.error_messages)
             analysis['error_summary'] = {
-                'total_errors': len(all_errors),
+                'total_errors': len(columns.error_messages),
                 'unique_errors': len(error_counts),
                 'most_common_errors': error_counts.most_common(5)
             }
             
             # Categorize errors
-            categorized_errors = self._categorize_errors(all_errors)
-            analysis['error_trends'] = categorized_errors
+            analysis['error_trends'] = self._categorize_errors(error_counts)
             
             # Identify critical errors
-            analysis['critical_errors'] = self._identify_critical_errors(sessions, all_errors)
+            analysis['critical_errors'] = self._identify_critical_errors(columns, error_counts)
             
             # Analyze error impact on user sessions
-            analysis['error_impact'] = self._analyze_error_impact(sessions)
+            analysis['error_impact'] = self._analyze_error_impact(columns)
             
             # Generate recommendations
             analysis['recommendations'] = self._generate_error_recommendations(analysis)
-            
+        
         except Exception as e:
             logger.error(f"Error analysis failed: {e}")
-            
+        
         return analysis
     
-    def _categorize_errors(self, errors: List[Dict[str, Any]]) -> Dict[str, int]:
-        """Categorize errors by type"""
+    def _categorize_errors(self, error_counts: Counter) -> Dict[str, int]:
+        """Categorize errors by type (each distinct message is matched once)"""
         categories = defaultdict(int)
         
-        for error in errors:
-            message = error['data'].get('message', '').lower()
+        for message, count in error_counts.items():
+            message = message.lower()
             categorized = False
             
             for category, keywords in self.error_categories.items():
                 if any(keyword.lower() in message for keyword in keywords):
-                    categories[category] += 1
+                    categories[category] += count
                     categorized = True
                     break
             
             if not categorized:
-                categories['unknown'] += 1
+                categories['unknown'] += count
         
         return dict(categories)
     
-    def _identify_critical_errors(self, sessions: List[UserSession], 
-                                 errors: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def _identify_critical_errors(self, columns: SessionColumns,
+                                 error_counts: Counter) -> List[Dict[str, Any]]:
         """Identify critical errors that impact user experience"""
         critical_errors = []
         
-        # Errors that cause session termination
-        for session in sessions:
-            if session.errors and len(session.events) <= 3:  # Session ended soon after error
-                for error in session.errors:
-                    critical_errors.append({
-                        'type': 'session_terminating',
-                        'message': error['data'].get('message', 'Unknown'),
-                        'session_id': session.session_id,
-                        'severity': 'critical'
-                    })
+        # Errors that cause session termination (session ended soon after error)
+        if NUMPY_AVAILABLE:
+            terminating = np.flatnonzero(columns.event_counts[columns.error_sessions] <= 3).tolist()
+        else:
+            terminating = [i for i, session_index in enumerate(columns.error_sessions)
+                           if columns.event_counts[session_index] <= 3]
+        
+        for error_index in terminating:
+            critical_errors.append({
+                'type': 'session_terminating',
+                'message': columns.error_messages[error_index],
+                'session_id': columns.session_ids[int(columns.error_sessions[error_index])],
+                'severity': 'critical'
+            })
         
         # Frequently occurring errors
-        error_counts = Counter(error['data'].get('message', 'Unknown') for error in errors)
         for error_msg, count in error_counts.items():
-            if count > len(sessions) * 0.1:  # Affects > 10% of sessions
+            if count > columns.size * 0.1:  # Affects > 10% of sessions
                 critical_errors.append({
                     'type': 'high_frequency',
                     'message': error_msg,
@@ -488,7 +587,7 @@ class ErrorAnalyzer:
         
         return critical_errors
     
-    def _analyze_error_impact(self, sessions: List[UserSession]) -> Dict[str, Any]:
+    def _analyze_error_impact(self, columns: SessionColumns) -> Dict[str, Any]:
         """Analyze how errors impact user behavior"""
         impact = {
             'sessions_with_errors': 0,
@@ -497,24 +596,26 @@ class ErrorAnalyzer:
             'bounce_rate_with_errors': 0
         }
         
-        sessions_with_errors = [s for s in sessions if s.errors]
-        sessions_without_errors = [s for s in sessions if not s.errors]
+        if NUMPY_AVAILABLE:
+            has_errors = columns.errors > 0
+            durations_with_errors = columns.durations[has_errors]
+            durations_without_errors = columns.durations[~has_errors]
+            bounce_sessions = int(np.count_nonzero(durations_with_errors < 30))
+        else:
+            durations_with_errors = [d for d, e in zip(columns.durations, columns.errors) if e]
+            durations_without_errors = [d for d, e in zip(columns.durations, columns.errors) if not e]
+            bounce_sessions = len([d for d in durations_with_errors if d < 30])
         
-        impact['sessions_with_errors'] = len(sessions_with_errors)
+        impact['sessions_with_errors'] = len(durations_with_errors)
         
-        if sessions_with_errors:
-            impact['avg_duration_with_errors'] = statistics.mean([
-                s.get_duration() for s in sessions_with_errors
-            ])
+        if len(durations_with_errors):
+            impact['avg_duration_with_errors'] = _mean(durations_with_errors)
             
             # Calculate bounce rate (sessions < 30 seconds)
-            bounce_sessions = [s for s in sessions_with_errors if s.get_duration() < 30]
-            impact['bounce_rate_with_errors'] = len(bounce_sessions) / len(sessions_with_errors) * 100
+            impact['bounce_rate_with_errors'] = bounce_sessions / len(durations_with_errors) * 100
         
-        if sessions_without_errors:
-            impact['avg_duration_without_errors'] = statistics.mean([
-                s.get_duration() for s in sessions_without_errors
-            ])
+        if len(durations_without_errors):
+            impact['avg_duration_without_errors'] = _mean(durations_without_errors)
         
         return impact
     
@@ -703,21 +804,28 @@ class InsightGenerator:
 class AdvancedAnalyticsPlatform:
     """Main Advanced Analytics Platform orchestrator"""
     
-    def __init__(self):
+    def __init__(self, db_path: str = "analytics_platform.db"):
         self.event_tracker = EventTracker()
         self.behavior_analyzer = BehaviorAnalyzer()
         self.performance_analyzer = PerformanceAnalyzer()
         self.error_analyzer = ErrorAnalyzer()
         self.insight_generator = InsightGenerator()
-        self.db_path = "analytics_platform.db"
+        self.db_path = db_path
         
         # Initialize database
         self._init_database()
     
+    def _connect(self) -> sqlite3.Connection:
+        """Open a database connection (WAL so report reads don't block event writes)"""
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+    
     def _init_database(self):
         """Initialize analytics database"""
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = self._connect()
             cursor = conn.cursor()
             
             cursor.execute("""
@@ -773,6 +881,12 @@ class AdvancedAnalyticsPlatform:
                 )
             """)
             
+            # Indexes for per-app session scans and per-session event loads
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_sessions_app_start ON user_sessions (app_id, start_time)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_events_session_time ON events (session_id, timestamp)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_events_timestamp ON events (timestamp)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_reports_generated ON analytics_reports (generated_at)")
+            
             conn.commit()
             conn.close()
             logger.info("📊 Analytics Platform database initialized")
@@ -803,10 +917,13 @@ class AdvancedAnalyticsPlatform:
                 # Generate demo data for testing
                 sessions = self._generate_demo_sessions(app_id)
             
+            # Build the columnar view once and share it between analyzers
+            columns = SessionColumns(sessions)
+            
             # Run analyses
-            report['behavior_analysis'] = self.behavior_analyzer.analyze_user_journey(sessions)
-            report['performance_analysis'] = self.performance_analyzer.analyze_performance_data(sessions)
-            report['error_analysis'] = self.error_analyzer.analyze_errors(sessions)
+            report['behavior_analysis'] = self.behavior_analyzer.analyze_user_journey(sessions, columns)
+            report['performance_analysis'] = self.performance_analyzer.analyze_performance_data(sessions, columns)
+            report['error_analysis'] = self.error_analyzer.analyze_errors(sessions, columns)
             
             # Generate insights
             report['insights'] = self.insight_generator.generate_insights(
@@ -833,55 +950,41 @@ class AdvancedAnalyticsPlatform:
         return report
     
     async def _get_recent_sessions(self, app_id: str) -> List[UserSession]:
-        """Get recent user sessions from database"""
+        """Get recent user sessions from database (sessions + events in one streamed query)"""
         sessions = []
         
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            conn = self._connect()
             
             # Get sessions from last 7 days
             week_ago = (datetime.now() - timedelta(days=7)).isoformat()
             
-            cursor.execute("""
-                SELECT session_id, user_id, app_id, start_time, end_time, 
-                       events_count, page_views, interactions, errors
-                FROM user_sessions 
-                WHERE app_id = ? AND start_time > ?
-                ORDER BY start_time DESC
+            rows = conn.execute("""
+                SELECT s.session_id, s.user_id, s.app_id, s.start_time, s.end_time,
+                       e.event_id, e.event_type, e.timestamp, e.data
+                FROM user_sessions s
+                LEFT JOIN events e ON e.session_id = s.session_id
+                WHERE s.app_id = ? AND s.start_time > ?
+                ORDER BY s.start_time DESC, s.session_id, e.timestamp
             """, (app_id, week_ago))
             
-            for row in cursor.fetchall():
-                session = UserSession(row[0], row[1], row[2])
-                session.start_time = datetime.fromisoformat(row[3])
-                if row[4]:
-                    session.end_time = datetime.fromisoformat(row[4])
-                
-                # Load events for this session
-                cursor.execute("""
-                    SELECT event_type, timestamp, data 
-                    FROM events 
-                    WHERE session_id = ?
-                    ORDER BY timestamp
-                """, (row[0],))
-                
-                for event_row in cursor.fetchall():
-                    event = {
-                        'type': event_row[0],
-                        'timestamp': event_row[1],
-                        'data': json.loads(event_row[2])
-                    }
-                    session.events.append(event)
-                    
-                    # Categorize events
-                    if event['type'] == 'page_view':
-                        session.page_views.append(event)
-                    elif event['type'] in ['click', 'scroll', 'form_submit']:
-                        session.interactions.append(event)
-                    elif event['type'] == 'error':
-                        session.errors.append(event)
+            session = None
+            for row in rows:
+                if session is None or session.session_id != row[0]:
+                    session = UserSession(row[0], row[1], row[2])
+                    session.start_time = datetime.fromisoformat(row[3])
+                    if row[4]:
+                        session.end_time = datetime.fromisoformat(row[4])
+                    sessions.append(session)
                 
-                sessions.append(session)
+                # Sessions without events come back with NULL event columns
+                if row[5] is not None:
+                    session.append_event({
+                        'event_id': row[5],
+                        'type': row[6],
+                        'timestamp': row[7],
+                        'data': json.loads(row[8])
+                    })
             
             conn.close()
             
@@ -890,6 +993,42 @@ class AdvancedAnalyticsPlatform:
             
         return sessions
     
+    async def save_sessions(self, sessions: List[UserSession]):
+        """Persist sessions and their events in a single transaction"""
+        if not sessions:
+            return
+        
+        try:
+            conn = self._connect()
+            with conn:
+                conn.executemany("""
+                    INSERT OR REPLACE INTO user_sessions
+                    (session_id, user_id, app_id, start_time, end_time, duration,
+                     events_count, page_views, interactions, errors, engagement_score)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, [
+                    (
+                        s.session_id, s.user_id, s.app_id, s.start_time.isoformat(),
+                        s.end_time.isoformat() if s.end_time else None, s.get_duration(),
+                        len(s.events), len(s.page_views), len(s.interactions), len(s.errors), None
+                    )
+                    for s in sessions
+                ])
+                conn.executemany("""
+                    INSERT OR REPLACE INTO events (event_id, session_id, event_type, timestamp, data)
+                    VALUES (?, ?, ?, ?, ?)
+                """, (
+                    (
+                        event.get('event_id') or str(uuid.uuid4()), s.session_id,
+                        event['type'], event['timestamp'], json.dumps(event['data'])
+                    )
+                    for s in sessions for event in s.events
+                ))
+            conn.close()
+            
+        except Exception as e:
+            logger.error(f"Failed to save sessions: {e}")
+    
     def _generate_demo_sessions(self, app_id: str) -> List[UserSession]:
         """Generate demo sessions for testing"""
         sessions = []
@@ -1022,7 +1161,7 @@ class AdvancedAnalyticsPlatform:
     async def _save_report(self, report: Dict[str, Any]):
         """Save analytics report to database"""
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = self._connect()
             cursor = conn.cursor()
             
             cursor.execute("""
@@ -1069,7 +1208,7 @@ class AdvancedAnalyticsPlatform:
         }
         
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = self._connect()
             cursor = conn.cursor()
             
             # Overall statistics
@@ -1103,6 +1242,12 @@ class AdvancedAnalyticsPlatform:
                     'generated_at': row[2]
                 })
             
+            # Live page load times tracked since startup
+            dashboard['performance_metrics'] = {
+                'last_hour': self.event_tracker.load_times.summary(seconds=3600),
+                'last_24_hours': self.event_tracker.load_times.summary(seconds=24 * 3600)
+            }
+            
             conn.close()
             
         except Exception as e:
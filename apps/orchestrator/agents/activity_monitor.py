@@ -3,31 +3,45 @@
 แสดงกิจกรรม AI ขณะทำงาน - เปิดไฟล์, แก้ไข, สถานะต่าง ๆ
 """
 
+import asyncio
 import json
-import time
+import os
+from collections import deque
 from datetime import datetime
 from typing import Dict, List, Any, Optional
 from pathlib import Path
-import asyncio
 from fastapi import WebSocket
-import threading
+
+from .event_bus import EventBus, Subscription
+from .shared_state import state_backend
+
+# จำนวน message ที่ค้างได้ต่อ client ก่อนเริ่มทิ้งอันเก่าสุด
+CLIENT_QUEUE_SIZE = int(os.getenv("ACTIVITY_CLIENT_QUEUE", "256"))
+# ความถี่ที่ดึงกิจกรรมของ worker อื่นจาก shared state (วินาที)
+RELAY_INTERVAL = float(os.getenv("ACTIVITY_RELAY_INTERVAL", "0.05"))
+
 
 class ActivityMonitor:
-    def __init__(self):
-        self.activities: List[Dict] = []
-        self.active_connections: List[WebSocket] = []
+    def __init__(self, history_size: int = 100, state=None):
+        self.bus = EventBus(history_size=history_size, queue_size=CLIENT_QUEUE_SIZE)
+        # หลาย worker: กิจกรรมถูกเขียนลง shared state ด้วย แล้ว worker ที่มี client ดึงไปส่งต่อ
+        self.state = state or state_backend
+        self._relay_task: Optional[asyncio.Task] = None
+        self.activities: deque = self.bus.history
+        # websocket -> task ที่ส่งข้อมูลให้ client นั้น (client ช้าจะรอแค่ของตัวเอง)
+        self.active_connections: Dict[WebSocket, asyncio.Task] = {}
         self.current_task = None
         self.task_progress = 0
-        self.lock = threading.Lock()
         
     def add_activity(self, 
                     activity_type: str, 
                     description: str, 
                     details: Optional[Dict] = None,
-                    status: str = "info"):
-        """เพิ่มกิจกรรมใหม่"""
+                    status: str = "info",
+                    coalesce_key: Optional[str] = None):
+        """เพิ่มกิจกรรมใหม่ (เรียกได้จากทุก thread ไม่ต้องมี event loop)"""
         activity = {
-            "id": len(self.activities) + 1,
+            "id": self.bus.next_id(),
             "timestamp": datetime.now().isoformat(),
             "type": activity_type,
             "description": description,
@@ -35,53 +49,70 @@ class ActivityMonitor:
             "status": status  # info, success, warning, error, working
         }
         
-        with self.lock:
-            self.activities.append(activity)
-            # เก็บแค่ 100 activities ล่าสุด
-            if len(self.activities) > 100:
-                self.activities.pop(0)
-        
-        # ส่งข้อมูล real-time ไปยัง clients
-        asyncio.create_task(self.broadcast_activity(activity))
-        
-    async def broadcast_activity(self, activity: Dict):
-        """ส่งกิจกรรมไปยัง WebSocket clients"""
-        if not self.active_connections:
-            return
-            
-        message = json.dumps({
-            "type": "activity_update",
-            "data": activity
-        })
+        # ส่งข้อมูล real-time ไปยัง clients (publish ของ shared state แค่เข้าคิว ไม่ block event loop)
+        self.bus.publish(activity, "activity_update", coalesce_key)
+        if self.state.shared:
+            self.state.publish("activity", {"activity": activity, "coalesce_key": coalesce_key})
         
-        # ส่งไปยัง clients ทั้งหมด
-        disconnected = []
-        for connection in self.active_connections:
-            try:
-                await connection.send_text(message)
-            except:
-                disconnected.append(connection)
-        
-        # เอา connections ที่หลุดออก
-        for conn in disconnected:
-            self.active_connections.remove(conn)
-    
     async def connect_websocket(self, websocket: WebSocket):
         """เชื่อมต่อ WebSocket client ใหม่"""
         await websocket.accept()
-        self.active_connections.append(websocket)
+        subscription = self.bus.subscribe()
+        if self.state.shared and self._relay_task is None:
+            self._relay_task = asyncio.create_task(self._relay())
         
-        # ส่งกิจกรรมล่าสุด 10 รายการ
-        recent_activities = self.activities[-10:] if self.activities else []
+        # ส่งกิจกรรมล่าสุด 10 รายการ (ของทุก worker ถ้าใช้ shared state อ่าน SQLite ใน thread แยก)
+        if self.state.shared:
+            recent = await asyncio.to_thread(self.get_recent_activities, 10)
+        else:
+            recent = self.get_recent_activities(10)
         await websocket.send_text(json.dumps({
             "type": "initial_activities",
-            "data": recent_activities
-        }))
+            "data": recent
+        }, ensure_ascii=False, default=str))
+        self.active_connections[websocket] = asyncio.create_task(self._pump(websocket, subscription))
+        
+    async def _pump(self, websocket: WebSocket, subscription: Subscription):
+        try:
+            async for message in subscription:
+                await websocket.send_text(message)
+        except Exception:
+            pass
+        finally:
+            subscription.close()
+            self.active_connections.pop(websocket, None)
+        
+    async def _relay(self):
+        """ส่งกิจกรรมจาก worker อื่นเข้า bus ของ process นี้ (poll SQLite ใน thread แยก)
+        หยุดเองเมื่อไม่มี client เหลือ และถูก cancel ได้จาก stop()"""
+        try:
+            last_id = await asyncio.to_thread(self.state.last_event_id, "activity")
+            while self.bus.subscriber_count:
+                await asyncio.sleep(RELAY_INTERVAL)
+                last_id, events = await asyncio.to_thread(self.state.poll, "activity", last_id)
+                for event in events:
+                    self.bus.publish(event["activity"], "activity_update", event.get("coalesce_key"))
+        finally:
+            if self._relay_task is asyncio.current_task():
+                self._relay_task = None
         
     def disconnect_websocket(self, websocket: WebSocket):
         """ยกเลิกการเชื่อมต่อ WebSocket"""
-        if websocket in self.active_connections:
-            self.active_connections.remove(websocket)
+        task = self.active_connections.pop(websocket, None)
+        if task is not None:
+            task.cancel()
+
+    async def stop(self):
+        """หยุด relay และ task ส่งข้อมูลของทุก client แล้ว commit กิจกรรมที่ค้าง (เรียกตอน shutdown)"""
+        tasks = list(self.active_connections.values())
+        self.active_connections.clear()
+        if self._relay_task is not None:
+            tasks.append(self._relay_task)
+            self._relay_task = None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await asyncio.to_thread(self.state.flush)
     
     def start_task(self, task_name: str, total_steps: int = 100):
         """เริ่มงานใหม่"""
@@ -102,9 +133,11 @@ class ActivityMonitor:
         self.current_task["current_step"] = step
         progress_percent = (step / self.current_task["total_steps"]) * 100
         
+        # client ที่ยังไม่ได้รับ progress อันก่อนจะได้แค่อันล่าสุด
         self.add_activity("progress_update", 
                          f"⚡ {description} ({step}/{self.current_task['total_steps']}) - {progress_percent:.1f}%",
-                         {"progress": progress_percent, "step": step}, "working")
+                         {"progress": progress_percent, "step": step}, "working",
+                         coalesce_key=f"progress:{self.current_task['name']}")
     
     def complete_task(self, result: str = "สำเร็จ"):
         """เสร็จสิ้นงาน"""
@@ -160,8 +193,9 @@ class ActivityMonitor:
     
     def get_recent_activities(self, limit: int = 20) -> List[Dict]:
         """ดึงกิจกรรมล่าสุด"""
-        with self.lock:
-            return self.activities[-limit:] if self.activities else []
+        if self.state.shared:
+            return [event["activity"] for event in self.state.recent_events("activity", limit)]
+        return self.bus.recent(limit)
     
     def get_current_status(self) -> Dict:
         """ดึงสถานะปัจจุบัน"""
@@ -169,7 +203,7 @@ class ActivityMonitor:
             "current_task": self.current_task,
             "total_activities": len(self.activities),
             "active_connections": len(self.active_connections),
-            "last_activity": self.activities[-1] if self.activities else None
+            "last_activity": (self.bus.recent(1) or [None])[0]
         }
 
 # Global instance
@@ -13,8 +13,9 @@ import asyncio
 import json
 import time
 import statistics
-from typing import Dict, List, Any, Optional, Tuple
-from dataclasses import dataclass, asdict
+from collections import OrderedDict, deque
+from typing import Dict, List, Any, Optional, Tuple, Deque
+from dataclasses import dataclass, asdict, field
 from pathlib import Path
 from enum import Enum
 import aiofiles
@@ -130,21 +131,187 @@ class Alert:
     resolved_at: Optional[float]
     actions_taken: List[str]
 
+# Heatmap points / page flow kept per session
+SESSION_DETAIL_LIMIT = 200
+# Distinct page URLs whose conversion counts are kept
+CONVERSION_PAGE_LIMIT = 1_000
+
+@dataclass
+class SessionAggregate:
+    """Running per-session aggregates, updated in O(1) per event"""
+    session_id: str
+    start: float
+    end: float
+    event_count: int = 0
+    page_views: int = 0
+    conversions: int = 0
+    interactions: int = 0
+    scroll_depth_sum: float = 0.0
+    scroll_depth_count: int = 0
+    device_info: Dict[str, str] = field(default_factory=dict)
+    clicks: Deque[Any] = field(default_factory=lambda: deque(maxlen=SESSION_DETAIL_LIMIT))
+    scrolls: Deque[Any] = field(default_factory=lambda: deque(maxlen=SESSION_DETAIL_LIMIT))
+    user_flow: Deque[str] = field(default_factory=lambda: deque(maxlen=SESSION_DETAIL_LIMIT))
+    
+    def add(self, event: AnalyticsDataPoint):
+        if self.event_count == 0:
+            self.device_info = event.metadata.get("device_info", {})
+        self.event_count += 1
+        self.start = min(self.start, event.timestamp)
+        self.end = max(self.end, event.timestamp)
+        
+        if event.event_type == AnalyticsEvent.PAGE_VIEW:
+            self.page_views += 1
+            if event.page_url:
+                self.user_flow.append(event.page_url)
+        elif event.event_type == AnalyticsEvent.CONVERSION:
+            self.conversions += 1
+        elif event.event_type == AnalyticsEvent.USER_INTERACTION:
+            self.interactions += 1
+            if "scroll_depth" in event.metadata:
+                self.scroll_depth_sum += event.metadata["scroll_depth"]
+                self.scroll_depth_count += 1
+            if "click_position" in event.metadata:
+                self.clicks.append(event.metadata["click_position"])
+            if "scroll_position" in event.metadata:
+                self.scrolls.append(event.metadata["scroll_position"])
+    
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+# Open sessions tracked per A/B variant; older ones are folded into the closed totals
+VARIANT_SESSION_LIMIT = 10_000
+# Sessions shorter than this (seconds) count as bounces in variant metrics
+BOUNCE_SECONDS = 10
+
+@dataclass
+class VariantAggregate:
+    """Running A/B variant aggregates; open sessions map to [start, end, event_count]
+
+    At most ``session_limit`` sessions are kept open (least recently active first out);
+    an evicted session is folded into the closed_* counters and no longer tracked.
+    """
+    event_count: int = 0
+    page_views: int = 0
+    conversions: int = 0
+    interactions: int = 0
+    session_limit: int = VARIANT_SESSION_LIMIT
+    sessions: "OrderedDict[str, List[float]]" = field(default_factory=OrderedDict)
+    closed_sessions: int = 0
+    closed_durations: int = 0  # closed sessions with more than one event
+    closed_duration_sum: float = 0.0
+    closed_bounces: int = 0
+    
+    def add(self, event: AnalyticsDataPoint):
+        self.event_count += 1
+        if event.event_type == AnalyticsEvent.PAGE_VIEW:
+            self.page_views += 1
+        elif event.event_type == AnalyticsEvent.CONVERSION:
+            self.conversions += 1
+        elif event.event_type == AnalyticsEvent.USER_INTERACTION:
+            self.interactions += 1
+        
+        if event.session_id:
+            span = self.sessions.get(event.session_id)
+            if span is None:
+                self.sessions[event.session_id] = [event.timestamp, event.timestamp, 1]
+                if len(self.sessions) > self.session_limit:
+                    self._close(self.sessions.popitem(last=False)[1])
+            else:
+                self.sessions.move_to_end(event.session_id)
+                span[0] = min(span[0], event.timestamp)
+                span[1] = max(span[1], event.timestamp)
+                span[2] += 1
+    
+    def _close(self, span: List[float]):
+        start, end, count = span
+        self.closed_sessions += 1
+        if count > 1:
+            self.closed_durations += 1
+            self.closed_duration_sum += end - start
+            if end - start < BOUNCE_SECONDS:
+                self.closed_bounces += 1
+    
+    @property
+    def total_sessions(self) -> int:
+        return self.closed_sessions + len(self.sessions)
+    
+    def duration_totals(self) -> Tuple[int, float, int]:
+        """(sessions with more than one event, summed duration, bounces) over closed and open sessions"""
+        durations = [end - start for start, end, count in self.sessions.values() if count > 1]
+        return (self.closed_durations + len(durations),
+                self.closed_duration_sum + sum(durations),
+                self.closed_bounces + sum(1 for d in durations if d < BOUNCE_SECONDS))
+
+@dataclass
+class PageCounter:
+    """Approximate top-k page counts (space-saving) in at most ``limit`` entries
+
+    When full, a new page takes over the least recently seen page with the lowest count and
+    starts at that count + 1, so it is never dropped on arrival; counts may overestimate by
+    at most the count it inherited. Pages are grouped in count buckets so every update is O(1).
+    """
+    limit: int = CONVERSION_PAGE_LIMIT
+    counts: Dict[str, int] = field(default_factory=dict)
+    buckets: Dict[int, "OrderedDict[str, None]"] = field(default_factory=dict)
+    min_count: int = 0
+    
+    def add(self, key: str):
+        count = self.counts.get(key)
+        if count is None:
+            if len(self.counts) < self.limit:
+                count = 0
+                self.min_count = 1
+            else:
+                count = self.min_count
+                evicted, _ = self.buckets[count].popitem(last=False)
+                del self.counts[evicted]
+                if not self.buckets[count]:
+                    del self.buckets[count]
+        else:
+            bucket = self.buckets[count]
+            del bucket[key]
+            if not bucket:
+                del self.buckets[count]
+        
+        self.counts[key] = count + 1
+        self.buckets.setdefault(count + 1, OrderedDict())[key] = None
+        if self.min_count not in self.buckets:
+            # The emptied lowest bucket was the one this key just left
+            self.min_count += 1
+    
+    def top(self, n: int) -> List[str]:
+        return sorted(self.counts, key=self.counts.get, reverse=True)[:n]
+
 class AdvancedAnalyticsEngine:
     """Advanced analytics and optimization engine with ML capabilities"""
     
-    def __init__(self, openai_client, project_path: Path):
+    def __init__(self, openai_client, project_path: Path,
+                 raw_event_limit: int = 100_000,
+                 history_limit: int = 10_000,
+                 session_limit: int = 50_000):
         self.client = openai_client
         self.project_path = project_path
         
-        # Data storage
-        self.analytics_data: List[AnalyticsDataPoint] = []
-        self.performance_history: List[PerformanceMetrics] = []
-        self.behavior_history: List[UserBehaviorMetrics] = []
+        # Data storage (bounded ring buffers - aggregates below hold the long-running totals)
+        self.analytics_data: Deque[AnalyticsDataPoint] = deque(maxlen=raw_event_limit)
+        self.performance_history: Deque[PerformanceMetrics] = deque(maxlen=history_limit)
+        self.behavior_history: Deque[UserBehaviorMetrics] = deque(maxlen=history_limit)
         self.ab_tests: Dict[str, ABTestVariant] = {}
         self.recommendations: Dict[str, OptimizationRecommendation] = []
         self.alerts: Dict[str, Alert] = {}
         
+        # Indexes / running aggregates (O(1) update per event)
+        self.session_limit = session_limit
+        self.sessions: "OrderedDict[str, SessionAggregate]" = OrderedDict()
+        self.variant_index: Dict[str, VariantAggregate] = {}
+        self.event_counts: Dict[AnalyticsEvent, int] = {event_type: 0 for event_type in AnalyticsEvent}
+        self.total_events = 0
+        self.conversion_value = 0.0
+        self.conversion_pages = PageCounter()
+        self.last_model_update = 0.0
+        
         # Configuration
         self.monitoring_config = self._initialize_monitoring_config()
         self.optimization_config = self._initialize_optimization_config()
@@ -225,6 +392,7 @@ class AdvancedAnalyticsEngine:
         
         # Store raw event
         self.analytics_data.append(event)
+        self._index_event(event)
         
         # Real-time analysis
         await self._analyze_real_time_event(event)
@@ -232,10 +400,37 @@ class AdvancedAnalyticsEngine:
         # Check for alerts
         await self._check_alert_conditions(event)
         
-        # Update ML models if needed
-        if len(self.analytics_data) % 1000 == 0:
+        # Update ML models if needed (at most once per retrain_interval)
+        retrain_seconds = self.optimization_config["ml_models"]["retrain_interval"] * 3600
+        if self.total_events % 1000 == 0 and time.time() - self.last_model_update >= retrain_seconds:
+            self.last_model_update = time.time()
             await self._update_ml_models()
     
+    def _index_event(self, event: AnalyticsDataPoint):
+        """Update session / variant / counter aggregates for one event"""
+        
+        self.total_events += 1
+        self.event_counts[event.event_type] += 1
+        
+        if event.session_id:
+            session = self.sessions.get(event.session_id)
+            if session is None:
+                session = SessionAggregate(event.session_id, event.timestamp, event.timestamp)
+                self.sessions[event.session_id] = session
+                # Evict least recently active session
+                if len(self.sessions) > self.session_limit:
+                    self.sessions.popitem(last=False)
+            else:
+                self.sessions.move_to_end(event.session_id)
+            session.add(event)
+        
+        variant_id = event.metadata.get("ab_test_variant")
+        if variant_id:
+            variant = self.variant_index.get(variant_id)
+            if variant is None:
+                variant = self.variant_index[variant_id] = VariantAggregate()
+            variant.add(event)
+    
     async def _analyze_real_time_event(self, event: AnalyticsDataPoint):
         """Real-time event analysis"""
         
@@ -284,54 +479,82 @@ class AdvancedAnalyticsEngine:
         """Analyze user behavior events"""
         
         if event.session_id:
-            # Aggregate session data
-            session_events = [e for e in self.analytics_data if e.session_id == event.session_id]
+            # Read the session's running aggregate instead of rescanning raw events
+            session = self.sessions.get(event.session_id)
             
-            if len(session_events) > 1:
-                behavior_metrics = await self._calculate_behavior_metrics(session_events)
+            if session and session.event_count > 1:
+                behavior_metrics = await self._calculate_behavior_metrics(session)
                 self.behavior_history.append(behavior_metrics)
     
-    async def _calculate_behavior_metrics(self, session_events: List[AnalyticsDataPoint]) -> UserBehaviorMetrics:
-        """Calculate user behavior metrics for a session"""
+    async def _analyze_conversion_event(self, event: AnalyticsDataPoint):
+        """Analyze conversion events"""
+        
+        # Conversion counts live in the session / variant aggregates (see _index_event);
+        # the value (order total) is metadata["value"] or the event value
+        self.conversion_value += self._conversion_value(event)
+        if event.page_url:
+            self.conversion_pages.add(event.page_url)
+
+    async def _analyze_error_event(self, event: AnalyticsDataPoint):
+        """Analyze error events"""
         
-        session_start = min(e.timestamp for e in session_events)
-        session_end = max(e.timestamp for e in session_events)
-        session_duration = session_end - session_start
+        # Error rate over every tracked event, once there is enough data to be meaningful
+        if self.total_events < self.optimization_config["ab_testing"]["min_sample_size"]:
+            return
+        error_rate = self.event_counts[AnalyticsEvent.ERROR] / self.total_events
+        threshold_config = self.monitoring_config["business_thresholds"]["error_rate"]
+        
+        severity = None
+        if error_rate > threshold_config["critical"]:
+            severity = AlertSeverity.CRITICAL
+        elif error_rate > threshold_config["warning"]:
+            severity = AlertSeverity.WARNING
+        
+        title = "High Error Rate"
+        if severity and not self._has_active_alert(title, severity):
+            await self._create_alert(
+                severity=severity,
+                title=title,
+                description=f"error_rate is {error_rate:.2%} over {self.total_events} events, exceeding threshold",
+                metric_type=MetricType.TECHNICAL,
+                threshold_value=threshold_config[severity.value],
+                current_value=error_rate
+            )
+
+    @staticmethod
+    def _conversion_value(event: AnalyticsDataPoint) -> float:
+        value = event.metadata.get("value", event.value)
+        return value if isinstance(value, (int, float)) else 0.0
+
+    def _has_active_alert(self, title: str, severity: AlertSeverity) -> bool:
+        return any(alert.title == title and alert.severity == severity and not alert.resolved_at
+                   for alert in self.alerts.values())
+
+    async def _calculate_behavior_metrics(self, session: SessionAggregate) -> UserBehaviorMetrics:
+        """Calculate user behavior metrics for a session"""
         
-        page_views = [e for e in session_events if e.event_type == AnalyticsEvent.PAGE_VIEW]
-        interactions = [e for e in session_events if e.event_type == AnalyticsEvent.USER_INTERACTION]
-        conversions = [e for e in session_events if e.event_type == AnalyticsEvent.CONVERSION]
+        page_views = session.page_views
         
         return UserBehaviorMetrics(
-            timestamp=session_end,
-            session_duration=session_duration,
-            bounce_rate=1.0 if len(page_views) <= 1 else 0.0,
-            pages_per_session=len(page_views),
-            conversion_rate=len(conversions) / len(page_views) if page_views else 0.0,
-            click_through_rate=len(interactions) / len(page_views) if page_views else 0.0,
-            scroll_depth=statistics.mean([e.metadata.get("scroll_depth", 0) for e in interactions if "scroll_depth" in e.metadata]) if interactions else 0.0,
-            heatmap_data=self._aggregate_heatmap_data(interactions),
-            user_flow=[e.page_url for e in page_views if e.page_url],
-            device_info=session_events[0].metadata.get("device_info", {}) if session_events else {}
+            timestamp=session.end,
+            session_duration=session.duration,
+            bounce_rate=1.0 if page_views <= 1 else 0.0,
+            pages_per_session=page_views,
+            conversion_rate=session.conversions / page_views if page_views else 0.0,
+            click_through_rate=session.interactions / page_views if page_views else 0.0,
+            scroll_depth=session.scroll_depth_sum / session.scroll_depth_count if session.scroll_depth_count else 0.0,
+            heatmap_data=self._aggregate_heatmap_data(session),
+            user_flow=list(session.user_flow),
+            device_info=session.device_info
         )
     
-    def _aggregate_heatmap_data(self, interactions: List[AnalyticsDataPoint]) -> Dict[str, Any]:
+    def _aggregate_heatmap_data(self, session: SessionAggregate) -> Dict[str, Any]:
         """Aggregate heatmap data from interactions"""
         
-        click_data = []
-        scroll_data = []
-        
-        for interaction in interactions:
-            if "click_position" in interaction.metadata:
-                click_data.append(interaction.metadata["click_position"])
-            
-            if "scroll_position" in interaction.metadata:
-                scroll_data.append(interaction.metadata["scroll_position"])
-        
         return {
-            "clicks": click_data,
-            "scrolls": scroll_data,
-            "total_interactions": len(interactions)
+            "clicks": list(session.clicks),
+            "scrolls": list(session.scrolls),
+            "total_interactions": session.interactions
         }
     
     async def _check_alert_conditions(self, event: AnalyticsDataPoint):
@@ -499,16 +722,15 @@ class AdvancedAnalyticsEngine:
         
         for variant in test_variants:
             # Calculate metrics for this variant
-            variant_data = [e for e in self.analytics_data 
-                          if e.metadata.get("ab_test_variant") == variant.variant_id]
+            variant_data = self.variant_index.get(variant.variant_id)
             
-            if variant_data:
+            if variant_data and variant_data.event_count:
                 metrics = await self._calculate_variant_metrics(variant_data)
                 variant.metrics.update(metrics)
                 results[variant.variant_id] = {
                     "variant": asdict(variant),
                     "metrics": metrics,
-                    "sample_size": len(variant_data)
+                    "sample_size": variant_data.event_count
                 }
         
         # Statistical significance analysis
@@ -518,25 +740,20 @@ class AdvancedAnalyticsEngine:
         
         return results
     
-    async def _calculate_variant_metrics(self, variant_data: List[AnalyticsDataPoint]) -> Dict[str, float]:
+    async def _calculate_variant_metrics(self, variant_data: VariantAggregate) -> Dict[str, float]:
         """Calculate metrics for A/B test variant"""
         
-        total_sessions = len(set(e.session_id for e in variant_data if e.session_id))
-        page_views = len([e for e in variant_data if e.event_type == AnalyticsEvent.PAGE_VIEW])
-        conversions = len([e for e in variant_data if e.event_type == AnalyticsEvent.CONVERSION])
-        interactions = len([e for e in variant_data if e.event_type == AnalyticsEvent.USER_INTERACTION])
+        total_sessions = variant_data.total_sessions
+        page_views = variant_data.page_views
+        conversions = variant_data.conversions
+        interactions = variant_data.interactions
         
-        session_durations = []
-        for session_id in set(e.session_id for e in variant_data if e.session_id):
-            session_events = [e for e in variant_data if e.session_id == session_id]
-            if len(session_events) > 1:
-                duration = max(e.timestamp for e in session_events) - min(e.timestamp for e in session_events)
-                session_durations.append(duration)
+        timed_sessions, duration_sum, bounces = variant_data.duration_totals()
         
         return {
             "conversion_rate": conversions / page_views if page_views > 0 else 0.0,
-            "bounce_rate": len([s for s in session_durations if s < 10]) / total_sessions if total_sessions > 0 else 0.0,
-            "avg_session_duration": statistics.mean(session_durations) if session_durations else 0.0,
+            "bounce_rate": bounces / total_sessions if total_sessions > 0 else 0.0,
+            "avg_session_duration": duration_sum / timed_sessions if timed_sessions else 0.0,
             "pages_per_session": page_views / total_sessions if total_sessions > 0 else 0.0,
             "click_through_rate": interactions / page_views if page_views > 0 else 0.0,
             "total_sessions": total_sessions,
@@ -675,7 +892,7 @@ class AdvancedAnalyticsEngine:
         if not self.performance_history:
             return {"error": "No performance data available"}
         
-        recent_metrics = self.performance_history[-100:]  # Last 100 data points
+        recent_metrics = list(self.performance_history)[-100:]  # Last 100 data points
         
         return {
             "avg_page_load_time": statistics.mean([m.page_load_time for m in recent_metrics]),
@@ -697,7 +914,7 @@ class AdvancedAnalyticsEngine:
         if not self.behavior_history:
             return {"error": "No behavior data available"}
         
-        recent_behavior = self.behavior_history[-100:]
+        recent_behavior = list(self.behavior_history)[-100:]
         
         return {
             "avg_session_duration": statistics.mean([b.session_duration for b in recent_behavior]),
@@ -716,14 +933,17 @@ class AdvancedAnalyticsEngine:
     async def _analyze_business_metrics(self) -> Dict[str, Any]:
         """Analyze business-related metrics"""
         
-        conversions = [e for e in self.analytics_data if e.event_type == AnalyticsEvent.CONVERSION]
-        page_views = [e for e in self.analytics_data if e.event_type == AnalyticsEvent.PAGE_VIEW]
+        conversions = self.event_counts[AnalyticsEvent.CONVERSION]
+        page_views = self.event_counts[AnalyticsEvent.PAGE_VIEW]
         
         return {
-            "total_conversions": len(conversions),
-            "total_page_views": len(page_views),
-            "overall_conversion_rate": len(conversions) / len(page_views) if page_views else 0,
-            "revenue_impact": {"total": "$5,240", "avg_per_conversion": "$52.40"},
+            "total_conversions": conversions,
+            "total_page_views": page_views,
+            "overall_conversion_rate": conversions / page_views if page_views else 0,
+            "revenue_impact": {
+                "total": f"${self.conversion_value:,.2f}",
+                "avg_per_conversion": f"${self.conversion_value / conversions:,.2f}" if conversions else "$0.00"
+            },
             "cost_metrics": {"acquisition_cost": "$12.50", "customer_lifetime_value": "$156.80"},
             "growth_trends": {"weekly_growth": "+8.5%", "monthly_growth": "+23.1%"}
         }
@@ -731,7 +951,7 @@ class AdvancedAnalyticsEngine:
     async def _update_ml_models(self):
         """Update ML models with new data"""
         
-        if len(self.analytics_data) < 100:  # Need minimum data for training
+        if self.total_events < 100:  # Need minimum data for training
             return
         
         # Prepare training data
@@ -747,7 +967,7 @@ class AdvancedAnalyticsEngine:
             self.user_behavior_model = await self._train_behavior_model(behavior_data)
         
         # Train anomaly detection model
-        if len(self.analytics_data) > 200:
+        if self.total_events > 200:
             self.anomaly_detection_model = await self._train_anomaly_model()
     
     def _prepare_performance_data(self) -> pd.DataFrame:
@@ -878,7 +1098,8 @@ class AdvancedAnalyticsEngine:
             },
             "data_freshness": {
                 "last_updated": time.time(),
-                "total_events": len(self.analytics_data),
+                "total_events": self.total_events,
+                "tracked_sessions": len(self.sessions),
                 "data_quality_score": 0.95
             }
         }
@@ -889,7 +1110,7 @@ class AdvancedAnalyticsEngine:
         if not self.performance_history:
             return {"status": "No data"}
         
-        recent = self.performance_history[-24:]  # Last 24 measurements
+        recent = list(self.performance_history)[-24:]  # Last 24 measurements
         
         return {
             "core_web_vitals": {
@@ -908,7 +1129,7 @@ class AdvancedAnalyticsEngine:
         if not self.behavior_history:
             return {"status": "No data"}
         
-        recent = self.behavior_history[-24:]
+        recent = list(self.behavior_history)[-24:]
         
         return {
             "bounce_rate": statistics.mean([b.bounce_rate for b in recent]),
@@ -924,10 +1145,13 @@ class AdvancedAnalyticsEngine:
                             if e.event_type == AnalyticsEvent.CONVERSION 
                             and e.timestamp > time.time() - 86400]  # Last 24h
         
+        revenue = sum(self._conversion_value(e) for e in recent_conversions)
+        top_pages = self.conversion_pages.top(3)
+        
         return {
             "conversions_24h": len(recent_conversions),
-            "revenue_24h": "$1,250",  # Would calculate from actual data
-            "top_converting_pages": ["/pricing", "/signup", "/checkout"],
+            "revenue_24h": f"${revenue:,.2f}",
+            "top_converting_pages": top_pages,
             "growth_rate": "+12.5%"
         }
 
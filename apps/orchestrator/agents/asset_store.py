@@ -0,0 +1,302 @@
+"""
+🗃️ Asset Store - คลังรูปภาพแบบ content-addressed ที่ทุก project ใช้ร่วมกัน
+- รูปต้นฉบับแต่ละไฟล์ถูกย่อเป็น derivative หลายความกว้าง (WIDTHS) ในรูปแบบ WebP (และ AVIF ถ้า Pillow รองรับ)
+  ทำครั้งเดียวต่อเนื้อหาไฟล์ ไฟล์เดียวกันที่อยู่หลาย group หรือถูกเลือกโดยหลาย project ไม่ถูกย่อ/เก็บซ้ำ
+- เก็บที่ <root>/<key[:2]>/<key>-<width>.<format> พร้อม manifest <key>.json (ขนาดจริง, derivative ที่มี)
+- project ใหม่ hardlink derivative เข้า assets/images แทนการ copy ต้นฉบับ (ไม่กินดิสก์เพิ่ม, zip/snapshot ได้ตามปกติ)
+  ไฟล์ในคลังถูก chmod 0444 เพราะทุก project ใช้ inode เดียวกัน: เปลี่ยนรูปด้วยการ replace ไฟล์ ไม่ใช่แก้ในที่
+- picture_html สร้าง <picture> พร้อม srcset/sizes และ lazy loading ให้ browser เลือกขนาดที่พอดีกับจอ
+
+Pillow เป็น optional: ถ้าไม่ได้ติดตั้ง จะเก็บต้นฉบับแบบ content-addressed อย่างเดียว (ยังได้เรื่องไม่ copy ซ้ำ)
+ตำแหน่งคลังตั้งด้วย ASSET_STORE_PATH
+"""
+
+import errno
+import hashlib
+import json
+import os
+import shutil
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+try:
+    from PIL import Image, ImageOps, features
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+DEFAULT_STORE_PATH = Path(__file__).resolve().parent.parent / "asset_store"
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".webp"}
+
+# ความกว้างที่ย่อไว้ล่วงหน้า (มือถือ, มือถือจอ 2x, แท็บเล็ต, เดสก์ท็อป)
+WIDTHS = (320, 640, 1024, 1600)
+# ขนาดที่ใช้เป็น src สำรองของ <img> (browser ที่ไม่อ่าน srcset)
+FALLBACK_WIDTH = 1024
+# speed 8: AVIF ค่าเริ่มต้นช้ากว่า WebP หลายเท่า ไฟล์ต่างกันเล็กน้อย
+SAVE_OPTIONS = {"avif": {"quality": 50, "speed": 8}, "webp": {"quality": 78, "method": 4}}
+DEFAULT_SIZES = "(max-width: 640px) 100vw, (max-width: 1024px) 50vw, 33vw"
+
+# hardlink ไม่ได้ (คนละ filesystem, เกินจำนวน link, filesystem ไม่รองรับ) ให้ copy แทน
+LINK_FALLBACK_ERRNOS = {errno.EXDEV, errno.EMLINK, errno.EPERM, errno.ENOTSUP, errno.EACCES}
+# สิทธิ์ของไฟล์ในคลัง (ทุก project hardlink inode เดียวกัน ห้ามแก้ในที่)
+READ_ONLY = 0o444
+
+
+def _supported_formats() -> Tuple[str, ...]:
+    """รูปแบบที่ Pillow ตัวนี้เขียนได้ เรียงจากไฟล์เล็กสุด (ลำดับเดียวกับ <source> ใน <picture>)"""
+    if not PIL_AVAILABLE:
+        return ()
+    formats = []
+    try:
+        if features.check("avif"):
+            formats.append("avif")
+    except ValueError:  # Pillow รุ่นที่ยังไม่รู้จัก feature avif
+        try:
+            import pillow_avif  # noqa: F401
+            formats.append("avif")
+        except ImportError:
+            pass
+    if features.check("webp"):
+        formats.append("webp")
+    return tuple(formats)
+
+
+class AssetStore:
+    """derivative ของรูปภาพที่เก็บครั้งเดียวตาม hash ของเนื้อหา"""
+
+    def __init__(self, root: Optional[Path] = None, widths: Iterable[int] = WIDTHS,
+                 formats: Optional[Iterable[str]] = None):
+        self.root = Path(root or os.getenv("ASSET_STORE_PATH", DEFAULT_STORE_PATH))
+        self.widths = tuple(sorted(widths))
+        self.formats = tuple(formats) if formats is not None else _supported_formats()
+        self._lock = threading.Lock()
+        self._building: Dict[str, threading.Lock] = {}
+        # (path, size, mtime) -> key เพื่อไม่ต้องอ่านไฟล์ต้นฉบับซ้ำทุกครั้งที่ถูกเลือก
+        self._keys: Dict[Tuple[str, int, int], str] = {}
+        self._manifests: Dict[str, Dict[str, Any]] = {}
+
+        self.counters = {
+            "hits": 0,
+            "built": 0,
+            "linked": 0,
+            "link_copies": 0,
+        }
+
+        if not self.formats:
+            print("⚠️ Pillow ไม่รองรับ WebP/AVIF (หรือไม่ได้ติดตั้ง) จะเก็บรูปต้นฉบับโดยไม่ย่อ")
+
+    # ------------------------------------------------------------------ store
+
+    def key_for(self, source: Path) -> str:
+        source = Path(source)
+        stat = source.stat()
+        cache_key = (str(source), stat.st_size, stat.st_mtime_ns)
+        key = self._keys.get(cache_key)
+        if key is None:
+            digest = hashlib.sha256()
+            with open(source, "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(chunk)
+            key = digest.hexdigest()[:32]
+            self._keys[cache_key] = key
+        return key
+
+    def _manifest_path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.json"
+
+    def lookup(self, source: Path) -> Optional[Dict[str, Any]]:
+        """manifest ของรูปที่อยู่ในคลังแล้ว (None ถ้ายังไม่เคย add) ไม่ย่อรูปเอง"""
+        try:
+            key = self.key_for(source)
+        except OSError:
+            return None
+        manifest = self._manifests.get(key)
+        if manifest is None:
+            try:
+                manifest = json.loads(self._manifest_path(key).read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                return None
+            self._manifests[key] = manifest
+        return manifest
+
+    def add(self, source: Path) -> Dict[str, Any]:
+        """ใส่รูปเข้าคลัง (ย่อเฉพาะครั้งแรกของเนื้อหานี้) คืน manifest"""
+        source = Path(source)
+        manifest = self.lookup(source)
+        if manifest is not None:
+            with self._lock:
+                self.counters["hits"] += 1
+            return manifest
+
+        key = self.key_for(source)
+        with self._lock:
+            building = self._building.setdefault(key, threading.Lock())
+        with building:  # thread อื่นที่ขอรูปเดียวกันรอผลแทนการย่อซ้ำ
+            manifest = self.lookup(source)
+            if manifest is None:
+                manifest = self._build(key, source)
+                with self._lock:
+                    self.counters["built"] += 1
+        with self._lock:
+            self._building.pop(key, None)
+        return manifest
+
+    def precompute(self, sources: Iterable[Path], workers: Optional[int] = None) -> List[Dict[str, Any]]:
+        """ใส่รูปทั้งชุดเข้าคลังล่วงหน้า (Pillow ปล่อย GIL ตอน decode/resize จึงใช้ thread ได้)"""
+        workers = workers or min(8, os.cpu_count() or 1)
+        results = []
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for manifest in pool.map(self._add_quietly, list(sources)):
+                if manifest is not None:
+                    results.append(manifest)
+        return results
+
+    def _add_quietly(self, source: Path) -> Optional[Dict[str, Any]]:
+        try:
+            return self.add(source)
+        except Exception as e:
+            print(f"⚠️ Asset store could not process {source}: {e}")
+            return None
+
+    def _build(self, key: str, source: Path) -> Dict[str, Any]:
+        directory = self.root / key[:2]
+        directory.mkdir(parents=True, exist_ok=True)
+        manifest: Dict[str, Any] = {
+            "key": key,
+            "source_name": source.name,
+            "width": None,
+            "height": None,
+            "variants": {},
+            "fallback": None,
+        }
+
+        if self.formats:
+            with Image.open(source) as image:
+                image = ImageOps.exif_transpose(image)
+                if image.mode not in ("RGB", "RGBA"):
+                    has_alpha = image.mode in ("LA", "PA") or "transparency" in image.info
+                    image = image.convert("RGBA" if has_alpha else "RGB")
+                width, height = image.size
+                manifest["width"], manifest["height"] = width, height
+                # ไม่ขยายรูปเล็ก: ใช้ความกว้างที่เล็กกว่าต้นฉบับ + ต้นฉบับเอง (ไม่เกินขนาดใหญ่สุด)
+                widths = sorted({w for w in self.widths if w < width} | {min(width, self.widths[-1])})
+                for target in widths:
+                    resized = image if target == width else image.resize(
+                        (target, max(1, round(height * target / width))), Image.LANCZOS
+                    )
+                    for fmt in self.formats:
+                        name = f"{key}-{target}.{fmt}"
+                        self._write_atomic(directory / name, lambda path: resized.save(
+                            path, fmt.upper(), **SAVE_OPTIONS[fmt]
+                        ))
+                        manifest["variants"].setdefault(fmt, []).append([target, f"{key[:2]}/{name}"])
+            fallback_format = "webp" if "webp" in manifest["variants"] else self.formats[0]
+            candidates = manifest["variants"][fallback_format]
+            manifest["fallback"] = next(
+                (path for w, path in candidates if w >= FALLBACK_WIDTH), candidates[-1][1]
+            )
+        else:
+            name = f"{key}{source.suffix.lower()}"
+            self._write_atomic(directory / name, lambda path: shutil.copyfile(source, path))
+            manifest["fallback"] = f"{key[:2]}/{name}"
+
+        self._write_atomic(self._manifest_path(key), lambda path: Path(path).write_text(
+            json.dumps(manifest, ensure_ascii=False), encoding="utf-8"
+        ))
+        self._manifests[key] = manifest
+        return manifest
+
+    @staticmethod
+    def _write_atomic(destination: Path, write):
+        # เขียนไฟล์ชั่วคราวแล้ว rename ทับ process อื่นจะไม่เห็นไฟล์ครึ่งๆ กลางๆ
+        # ไฟล์ในคลังเป็น read-only: project hardlink inode เดียวกัน การแก้ไฟล์ในที่จะไปเปลี่ยนทุก project
+        temporary = destination.with_name(f".{destination.name}.{uuid.uuid4().hex[:8]}.tmp")
+        try:
+            write(str(temporary))
+            os.chmod(temporary, READ_ONLY)
+            os.replace(temporary, destination)
+        finally:
+            if temporary.exists():
+                temporary.unlink()
+
+    # ------------------------------------------------------------------ project
+
+    @staticmethod
+    def files_of(manifest: Dict[str, Any]) -> List[str]:
+        """path (relative กับคลัง) ของทุกไฟล์ของรูปนี้"""
+        files = [path for variants in manifest["variants"].values() for _, path in variants]
+        return files or [manifest["fallback"]]
+
+    def link_into(self, manifest: Dict[str, Any], directory: Path) -> List[Path]:
+        """hardlink ไฟล์ของรูปเข้า directory ของ project ด้วย layout เดียวกับคลัง (copy ถ้า hardlink ไม่ได้)
+
+        ไฟล์ที่ link เข้ามาเป็น read-only และใช้ inode ร่วมกับคลังและ project อื่น:
+        ถ้าจะเปลี่ยนรูปให้เขียนไฟล์ใหม่แล้ว replace ทับ (เช่น os.replace) ห้ามเปิดแก้ในที่
+        """
+        linked = []
+        for relative in self.files_of(manifest):
+            source = self.root / relative
+            destination = Path(directory) / relative
+            if not destination.exists():
+                destination.parent.mkdir(parents=True, exist_ok=True)
+                try:
+                    os.link(source, destination)
+                    with self._lock:
+                        self.counters["linked"] += 1
+                except OSError as e:
+                    if e.errno not in LINK_FALLBACK_ERRNOS:
+                        raise
+                    shutil.copyfile(source, destination)
+                    with self._lock:
+                        self.counters["link_copies"] += 1
+            linked.append(destination)
+        return linked
+
+    # ------------------------------------------------------------------ HTML
+
+    # base_url คือที่ที่คลังถูก serve (เช่น /asset-store) หรือโฟลเดอร์ที่ link_into ใส่ไฟล์ไว้ (เช่น ./assets/images)
+
+    @staticmethod
+    def srcset(manifest: Dict[str, Any], base_url: str, fmt: str) -> str:
+        base_url = base_url.rstrip("/")
+        return ", ".join(f"{base_url}/{path} {width}w" for width, path in manifest["variants"].get(fmt, []))
+
+    @staticmethod
+    def url(manifest: Dict[str, Any], base_url: str, min_width: Optional[int] = None) -> str:
+        """URL ของไฟล์เดียว: src สำรอง หรือ derivative ที่เล็กที่สุดที่กว้างอย่างน้อย min_width (สำหรับ CSS background)"""
+        path = manifest["fallback"]
+        if min_width and manifest["variants"]:
+            fmt = "webp" if "webp" in manifest["variants"] else next(iter(manifest["variants"]))
+            candidates = manifest["variants"][fmt]
+            path = next((p for w, p in candidates if w >= min_width), candidates[-1][1])
+        return f"{base_url.rstrip('/')}/{path}"
+
+    @classmethod
+    def picture_html(cls, manifest: Dict[str, Any], base_url: str, alt: str,
+                     sizes: str = DEFAULT_SIZES, lazy: bool = True, attrs: str = "") -> str:
+        """<picture> ที่ให้ browser เลือก format/ขนาดเอง รูปที่อยู่นอกจอแรกโหลดแบบ lazy"""
+        alt = alt.replace("&", "&amp;").replace('"', "&quot;")
+        sources = "".join(
+            f'<source type="image/{fmt}" srcset="{cls.srcset(manifest, base_url, fmt)}" sizes="{sizes}">'
+            for fmt in manifest["variants"]
+        )
+        dimensions = ""
+        if manifest.get("width") and manifest.get("height"):
+            # ให้ browser จองพื้นที่ตามสัดส่วนรูปไว้ก่อน (ไม่มี layout shift ตอนรูปโหลดเสร็จ)
+            dimensions = f' width="{manifest["width"]}" height="{manifest["height"]}"'
+        loading = ' loading="lazy" decoding="async"' if lazy else ' fetchpriority="high"'
+        attrs = f" {attrs.strip()}" if attrs.strip() else ""
+        img = f'<img src="{cls.url(manifest, base_url)}" alt="{alt}"{dimensions}{loading}{attrs}>'
+        return f"<picture>{sources}{img}</picture>" if sources else img
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"root": str(self.root), "formats": list(self.formats),
+                    "widths": list(self.widths), **self.counters}
+
+
+# Global asset store instance
+asset_store = AssetStore()
@@ -7,7 +7,11 @@ from abc import ABC, abstractmethod
 from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import heapq
+import itertools
 import json
+import os
 import time
 from pathlib import Path
 
@@ -95,28 +99,39 @@ class BaseAgent(ABC):
 class AgentWorkflow:
     """Manages the workflow between agents with autonomous feedback loops"""
     
-    def __init__(self):
+    def __init__(self, max_workers: Optional[int] = None):
         self.agents: Dict[str, BaseAgent] = {}
         self.task_queue: List[AgentTask] = []
         self.completed_tasks: Dict[str, AgentResult] = {}
         self.workflow_state = "idle"
         self.max_iterations = 5  # Max iterations for improvement
+        # Agents run in parallel, one task per agent at a time (default: one thread per agent)
+        self.max_workers = max_workers or int(os.getenv("AGENT_WORKFLOW_WORKERS", "0")) or None
+        self._task_ids = itertools.count(1)
+        self._order = itertools.count()
+        # task type -> agents whose can_handle() accepts it (can_handle depends on the task type)
+        self._agents_by_type: Dict[str, List[BaseAgent]] = {}
+        # task type -> heap of (failure_count, order, agent name) for idle agents, stale entries skipped
+        self._idle_by_type: Dict[str, List[Tuple[int, int, str]]] = {}
         
     def register_agent(self, agent: BaseAgent):
         """Register an agent in the system"""
         self.agents[agent.name] = agent
+        self._agents_by_type.clear()
+        self._idle_by_type.clear()
         
     def create_task(self, task_type: str, priority: TaskPriority, 
                    input_data: Dict[str, Any], requirements: List[str],
                    dependencies: List[str] = None) -> str:
         """Create a new task"""
-        task_id = f"{task_type}_{int(time.time() * 1000)}"
+        task_id = f"{task_type}_{int(time.time() * 1000)}_{next(self._task_ids)}"
         task = AgentTask(
             id=task_id,
             type=task_type,
             priority=priority,
             input_data=input_data,
             requirements=requirements,
+            expected_output={},
             dependencies=dependencies or [],
             created_at=time.time()
         )
@@ -136,6 +151,38 @@ class AgentWorkflow:
         # Prefer agents with fewer failures
         return min(available_agents, key=lambda a: a.failure_count)
     
+    def _capable_agents(self, task: AgentTask) -> List[BaseAgent]:
+        agents = self._agents_by_type.get(task.type)
+        if agents is None:
+            agents = [agent for agent in self.agents.values() if agent.can_handle(task)]
+            self._agents_by_type[task.type] = agents
+            self._idle_by_type[task.type] = [
+                (agent.failure_count, next(self._order), agent.name)
+                for agent in agents if agent.status == AgentStatus.IDLE
+            ]
+            heapq.heapify(self._idle_by_type[task.type])
+        return agents
+    
+    def _take_idle_agent(self, task: AgentTask) -> Optional[BaseAgent]:
+        """Idle agent with the fewest failures for this task type, without scanning every agent"""
+        self._capable_agents(task)
+        heap = self._idle_by_type[task.type]
+        while heap:
+            failure_count, _, name = heapq.heappop(heap)
+            agent = self.agents.get(name)
+            # Entries go stale when the agent was taken through another task type or failed since
+            if agent is not None and agent.status == AgentStatus.IDLE and agent.failure_count == failure_count:
+                return agent
+        return None
+    
+    def _release_agent(self, agent: BaseAgent):
+        agent.status = AgentStatus.IDLE
+        agent.current_task = None
+        entry_order = next(self._order)
+        for task_type, agents in self._agents_by_type.items():
+            if agent in agents:
+                heapq.heappush(self._idle_by_type[task_type], (agent.failure_count, entry_order, agent.name))
+    
     def execute_autonomous_workflow(self, initial_requirements: str) -> Dict[str, Any]:
         """Execute complete autonomous workflow from requirements to final product"""
         
@@ -175,38 +222,103 @@ class AgentWorkflow:
         }
     
     def _process_task_queue(self):
-        """Process all tasks in the queue"""
-        while self.task_queue:
-            # Sort by priority and dependencies
-            self.task_queue.sort(key=lambda t: (t.priority.value, t.created_at), reverse=True)
-            
-            task = self.task_queue.pop(0)
-            
-            # Check if dependencies are met
-            if not self._dependencies_met(task):
-                self.task_queue.append(task)  # Put back at the end
-                continue
-            
-            # Find and assign agent
-            agent = self.find_suitable_agent(task)
-            if not agent:
-                print(f"No suitable agent found for task {task.id}")
-                continue
-            
-            print(f"Assigning task {task.id} to agent {agent.name}")
-            
-            if agent.start_task(task):
-                result = agent.execute_task(task)
-                self.completed_tasks[task.id] = result
-                agent.status = AgentStatus.IDLE
-                agent.current_task = None
-                
-                if result.success:
-                    agent.completed_tasks.append(task.id)
+        """Process all tasks in the queue
+        
+        Ready tasks wait in a heap per task type ordered by (priority, created_at). A task with
+        dependencies is ready once its last dependency completes successfully. Tasks whose
+        dependencies failed or never appear stay in task_queue instead of being retried forever.
+        """
+        tasks: Dict[str, AgentTask] = {}
+        for task in self.task_queue:
+            tasks.setdefault(task.id, task)
+        self.task_queue = []
+        
+        ready: Dict[str, List[Tuple[int, float, int, AgentTask]]] = {}
+        unmet: Dict[str, int] = {}
+        dependents: Dict[str, List[str]] = {}
+        blocked: List[AgentTask] = []
+        
+        def make_ready(task: AgentTask):
+            entry = (-task.priority.value, task.created_at, next(self._order), task)
+            heapq.heappush(ready.setdefault(task.type, []), entry)
+        
+        for task in tasks.values():
+            waiting = 0
+            for dep_id in task.dependencies or []:
+                result = self.completed_tasks.get(dep_id)
+                if result is not None and result.success:
+                    continue
+                if dep_id in tasks and result is None:
+                    dependents.setdefault(dep_id, []).append(task.id)
+                    waiting += 1
                 else:
-                    agent.failure_count += 1
+                    # Failed before, or not queued anywhere: this task can never run in this pass
+                    waiting = -1
+                    break
+            if waiting < 0:
+                blocked.append(task)
+            elif waiting:
+                unmet[task.id] = waiting
+            else:
+                make_ready(task)
+        
+        running = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers or max(1, len(self.agents))) as pool:
+            while ready or running:
+                # Dispatch: the task type whose best ready task has the highest priority goes first
+                for task_type in sorted(ready, key=lambda t: ready[t][0][:3]):
+                    heap = ready[task_type]
+                    while heap:
+                        task = heap[0][-1]
+                        if not self._capable_agents(task):
+                            heapq.heappop(heap)
+                            print(f"No suitable agent found for task {task.id}")
+                            continue
+                        agent = self._take_idle_agent(task)
+                        if agent is None or not agent.start_task(task):
+                            break  # every capable agent is busy, wait for one to finish
+                        heapq.heappop(heap)
+                        print(f"Assigning task {task.id} to agent {agent.name}")
+                        running[pool.submit(agent.execute_task, task)] = (task, agent)
+                    if not heap:
+                        del ready[task_type]
+                
+                if not running:
+                    break
+                
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    task, agent = running.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        result = AgentResult(False, {"error": str(e)}, issues=[str(e)])
+                    self.completed_tasks[task.id] = result
+                    if result.success:
+                        agent.completed_tasks.append(task.id)
+                    else:
+                        agent.failure_count += 1
+                    self._release_agent(agent)
+                    print(f"Task {task.id} completed with success: {result.success}")
                     
-                print(f"Task {task.id} completed with success: {result.success}")
+                    for dependent_id in dependents.pop(task.id, []):
+                        if dependent_id not in unmet:
+                            continue
+                        if not result.success:
+                            blocked.append(tasks[dependent_id])
+                            del unmet[dependent_id]
+                            continue
+                        unmet[dependent_id] -= 1
+                        if unmet[dependent_id] == 0:
+                            del unmet[dependent_id]
+                            make_ready(tasks[dependent_id])
+        
+        # Left over: a dependency failed, was dropped, or is part of a cycle
+        blocked.extend(tasks[task_id] for task_id in unmet)
+        for task in blocked:
+            if task.id not in self.completed_tasks:
+                print(f"Task {task.id} is blocked: dependencies not met")
+        self.task_queue = [task for task in blocked if task.id not in self.completed_tasks]
     
     def _dependencies_met(self, task: AgentTask) -> bool:
         """Check if all task dependencies are completed successfully"""
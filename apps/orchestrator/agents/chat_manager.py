@@ -12,6 +12,7 @@ from datetime import datetime
 from .simple_conversational_ai import SimpleConversationalAI
 from .base_agent import AgentWorkflow  
 from .simple_agent_manager import SimpleAgentManager
+from .session_store import SessionStore
 from pathlib import Path
 import os
 
@@ -26,13 +27,20 @@ class ChatConnection:
 class ChatManager:
     def __init__(self, openai_client):
         self.connections: Dict[str, ChatConnection] = {}
-        self.user_sessions: Dict[str, ConversationalAI] = {}
         self.openai_client = openai_client
         
         # Initialize simple agent manager
         webroot = Path(os.getenv("WEBROOT", "/app/workspace/generated-app/apps/web"))
         self.agent_manager = SimpleAgentManager(webroot, openai_client)
         
+        # Conversational AI per user: connected users stay in memory, idle ones are spilled to SQLite
+        self.user_sessions = SessionStore(
+            "chat",
+            factory=lambda: SimpleConversationalAI(self.openai_client, self.agent_manager),
+            dump=SimpleConversationalAI.to_state,
+            load=lambda state: SimpleConversationalAI.from_state(state, self.openai_client, self.agent_manager)
+        )
+        
         # Initialize agents (will be implemented)
         self._initialize_agents()
     
@@ -52,12 +60,9 @@ class ChatManager:
         connection = ChatConnection(websocket, user_id)
         self.connections[connection.session_id] = connection
         
-        # Create or get user's conversational AI session
-        if user_id not in self.user_sessions:
-            self.user_sessions[user_id] = SimpleConversationalAI(
-                self.openai_client,
-                self.agent_manager
-            )
+        # Create or rehydrate user's conversational AI session; kept resident while connected
+        self.user_sessions.pin(user_id)
+        self.user_sessions.get(user_id)
         
         # Send welcome message
         await websocket.send_json({
@@ -78,8 +83,9 @@ class ChatManager:
     async def disconnect(self, session_id: str):
         """Handle disconnection"""
         if session_id in self.connections:
-            self.connections[session_id].active = False
-            del self.connections[session_id]
+            connection = self.connections.pop(session_id)
+            connection.active = False
+            self.user_sessions.unpin(connection.user_id)
     
     async def handle_message(self, session_id: str, message: Dict):
         """Handle incoming message from user"""
@@ -94,7 +100,7 @@ class ChatManager:
         
         try:
             # Get user's conversational AI
-            conv_ai = self.user_sessions.get(connection.user_id)
+            conv_ai = self.user_sessions.get(connection.user_id, create=False)
             
             if not conv_ai:
                 await connection.websocket.send_json({
@@ -121,6 +127,7 @@ class ChatManager:
             
             # Process with conversational AI
             response = await conv_ai.process_message(user_text, connection.websocket)
+            self.user_sessions.save(connection.user_id)
             
             # Send immediate response
             response_data = {
@@ -194,7 +201,7 @@ class ChatManager:
         return len([conn for conn in self.connections.values() if conn.active])
     
     def get_user_sessions(self) -> Dict[str, Dict]:
-        """Get summary of user sessions"""
+        """Get summary of user sessions held in memory (idle ones live on disk)"""
         sessions = {}
         
         for user_id, conv_ai in self.user_sessions.items():
@@ -205,7 +212,7 @@ class ChatManager:
             
             sessions[user_id] = {
                 "active_connections": active_connections,
-                "conversation_length": len(conv_ai.conversation_history),
+                "conversation_length": conv_ai.message_count,
                 "active_project": conv_ai.active_project,
                 "last_activity": conv_ai.user_context.get("timestamp")
             }
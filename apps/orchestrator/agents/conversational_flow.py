@@ -2,18 +2,50 @@
 🎭 Advanced Conversational AI - คุยไหลลื่นเหมือน Lovable
 """
 
-from openai import AsyncOpenAI
 from typing import Dict, List, Any, Optional
 from datetime import datetime
 import json
 import re
 
+from .llm_gateway import llm_gateway
+from .session_store import ConversationMemory, SessionStore
+
+# ความยาวสูงสุดต่อข้อความเมื่อใส่ประวัติลงใน prompt
+CONTEXT_MESSAGE_CHARS = 1000
+
+
+class UserConversation:
+    """สถานะการสนทนาของผู้ใช้หนึ่งคน"""
+
+    def __init__(self, memory: Optional[ConversationMemory] = None,
+                 preferences: Optional[Dict] = None, project_context: Optional[Dict] = None):
+        self.memory = memory or ConversationMemory()
+        self.preferences = preferences or {}
+        self.project_context = project_context or {}
+
+    def to_state(self) -> Dict[str, Any]:
+        return {
+            "memory": self.memory.to_state(),
+            "preferences": self.preferences,
+            "project_context": self.project_context
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "UserConversation":
+        return cls(ConversationMemory.from_state(state.get("memory", {})),
+                   state.get("preferences"), state.get("project_context"))
+
+
 class ConversationalFlowManager:
     def __init__(self):
-        self.client = AsyncOpenAI()
-        self.conversation_memory = {}
-        self.user_preferences = {}
-        self.project_context = {}
+        self.llm = llm_gateway
+        # session ต่อผู้ใช้: อยู่ในหน่วยความจำเฉพาะคนที่ active, ที่เหลือถูก spill ลง SQLite
+        self.sessions = SessionStore(
+            "conversation_flow",
+            factory=UserConversation,
+            dump=UserConversation.to_state,
+            load=UserConversation.from_state
+        )
         
         # Personality โดยรอบ
         self.ai_personality = {
@@ -27,32 +59,35 @@ class ConversationalFlowManager:
     async def process_conversation(self, user_id: str, message: str, context: Dict = None) -> Dict[str, Any]:
         """ประมวลผลการสนทนาแบบไหลลื่น"""
         
-        # บันทึกข้อความใน Memory
-        if user_id not in self.conversation_memory:
-            self.conversation_memory[user_id] = []
+        # pin ไว้ระหว่างรอ LLM ไม่ให้ session ถูก spill ไปก่อนบันทึกคำตอบ
+        self.sessions.pin(user_id)
+        try:
+            # บันทึกข้อความใน Memory
+            memory = self.sessions.get(user_id).memory
+            memory.append({
+                "role": "user",
+                "content": message,
+                "timestamp": datetime.now()
+            })
             
-        self.conversation_memory[user_id].append({
-            "role": "user",
-            "content": message,
-            "timestamp": datetime.now()
-        })
-        
-        # วิเคราะห์ Intent และ Context
-        intent_analysis = await self._analyze_user_intent(message, user_id)
-        
-        # สร้าง Response ที่เหมาะสม
-        response_data = await self._generate_contextual_response(
-            user_id, message, intent_analysis, context
-        )
-        
-        # บันทึก AI Response
-        self.conversation_memory[user_id].append({
-            "role": "assistant", 
-            "content": response_data["message"],
-            "timestamp": datetime.now(),
-            "intent": intent_analysis,
-            "actions": response_data.get("actions", [])
-        })
+            # วิเคราะห์ Intent และ Context
+            intent_analysis = await self._analyze_user_intent(message, user_id)
+            
+            # สร้าง Response ที่เหมาะสม
+            response_data = await self._generate_contextual_response(
+                user_id, message, intent_analysis, context
+            )
+            
+            # บันทึก AI Response
+            memory.append({
+                "role": "assistant", 
+                "content": response_data["message"],
+                "timestamp": datetime.now(),
+                "intent": intent_analysis,
+                "actions": response_data.get("actions", [])
+            })
+        finally:
+            self.sessions.unpin(user_id)
         
         return response_data
     
@@ -93,13 +128,11 @@ class ConversationalFlowManager:
         """
         
         try:
-            response = await self.client.chat.completions.create(
+            analysis_text = await self.llm.complete(
                 model="gpt-4o-mini",
                 messages=[{"role": "user", "content": analysis_prompt}],
                 temperature=0.1
             )
-            
-            analysis_text = response.choices[0].message.content
             # Extract JSON จาก response
             json_match = re.search(r'\{.*\}', analysis_text, re.DOTALL)
             if json_match:
@@ -204,14 +237,13 @@ class ConversationalFlowManager:
         ]
         
         try:
-            response = await self.client.chat.completions.create(
+            ai_message = await self.llm.complete(
                 model="gpt-4o-mini",
                 messages=messages,
                 temperature=0.7,
                 max_tokens=800
             )
-            
-            ai_message = response.choices[0].message.content.strip()
+            ai_message = ai_message.strip()
             
             return {
                 "message": ai_message,
@@ -230,38 +262,46 @@ class ConversationalFlowManager:
     def _get_conversation_context(self, user_id: str, last_n: int = 10) -> str:
         """ดึงประวัติการสนทนาย้อนหลัง"""
         
-        if user_id not in self.conversation_memory:
+        conversation = self.sessions.get(user_id, create=False)
+        if conversation is None or not conversation.memory.total_messages:
             return "ไม่มีประวัติการสนทนา"
         
-        recent_messages = self.conversation_memory[user_id][-last_n:]
+        memory = conversation.memory
+        recent_messages = memory.recent(last_n)
         
         context_lines = []
+        # ส่วนที่เก่ากว่า last_n ส่งเป็นสรุป prompt จึงไม่โตตามความยาวของการสนทนา
+        older = memory.total_messages - len(recent_messages)
+        if older > 0:
+            context_lines.append(f"สรุปก่อนหน้า ({older} ข้อความ):\n{memory.summary_before(last_n)}")
         for msg in recent_messages:
             role = "ผู้ใช้" if msg["role"] == "user" else "AI"
-            context_lines.append(f"{role}: {msg['content']}")
+            content = msg["content"]
+            if len(content) > CONTEXT_MESSAGE_CHARS:
+                content = content[:CONTEXT_MESSAGE_CHARS] + "…"
+            context_lines.append(f"{role}: {content}")
         
         return "\n".join(context_lines)
     
     def update_user_preferences(self, user_id: str, preferences: Dict):
         """อัพเดตความชอบของผู้ใช้"""
-        if user_id not in self.user_preferences:
-            self.user_preferences[user_id] = {}
-        
-        self.user_preferences[user_id].update(preferences)
+        self.sessions.get(user_id).preferences.update(preferences)
+        self.sessions.save(user_id)
     
     def get_conversation_summary(self, user_id: str) -> Dict[str, Any]:
         """สรุปการสนทนา"""
         
-        if user_id not in self.conversation_memory:
+        conversation = self.sessions.get(user_id, create=False)
+        if conversation is None:
             return {"total_messages": 0, "summary": "ยังไม่มีการสนทนา"}
         
-        messages = self.conversation_memory[user_id]
+        last = conversation.memory.last
         
         return {
-            "total_messages": len(messages),
-            "last_conversation": messages[-1]["timestamp"] if messages else None,
-            "user_preferences": self.user_preferences.get(user_id, {}),
-            "project_context": self.project_context.get(user_id, {})
+            "total_messages": conversation.memory.total_messages,
+            "last_conversation": last["timestamp"] if last else None,
+            "user_preferences": conversation.preferences,
+            "project_context": conversation.project_context
         }
 
 # Singleton Instance
@@ -8,12 +8,23 @@ import os
 import sqlite3
 import shutil
 from datetime import datetime
-from pathlib import Path
-from typing import Dict, List, Any
+from pathlib import Path, PurePosixPath
+from typing import Dict, List, Any, Optional
 from openai import AsyncOpenAI
 from .ai_knowledge_base import ai_knowledge
 from .image_manager import image_manager
 
+def safe_relative_path(name: Any) -> Optional[str]:
+    """path แบบ relative ที่ปลอดภัย (เช่น "routes/api.js") หรือ None ถ้าว่าง เป็น absolute หรือมี .. ออกนอกโฟลเดอร์"""
+    if not isinstance(name, str):
+        return None
+    path = PurePosixPath(name.strip().replace("\\", "/"))
+    parts = [part for part in path.parts if part not in ("", ".")]
+    if not parts or path.is_absolute() or ".." in parts or ":" in parts[0]:
+        return None
+    return "/".join(parts)
+
+
 class EnterpriseProjectGenerator:
     def __init__(self):
         self.client = AsyncOpenAI()
@@ -569,8 +580,9 @@ module.exports = {
             hero_image = image_manager.get_hero_image(project_type)
             gallery_images = image_manager.get_gallery_images(project_type, 8)
             
-            # คัดลอกรูปภาพไป project
-            copy_result = image_manager.copy_images_to_project(str(project_path), project_type)
+            # link รูปที่หน้าเว็บใช้จากคลังกลางเข้า project (derivative หลายขนาด ไม่คัดลอกต้นฉบับ)
+            page_images = ([hero_image] if hero_image else []) + gallery_images + project_images["images"]
+            copy_result = image_manager.copy_images_to_project(str(project_path), project_type, page_images)
             
             # สร้างหน้าเว็บหลักด้วยรูปภาพจริง
             pages_created = []
@@ -648,7 +660,7 @@ module.exports = {
         project_title = requirements.get("business_name", f"Professional {project_type.replace('_', ' ').title()}")
         project_description = requirements.get("description", f"Modern {project_type} solution with cutting-edge technology")
         
-        hero_bg = f"./assets/images/{hero_image['filename']}" if hero_image else "./assets/images/default-bg.jpg"
+        hero_bg = image_manager.project_url(hero_image, min_width=1600) if hero_image else "./assets/images/default-bg.jpg"
         
         html = f"""<!DOCTYPE html>
 <html lang="th">
@@ -743,7 +755,7 @@ module.exports = {
         for i, img in enumerate(gallery_images[:6]):
             html += f"""
                 <div class="gallery-item" data-aos="fade-up" data-aos-delay="{i*100}">
-                    <img src="./assets/images/{img['filename']}" alt="{img['description']}" loading="lazy">
+                    {image_manager.picture_html(img)}
                     <div class="gallery-overlay">
                         <h4>โปรเจกต์ที่ {i+1}</h4>
                         <p>{img['description']}</p>
@@ -1719,7 +1731,8 @@ console.log('✨ Powered by AgentPro AI Enterprise Generator');"""
                 <div class="about-image">
 """
         if images:
-            html += f'<img src="./assets/images/{images[0]["filename"]}" alt="About us" style="width: 100%; border-radius: 12px;">'
+            html += image_manager.picture_html(images[0], "About us", sizes="(max-width: 768px) 100vw, 50vw",
+                                               attrs='style="width: 100%; height: auto; border-radius: 12px;"')
         
         html += """
                 </div>
@@ -1769,10 +1782,13 @@ console.log('✨ Powered by AgentPro AI Enterprise Generator');"""
         ]
 
         for i, service in enumerate(services):
-            img_src = f"./assets/images/{images[i]['filename']}" if i < len(images) else ""
+            img_tag = image_manager.picture_html(
+                images[i], service['title'],
+                attrs='style="width: 100%; height: 200px; object-fit: cover; border-radius: 8px; margin-bottom: 1rem;"'
+            ) if i < len(images) else ""
             html += f"""
                 <div class="service-card" style="background: white; padding: 2rem; border-radius: 12px; box-shadow: var(--shadow);">
-                    <img src="{img_src}" alt="{service['title']}" style="width: 100%; height: 200px; object-fit: cover; border-radius: 8px; margin-bottom: 1rem;">
+                    {img_tag}
                     <h3>{service['title']}</h3>
                     <p>{service['desc']}</p>
                 </div>"""
@@ -1819,7 +1835,7 @@ console.log('✨ Powered by AgentPro AI Enterprise Generator');"""
         for img in images:
             html += f"""
                 <div class="gallery-item">
-                    <img src="./assets/images/{img['filename']}" alt="{img['description']}" loading="lazy">
+                    {image_manager.picture_html(img)}
                     <div class="gallery-overlay">
                         <h4>{img['description']}</h4>
                     </div>
@@ -2031,14 +2047,23 @@ console.log('✨ Powered by AgentPro AI Enterprise Generator');"""
         # สร้าง directory structure
         project_dir.mkdir(parents=True, exist_ok=True)
         
-        # เขียนไฟล์ทั้งหมด
+        # เขียนไฟล์ทั้งหมด (ชื่อไฟล์อาจมาจาก LLM: ตัดให้อยู่ใต้ category_dir และสร้างโฟลเดอร์ย่อยให้)
         for category, files in project_structure.items():
             if isinstance(files, dict):
-                category_dir = project_dir / category
-                category_dir.mkdir(exist_ok=True)
+                category_name = safe_relative_path(category)
+                if category_name is None:
+                    print(f"⚠️ Skipping unsafe category: {category!r}")
+                    continue
+                category_dir = project_dir / category_name
+                category_dir.mkdir(parents=True, exist_ok=True)
                 
                 for filename, content in files.items():
-                    file_path = category_dir / filename
+                    relative = safe_relative_path(filename)
+                    if relative is None:
+                        print(f"⚠️ Skipping unsafe file path in {category}: {filename!r}")
+                        continue
+                    file_path = category_dir / relative
+                    file_path.parent.mkdir(parents=True, exist_ok=True)
                     if isinstance(content, str):
                         file_path.write_text(content, encoding="utf-8")
                     else:
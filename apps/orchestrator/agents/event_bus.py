@@ -0,0 +1,155 @@
+"""
+📡 Event Bus - pub/sub สำหรับ activity / progress แบบ real-time
+- publish ได้ทั้งจากโค้ด async และจาก thread ของ handler แบบ sync (ไม่ต้องมี event loop)
+- event ถูก serialize เป็น JSON ครั้งเดียว แล้วแจกให้ทุก subscriber
+- subscriber แต่ละรายมีคิวของตัวเองแบบจำกัดขนาด เต็มแล้วทิ้งอันเก่าสุด (client ช้าไม่ถ่วงคนอื่น)
+- event ที่มี coalesce key เดียวกัน (เช่น progress) ที่ยังไม่ถูกส่ง จะถูกแทนที่ด้วยอันล่าสุด
+- ประวัติล่าสุดเก็บใน ring buffer (deque)
+"""
+
+import asyncio
+import itertools
+import json
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Set
+
+
+class Subscription:
+    """คิวของ subscriber หนึ่งราย ใช้ได้เฉพาะใน event loop ของ bus"""
+
+    def __init__(self, bus: "EventBus", maxsize: int):
+        self.bus = bus
+        self.maxsize = maxsize
+        self.dropped = 0
+        self.coalesced = 0
+        self.closed = False
+        # slot = [message, key] ; key -> slot ที่ยังค้างในคิว ใช้แทนที่ event เดิมแบบ in-place
+        self._pending: Deque[list] = deque()
+        self._keyed: Dict[str, list] = {}
+        self._ready = asyncio.Event()
+
+    def _offer(self, message: str, key: Optional[str]):
+        if key is not None:
+            slot = self._keyed.get(key)
+            if slot is not None:
+                slot[0] = message
+                self.coalesced += 1
+                return
+        if len(self._pending) >= self.maxsize:
+            oldest = self._pending.popleft()
+            if oldest[1] is not None and self._keyed.get(oldest[1]) is oldest:
+                del self._keyed[oldest[1]]
+            self.dropped += 1
+        slot = [message, key]
+        self._pending.append(slot)
+        if key is not None:
+            self._keyed[key] = slot
+        self._ready.set()
+
+    async def get(self) -> Optional[str]:
+        """รอ message ถัดไป ได้ None เมื่อ subscription ถูกปิด"""
+        while not self._pending:
+            if self.closed:
+                return None
+            self._ready.clear()
+            await self._ready.wait()
+        message, key = self._pending.popleft()
+        if key is not None:
+            del self._keyed[key]
+        return message
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> str:
+        message = await self.get()
+        if message is None:
+            raise StopAsyncIteration
+        return message
+
+    def close(self):
+        self.closed = True
+        self.bus._subscribers.discard(self)
+        self._ready.set()
+
+    def __len__(self):
+        return len(self._pending)
+
+
+class EventBus:
+    def __init__(self, history_size: int = 100, queue_size: int = 256):
+        self.queue_size = queue_size
+        self.history: Deque[Dict[str, Any]] = deque(maxlen=history_size)
+        self._history_keys: Deque[Optional[str]] = deque(maxlen=history_size)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._subscribers: Set[Subscription] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        # event ที่มาจาก thread อื่น รอส่งเข้า loop เป็นชุดเดียว (ปลุก loop ครั้งเดียวต่อชุด)
+        self._inbox: List[tuple] = []
+        self._flush_scheduled = False
+
+    def next_id(self) -> int:
+        return next(self._ids)
+
+    def publish(self, event: Dict[str, Any], message_type: str = "event", coalesce_key: Optional[str] = None):
+        """ส่ง event ถึง subscriber ทุกราย เรียกได้จากทุก thread ไม่ block"""
+        message = json.dumps({"type": message_type, "data": event}, ensure_ascii=False, default=str)
+        with self._lock:
+            if coalesce_key is not None and self._history_keys and self._history_keys[-1] == coalesce_key:
+                self.history[-1] = event
+            else:
+                self.history.append(event)
+                self._history_keys.append(coalesce_key)
+            loop = self._loop
+            if loop is None or not self._subscribers:
+                return
+            if threading.get_ident() != self._loop_thread:
+                self._inbox.append((message, coalesce_key))
+                if not self._flush_scheduled:
+                    self._flush_scheduled = True
+                    try:
+                        loop.call_soon_threadsafe(self._flush_inbox)
+                    except RuntimeError:
+                        # loop ปิดไปแล้ว (เช่นตอน shutdown)
+                        self._inbox.clear()
+                        self._flush_scheduled = False
+                return
+            backlog = bool(self._inbox)
+        if backlog:
+            self._flush_inbox()  # ส่งของที่ค้างจาก thread อื่นก่อน ลำดับจะได้ไม่สลับ
+        self._deliver(message, coalesce_key)
+
+    def recent(self, limit: int = 20) -> List[Dict[str, Any]]:
+        with self._lock:
+            if limit <= 0:
+                return []
+            return list(itertools.islice(reversed(self.history), limit))[::-1]
+
+    def subscribe(self, queue_size: Optional[int] = None) -> Subscription:
+        """สร้าง subscriber ใหม่ ต้องเรียกจากใน event loop ที่จะใช้ส่งข้อมูล"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._loop is not loop:
+                self._loop = loop
+                self._loop_thread = threading.get_ident()
+            subscription = Subscription(self, queue_size or self.queue_size)
+            self._subscribers.add(subscription)
+        return subscription
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def _flush_inbox(self):
+        with self._lock:
+            batch, self._inbox = self._inbox, []
+            self._flush_scheduled = False
+        for message, key in batch:
+            self._deliver(message, key)
+
+    def _deliver(self, message: str, key: Optional[str]):
+        for subscription in list(self._subscribers):
+            subscription._offer(message, key)
@@ -8,9 +8,14 @@ import random
 from pathlib import Path
 from typing import Dict, List, Any, Optional
 
+from .asset_store import IMAGE_EXTENSIONS, AssetStore, asset_store
+
+PROJECT_ASSETS_URL = "./assets/images"
+
 class ImageManager:
-    def __init__(self, base_path: str = "C:/agent/data"):
+    def __init__(self, base_path: str = "C:/agent/data", store: Optional[AssetStore] = None):
         self.base_path = Path(base_path)
+        self.store = store or asset_store
         self.image_cache = {}
         self.group_mappings = {
             # Business & Corporate
@@ -93,7 +98,7 @@ class ImageManager:
                 if raw_folder.exists():
                     images = []
                     for img_file in raw_folder.iterdir():
-                        if img_file.suffix.lower() in ['.jpg', '.jpeg', '.png', '.gif', '.webp']:
+                        if img_file.suffix.lower() in IMAGE_EXTENSIONS:
                             images.append(img_file.name)
                     
                     if images:
@@ -245,30 +250,81 @@ class ImageManager:
         
         return css
 
-    def copy_images_to_project(self, project_path: str, project_type: str) -> Dict[str, Any]:
-        """คัดลอกรูปภาพไปยัง project folder"""
+    def precompute_library(self, workers: Optional[int] = None) -> Dict[str, Any]:
+        """ย่อรูปทั้งคลัง data/<group>/raw เป็น derivative ล่วงหน้า project ใหม่จะแค่ link ไม่ต้องรอย่อรูป"""
+        
+        if not self.image_cache:
+            self.scan_available_images()
+        
+        sources = [self.base_path / group / "raw" / name
+                   for group, names in self.image_cache.items() for name in names]
+        manifests = self.store.precompute(sources, workers)
+        return {
+            "source_images": len(sources),
+            "unique_images": len({m["key"] for m in manifests}),
+            "store": self.store.get_stats()
+        }
+
+    def picture_html(self, img: Dict[str, Any], alt: Optional[str] = None, lazy: bool = True,
+                     sizes: Optional[str] = None, attrs: str = "") -> str:
+        """แท็กรูปของ project: <picture> + srcset ถ้ารูปถูก link จากคลังแล้ว ไม่งั้นเป็น <img> ธรรมดา"""
         
-        import shutil
+        alt = alt if alt is not None else img.get("description", "")
+        manifest = img.get("asset")
+        if manifest:
+            kwargs = {"sizes": sizes} if sizes else {}
+            return self.store.picture_html(manifest, PROJECT_ASSETS_URL, alt, lazy=lazy, attrs=attrs, **kwargs)
+        loading = ' loading="lazy"' if lazy else ""
+        attrs = f" {attrs.strip()}" if attrs.strip() else ""
+        return f'<img src="{self.project_url(img)}" alt="{alt}"{loading}{attrs}>'
+
+    def project_url(self, img: Dict[str, Any], min_width: Optional[int] = None) -> str:
+        """URL ของรูปไฟล์เดียวภายใน project (เช่น background-image ของ CSS)"""
+        
+        manifest = img.get("asset")
+        if manifest:
+            return self.store.url(manifest, PROJECT_ASSETS_URL, min_width)
+        return f"{PROJECT_ASSETS_URL}/{img['filename']}"
+
+    def copy_images_to_project(self, project_path: str, project_type: str,
+                               images: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """ใส่รูปให้ project: link derivative จากคลังกลางเข้า assets/images แทนการคัดลอกต้นฉบับ
+        
+        images ที่ส่งมา (เช่น hero/gallery ที่หน้าเว็บใช้) จะถูกเติม "asset" ให้ picture_html/project_url ใช้ต่อ
+        """
         
         project_path = Path(project_path)
         assets_path = project_path / "assets" / "images"
         assets_path.mkdir(parents=True, exist_ok=True)
         
-        images = self.get_images_for_project(project_type, 10)
+        if images is None:
+            images = self.get_images_for_project(project_type, 10)["images"]
         copied_files = []
+        seen = set()
         
-        for img in images["images"]:
+        for img in images:
             src_path = Path(img["full_path"])
-            dest_path = assets_path / img["filename"]
+            if not src_path.exists():
+                continue
             
-            if src_path.exists():
-                shutil.copy2(src_path, dest_path)
-                copied_files.append({
-                    "original": str(src_path),
-                    "copied": str(dest_path),
-                    "relative_url": f"./assets/images/{img['filename']}",
-                    "description": img["description"]
-                })
+            try:
+                manifest = self.store.add(src_path)
+                linked = self.store.link_into(manifest, assets_path)
+            except Exception as e:
+                print(f"⚠️ Could not add {src_path} to asset store: {e}")
+                continue
+            img["asset"] = manifest
+            if manifest["key"] in seen:
+                continue
+            seen.add(manifest["key"])
+            copied_files.append({
+                "original": str(src_path),
+                "copied": str(assets_path / manifest["fallback"]),
+                "linked_files": [str(path) for path in linked],
+                "relative_url": self.project_url(img),
+                "srcset": {fmt: self.store.srcset(manifest, PROJECT_ASSETS_URL, fmt) for fmt in manifest["variants"]},
+                "description": img["description"]
+            })
         
         return {
             "success": True,
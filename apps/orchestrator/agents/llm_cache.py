@@ -0,0 +1,207 @@
+"""
+🗄️ LLM Response Cache - แคชคำตอบ LLM แบบ content-addressed
+key = sha256(model, temperature, messages, response_format, max_tokens)
+ชั้นแรกเป็น LRU ในหน่วยความจำ ชั้นที่สองเป็น SQLite บนดิสก์ผ่าน sqlite_pool (อยู่รอดข้าม restart)
+โค้ด async ดูชั้น memory ก่อน แล้วค่อยอ่านดิสก์ใน thread แยก (get_memory / get_disk) ส่วนการเขียนเข้าคิวแบบ batch
+มี TTL, จำกัดจำนวน entry ทั้งสองชั้น และนับ hit/miss
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from sqlite_pool import SQLitePool, get_pool
+
+DEFAULT_DB_PATH = Path(__file__).resolve().parent.parent / "llm_cache.db"
+
+SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS llm_cache (
+        key TEXT PRIMARY KEY,
+        response TEXT NOT NULL,
+        created_at REAL NOT NULL,
+        last_access REAL NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_llm_cache_last_access ON llm_cache(last_access)",
+)
+
+
+def _normalize_content(content: Any) -> Any:
+    # prompt ที่ต่างกันแค่ whitespace/indent ให้ได้ key เดียวกัน
+    if isinstance(content, str):
+        return " ".join(content.split())
+    return content
+
+
+class LLMResponseCache:
+    def __init__(self,
+                 db_path: Optional[Path] = None,
+                 max_memory_entries: int = 512,
+                 max_disk_entries: int = 10000,
+                 ttl_seconds: float = 7 * 24 * 3600):
+        self.db_path = Path(db_path or os.getenv("LLM_CACHE_PATH", DEFAULT_DB_PATH))
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self.ttl_seconds = ttl_seconds
+        self.enabled = os.getenv("LLM_CACHE_DISABLED", "").lower() not in ("1", "true", "yes")
+
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[SQLitePool] = None
+        self._writes_since_sweep = 0
+
+        self.counters = {
+            "hits": 0,
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "evictions": 0,
+            "expired": 0,
+        }
+
+    @staticmethod
+    def make_key(model: str,
+                 temperature: float,
+                 messages: List[Dict[str, Any]],
+                 response_format: Optional[Dict[str, Any]] = None,
+                 max_tokens: Optional[int] = None) -> str:
+        """สร้าง key จากทุกอย่างที่มีผลต่อคำตอบ"""
+        payload = {
+            "model": model,
+            "temperature": round(float(temperature), 3),
+            "messages": [
+                {"role": m.get("role"), "content": _normalize_content(m.get("content"))}
+                for m in messages
+            ],
+            "response_format": response_format,
+            "max_tokens": max_tokens,
+        }
+        raw = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    @property
+    def db(self) -> SQLitePool:
+        if self._db is None:
+            self._db = get_pool(self.db_path, SCHEMA)
+        return self._db
+
+    def _remember(self, key: str, response: str, created_at: float):
+        self._memory[key] = (response, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+            self.counters["evictions"] += 1
+
+    def get(self, key: str) -> Optional[str]:
+        """คืนคำตอบที่แคชไว้ หรือ None ถ้าไม่มี/หมดอายุ (อาจอ่านดิสก์ ใน event loop ให้ใช้ get_memory/get_disk)"""
+        response = self.get_memory(key)
+        if response is None:
+            response = self.get_disk(key)
+        return response
+
+    def get_memory(self, key: str) -> Optional[str]:
+        """ดูเฉพาะชั้น memory (ไม่แตะดิสก์ เรียกจาก event loop ได้) ได้ None ถ้าต้องไปดูดิสก์ต่อ"""
+        if not self.enabled:
+            return None
+
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            response, created_at = entry
+            if now - created_at <= self.ttl_seconds:
+                self._memory.move_to_end(key)
+                self.counters["hits"] += 1
+                self.counters["memory_hits"] += 1
+                return response
+            del self._memory[key]
+            self.counters["expired"] += 1
+            return None
+
+    def get_disk(self, key: str) -> Optional[str]:
+        """ดูชั้น SQLite (blocking) แล้วดึงขึ้น memory ถ้าเจอ; นับ miss เมื่อไม่เจอทั้งสองชั้น"""
+        if not self.enabled:
+            return None
+
+        now = time.time()
+        row = response = None
+        try:
+            # lock ของ memory ไม่ถูกถือระหว่าง I/O: แต่ละ thread ใช้ connection ของตัวเองจาก pool
+            row = self.db.fetchone("SELECT response, created_at FROM llm_cache WHERE key = ?", (key,))
+            if row is not None:
+                if now - row[1] <= self.ttl_seconds:
+                    response = row[0]
+                    self.db.defer("UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key))
+                else:
+                    self.db.defer("DELETE FROM llm_cache WHERE key = ?", (key,))
+        except sqlite3.Error as e:
+            print(f"⚠️ LLM cache read error: {e}")
+
+        with self._lock:
+            if row is not None and response is None:
+                self.counters["expired"] += 1
+            if response is None:
+                self.counters["misses"] += 1
+                return None
+            self._remember(key, response, row[1])
+            self.counters["hits"] += 1
+            self.counters["disk_hits"] += 1
+            return response
+
+    def set(self, key: str, response: str):
+        """บันทึกคำตอบลง memory ทันที ส่วนดิสก์เข้าคิวให้ flusher ของ pool เขียน (ไม่ block ผู้เรียก)"""
+        if not self.enabled or not response:
+            return
+
+        now = time.time()
+        with self._lock:
+            self._remember(key, response, now)
+            self.counters["stores"] += 1
+            self._writes_since_sweep += 1
+            sweep = self._writes_since_sweep >= 50
+            if sweep:
+                self._writes_since_sweep = 0
+        self.db.defer(
+            "INSERT OR REPLACE INTO llm_cache (key, response, created_at, last_access) VALUES (?, ?, ?, ?)",
+            (key, response, now, now)
+        )
+        # กวาด entry หมดอายุ/เกินขนาดเป็นช่วง ๆ ไม่ต้องทำทุกครั้งที่เขียน
+        if sweep:
+            self.db.defer("DELETE FROM llm_cache WHERE created_at < ?", (now - self.ttl_seconds,))
+            self.db.defer(
+                "DELETE FROM llm_cache WHERE key IN "
+                "(SELECT key FROM llm_cache ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                (self.max_disk_entries,)
+            )
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+        try:
+            self.db.flush()
+            self.db.execute("DELETE FROM llm_cache")
+        except sqlite3.Error as e:
+            print(f"⚠️ LLM cache clear error: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.counters["hits"] + self.counters["misses"]
+            return {
+                "enabled": self.enabled,
+                "memory_entries": len(self._memory),
+                "hit_rate": (self.counters["hits"] / lookups) if lookups else 0.0,
+                **self.counters,
+            }
+
+
+# Global instance
+llm_cache = LLMResponseCache()
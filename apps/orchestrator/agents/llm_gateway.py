@@ -0,0 +1,407 @@
+"""
+🚦 LLM Gateway - จุดเดียวสำหรับเรียก LLM ทั้งระบบ
+เรียกแบบ async ไม่บล็อก event loop, จำกัดจำนวน request พร้อมกัน, มี timeout ต่อ request
+และมี thread pool สำหรับโค้ด sync เดิม
+
+Backends:
+- "openai" (default): AsyncOpenAI / OpenAI
+- "stub": ตอบกลับจำลองแบบ offline สำหรับ load test (LLM_BACKEND=stub)
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from functools import partial
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+from .llm_cache import LLMResponseCache, llm_cache
+
+DEFAULT_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+
+
+@dataclass
+class LLMRequest:
+    messages: List[Dict[str, str]]
+    model: str = DEFAULT_MODEL
+    temperature: float = 0.7
+    max_tokens: Optional[int] = None
+    response_format: Optional[Dict[str, Any]] = None
+
+    def cache_key(self) -> str:
+        return LLMResponseCache.make_key(
+            self.model, self.temperature, self.messages, self.response_format, self.max_tokens
+        )
+
+    def to_kwargs(self) -> Dict[str, Any]:
+        """แปลงเป็น kwargs สำหรับ chat.completions.create"""
+        kwargs: Dict[str, Any] = {
+            "model": self.model,
+            "messages": self.messages,
+            "temperature": self.temperature,
+        }
+        if self.max_tokens is not None:
+            kwargs["max_tokens"] = self.max_tokens
+        if self.response_format is not None:
+            kwargs["response_format"] = self.response_format
+        return kwargs
+
+
+@dataclass
+class GatewayStats:
+    in_flight: int = 0
+    peak_in_flight: int = 0
+    completed: int = 0
+    failed: int = 0
+    timeouts: int = 0
+    total_latency: float = 0.0
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def started(self):
+        with self.lock:
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def finished(self, latency: float, ok: bool, timed_out: bool = False):
+        with self.lock:
+            self.in_flight -= 1
+            self.total_latency += latency
+            if ok:
+                self.completed += 1
+            else:
+                self.failed += 1
+            if timed_out:
+                self.timeouts += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self.lock:
+            finished = self.completed + self.failed
+            return {
+                "in_flight": self.in_flight,
+                "peak_in_flight": self.peak_in_flight,
+                "completed": self.completed,
+                "failed": self.failed,
+                "timeouts": self.timeouts,
+                "avg_latency": (self.total_latency / finished) if finished else 0.0,
+            }
+
+
+class OpenAIBackend:
+    """เรียก OpenAI จริง - สร้าง client ครั้งเดียวแล้วใช้ร่วมกัน"""
+
+    name = "openai"
+
+    def __init__(self, api_key: Optional[str] = None):
+        self.api_key = api_key or os.getenv("OPENAI_API_KEY")
+        self._async_client = None
+        self._sync_client = None
+
+    @property
+    def async_client(self):
+        if self._async_client is None:
+            from openai import AsyncOpenAI
+            self._async_client = AsyncOpenAI(api_key=self.api_key)
+        return self._async_client
+
+    @property
+    def sync_client(self):
+        if self._sync_client is None:
+            from openai import OpenAI
+            self._sync_client = OpenAI(api_key=self.api_key)
+        return self._sync_client
+
+    async def complete(self, request: LLMRequest, timeout: float) -> str:
+        response = await self.async_client.chat.completions.create(timeout=timeout, **request.to_kwargs())
+        return response.choices[0].message.content or ""
+
+    def complete_sync(self, request: LLMRequest, timeout: float) -> str:
+        response = self.sync_client.chat.completions.create(timeout=timeout, **request.to_kwargs())
+        return response.choices[0].message.content or ""
+
+    async def stream(self, request: LLMRequest, timeout: float) -> AsyncIterator[str]:
+        response = await self.async_client.chat.completions.create(timeout=timeout, stream=True, **request.to_kwargs())
+        async for chunk in response:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+
+class StubBackend:
+    """Backend จำลองสำหรับทดสอบ offline - หน่วงเวลาตาม latency แล้วตอบกลับแบบ deterministic"""
+
+    name = "stub"
+
+    def __init__(self, latency: float = 0.5):
+        self.latency = latency
+
+    def _reply(self, request: LLMRequest) -> str:
+        user_msg = next((m["content"] for m in reversed(request.messages) if m.get("role") == "user"), "")
+        if request.response_format and request.response_format.get("type") == "json_object":
+            slug = "myapp-" + datetime.now().strftime("%Y%m%d-%H%M%S")
+            return json.dumps({
+                "slug": slug,
+                "files": [
+                    {"path": "index.html", "content": (
+                        "<!doctype html><html><head><meta charset=\"utf-8\">"
+                        "<meta name=\"viewport\" content=\"width=device-width, initial-scale=1\">"
+                        "<link rel=\"stylesheet\" href=\"./styles.css\"></head>"
+                        f"<body><h1>{user_msg[:80]}</h1><script src=\"./script.js\"></script></body></html>"
+                    )},
+                    {"path": "styles.css", "content": "body { font-family: sans-serif; margin: 0; }"},
+                    {"path": "script.js", "content": "console.log('stub');"},
+                ],
+            }, ensure_ascii=False)
+        return f"[stub] {user_msg[:200]}"
+
+    async def complete(self, request: LLMRequest, timeout: float) -> str:
+        await asyncio.sleep(self.latency)
+        return self._reply(request)
+
+    def complete_sync(self, request: LLMRequest, timeout: float) -> str:
+        time.sleep(self.latency)
+        return self._reply(request)
+
+    async def stream(self, request: LLMRequest, timeout: float, chunk_size: int = 16) -> AsyncIterator[str]:
+        # กระจาย latency ไปตามจำนวน chunk เหมือน token ที่ทยอยมา (นับจากเวลาเริ่ม ไม่ให้ sleep สะสมเกิน)
+        reply = self._reply(request)
+        pieces = [reply[i:i + chunk_size] for i in range(0, len(reply), chunk_size)] or [""]
+        loop = asyncio.get_running_loop()
+        started_at = loop.time()
+        for n, piece in enumerate(pieces, 1):
+            await asyncio.sleep(max(0.0, started_at + self.latency * n / len(pieces) - loop.time()))
+            yield piece
+
+
+def _backend_from_env():
+    if os.getenv("LLM_BACKEND", "openai").lower() == "stub":
+        return StubBackend(latency=float(os.getenv("LLM_STUB_LATENCY", "0.5")))
+    return OpenAIBackend()
+
+
+class LLMGateway:
+    """Gateway กลางสำหรับเรียก LLM แบบไม่บล็อก
+
+    - complete(): async, จำกัด concurrency ด้วย semaphore (ต่อ event loop) + timeout
+    - stream(): เหมือน complete() แต่ yield ข้อความทีละส่วนระหว่างที่ LLM ยังตอบอยู่
+    - complete_sync(): สำหรับโค้ด sync ที่รันใน thread ของตัวเอง
+    - run_blocking(): ย้ายโค้ด sync เดิม (เช่น agent ที่ใช้ OpenAI client ตรง ๆ) ไปรันใน thread pool
+    - cache=True: อ่าน/เขียน LLMResponseCache ก่อนเรียก backend (ใช้กับ prompt ที่ตอบซ้ำได้)
+      validate(text) -> bool: เก็บลง cache เฉพาะคำตอบที่ผู้เรียกใช้ได้จริง (เช่น JSON ครบตามสคีม)
+    """
+
+    def __init__(self,
+                 backend=None,
+                 model: str = DEFAULT_MODEL,
+                 max_concurrency: Optional[int] = None,
+                 timeout: Optional[float] = None,
+                 cache: Optional[LLMResponseCache] = None):
+        self.backend = backend or _backend_from_env()
+        self.cache = cache or llm_cache
+        self.model = model
+        self.max_concurrency = max_concurrency or int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+        self.timeout = timeout or float(os.getenv("LLM_TIMEOUT", "60"))
+        self.stats = GatewayStats()
+
+        self._semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+        self._semaphores_lock = threading.Lock()
+        self._sync_slots = threading.BoundedSemaphore(self.max_concurrency)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="llm-gateway")
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        with self._semaphores_lock:
+            semaphore = self._semaphores.get(loop)
+            if semaphore is None:
+                semaphore = asyncio.Semaphore(self.max_concurrency)
+                self._semaphores[loop] = semaphore
+            return semaphore
+
+    async def _cached(self, cache_key: str) -> Optional[str]:
+        """ดู cache โดยไม่ block event loop: ชั้น memory ตรง ๆ, ชั้น SQLite ใน thread แยก"""
+        cached = self.cache.get_memory(cache_key)
+        if cached is None:
+            cached = await asyncio.to_thread(self.cache.get_disk, cache_key)
+        return cached
+
+    def _store(self, cache_key: Optional[str], content: str, validate: Optional[Callable[[str], bool]]):
+        """เก็บคำตอบลง cache เฉพาะที่ผ่าน validate (คำตอบเสียจะไม่ถูกตอบซ้ำไปตลอด TTL)"""
+        if not cache_key:
+            return
+        if validate is not None:
+            try:
+                if not validate(content):
+                    return
+            except Exception:
+                return
+        self.cache.set(cache_key, content)
+
+    def _build_request(self, messages, model, temperature, max_tokens, response_format) -> LLMRequest:
+        return LLMRequest(
+            messages=messages,
+            model=model or self.model,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            response_format=response_format,
+        )
+
+    async def complete(self,
+                       messages: List[Dict[str, str]],
+                       model: Optional[str] = None,
+                       temperature: float = 0.7,
+                       max_tokens: Optional[int] = None,
+                       response_format: Optional[Dict[str, Any]] = None,
+                       timeout: Optional[float] = None,
+                       cache: bool = False,
+                       validate: Optional[Callable[[str], bool]] = None) -> str:
+        """เรียก LLM แบบ async และคืนข้อความของคำตอบแรก"""
+        request = self._build_request(messages, model, temperature, max_tokens, response_format)
+        timeout = timeout or self.timeout
+
+        cache_key = request.cache_key() if cache else None
+        if cache_key:
+            cached = await self._cached(cache_key)
+            if cached is not None:
+                return cached
+
+        async with self._semaphore():
+            self.stats.started()
+            started_at = time.perf_counter()
+            try:
+                content = await asyncio.wait_for(self.backend.complete(request, timeout), timeout)
+            except asyncio.TimeoutError:
+                self.stats.finished(time.perf_counter() - started_at, ok=False, timed_out=True)
+                raise
+            except Exception:
+                self.stats.finished(time.perf_counter() - started_at, ok=False)
+                raise
+            self.stats.finished(time.perf_counter() - started_at, ok=True)
+
+        self._store(cache_key, content, validate)
+        return content
+
+    async def stream(self,
+                     messages: List[Dict[str, str]],
+                     model: Optional[str] = None,
+                     temperature: float = 0.7,
+                     max_tokens: Optional[int] = None,
+                     response_format: Optional[Dict[str, Any]] = None,
+                     timeout: Optional[float] = None,
+                     cache: bool = False,
+                     validate: Optional[Callable[[str], bool]] = None) -> AsyncIterator[str]:
+        """เรียก LLM แบบ streaming - yield ข้อความทีละส่วนทันทีที่มาถึง
+
+        timeout คือเวลารวมของทั้งคำตอบ; ถ้าเปิด cache คำตอบที่มีอยู่แล้วถูก yield ทีเดียว
+        และคำตอบที่ stream จนจบจะถูกเก็บลง cache
+        """
+        request = self._build_request(messages, model, temperature, max_tokens, response_format)
+        timeout = timeout or self.timeout
+
+        cache_key = request.cache_key() if cache else None
+        if cache_key:
+            cached = await self._cached(cache_key)
+            if cached is not None:
+                yield cached
+                return
+
+        parts: List[str] = []
+        loop = asyncio.get_running_loop()
+        async with self._semaphore():
+            self.stats.started()
+            started_at = time.perf_counter()
+            deadline = loop.time() + timeout
+            # timeout ต่อ chunk (ไม่ใช่ asyncio.timeout ครอบ yield ซึ่งจะไป cancel งานของผู้เรียก)
+            parts_iter = self.backend.stream(request, timeout).__aiter__()
+            try:
+                while True:
+                    try:
+                        part = await asyncio.wait_for(parts_iter.__anext__(), deadline - loop.time())
+                    except StopAsyncIteration:
+                        break
+                    parts.append(part)
+                    yield part
+            except asyncio.TimeoutError:
+                self.stats.finished(time.perf_counter() - started_at, ok=False, timed_out=True)
+                raise
+            except BaseException:
+                # รวมกรณีผู้เรียกเลิกอ่านกลางทาง (GeneratorExit / CancelledError)
+                self.stats.finished(time.perf_counter() - started_at, ok=False)
+                raise
+            finally:
+                await parts_iter.aclose()
+            self.stats.finished(time.perf_counter() - started_at, ok=True)
+
+        self._store(cache_key, "".join(parts), validate)
+
+    def complete_sync(self,
+                      messages: List[Dict[str, str]],
+                      model: Optional[str] = None,
+                      temperature: float = 0.7,
+                      max_tokens: Optional[int] = None,
+                      response_format: Optional[Dict[str, Any]] = None,
+                      timeout: Optional[float] = None,
+                      cache: bool = False,
+                      validate: Optional[Callable[[str], bool]] = None) -> str:
+        """เรียก LLM จากโค้ด sync (ห้ามเรียกจากใน event loop - ให้ใช้ complete() แทน)"""
+        request = self._build_request(messages, model, temperature, max_tokens, response_format)
+        timeout = timeout or self.timeout
+
+        cache_key = request.cache_key() if cache else None
+        if cache_key:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        with self._sync_slots:
+            self.stats.started()
+            started_at = time.perf_counter()
+            try:
+                content = self.backend.complete_sync(request, timeout)
+            except Exception:
+                self.stats.finished(time.perf_counter() - started_at, ok=False)
+                raise
+            self.stats.finished(time.perf_counter() - started_at, ok=True)
+
+        self._store(cache_key, content, validate)
+        return content
+
+    async def run_blocking(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """รันฟังก์ชัน sync (ที่เรียก LLM ภายใน) ใน thread pool ของ gateway"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(func, *args, **kwargs))
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.backend.name,
+            "model": self.model,
+            "max_concurrency": self.max_concurrency,
+            "timeout": self.timeout,
+            **self.stats.to_dict(),
+            "cache": self.cache.get_stats(),
+        }
+
+
+# Global instance
+llm_gateway = LLMGateway()
+
+
+async def _load_test(requests: int = 64, concurrency: int = 16, latency: float = 0.2):
+    """Load test แบบ offline ด้วย StubBackend (รันด้วย: python -m agents.llm_gateway)"""
+    gateway = LLMGateway(backend=StubBackend(latency=latency), max_concurrency=concurrency, timeout=10)
+    messages = [{"role": "user", "content": "สร้างเว็บไซต์ร้านกาแฟ"}]
+
+    started_at = time.perf_counter()
+    await asyncio.gather(*(gateway.complete(messages, response_format={"type": "json_object"}) for _ in range(requests)))
+    elapsed = time.perf_counter() - started_at
+
+    serial = requests * latency
+    print(f"🚦 {requests} requests @ concurrency {concurrency}, latency {latency:.2f}s")
+    print(f"⏱️ {elapsed:.2f}s (serial would be {serial:.2f}s, ideal {serial / concurrency:.2f}s)")
+    print(f"📊 {gateway.get_stats()}")
+
+
+if __name__ == "__main__":
+    asyncio.run(_load_test())
@@ -0,0 +1,329 @@
+"""
+🌊 Plan Stream - อ่าน JSON แผนเว็บ {"slug": ..., "files": [{"path", "content"}]} ทีละ chunk ขณะ LLM ยังตอบไม่จบ
+- PlanStreamParser: parser แบบ incremental ได้ event ทันทีที่ข้อมูลมาถึง (ไม่ต้องรอ JSON ทั้งก้อน)
+- write_plan_stream: เขียนแต่ละไฟล์ลงดิสก์ทันทีที่ object ของไฟล์นั้นปิด และส่ง chunk ของเนื้อหาต่อให้ client
+"""
+
+import json
+import os
+import re
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+_STRING_STOP = re.compile(r'["\\]')
+_SIMPLE_ESCAPES = {'"': '"', '\\': '\\', '/': '/', 'b': '\b', 'f': '\f', 'n': '\n', 'r': '\r', 't': '\t'}
+_WHITESPACE = ' \t\r\n'
+
+
+class PlanStreamError(ValueError):
+    pass
+
+
+class PlanStreamParser:
+    """Incremental parser สำหรับแผนไฟล์
+
+    feed() คืน list ของ event (tuple):
+    - ("slug", slug)
+    - ("file_start", index, path)
+    - ("file_chunk", index, path, text)   เนื้อหาที่เพิ่งมาถึง (ต่อกันแล้วได้ content ทั้งไฟล์)
+    - ("file_end", index, path, content)
+    ค่าอื่นใน JSON ถูกข้ามไป ไฟล์ที่ไม่มี path จะไม่ได้ event
+    """
+
+    def __init__(self):
+        # container ที่เปิดอยู่: [kind, key/index, state]  kind = "{" หรือ "["
+        self._stack: List[list] = []
+        self._done = False
+        self._string: Optional[List[str]] = None  # อยู่ในสตริง (buffer ของสตริงที่ต้องเก็บ)
+        self._string_role: Optional[str] = None   # "key" | "slug" | "path" | "content" | "skip"
+        self._escape: Optional[str] = None        # escape ที่ค้างข้าม chunk เช่น "\\" หรือ "\\u00"
+        self._high_surrogate: Optional[str] = None
+        self._scalar = False                      # อยู่ใน number / true / false / null
+        self._file: Optional[Dict[str, Any]] = None
+
+    # ------------------------------------------------------------------ public
+
+    @property
+    def done(self) -> bool:
+        return self._done
+
+    def feed(self, text: str) -> List[Tuple]:
+        events: List[Tuple] = []
+        i, n = 0, len(text)
+        while i < n:
+            if self._string is not None:
+                i = self._read_string(text, i, events)
+                continue
+            ch = text[i]
+            if self._scalar:
+                if ch in ',]}' or ch in _WHITESPACE:
+                    self._scalar = False
+                    self._value_done()
+                else:
+                    i += 1
+                    continue
+            if ch in _WHITESPACE:
+                pass
+            elif self._done:
+                raise PlanStreamError(f"unexpected data after the plan: {ch!r}")
+            elif ch == '{' or ch == '[':
+                self._begin_value()
+                frame = [ch, None, 'key' if ch == '{' else 'value']
+                if ch == '{' and self._path() == ('files', '#'):
+                    self._file = {'frame': frame, 'index': self._stack[-1][1], 'path': None,
+                                  'content': [], 'pending': []}
+                self._stack.append(frame)
+            elif ch == '}' or ch == ']':
+                if not self._stack or self._stack[-1][0] != ('{' if ch == '}' else '['):
+                    raise PlanStreamError(f"unbalanced {ch!r}")
+                if self._file is not None and self._stack[-1] is self._file['frame']:
+                    self._close_file(events)
+                self._stack.pop()
+                self._value_done()
+            elif ch == ':':
+                self._stack[-1][2] = 'value'
+            elif ch == ',':
+                top = self._stack[-1]
+                top[2] = 'key' if top[0] == '{' else 'value'
+            elif ch == '"':
+                self._begin_string()
+            else:
+                self._begin_value()
+                self._scalar = True
+            i += 1
+        return events
+
+    def close(self):
+        """ตรวจว่า JSON จบครบ (เรียกหลัง chunk สุดท้าย)"""
+        if not self._done:
+            raise PlanStreamError("plan ended before the JSON was complete")
+
+    # ------------------------------------------------------------------ structure
+
+    def _path(self) -> tuple:
+        """key path ของตำแหน่งปัจจุบัน (index ของ array แทนด้วย '#')"""
+        return tuple('#' if frame[0] == '[' else frame[1] for frame in self._stack)
+
+    def _begin_value(self):
+        if not self._stack:
+            if self._done:
+                raise PlanStreamError("unexpected data after the plan")
+            return
+        top = self._stack[-1]
+        if top[0] == '[':
+            top[1] = 0 if top[1] is None else top[1] + 1
+        elif top[2] != 'value':
+            raise PlanStreamError("object key expected")
+
+    def _value_done(self):
+        if not self._stack:
+            self._done = True
+        else:
+            self._stack[-1][2] = 'next'
+
+    def _begin_string(self):
+        top = self._stack[-1] if self._stack else None
+        if top is not None and top[0] == '{' and top[2] == 'key':
+            self._string_role = 'key'
+        else:
+            self._begin_value()
+            path = self._path()
+            if path == ('slug',):
+                self._string_role = 'slug'
+            elif path in (('files', '#', 'path'), ('files', '#', 'content')) and self._file is not None:
+                self._string_role = path[-1]
+            else:
+                self._string_role = 'skip'
+        self._string = []
+
+    def _read_string(self, text: str, i: int, events: List[Tuple]) -> int:
+        piece: List[str] = []
+        n = len(text)
+        while i < n:
+            if self._escape is not None:
+                i = self._read_escape(text, i, piece)
+                continue
+            match = _STRING_STOP.search(text, i)
+            end = match.start() if match else n
+            if end > i:
+                self._flush_surrogate(piece)
+                piece.append(text[i:end])
+            i = end
+            if match is None:
+                break
+            if text[i] == '\\':
+                self._escape = '\\'
+                i += 1
+                continue
+            # ปิดสตริง
+            self._flush_surrogate(piece)
+            self._string_piece(''.join(piece), events)
+            self._string_end(events)
+            return i + 1
+        self._string_piece(''.join(piece), events)
+        return i
+
+    def _read_escape(self, text: str, i: int, piece: List[str]) -> int:
+        escape = self._escape
+        if escape == '\\':
+            ch = text[i]
+            if ch == 'u':
+                self._escape = '\\u'
+                return i + 1
+            if ch not in _SIMPLE_ESCAPES:
+                raise PlanStreamError(f"invalid escape \\{ch}")
+            self._flush_surrogate(piece)
+            piece.append(_SIMPLE_ESCAPES[ch])
+            self._escape = None
+            return i + 1
+        need = 6 - len(escape)
+        escape += text[i:i + need]
+        i += min(need, len(text) - i)
+        if len(escape) < 6:
+            self._escape = escape
+            return i
+        self._escape = None
+        char = chr(int(escape[2:], 16))
+        if 0xD800 <= ord(char) <= 0xDBFF:
+            self._flush_surrogate(piece)
+            self._high_surrogate = char
+        elif 0xDC00 <= ord(char) <= 0xDFFF and self._high_surrogate:
+            high = ord(self._high_surrogate)
+            self._high_surrogate = None
+            piece.append(chr(0x10000 + ((high - 0xD800) << 10) + (ord(char) - 0xDC00)))
+        else:
+            self._flush_surrogate(piece)
+            piece.append(char)
+        return i
+
+    def _flush_surrogate(self, piece: List[str]):
+        if self._high_surrogate is not None:
+            piece.append(self._high_surrogate)
+            self._high_surrogate = None
+
+    def _string_piece(self, text: str, events: List[Tuple]):
+        if not text:
+            return
+        role = self._string_role
+        if role == 'content':
+            file = self._file
+            file['content'].append(text)
+            if file['path'] is None:
+                file['pending'].append(text)
+            else:
+                events.append(('file_chunk', file['index'], file['path'], text))
+        elif role != 'skip':
+            self._string.append(text)
+
+    def _string_end(self, events: List[Tuple]):
+        role, value = self._string_role, ''.join(self._string)
+        self._string = None
+        self._string_role = None
+        if role == 'key':
+            self._stack[-1][1] = value
+            return
+        if role == 'slug':
+            events.append(('slug', value))
+        elif role == 'path' and self._file['path'] is None:
+            file = self._file
+            file['path'] = value
+            events.append(('file_start', file['index'], value))
+            if file['pending']:
+                events.append(('file_chunk', file['index'], value, ''.join(file['pending'])))
+                file['pending'] = []
+        self._value_done()
+
+    def _close_file(self, events: List[Tuple]):
+        file, self._file = self._file, None
+        if file['path'] is not None:
+            events.append(('file_end', file['index'], file['path'], ''.join(file['content'])))
+
+
+def default_slug() -> str:
+    return "myapp-" + datetime.now().strftime("%Y%m%d-%H%M%S")
+
+
+REQUIRED_PLAN_FILES = ("index.html", "styles.css")
+
+
+def is_complete_plan(text: str) -> bool:
+    """คำตอบเป็น JSON แผนที่ใช้ได้ครบ (slug, files และมี index.html + styles.css) - ใช้เป็น validate ของ cache"""
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return False
+    if not isinstance(data, dict) or not isinstance(data.get("slug"), str) or not isinstance(data.get("files"), list):
+        return False
+    paths = {(f.get("path") or "").lstrip("/").strip().lower() for f in data["files"] if isinstance(f, dict)}
+    return all(name in paths for name in REQUIRED_PLAN_FILES)
+
+
+def _safe_target(outdir: Path, rel: str) -> Optional[Path]:
+    rel = rel.lstrip("/").strip()
+    if not rel:
+        return None
+    target = (outdir / rel).resolve()
+    if os.path.commonpath([str(target), str(outdir.resolve())]) != str(outdir.resolve()):
+        return None
+    return target
+
+
+async def write_plan_stream(chunks: AsyncIterator[str], webroot: Path) -> AsyncIterator[Dict[str, Any]]:
+    """อ่านแผนจาก chunks ของ LLM แล้วเขียนไฟล์ลง webroot/<slug>/ ทันทีที่แต่ละไฟล์จบ
+
+    yield event (dict):
+    - {"event": "file_start", "slug", "path"}
+    - {"event": "chunk", "path", "text"}
+    - {"event": "file_written", "slug", "path", "file"}
+    - {"event": "done", "slug", "files": [absolute paths]}
+
+    slug จากแผนใช้ได้เมื่อขึ้นต้นด้วย "myapp-" และยังไม่มีโปรเจคชื่อนี้ (ห้ามเขียนทับของเดิม)
+    ไม่อย่างนั้นใช้ slug ตามเวลา; slug ถูกตัดสินตอนไฟล์แรกเริ่ม
+    """
+    parser = PlanStreamParser()
+    plan_slug: Optional[str] = None
+    slug: Optional[str] = None
+    outdir: Optional[Path] = None
+    written: List[str] = []
+    targets: Dict[int, Path] = {}
+
+    def choose_slug() -> Tuple[str, Path]:
+        candidate = (plan_slug or "").strip()
+        if not candidate.startswith("myapp-") or "/" in candidate or (webroot / candidate).exists():
+            candidate = default_slug()
+        directory = webroot / candidate
+        directory.mkdir(parents=True, exist_ok=True)
+        return candidate, directory
+
+    async for chunk in chunks:
+        for event in parser.feed(chunk):
+            kind = event[0]
+            if kind == "slug":
+                plan_slug = event[1]
+            elif kind == "file_start":
+                if outdir is None:
+                    slug, outdir = choose_slug()
+                target = _safe_target(outdir, event[2])
+                if target is None:
+                    continue  # path ว่าง หรือชี้ออกนอกโฟลเดอร์โปรเจค
+                targets[event[1]] = target
+                yield {"event": "file_start", "slug": slug, "path": event[2]}
+            elif kind == "file_chunk":
+                if event[1] in targets:
+                    yield {"event": "chunk", "path": event[2], "text": event[3]}
+            elif kind == "file_end":
+                target = targets.pop(event[1], None)
+                if target is None:
+                    continue
+                target.parent.mkdir(parents=True, exist_ok=True)
+                temp = target.with_name(f".{target.name}.{uuid.uuid4().hex[:6]}.tmp")
+                temp.write_text(event[3], encoding="utf-8")
+                os.replace(temp, target)  # preview ไม่เห็นไฟล์ที่เขียนไม่ครบ
+                written.append(str(target))
+                yield {"event": "file_written", "slug": slug, "path": event[2], "file": str(target)}
+    parser.close()
+    if outdir is None:
+        slug, outdir = choose_slug()
+    yield {"event": "done", "slug": slug, "files": written}
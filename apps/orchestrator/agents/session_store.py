@@ -0,0 +1,366 @@
+"""
+🗃️ Session Store - เก็บ session ของผู้ใช้แบบมีขอบเขต
+ชั้นแรกเป็น LRU ในหน่วยความจำ (จำกัดจำนวน + ไล่ออกเมื่อ idle เกิน TTL)
+session ที่ถูกไล่ออกจะถูกเขียนลง SQLite (spill) แล้วโหลดกลับให้เองเมื่อผู้ใช้กลับมา
+session ที่ยังมี connection อยู่ (pin) ไม่ถูกไล่ออก
+โหมด shared (หลาย worker): เขียนลงดิสก์ทุกครั้งที่ปล่อย session และโหลดใหม่ถ้า worker อื่นเขียนฉบับที่ใหม่กว่า
+
+ConversationMemory: ประวัติแชทที่เก็บ N ข้อความล่าสุดแบบเต็ม ส่วนที่เก่ากว่าถูกย่อเป็นสรุปที่จำกัดความยาว
+เพื่อให้ prompt ที่ส่งให้ LLM มีขนาดคงที่ไม่ว่าคุยไปนานแค่ไหน
+"""
+
+import atexit
+import json
+import os
+import sqlite3
+import threading
+import time
+import weakref
+from collections import OrderedDict, deque
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlite_pool import SQLitePool, get_pool
+
+from .shared_state import state_backend
+
+DEFAULT_DB_PATH = Path(__file__).resolve().parent.parent / "sessions.db"
+
+SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS sessions (
+        namespace TEXT NOT NULL,
+        key TEXT NOT NULL,
+        state TEXT NOT NULL,
+        updated_at REAL NOT NULL,
+        PRIMARY KEY (namespace, key)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_sessions_updated_at ON sessions(updated_at)",
+)
+
+# session ที่ยังอยู่ในหน่วยความจำถูกเขียนลงดิสก์ตอน shutdown (atexit และ shutdown hook ของ main.py)
+_open_stores: "weakref.WeakSet[SessionStore]" = weakref.WeakSet()
+
+
+@atexit.register
+def spill_all_stores():
+    """เรียก spill_all ของทุก SessionStore ที่ยังเปิดอยู่"""
+    for store in list(_open_stores):
+        try:
+            store.spill_all()
+        except Exception as e:
+            print(f"⚠️ Session store spill error ({store.namespace}): {e}")
+
+
+class SessionStore:
+    """LRU + idle TTL ในหน่วยความจำ, spill ลง SQLite ตาม namespace
+
+    factory() สร้าง session ใหม่, dump(session) -> dict ที่ JSON ได้, load(dict) -> session
+    """
+
+    def __init__(self,
+                 namespace: str,
+                 factory: Callable[[], Any],
+                 dump: Callable[[Any], Dict[str, Any]],
+                 load: Callable[[Dict[str, Any]], Any],
+                 db_path: Optional[Path] = None,
+                 max_sessions: Optional[int] = None,
+                 idle_ttl: Optional[float] = None,
+                 retention_seconds: float = 30 * 24 * 3600,
+                 shared: Optional[bool] = None):
+        self.namespace = namespace
+        self.factory = factory
+        self.dump = dump
+        self.load = load
+        self.db_path = Path(db_path or os.getenv("SESSION_STORE_PATH", DEFAULT_DB_PATH))
+        self.max_sessions = max_sessions or int(os.getenv("SESSION_STORE_MAX", "1000"))
+        self.idle_ttl = idle_ttl if idle_ttl is not None else float(os.getenv("SESSION_IDLE_TTL", "900"))
+        self.retention_seconds = retention_seconds
+        self.shared = state_backend.shared if shared is None else shared
+
+        # key -> [session, last_used, version]  เรียงจากใช้ล่าสุดนานที่สุดไปล่าสุด
+        # version = updated_at ของฉบับบนดิสก์ที่ session นี้ตรงกัน (0 = ยังไม่เคยเขียน)
+        self._hot: "OrderedDict[str, list]" = OrderedDict()
+        self._pins: Dict[str, int] = {}
+        self._lock = threading.RLock()
+        self._db: Optional[SQLitePool] = None
+        self._last_sweep = time.time()
+        self._spills_since_purge = 0
+
+        self.counters = {
+            "hits": 0,
+            "created": 0,
+            "rehydrated": 0,
+            "spilled": 0,
+            "idle_evictions": 0,
+            "lru_evictions": 0,
+            "reloaded": 0,
+        }
+        _open_stores.add(self)
+
+    @property
+    def db(self) -> SQLitePool:
+        # เปิด pool ตอนใช้ครั้งแรก (store ที่ไม่เคย spill ไม่ต้องสร้างไฟล์)
+        if self._db is None:
+            self._db = get_pool(self.db_path, SCHEMA)
+        return self._db
+
+    # ------------------------------------------------------------------ access
+
+    def get(self, key: str, create: bool = True) -> Any:
+        """คืน session ของ key (โหลดจากดิสก์หรือสร้างใหม่ถ้ายังไม่อยู่ในหน่วยความจำ)
+
+        create=False: คืน None ถ้าไม่มี session นี้ทั้งในหน่วยความจำและบนดิสก์
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._hot.get(key)
+            if entry is not None and self.shared and key not in self._pins:
+                # worker อื่นอาจเขียนฉบับใหม่กว่าไว้ (session ที่ pin อยู่กำลังถูกแก้ใน worker นี้)
+                state, version = self._read_versioned(key, newer_than=entry[2])
+                if state is not None:
+                    entry[0], entry[2] = self.load(state), version
+                    self.counters["reloaded"] += 1
+            if entry is not None:
+                entry[1] = now
+                self._hot.move_to_end(key)
+                self.counters["hits"] += 1
+                return entry[0]
+
+            state, version = self._read_versioned(key)
+            if state is not None:
+                session = self.load(state)
+                self.counters["rehydrated"] += 1
+            elif create:
+                session = self.factory()
+                self.counters["created"] += 1
+            else:
+                return None
+            self._hot[key] = [session, now, version]
+            self._evict(now)
+            return session
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._hot or self._read(key) is not None
+
+    def items(self) -> List[Tuple[str, Any]]:
+        """session ที่อยู่ในหน่วยความจำตอนนี้"""
+        with self._lock:
+            return [(key, entry[0]) for key, entry in self._hot.items()]
+
+    def pin(self, key: str):
+        """กันไม่ให้ session ถูกไล่ออก (เช่นระหว่างที่ยังมี WebSocket เปิดอยู่)"""
+        with self._lock:
+            self._pins[key] = self._pins.get(key, 0) + 1
+
+    def unpin(self, key: str):
+        with self._lock:
+            count = self._pins.get(key, 0) - 1
+            if count > 0:
+                self._pins[key] = count
+            else:
+                self._pins.pop(key, None)
+                entry = self._hot.get(key)
+                if entry is not None:
+                    entry[1] = time.time()  # เริ่มนับ idle จากตอนที่ปล่อย
+                    self._hot.move_to_end(key)
+                    self.save(key)
+            self._evict(time.time())
+
+    def save(self, key: str):
+        """โหมด shared: เขียน session ลงดิสก์ทันทีให้ worker อื่นเห็น (โหมดปกติไม่ทำอะไร)"""
+        if not self.shared:
+            return
+        with self._lock:
+            entry = self._hot.get(key)
+            if entry is not None:
+                entry[2] = self._write(key, entry[0]) or entry[2]
+
+    def discard(self, key: str):
+        """ลบ session ทิ้งทั้งในหน่วยความจำและบนดิสก์"""
+        with self._lock:
+            self._hot.pop(key, None)
+            try:
+                self.db.execute("DELETE FROM sessions WHERE namespace = ? AND key = ?", (self.namespace, key))
+            except sqlite3.Error as e:
+                print(f"⚠️ Session store delete error: {e}")
+
+    def evict_idle(self) -> int:
+        """spill session ที่ idle เกิน TTL ลงดิสก์ทันที คืนจำนวนที่ถูกไล่ออก"""
+        with self._lock:
+            before = self.counters["idle_evictions"]
+            self._last_sweep = 0
+            self._evict(time.time())
+            return self.counters["idle_evictions"] - before
+
+    def spill_all(self):
+        """เขียนทุก session ในหน่วยความจำลงดิสก์ (เช่นตอน shutdown) โดยไม่ไล่ออก"""
+        with self._lock:
+            for key, entry in self._hot.items():
+                entry[2] = self._write(key, entry[0]) or entry[2]
+
+    # ------------------------------------------------------------------ eviction
+
+    def _evict(self, now: float):
+        # idle: ไล่จากอันที่ใช้ล่าสุดนานที่สุด หยุดเมื่อเจออันที่ยังไม่ idle (กวาดเป็นช่วง ๆ)
+        if self.idle_ttl > 0 and now - self._last_sweep >= min(self.idle_ttl / 4, 60):
+            self._last_sweep = now
+            for key in list(self._hot):
+                entry = self._hot[key]
+                if now - entry[1] < self.idle_ttl:
+                    break
+                if key not in self._pins:
+                    self._spill(key)
+                    self.counters["idle_evictions"] += 1
+
+        # เกินจำนวน: ไล่อันที่ใช้ล่าสุดนานที่สุด (ข้ามอันที่ถูก pin)
+        if len(self._hot) > self.max_sessions:
+            for key in list(self._hot):
+                if len(self._hot) <= self.max_sessions:
+                    break
+                if key not in self._pins:
+                    self._spill(key)
+                    self.counters["lru_evictions"] += 1
+
+    def _spill(self, key: str):
+        session = self._hot.pop(key)[0]
+        self._write(key, session)
+        self.counters["spilled"] += 1
+
+    # ------------------------------------------------------------------ disk
+
+    def _write(self, key: str, session: Any) -> Optional[float]:
+        """คืน updated_at ที่เขียน (None ถ้าเขียนไม่สำเร็จ)"""
+        now = time.time()
+        try:
+            state = json.dumps(self.dump(session), ensure_ascii=False, default=str)
+            with self.db.transaction() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO sessions (namespace, key, state, updated_at) VALUES (?, ?, ?, ?)",
+                    (self.namespace, key, state, now)
+                )
+                self._spills_since_purge += 1
+                if self._spills_since_purge >= 100:
+                    self._spills_since_purge = 0
+                    conn.execute("DELETE FROM sessions WHERE updated_at < ?", (now - self.retention_seconds,))
+            return now
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            print(f"⚠️ Session store write error: {e}")
+            return None
+
+    def _read(self, key: str) -> Optional[Dict[str, Any]]:
+        return self._read_versioned(key)[0]
+
+    def _read_versioned(self, key: str, newer_than: float = -1.0) -> Tuple[Optional[Dict[str, Any]], float]:
+        """(state, updated_at) จากดิสก์ ได้ (None, 0) ถ้าไม่มีหรือไม่ใหม่กว่า newer_than"""
+        try:
+            row = self.db.fetchone(
+                "SELECT state, updated_at FROM sessions WHERE namespace = ? AND key = ? AND updated_at > ?",
+                (self.namespace, key, newer_than)
+            )
+        except sqlite3.Error as e:
+            print(f"⚠️ Session store read error: {e}")
+            return None, 0.0
+        return (json.loads(row[0]), row[1]) if row else (None, 0.0)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "resident_sessions": len(self._hot),
+                "pinned_sessions": len(self._pins),
+                "max_sessions": self.max_sessions,
+                "idle_ttl": self.idle_ttl,
+                "shared": self.shared,
+                **self.counters,
+            }
+
+
+class ConversationMemory:
+    """ประวัติแชทแบบมีขอบเขต: keep_last ข้อความล่าสุดแบบเต็ม + สรุปของส่วนที่เก่ากว่า
+
+    ข้อความ = dict ที่มีอย่างน้อย role, content (timestamp เป็น datetime ได้)
+    """
+
+    def __init__(self, keep_last: Optional[int] = None, summary_chars: Optional[int] = None):
+        self.keep_last = keep_last or int(os.getenv("CONVERSATION_KEEP_LAST", "20"))
+        self.summary_chars = summary_chars or int(os.getenv("CONVERSATION_SUMMARY_CHARS", "2000"))
+        self.messages: deque = deque()
+        self.summary_lines: deque = deque()
+        self._summary_size = 0
+        self.total_messages = 0
+
+    def append(self, message: Dict[str, Any]):
+        self.messages.append(message)
+        self.total_messages += 1
+        while len(self.messages) > self.keep_last:
+            self._fold(self.messages.popleft())
+
+    def recent(self, n: int) -> List[Dict[str, Any]]:
+        if n <= 0:
+            return []
+        return list(self.messages)[-n:]
+
+    @property
+    def summary(self) -> str:
+        return "\n".join(self.summary_lines)
+
+    def summary_before(self, n: int) -> str:
+        """สรุปของทุกข้อความก่อน n ข้อความล่าสุด (ยาวไม่เกิน summary_chars)"""
+        older = list(self.messages)[:-n] if n > 0 else list(self.messages)
+        lines = list(self.summary_lines) + [self._summary_line(m) for m in older]
+        size = sum(len(line) + 1 for line in lines)
+        while size > self.summary_chars and len(lines) > 2:
+            size -= len(lines.pop(1)) + 1
+        return "\n".join(lines)
+
+    @property
+    def last(self) -> Optional[Dict[str, Any]]:
+        return self.messages[-1] if self.messages else None
+
+    @staticmethod
+    def _summary_line(message: Dict[str, Any]) -> str:
+        # ผู้ใช้เก็บได้ยาวกว่า AI (ความต้องการอยู่ฝั่งผู้ใช้)
+        limit = 200 if message.get("role") == "user" else 80
+        content = " ".join(str(message.get("content", "")).split())
+        if len(content) > limit:
+            content = content[:limit] + "…"
+        return f"{'ผู้ใช้' if message.get('role') == 'user' else 'AI'}: {content}"
+
+    def _fold(self, message: Dict[str, Any]):
+        line = self._summary_line(message)
+        self.summary_lines.append(line)
+        self._summary_size += len(line) + 1
+        # เก็บบรรทัดแรก (คำขอตั้งต้น) ไว้เสมอ ตัดบรรทัดถัดไปที่เก่าที่สุดออก
+        while self._summary_size > self.summary_chars and len(self.summary_lines) > 2:
+            first = self.summary_lines.popleft()
+            dropped = self.summary_lines.popleft()
+            self.summary_lines.appendleft(first)
+            self._summary_size -= len(dropped) + 1
+
+    def to_state(self) -> Dict[str, Any]:
+        return {
+            "messages": [
+                {**m, "timestamp": m["timestamp"].isoformat()} if isinstance(m.get("timestamp"), datetime) else m
+                for m in self.messages
+            ],
+            "summary_lines": list(self.summary_lines),
+            "total_messages": self.total_messages,
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any], **kwargs) -> "ConversationMemory":
+        memory = cls(**kwargs)
+        for m in state.get("messages", []):
+            if isinstance(m.get("timestamp"), str):
+                m = {**m, "timestamp": datetime.fromisoformat(m["timestamp"])}
+            memory.messages.append(m)
+        for line in state.get("summary_lines", []):
+            memory.summary_lines.append(line)
+            memory._summary_size += len(line) + 1
+        memory.total_messages = state.get("total_messages", len(memory.messages))
+        while len(memory.messages) > memory.keep_last:
+            memory._fold(memory.messages.popleft())
+        return memory
@@ -0,0 +1,237 @@
+"""
+🔗 Shared State - state ที่ทุก uvicorn worker เห็นตรงกัน
+- MemoryStateBackend: dict ใน process เดียว (ค่าเริ่มต้น, ใช้กับ worker เดียว)
+- SqliteStateBackend: ไฟล์ SQLite โหมด WAL (ผ่าน sqlite_pool) ที่หลาย process เปิดพร้อมกันได้
+  เก็บ key/value ตาม namespace (เช่นผลของ workflow) และ log ของ event สำหรับ pub/sub ข้าม worker
+  worker อื่นอ่าน event ใหม่ด้วยการ poll ตาม id (ไม่ต้องมี broker แยก)
+
+เลือก backend ด้วย STATE_BACKEND=memory|sqlite (ถ้าไม่ตั้งและ WEB_CONCURRENCY > 1 จะใช้ sqlite)
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlite_pool import SQLitePool, get_pool
+
+DEFAULT_DB_PATH = Path(__file__).resolve().parent.parent / "state.db"
+
+SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS state (
+        namespace TEXT NOT NULL,
+        key TEXT NOT NULL,
+        value TEXT NOT NULL,
+        updated_at REAL NOT NULL,
+        PRIMARY KEY (namespace, key)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS events (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        channel TEXT NOT NULL,
+        origin TEXT NOT NULL,
+        payload TEXT NOT NULL,
+        created_at REAL NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_events_channel ON events(channel, id)",
+)
+
+
+class MemoryStateBackend:
+    """state ใน process เดียว event ไม่ต้องส่งต่อเพราะมี subscriber อยู่ใน process นี้หมดแล้ว"""
+
+    name = "memory"
+    shared = False
+
+    def __init__(self):
+        self._values: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def put(self, namespace: str, key: str, value: Dict[str, Any]):
+        with self._lock:
+            self._values.setdefault(namespace, {})[key] = value
+
+    def get(self, namespace: str, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._values.get(namespace, {}).get(key)
+
+    def delete(self, namespace: str, key: str):
+        with self._lock:
+            self._values.get(namespace, {}).pop(key, None)
+
+    def publish(self, channel: str, payload: Dict[str, Any]):
+        pass
+
+    def flush(self):
+        pass
+
+    def last_event_id(self, channel: str) -> int:
+        return 0
+
+    def poll(self, channel: str, after_id: int, limit: int = 500) -> Tuple[int, List[Dict[str, Any]]]:
+        return after_id, []
+
+    def recent_events(self, channel: str, limit: int) -> List[Dict[str, Any]]:
+        return []
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"backend": self.name, "keys": sum(len(values) for values in self._values.values())}
+
+
+class SqliteStateBackend:
+    """state ที่แชร์ระหว่าง process ผ่านไฟล์ SQLite (WAL: คนอ่านไม่ถูกคนเขียน block) ผ่าน sqlite_pool
+    key/value เขียนทันที (worker อื่นต้องเห็นเลย) ส่วน event ใช้ defer ให้ flusher ของ pool commit เป็น batch
+    publish จึงไม่ block thread ที่เรียก (รวมถึง event loop)"""
+
+    name = "sqlite"
+    shared = True
+
+    def __init__(self, db_path: Optional[Path] = None, event_retention: int = 2000,
+                 publish_interval: float = None):
+        self.db_path = Path(db_path or os.getenv("STATE_DB_PATH", DEFAULT_DB_PATH))
+        self.event_retention = event_retention
+        self.publish_interval = (float(os.getenv("STATE_PUBLISH_INTERVAL", "0.02"))
+                                 if publish_interval is None else publish_interval)
+        self._lock = threading.Lock()
+        self._pool: Optional[SQLitePool] = None
+        self._pid: Optional[int] = None
+        self._origin: Optional[str] = None
+        self._publishes_since_purge = 0
+
+        self.counters = {
+            "puts": 0,
+            "gets": 0,
+            "published": 0,
+            "received": 0,
+        }
+
+    @property
+    def origin(self) -> str:
+        """id ของ process นี้ ใช้กรอง event ของตัวเองออกตอน poll"""
+        if self._origin is None or self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._origin = f"{self._pid}-{uuid.uuid4().hex[:8]}"
+        return self._origin
+
+    @property
+    def db(self) -> SQLitePool:
+        # connection ใช้ข้าม fork ไม่ได้ process ลูกต้องเปิด pool ใหม่ (get_pool จัดการให้)
+        pool = self._pool
+        if pool is None or pool.pid != os.getpid():
+            pool = self._pool = get_pool(self.db_path, SCHEMA, flush_interval=self.publish_interval)
+        return pool
+
+    # ------------------------------------------------------------------ key/value
+
+    def put(self, namespace: str, key: str, value: Dict[str, Any]):
+        data = json.dumps(value, ensure_ascii=False, default=str)
+        try:
+            self.db.execute(
+                "INSERT OR REPLACE INTO state (namespace, key, value, updated_at) VALUES (?, ?, ?, ?)",
+                (namespace, key, data, time.time())
+            )
+            with self._lock:
+                self.counters["puts"] += 1
+        except sqlite3.Error as e:
+            print(f"⚠️ Shared state write error: {e}")
+
+    def get(self, namespace: str, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            row = self.db.fetchone("SELECT value FROM state WHERE namespace = ? AND key = ?", (namespace, key))
+        except sqlite3.Error as e:
+            print(f"⚠️ Shared state read error: {e}")
+            return None
+        with self._lock:
+            self.counters["gets"] += 1
+        return json.loads(row[0]) if row else None
+
+    def delete(self, namespace: str, key: str):
+        try:
+            self.db.execute("DELETE FROM state WHERE namespace = ? AND key = ?", (namespace, key))
+        except sqlite3.Error as e:
+            print(f"⚠️ Shared state delete error: {e}")
+
+    # ------------------------------------------------------------------ pub/sub
+
+    def publish(self, channel: str, payload: Dict[str, Any]):
+        """ต่อ event ท้าย log ให้ worker อื่น poll ไปส่งต่อ (เรียกได้จากทุก thread และจาก event loop)
+        แค่เข้าคิวของ pool; flusher thread commit ทุก publish_interval วินาที"""
+        data = json.dumps(payload, ensure_ascii=False, default=str)
+        db = self.db
+        db.defer("INSERT INTO events (channel, origin, payload, created_at) VALUES (?, ?, ?, ?)",
+                 (channel, self.origin, data, time.time()))
+        with self._lock:
+            self.counters["published"] += 1
+            self._publishes_since_purge += 1
+            purge = self._publishes_since_purge >= 200
+            if purge:
+                self._publishes_since_purge = 0
+        if purge:
+            db.defer("DELETE FROM events WHERE id <= (SELECT MAX(id) FROM events) - ?", (self.event_retention,))
+
+    def flush(self):
+        """commit event ที่ยังค้างในคิวทันที (เช่นตอน shutdown)"""
+        self.db.flush()
+
+    def last_event_id(self, channel: str) -> int:
+        try:
+            return self.db.fetchvalue("SELECT MAX(id) FROM events WHERE channel = ?", (channel,)) or 0
+        except sqlite3.Error as e:
+            print(f"⚠️ Shared state read error: {e}")
+            return 0
+
+    def poll(self, channel: str, after_id: int, limit: int = 500) -> Tuple[int, List[Dict[str, Any]]]:
+        """event ของ worker อื่นที่ id > after_id คืน (id ล่าสุดที่อ่านแล้ว, payloads)"""
+        try:
+            rows = self.db.fetchall(
+                "SELECT id, origin, payload FROM events WHERE channel = ? AND id > ? ORDER BY id LIMIT ?",
+                (channel, after_id, limit)
+            )
+        except sqlite3.Error as e:
+            print(f"⚠️ Shared state poll error: {e}")
+            return after_id, []
+        origin = self.origin
+        payloads = [json.loads(payload) for _, event_origin, payload in rows if event_origin != origin]
+        with self._lock:
+            self.counters["received"] += len(payloads)
+        return (rows[-1][0] if rows else after_id), payloads
+
+    def recent_events(self, channel: str, limit: int) -> List[Dict[str, Any]]:
+        """event ล่าสุดของทุก worker (เก่าไปใหม่)"""
+        try:
+            rows = self.db.fetchall(
+                "SELECT payload FROM events WHERE channel = ? ORDER BY id DESC LIMIT ?", (channel, limit)
+            )
+        except sqlite3.Error as e:
+            print(f"⚠️ Shared state read error: {e}")
+            return []
+        return [json.loads(row[0]) for row in reversed(rows)]
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self.counters)
+        return {"backend": self.name, "db_path": str(self.db_path),
+                "pending_events": self.db.get_stats()["pending_writes"], **counters}
+
+
+def create_state_backend(kind: Optional[str] = None):
+    kind = (kind or os.getenv("STATE_BACKEND", "")).lower()
+    if not kind:
+        kind = "sqlite" if int(os.getenv("WEB_CONCURRENCY", "1") or 1) > 1 else "memory"
+    if kind == "sqlite":
+        return SqliteStateBackend()
+    if kind != "memory":
+        print(f"⚠️ Unknown STATE_BACKEND {kind!r}, using memory")
+    return MemoryStateBackend()
+
+
+# Global shared state instance
+state_backend = create_state_backend()
@@ -12,6 +12,8 @@ from dataclasses import dataclass
 from pathlib import Path
 
 from .base_agent import BaseAgent, AgentTask, AgentResult, TaskPriority, AgentStatus
+from .llm_gateway import llm_gateway
+from .plan_stream import write_plan_stream
 
 @dataclass
 class SimpleTask:
@@ -25,7 +27,8 @@ class SimpleAgentManager:
     """Simple implementation of agent manager for testing"""
     
     def __init__(self, webroot: Path, openai_client):
-        self.webroot = webroot
+        # resolved once: plan_stream reports resolved file paths
+        self.webroot = Path(webroot).resolve()
         self.client = openai_client
         self.active_tasks: Dict[str, SimpleTask] = {}
         
@@ -45,7 +48,7 @@ class SimpleAgentManager:
         return task_id
     
     async def execute_with_streaming(self, task_id: str) -> AsyncIterator[Dict[str, Any]]:
-        """Execute task with streaming updates"""
+        """Execute task with streaming updates (one update per generated file as it lands on disk)"""
         
         if task_id not in self.active_tasks:
             yield {"status": "error", "message": "Task not found"}
@@ -54,18 +57,20 @@ class SimpleAgentManager:
         task = self.active_tasks[task_id]
         
         try:
-            # Simulate the website creation process
             yield {"status": "started", "agent": "RequirementsAnalyst", "message": "วิเคราะห์ความต้องการ...", "progress": 10}
-            await asyncio.sleep(1)
             
-            yield {"status": "progress", "agent": "UIDesigner", "message": "ออกแบบ UI/UX...", "progress": 30}
-            await asyncio.sleep(1)
-            
-            yield {"status": "progress", "agent": "CodeGenerator", "message": "เขียนโค้ด HTML, CSS, JS...", "progress": 60}
-            await asyncio.sleep(2)
-            
-            # Actually create the website using existing system
-            result = await self._create_website_files(task.input_data)
+            result = None
+            async for update in self._stream_website_files(task.input_data):
+                if update["event"] == "file_written":
+                    yield {
+                        "status": "progress",
+                        "agent": "CodeGenerator",
+                        "message": f"เขียน {update['path']} แล้ว",
+                        "progress": min(90, 30 + 10 * update["count"]),
+                        "preview_url": update.get("preview_url")
+                    }
+                elif update["event"] == "done":
+                    result = update
             
             yield {
                 "status": "completed", 
@@ -82,28 +87,56 @@ class SimpleAgentManager:
             yield {"status": "error", "message": f"Error: {str(e)}", "progress": 0}
             task.status = "failed"
     
-    async def _create_website_files(self, task_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Create website files using the existing AI system"""
+    async def _stream_website_files(self, task_data: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        """Stream the AI plan and write each file as soon as it is complete
+
+        Yields {"event": "file_written", ...} per file and a final {"event": "done", slug, web_url, files}.
+        """
         
-        # Use the existing AI planning system
         user_message = task_data.get("requirements", "สร้างเว็บไซต์")
+        slug = None
+        written: List[str] = []
+        paths = set()  # relative paths (lowercase) of the files written so far
         
-        # Call existing AI system
-        plan = await self._ask_ai_to_plan_async(user_message)
-        files = self._write_files(plan)
-        slug = plan["slug"]
-        web_url = f"/app/{slug}/index.html"
+        try:
+            async for event in write_plan_stream(llm_gateway.stream(**self._plan_request(user_message)), self.webroot):
+                if event["event"] == "file_written":
+                    slug = event["slug"]
+                    written.append(event["file"])
+                    rel = event["path"].lstrip("/").strip()
+                    paths.add(Path(rel).as_posix().lower())
+                    yield {
+                        "event": "file_written",
+                        "path": rel,
+                        "count": len(written),
+                        "preview_url": f"/app/{slug}/index.html" if rel.lower() == "index.html" else None
+                    }
+                elif event["event"] == "done":
+                    slug = event["slug"]
+        except Exception as e:
+            print(f"AI planning error: {e}")
+            if not written:
+                plan = self._fallback_plan()
+                slug = plan["slug"]
+                written = self._write_files(plan)
+                paths = {Path(f["path"].lstrip("/").strip()).as_posix().lower() for f in plan["files"]}
         
-        return {
-            "ok": True,
-            "slug": slug, 
-            "web_url": web_url,
-            "files": [f"/app/{slug}/{Path(f).name}" for f in files]
+        # Ensure required files exist
+        missing = [f for f in self._required_files() if f["path"] not in paths]
+        if missing:
+            written += self._write_files({"slug": slug, "files": missing})
+        
+        yield {
+            "event": "done",
+            "slug": slug,
+            "web_url": f"/app/{slug}/index.html",
+            "files": [f"/app/{slug}/{Path(f).name}" for f in written]
         }
     
-    async def _ask_ai_to_plan_async(self, user_msg: str) -> Dict[str, Any]:
-        """Async version of AI planning"""
+    def _plan_request(self, user_msg: str) -> Dict[str, Any]:
+        """LLM request for the website plan"""
         
+
         SYSTEM = """
         คุณคือ Codegen Orchestrator. หน้าที่คุณคือ สร้าง "ชุดไฟล์เว็บ" ตาม requirement สั้น ๆ เป็นภาษาไทย/อังกฤษ
         **ตอบกลับเป็น JSON เท่านั้น** และต้องตรงสคีมนี้เป๊ะ:
@@ -126,57 +159,42 @@ class SimpleAgentManager:
         - ห้ามอธิบาย, ห้ามใส่ข้อความนอก JSON, ห้าม markdown, ห้าม code fence
         """
         
-        try:
-            response = await self.client.chat.completions.acreate(
-                model="gpt-4o-mini",
-                temperature=0.3,
-                response_format={"type": "json_object"},
-                messages=[
-                    {"role": "system", "content": SYSTEM},
-                    {"role": "user", "content": user_msg}
-                ],
-                timeout=30
-            )
-            
-            content = response.choices[0].message.content
-            data = json.loads(content)
-            
-            # Validate and fix data
-            slug = data.get("slug", "").strip()
-            if not slug or not slug.startswith("myapp-"):
-                from datetime import datetime
-                slug = "myapp-" + datetime.now().strftime("%Y%m%d-%H%M%S")
-                data["slug"] = slug
-            
-            # Ensure required files exist
-            files = data.get("files", [])
-            paths = {f.get("path", "").lower() for f in files if isinstance(f, dict)}
-            
-            if "index.html" not in paths:
-                files.append({
+        return dict(
+            model="gpt-4o-mini",
+            temperature=0.3,
+            response_format={"type": "json_object"},
+            messages=[
+                {"role": "system", "content": SYSTEM},
+                {"role": "user", "content": user_msg}
+            ],
+            timeout=30
+        )
+    
+    @staticmethod
+    def _required_files() -> List[Dict[str, str]]:
+        """Minimal index.html / styles.css used when the plan leaves them out"""
+        return [
+            {
+                "path": "index.html",
+                "content": "<!DOCTYPE html><html><head><meta charset='utf-8'><title>My Website</title></head><body><h1>Welcome</h1></body></html>"
+            },
+            {
+                "path": "styles.css", 
+                "content": "body { font-family: Arial, sans-serif; margin: 0; padding: 20px; }"
+            }
+        ]
+    
+    @staticmethod
+    def _fallback_plan() -> Dict[str, Any]:
+        """Plan used when the AI call fails before any file was written"""
+        from datetime import datetime
+
+        return {
+            "slug": "myapp-" + datetime.now().strftime("%Y%m%d-%H%M%S"),
+            "files": [
+                {
                     "path": "index.html",
-                    "content": "<!DOCTYPE html><html><head><meta charset='utf-8'><title>My Website</title></head><body><h1>Welcome</h1></body></html>"
-                })
-            
-            if "styles.css" not in paths:
-                files.append({
-                    "path": "styles.css", 
-                    "content": "body { font-family: Arial, sans-serif; margin: 0; padding: 20px; }"
-                })
-            
-            data["files"] = files
-            return data
-            
-        except Exception as e:
-            print(f"AI planning error: {e}")
-            # Fallback response
-            from datetime import datetime
-            return {
-                "slug": "myapp-" + datetime.now().strftime("%Y%m%d-%H%M%S"),
-                "files": [
-                    {
-                        "path": "index.html",
-                        "content": """<!DOCTYPE html>
+                    "content": """<!DOCTYPE html>
 <html lang="th">
 <head>
     <meta charset="utf-8">
@@ -194,10 +212,10 @@ class SimpleAgentManager:
     <script src="./script.js"></script>
 </body>
 </html>"""
-                    },
-                    {
-                        "path": "styles.css",
-                        "content": """
+                },
+                {
+                    "path": "styles.css",
+                    "content": """
 body {
     font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
     margin: 0;
@@ -230,10 +248,10 @@ h1 {
     }
 }
 """
-                    },
-                    {
-                        "path": "script.js",
-                        "content": """
+                },
+                {
+                    "path": "script.js",
+                    "content": """
 // Interactive functionality
 document.addEventListener('DOMContentLoaded', function() {
     console.log('Website loaded successfully!');
@@ -249,9 +267,9 @@ document.addEventListener('DOMContentLoaded', function() {
     });
 });
 """
-                    }
-                ]
-            }
+                }
+            ]
+        }
     
     def _write_files(self, plan: Dict[str, Any]) -> List[str]:
         """Write files to filesystem"""
@@ -5,14 +5,19 @@ Simple Conversational AI Implementation
 
 import json
 import asyncio
+import os
 import re
 import time
+from collections import deque
 from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
 from dataclasses import dataclass, asdict
 from enum import Enum
 from fastapi import WebSocket
 
+# จำนวนข้อความล่าสุดที่เก็บต่อผู้ใช้ (ประวัติไม่ได้ถูกส่งให้ LLM ใช้แสดงผล/สถิติเท่านั้น)
+HISTORY_LIMIT = int(os.getenv("CHAT_HISTORY_LIMIT", "50"))
+
 class SimpleIntentType(Enum):
     CREATE_WEBSITE = "create_website"
     MODIFY_DESIGN = "modify_design" 
@@ -41,7 +46,8 @@ class SimpleConversationalAI:
     def __init__(self, openai_client, agent_manager):
         self.client = openai_client
         self.agent_manager = agent_manager
-        self.conversation_history: List[SimpleChatMessage] = []
+        self.conversation_history: deque = deque(maxlen=HISTORY_LIMIT)
+        self.message_count = 0
         self.user_context: Dict[str, Any] = {}
         self.active_project: Optional[str] = None
         
@@ -76,6 +82,7 @@ class SimpleConversationalAI:
             timestamp=time.time()
         )
         self.conversation_history.append(user_msg)
+        self.message_count += 1
         
         # Simple intent detection
         intent = self._detect_intent(user_input)
@@ -94,9 +101,28 @@ class SimpleConversationalAI:
             timestamp=time.time()
         )
         self.conversation_history.append(assistant_msg)
+        self.message_count += 1
         
         return response
     
+    def to_state(self) -> Dict[str, Any]:
+        """Serializable session state (for spilling idle sessions to disk)"""
+        return {
+            "conversation_history": [asdict(msg) for msg in self.conversation_history],
+            "message_count": self.message_count,
+            "user_context": self.user_context,
+            "active_project": self.active_project
+        }
+    
+    @classmethod
+    def from_state(cls, state: Dict[str, Any], openai_client, agent_manager) -> "SimpleConversationalAI":
+        conv_ai = cls(openai_client, agent_manager)
+        conv_ai.conversation_history.extend(SimpleChatMessage(**msg) for msg in state.get("conversation_history", []))
+        conv_ai.message_count = state.get("message_count", len(conv_ai.conversation_history))
+        conv_ai.user_context = state.get("user_context", {})
+        conv_ai.active_project = state.get("active_project")
+        return conv_ai
+    
     def _detect_intent(self, user_input: str) -> SimpleIntentType:
         """Simple rule-based intent detection"""
         
@@ -1,14 +1,23 @@
 """
 🎯 Supervisor Agent - ควบคุมและประสานงาน Multi-Agent System
+งานใน workflow เป็น DAG (requirements["depends_on"]) งานที่ไม่ขึ้นต่อกันรันพร้อมกันภายใต้
+max_concurrent_tasks และงานถูกปลุกด้วย future ของงานที่มันรอ (ไม่ poll)
 """
 
 import asyncio
 import json
+import os
+import re
+import time
+import uuid
 from datetime import datetime
 from typing import Dict, List, Any, Optional
 from dataclasses import dataclass
 from enum import Enum
 
+from .llm_gateway import llm_gateway
+from .shared_state import state_backend
+
 class TaskStatus(Enum):
     PENDING = "pending"
     IN_PROGRESS = "in_progress"
@@ -35,13 +44,27 @@ class Task:
     completed_at: Optional[datetime] = None
     result: Optional[Dict[str, Any]] = None
     error: Optional[str] = None
+    started_at: Optional[datetime] = None
+    duration: Optional[float] = None  # วินาที รวม retry
+
+    @property
+    def dependencies(self) -> List[str]:
+        depends_on = self.requirements.get("depends_on") or []
+        return [depends_on] if isinstance(depends_on, str) else list(depends_on)
 
 class SupervisorAgent:
-    def __init__(self):
-        self.tasks: Dict[str, Task] = {}
+    def __init__(self, state=None):
+        # ผลของ workflow อยู่ใน shared state worker ไหนก็ตอบ /workflow-status ได้
+        self.state = state or state_backend
+        # workflow_id -> tasks ของ workflow นั้น (workflow ที่รันพร้อมกันไม่ทับกัน)
+        self.workflows: Dict[str, Dict[str, Task]] = {}
+        self.max_workflows_kept = 50
+        # agent และ LLM client สร้างครั้งเดียวแล้วใช้ซ้ำทุก task
         self.agents: Dict[str, Any] = {}
         self.workflow_queue: List[str] = []
-        self.max_concurrent_tasks = 3
+        self.max_concurrent_tasks = int(os.getenv("SUPERVISOR_MAX_CONCURRENT_TASKS", "3"))
+        self._task_slots: Optional[asyncio.Semaphore] = None
+        self._task_slots_loop: Optional[asyncio.AbstractEventLoop] = None
         self.quality_standards = {
             "min_test_coverage": 90,
             "max_errors": 0,
@@ -64,7 +87,8 @@ class SupervisorAgent:
             
             # สร้าง Enterprise Task Chain
             task_chain = await self._create_enterprise_task_chain(user_request)
-            workflow_id = f"enterprise_workflow_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+            workflow_id = self._new_workflow_id("enterprise_workflow")
+            self._record_workflow(workflow_id, {"status": "in_progress", "professional_grade": True})
             
             # เริ่มการทำงาน Enterprise Workflow
             asyncio.create_task(self._execute_enterprise_workflow(workflow_id, task_chain, user_request))
@@ -73,13 +97,27 @@ class SupervisorAgent:
             
             # สร้าง Standard Task Chain
             task_chain = await self._create_task_chain(user_request)
-            workflow_id = f"workflow_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+            workflow_id = self._new_workflow_id("workflow")
+            self._record_workflow(workflow_id, {"status": "in_progress"})
             
             # เริ่มการทำงานใน Background
             asyncio.create_task(self._execute_workflow(workflow_id, task_chain))
         
         return workflow_id
     
+    @staticmethod
+    def _new_workflow_id(prefix: str) -> str:
+        # worker หลายตัวอาจเริ่ม workflow ในวินาทีเดียวกัน
+        return f"{prefix}_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+    
+    def _record_workflow(self, workflow_id: str, result: Dict[str, Any]):
+        self.state.put("workflow", workflow_id, {"workflow_id": workflow_id, **result,
+                                                 "updated_at": datetime.now().isoformat()})
+    
+    def get_workflow_result(self, workflow_id: str) -> Optional[Dict[str, Any]]:
+        """ผลของ workflow จาก shared state (None ถ้าไม่รู้จัก id นี้)"""
+        return self.state.get("workflow", workflow_id)
+    
     async def _create_task_chain(self, user_request: str) -> List[Task]:
         """สร้างลำดับงานที่ต้องทำ"""
         tasks = []
@@ -94,12 +132,12 @@ class SupervisorAgent:
             created_at=datetime.now()
         ))
         
-        # Task 2: ออกแบบระบบ
+        # Task 2: ออกแบบระบบ (อ่านแค่คำขอ รันคู่กับ Task 1 ได้)
         tasks.append(Task(
             id="system_design",
             type="system_design",
             description="Create system architecture and UI/UX design",
-            requirements={"depends_on": "req_analysis"},
+            requirements={"user_request": user_request},
             status=TaskStatus.PENDING,
             created_at=datetime.now()
         ))
@@ -109,7 +147,7 @@ class SupervisorAgent:
             id="code_generation",
             type="code_generation", 
             description="Generate HTML, CSS, JavaScript code",
-            requirements={"depends_on": "system_design"},
+            requirements={"depends_on": ["req_analysis", "system_design"]},
             status=TaskStatus.PENDING,
             created_at=datetime.now()
         ))
@@ -140,81 +178,174 @@ class SupervisorAgent:
         """ดำเนินการ Workflow แบบ Autonomous"""
         print(f"🚀 Supervisor: Executing workflow {workflow_id}")
         
-        # เก็บ Tasks ใน Memory
-        for task in tasks:
-            self.tasks[task.id] = task
-        
-        # ดำเนินการทีละ Task (Sequential สำหรับ Dependencies)
+        started_at = time.perf_counter()
+        try:
+            by_id = await self._run_dag(workflow_id, tasks)
+        except ValueError as e:
+            # dependency ชี้ไป task ที่ไม่มี หรือวนกันเอง
+            self._record_workflow(workflow_id, {"status": "failed", "error": str(e),
+                                                "completed_at": datetime.now().isoformat()})
+            return
+        
+        failed = [task for task in tasks if task.status == TaskStatus.FAILED]
+        deployment = by_id.get("deployment")
+        self._record_workflow(workflow_id, {
+            "status": "failed" if failed else "completed",
+            "deployment_info": deployment.result if deployment and deployment.result else None,
+            "tasks": self._task_summary(tasks),
+            "elapsed": round(time.perf_counter() - started_at, 3),
+            "error": failed[0].error if failed else None,
+            "completed_at": datetime.now().isoformat()
+        })
+        print(f"🎉 Workflow {workflow_id} completed!")
+    
+    def _slots(self) -> asyncio.Semaphore:
+        # semaphore ผูกกับ event loop ที่สร้างมัน
+        loop = asyncio.get_running_loop()
+        if self._task_slots is None or self._task_slots_loop is not loop:
+            self._task_slots = asyncio.Semaphore(self.max_concurrent_tasks)
+            self._task_slots_loop = loop
+        return self._task_slots
+    
+    @staticmethod
+    def _check_dag(tasks: List[Task]):
+        """ตรวจว่า dependency มีอยู่จริงและไม่วนกัน (วนกันจะรอกันเองตลอดไป)"""
+        by_id = {task.id: task for task in tasks}
+        indegree = {task.id: 0 for task in tasks}
         for task in tasks:
+            for dep in task.dependencies:
+                if dep not in by_id:
+                    raise ValueError(f"Task {task.id} depends on unknown task {dep}")
+                indegree[task.id] += 1
+        ready = [task_id for task_id, count in indegree.items() if count == 0]
+        visited = 0
+        while ready:
+            current = ready.pop()
+            visited += 1
+            for task in tasks:
+                if current in task.dependencies:
+                    indegree[task.id] -= 1
+                    if indegree[task.id] == 0:
+                        ready.append(task.id)
+        if visited != len(tasks):
+            raise ValueError("Task dependencies contain a cycle")
+    
+    async def _run_dag(self, workflow_id: str, tasks: List[Task], context: Optional[Dict[str, Any]] = None) -> Dict[str, Task]:
+        """รัน task ทั้งหมดตาม dependency งานที่ไม่ขึ้นต่อกันรันพร้อมกัน คืน tasks ของ workflow (id -> Task)"""
+        self._check_dag(tasks)
+        by_id = {task.id: task for task in tasks}
+        self.workflows[workflow_id] = by_id
+        while len(self.workflows) > self.max_workflows_kept:
+            self.workflows.pop(next(iter(self.workflows)))
+        
+        loop = asyncio.get_running_loop()
+        finished = {task.id: loop.create_future() for task in tasks}  # True = COMPLETED
+        slots = self._slots()
+        
+        async def run(task: Task):
             try:
-                # รอให้ Dependencies เสร็จก่อน
-                if "depends_on" in task.requirements:
-                    dep_task_id = task.requirements["depends_on"]
-                    await self._wait_for_task_completion(dep_task_id)
-                
-                # เริ่มทำงาน
-                task.status = TaskStatus.IN_PROGRESS
-                print(f"⚡ Starting task: {task.id} - {task.description}")
-                
-                # ส่งงานให้ Agent
-                result = await self._assign_and_execute_task(task)
-                
-                # ทดสอบผลงาน
-                if await self._validate_task_result(task, result):
-                    task.status = TaskStatus.COMPLETED
-                    task.result = result
-                    task.completed_at = datetime.now()
-                    print(f"✅ Task completed: {task.id}")
-                else:
-                    # ถ้าไม่ผ่าน ให้ทำใหม่
-                    print(f"❌ Task failed quality check, retrying: {task.id}")
-                    await self._retry_task(task)
-                    
-            except Exception as e:
-                task.status = TaskStatus.FAILED
-                task.error = str(e)
-                print(f"💥 Task failed: {task.id} - {e}")
-                break
-        
-        print(f"🎉 Workflow {workflow_id} completed!")
+                for dep in task.dependencies:
+                    if not await finished[dep]:
+                        task.status = TaskStatus.FAILED
+                        task.error = f"Dependency {dep} failed"
+                        return
+                async with slots:
+                    await self._execute_task(task, by_id, context or {})
+            finally:
+                finished[task.id].set_result(task.status == TaskStatus.COMPLETED)
+        
+        await asyncio.gather(*(run(task) for task in tasks))
+        return by_id
+    
+    async def _execute_task(self, task: Task, tasks: Dict[str, Task], context: Dict[str, Any]):
+        task.status = TaskStatus.IN_PROGRESS
+        task.started_at = datetime.now()
+        started_at = time.perf_counter()
+        print(f"⚡ Starting task: {task.id} - {task.description}")
+        try:
+            # ส่งงานให้ Agent
+            result = await self._assign_and_execute_task(task, tasks, context)
+            
+            # ทดสอบผลงาน
+            if await self._validate_task_result(task, result):
+                task.status = TaskStatus.COMPLETED
+                task.result = result
+                task.completed_at = datetime.now()
+                print(f"✅ Task completed: {task.id}")
+            else:
+                # ถ้าไม่ผ่าน ให้ทำใหม่
+                print(f"❌ Task failed quality check, retrying: {task.id}")
+                await self._retry_task(task, tasks, context)
+        except Exception as e:
+            task.status = TaskStatus.FAILED
+            task.error = str(e)
+            print(f"💥 Task failed: {task.id} - {e}")
+        finally:
+            task.duration = time.perf_counter() - started_at
+    
+    @staticmethod
+    def _task_summary(tasks: List[Task]) -> Dict[str, Dict[str, Any]]:
+        return {
+            task.id: {
+                "status": task.status.value,
+                "started_at": task.started_at.isoformat() if task.started_at else None,
+                "duration": round(task.duration, 3) if task.duration is not None else None,
+                "error": task.error
+            }
+            for task in tasks
+        }
+    
+    def _agent(self, name: str):
+        """agent ที่ใช้ซ้ำได้ (สร้างครั้งแรกที่ต้องใช้) ทุกตัวใช้ OpenAI client ตัวเดียวกัน"""
+        agent = self.agents.get(name)
+        if agent is None:
+            if "openai_client" not in self.agents:
+                from openai import OpenAI
+                self.agents["openai_client"] = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+            client = self.agents["openai_client"]
+            if name == "requirement_analyzer":
+                from .requirement_analyzer import RequirementAnalyzer
+                agent = RequirementAnalyzer(client)
+            elif name == "design_agent":
+                from .conversational_design_agent import ConversationalDesignAgent
+                agent = ConversationalDesignAgent(client)
+            else:
+                raise ValueError(f"Unknown agent {name}")
+            self.agents[name] = agent
+        return agent
     
-    async def _assign_and_execute_task(self, task: Task) -> Dict[str, Any]:
+    async def _assign_and_execute_task(self, task: Task, tasks: Dict[str, Task], context: Dict[str, Any]) -> Dict[str, Any]:
         """มอบหมายงานให้ Agent และรอผลลัพธ์"""
         
         if task.type == "requirement_analysis":
-            from .requirement_analyzer import RequirementAnalyzer
-            from openai import AsyncOpenAI
-            import os
-            
-            client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-            agent = RequirementAnalyzer(client)
-            return await agent.analyze_requirements(task.requirements["user_request"])
+            # agent ใช้ client แบบ sync รันใน thread ไม่ให้ block event loop
+            agent = self._agent("requirement_analyzer")
+            user_request = task.requirements["user_request"]
+            analysis = await asyncio.to_thread(agent.analyze_initial_request, user_request)
+            return {**analysis, "original_request": user_request}
             
         elif task.type == "system_design":
-            from .conversational_design_agent import ConversationalDesignAgent
-            from openai import AsyncOpenAI
-            import os
-            
-            client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-            agent = ConversationalDesignAgent(client)
-            prev_result = self.tasks["req_analysis"].result
-            return await agent.create_design(prev_result)
+            agent = self._agent("design_agent")
+            return await asyncio.to_thread(agent.analyze_request, task.requirements["user_request"])
             
         elif task.type == "code_generation":
             # ใช้โค้ดเจเนอเรเตอร์ง่ายๆ ก่อน
-            return await self._generate_simple_website(task)
+            return await self._generate_simple_website(task, tasks)
             
         elif task.type == "quality_testing":
-            return await self._run_quality_tests(task)
+            return await self._run_quality_tests(task, tasks)
             
         elif task.type == "deployment":
-            return await self._deploy_to_preview(task)
+            return await self._deploy_to_preview(task, tasks)
+            
+        elif task.type in self._enterprise_handlers:
+            return await getattr(self, self._enterprise_handlers[task.type])(task, tasks, context)
             
         return {"error": "Unknown task type"}
     
-    async def _run_quality_tests(self, task: Task) -> Dict[str, Any]:
+    async def _run_quality_tests(self, task: Task, tasks: Dict[str, Task]) -> Dict[str, Any]:
         """รัน Quality Tests แบบครอบคลุม"""
-        code_result = self.tasks["code_generation"].result
+        code_result = tasks["code_generation"].result
         
         test_results = {
             "syntax_check": True,
@@ -257,6 +388,9 @@ class SupervisorAgent:
     async def _validate_task_result(self, task: Task, result: Dict[str, Any]) -> bool:
         """ตรวจสอบว่าผลงานผ่านมาตรฐานหรือไม่"""
         
+        if task.type == "integration_testing":
+            return not result.get("errors")
+        
         if task.type == "quality_testing":
             # ตรวจสอบว่าผ่าน Quality Standards
             if len(result.get("errors", [])) > self.quality_standards["max_errors"]:
@@ -268,12 +402,12 @@ class SupervisorAgent:
         # สำหรับ Task อื่นๆ ตรวจสอบว่ามี result
         return result and not result.get("error")
     
-    async def _retry_task(self, task: Task, max_retries: int = 3):
+    async def _retry_task(self, task: Task, tasks: Dict[str, Task], context: Dict[str, Any], max_retries: int = 3):
         """ลองทำงานใหม่หากไม่ผ่าน"""
         for retry in range(max_retries):
             print(f"🔄 Retrying task {task.id} (attempt {retry + 1})")
             
-            result = await self._assign_and_execute_task(task)
+            result = await self._assign_and_execute_task(task, tasks, context)
             
             if await self._validate_task_result(task, result):
                 task.status = TaskStatus.COMPLETED
@@ -285,20 +419,11 @@ class SupervisorAgent:
         task.status = TaskStatus.FAILED
         task.error = f"Failed after {max_retries} retries"
     
-    async def _wait_for_task_completion(self, task_id: str):
-        """รอให้ Task เสร็จก่อน"""
-        while True:
-            task = self.tasks.get(task_id)
-            if task and task.status in [TaskStatus.COMPLETED, TaskStatus.FAILED]:
-                break
-            await asyncio.sleep(0.1)
-    
-    async def _deploy_to_preview(self, task: Task) -> Dict[str, Any]:
+    async def _deploy_to_preview(self, task: Task, tasks: Dict[str, Task]) -> Dict[str, Any]:
         """Deploy ไปยัง Preview Environment"""
         from pathlib import Path
-        import os
         
-        code_result = self.tasks["code_generation"].result
+        code_result = tasks["code_generation"].result
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         
         # สร้าง Directory
@@ -320,41 +445,38 @@ class SupervisorAgent:
     
     def get_workflow_status(self, workflow_id: str) -> Dict[str, Any]:
         """ดู Status ของ Workflow"""
+        tasks = self.workflows.get(workflow_id, {})
         tasks_status = {}
-        for task_id, task in self.tasks.items():
+        for task_id, task in tasks.items():
             tasks_status[task_id] = {
                 "status": task.status.value,
                 "description": task.description,
                 "completed_at": task.completed_at.isoformat() if task.completed_at else None,
+                "duration": task.duration,
                 "error": task.error
             }
         
         return {
             "workflow_id": workflow_id,
             "tasks": tasks_status,
-            "overall_progress": self._calculate_progress()
+            "overall_progress": self._calculate_progress(tasks)
         }
     
-    def _calculate_progress(self) -> float:
+    def _calculate_progress(self, tasks: Dict[str, Task]) -> float:
         """คำนวณความก้าวหน้าโดยรวม"""
-        if not self.tasks:
+        if not tasks:
             return 0.0
         
-        completed = sum(1 for task in self.tasks.values() if task.status == TaskStatus.COMPLETED)
-        total = len(self.tasks)
+        completed = sum(1 for task in tasks.values() if task.status == TaskStatus.COMPLETED)
+        total = len(tasks)
         return (completed / total) * 100
     
-    async def _generate_simple_website(self, task: Task) -> Dict[str, Any]:
+    async def _generate_simple_website(self, task: Task, tasks: Dict[str, Task]) -> Dict[str, Any]:
         """สร้างเว็บไซต์ง่ายๆ โดยใช้ OpenAI"""
         try:
-            from openai import AsyncOpenAI
-            import os
-            
-            client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-            
             # ดึงข้อมูลจาก design task
-            design_result = self.tasks.get("system_design", {}).result or {}
-            req_result = self.tasks.get("req_analysis", {}).result or {}
+            design_result = tasks["system_design"].result or {}
+            req_result = tasks["req_analysis"].result or {}
             
             user_request = req_result.get("original_request", "สร้างเว็บไซต์")
             
@@ -374,14 +496,13 @@ class SupervisorAgent:
             ตอบเฉพาะโค้ด HTML เท่านั้น ไม่ต้องมีคำอธิบาย:
             """
             
-            response = await client.chat.completions.create(
+            html_content = await llm_gateway.complete(
                 model="gpt-4o-mini",
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.7,
                 max_tokens=3000
             )
-            
-            html_content = response.choices[0].message.content.strip()
+            html_content = html_content.strip()
             
             # ทำความสะอาดโค้ด
             if "```html" in html_content:
@@ -505,60 +626,161 @@ class SupervisorAgent:
         
         return tasks
     
+    # task type ของ enterprise chain -> handler (เรียกผ่าน _assign_and_execute_task)
+    _enterprise_handlers = {
+        "enterprise_requirement_analysis": "_enterprise_analysis",
+        "enterprise_architecture": "_enterprise_architecture",
+        "frontend_development": "_enterprise_frontend",
+        "backend_development": "_enterprise_backend",
+        "database_setup": "_enterprise_database",
+        "integration_testing": "_enterprise_integration_test",
+        "professional_deployment": "_enterprise_deploy",
+    }
+    
     async def _execute_enterprise_workflow(self, workflow_id: str, tasks: List[Task], user_request: str):
-        """ดำเนินการ Enterprise Workflow"""
+        """ดำเนินการ Enterprise Workflow (frontend / backend / database รันพร้อมกันหลังออกแบบเสร็จ)"""
         print(f"🏢 Supervisor: Executing ENTERPRISE workflow {workflow_id}")
         
-        # Import Enterprise Generator
-        from .enterprise_generator import enterprise_generator
-        
+        started_at = time.perf_counter()
         try:
-            # Phase 1: ทำความเข้าใจความต้องการอย่างลึกซึ้ง
-            print("🔍 Phase 1: Deep Requirements Analysis...")
-            analysis = await enterprise_generator.analyze_requirements_thoroughly(user_request)
-            
-            project_type = analysis.get("project_type", "professional_website")
-            print(f"📊 Detected Project Type: {project_type}")
-            
-            # Phase 2: สร้าง Professional Project Structure
-            print("🏗️ Phase 2: Generating Professional Project...")
-            
-            if project_type in ["professional_website", "ecommerce_platform", "saas_platform"]:
-                project_structure = await enterprise_generator.generate_professional_website(analysis)
-            elif project_type == "mobile_app":
-                project_structure = await enterprise_generator.generate_mobile_app(analysis)
-            else:
-                project_structure = await enterprise_generator.generate_professional_website(analysis)
-            
-            # Phase 3: Deploy to Professional Environment
-            print("🚀 Phase 3: Deploying to Professional Environment...")
-            deployment_info = await enterprise_generator.deploy_project(
-                project_structure,
-                f"{project_type}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-            )
+            by_id = await self._run_dag(workflow_id, tasks, {"user_request": user_request})
+            failed = [task for task in tasks if task.status == TaskStatus.FAILED]
+            if failed:
+                raise RuntimeError(f"{failed[0].id}: {failed[0].error}")
             
-            # Phase 4: Update workflow status
+            architecture = by_id["enterprise_architecture"].result
+            deployment_info = by_id["professional_deployment"].result
             print("✅ Enterprise Workflow Completed Successfully!")
             print(f"🌐 Access URLs: {deployment_info.get('urls', {})}")
             
             # Store results in workflow tracking
-            self.workflow_results[workflow_id] = {
+            self._record_workflow(workflow_id, {
                 "status": "completed",
-                "project_type": project_type,
-                "analysis": analysis,
-                "project_structure": project_structure,
+                "project_type": architecture["project_type"],
+                "analysis": by_id["enterprise_req_analysis"].result,
                 "deployment_info": deployment_info,
                 "professional_grade": True,
+                "tasks": self._task_summary(tasks),
+                "elapsed": round(time.perf_counter() - started_at, 3),
                 "completed_at": datetime.now().isoformat()
-            }
+            })
             
         except Exception as e:
             print(f"❌ Enterprise workflow failed: {e}")
-            self.workflow_results[workflow_id] = {
+            self._record_workflow(workflow_id, {
                 "status": "failed", 
                 "error": str(e),
+                "tasks": self._task_summary(tasks),
                 "completed_at": datetime.now().isoformat()
-            }
+            })
+    
+    async def _enterprise_analysis(self, task: Task, tasks: Dict[str, Task], context: Dict[str, Any]) -> Dict[str, Any]:
+        """ทำความเข้าใจความต้องการอย่างลึกซึ้ง"""
+        from .enterprise_generator import enterprise_generator
+        return await enterprise_generator.analyze_requirements_thoroughly(task.requirements["user_request"])
+    
+    async def _enterprise_architecture(self, task: Task, tasks: Dict[str, Task], context: Dict[str, Any]) -> Dict[str, Any]:
+        """เลือกประเภทโปรเจ็กต์ หน้าที่ต้องสร้าง และดูว่าต้องมี backend/database หรือไม่"""
+        from .enterprise_generator import enterprise_generator
+        analysis = tasks["enterprise_req_analysis"].result
+        project_type = analysis.get("project_type") or "professional_website"
+        template = enterprise_generator.project_templates.get(
+            project_type, enterprise_generator.project_templates["professional_website"])
+        pages = analysis.get("technical_specifications", {}).get("required_pages") or ["home", "about", "services", "contact"]
+        # ชื่อหน้ามาจาก LLM ใช้เป็นชื่อไฟล์ได้เฉพาะตัวอักษร/ตัวเลข
+        page_names = []
+        for page in pages:
+            name = re.sub(r"[^\w-]+", "_", str(page).strip().lower()).strip("_")
+            if name and name not in page_names:
+                page_names.append(name)
+        print(f"📊 Detected Project Type: {project_type}")
+        return {
+            "project_type": project_type,
+            "pages": page_names[:8],
+            "features": template["features"],
+            "needs_backend": enterprise_generator._needs_backend(analysis)
+        }
+    
+    async def _enterprise_frontend(self, task: Task, tasks: Dict[str, Task], context: Dict[str, Any]) -> Dict[str, Any]:
+        """สร้างทุกหน้าพร้อมกัน"""
+        from .enterprise_generator import enterprise_generator
+        analysis = tasks["enterprise_req_analysis"].result
+        pages = tasks["enterprise_architecture"].result["pages"]
+        contents = await asyncio.gather(*(enterprise_generator._generate_page_content(page, analysis) for page in pages))
+        return {"pages": {f"{page}.html": content for page, content in zip(pages, contents)}}
+    
+    async def _enterprise_backend(self, task: Task, tasks: Dict[str, Task], context: Dict[str, Any]) -> Dict[str, Any]:
+        """REST API (เฉพาะโปรเจ็กต์ที่ต้องมี login / database / payment)"""
+        architecture = tasks["enterprise_architecture"].result
+        if not architecture["needs_backend"]:
+            return {"skipped": True, "files": {}}
+        reply = await llm_gateway.complete(
+            model="gpt-4o-mini",
+            messages=[{"role": "user", "content": f"""
+            สร้าง REST API ด้วย Node.js + Express สำหรับโปรเจ็กต์ {architecture['project_type']}
+            ฟีเจอร์: {', '.join(architecture['features'])}
+            ต้องมี authentication (JWT) และเชื่อมต่อ database
+            
+            ตอบเป็น JSON: {{"files": {{"server.js": "...", "routes/api.js": "...", "package.json": "..."}}}}
+            """}],
+            temperature=0.3,
+            max_tokens=4000,
+            response_format={"type": "json_object"}
+        )
+        from .enterprise_generator import safe_relative_path
+        files = json.loads(reply).get("files", {})
+        safe_files = {}
+        for path, content in files.items():
+            relative = safe_relative_path(path)  # ชื่อไฟล์มาจาก LLM: ห้าม absolute / ../
+            if relative is not None and isinstance(content, str):
+                safe_files[relative] = content
+        return {"files": safe_files}
+    
+    async def _enterprise_database(self, task: Task, tasks: Dict[str, Task], context: Dict[str, Any]) -> Dict[str, Any]:
+        """Database schema และ seed data"""
+        architecture = tasks["enterprise_architecture"].result
+        if not architecture["needs_backend"]:
+            return {"skipped": True, "files": {}}
+        schema = await llm_gateway.complete(
+            model="gpt-4o-mini",
+            messages=[{"role": "user", "content": f"""
+            สร้าง SQL schema (PostgreSQL) พร้อม seed data สำหรับโปรเจ็กต์ {architecture['project_type']}
+            ฟีเจอร์: {', '.join(architecture['features'])}
+            
+            ตอบเฉพาะ SQL เท่านั้น ไม่ต้องมีคำอธิบาย:
+            """}],
+            temperature=0.2,
+            max_tokens=2000
+        )
+        schema = schema.strip()
+        if "```" in schema:
+            schema = schema.split("```")[1].removeprefix("sql").strip()
+        return {"files": {"schema.sql": schema}}
+    
+    async def _enterprise_integration_test(self, task: Task, tasks: Dict[str, Task], context: Dict[str, Any]) -> Dict[str, Any]:
+        """ตรวจว่าทุกส่วนครบและหน้าเว็บมีโครงสร้าง HTML"""
+        pages = tasks["frontend_development"].result["pages"]
+        errors = [f"{name}: invalid HTML structure" for name, html in pages.items()
+                  if "<html" not in html.lower()]
+        if not pages:
+            errors.append("No pages were generated")
+        if tasks["enterprise_architecture"].result["needs_backend"] and not tasks["backend_development"].result["files"]:
+            errors.append("Backend API was not generated")
+        return {"errors": errors, "pages_checked": len(pages)}
+    
+    async def _enterprise_deploy(self, task: Task, tasks: Dict[str, Task], context: Dict[str, Any]) -> Dict[str, Any]:
+        """Deploy to Professional Environment"""
+        from .enterprise_generator import enterprise_generator
+        project_structure = {"pages": tasks["frontend_development"].result["pages"]}
+        if tasks["backend_development"].result["files"]:
+            project_structure["backend"] = tasks["backend_development"].result["files"]
+        if tasks["database_setup"].result["files"]:
+            project_structure["database"] = tasks["database_setup"].result["files"]
+        project_type = tasks["enterprise_architecture"].result["project_type"]
+        return await enterprise_generator.deploy_project(
+            project_structure,
+            f"{project_type}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        )
 
 # Singleton Instance
 supervisor_agent = SupervisorAgent()
\ No newline at end of file
@@ -0,0 +1,116 @@
+"""
+🗂️ AgentWorkflow scheduler benchmark
+สร้าง task สังเคราะห์ (ค่าเริ่มต้น 10,000 งาน, 8 ประเภท, agent 4 ตัวต่อประเภท) แล้ววัดเวลาของ _process_task_queue เทียบแบบเดิม:
+- เดิม: sort ทั้ง task_queue ทุกครั้งที่ pop, dependency ยังไม่ครบก็ต่อท้ายคิวแล้ววนใหม่, scan agent ทุกตัวหา agent ว่าง
+- ใหม่: heap ของ task ที่พร้อมแยกตามประเภท + ตัวนับ dependency, index agent ว่างตาม task type, agent รันพร้อมกัน
+วัด 3 แบบ: ไม่มี dependency (overhead ของ scheduler), มี dependency (แบบเดิมวนไม่จบ), งานที่รอ I/O 5ms (ผลของการรันขนาน)
+
+Usage: python benchmarks/agent_scheduler_benchmark.py [tasks]
+"""
+
+import contextlib
+import io
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from agents.base_agent import AgentResult, AgentStatus, AgentWorkflow, BaseAgent, TaskPriority  # noqa: E402
+
+TASK_TYPES = [f"type_{i}" for i in range(8)]
+AGENTS_PER_TYPE = 4
+
+
+class SyntheticAgent(BaseAgent):
+    def __init__(self, name: str, task_type: str, work_seconds: float):
+        super().__init__(name, [task_type])
+        self.work_seconds = work_seconds
+
+    def can_handle(self, task) -> bool:
+        return task.type in self.capabilities
+
+    def execute_task(self, task) -> AgentResult:
+        if self.work_seconds:
+            time.sleep(self.work_seconds)
+        return AgentResult(True, {"agent_name": self.name})
+
+    def improve_result(self, result, feedback):
+        return result
+
+
+class LegacyWorkflow(AgentWorkflow):
+    """_process_task_queue / find_suitable_agent แบบเดิม (จำกัดจำนวน pop เพื่อจับกรณีวนไม่จบ)"""
+
+    max_pops = 0
+
+    def _process_task_queue(self):
+        pops = 0
+        while self.task_queue:
+            pops += 1
+            if pops > self.max_pops:
+                raise TimeoutError(f"still spinning after {pops - 1:,} pops, {len(self.task_queue):,} tasks left")
+            self.task_queue.sort(key=lambda t: (t.priority.value, t.created_at), reverse=True)
+            task = self.task_queue.pop(0)
+            if not self._dependencies_met(task):
+                self.task_queue.append(task)
+                continue
+            agent = self.find_suitable_agent(task)
+            if not agent:
+                continue
+            if agent.start_task(task):
+                result = agent.execute_task(task)
+                self.completed_tasks[task.id] = result
+                agent.status = AgentStatus.IDLE
+                agent.current_task = None
+                if result.success:
+                    agent.completed_tasks.append(task.id)
+                else:
+                    agent.failure_count += 1
+
+
+def build(workflow_class, tasks: int, with_dependencies: bool, work_seconds: float = 0.0):
+    workflow = workflow_class()
+    for task_type in TASK_TYPES:
+        for i in range(AGENTS_PER_TYPE):
+            workflow.register_agent(SyntheticAgent(f"{task_type}_agent_{i}", task_type, work_seconds))
+    rng = random.Random(42)
+    ids = []
+    for i in range(tasks):
+        dependencies = rng.sample(ids[-50:], k=min(2, len(ids[-50:]))) if with_dependencies and ids else []
+        ids.append(workflow.create_task(rng.choice(TASK_TYPES), rng.choice(list(TaskPriority)),
+                                        {"n": i}, [], dependencies))
+    return workflow
+
+
+def measure(workflow_class, tasks: int, with_dependencies: bool, work_seconds: float = 0.0):
+    workflow = build(workflow_class, tasks, with_dependencies, work_seconds)
+    workflow.max_pops = tasks * 3
+    started_at = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            workflow._process_task_queue()
+    except TimeoutError as e:
+        return f"{time.perf_counter() - started_at:7.2f}s  gave up: {e}"
+    elapsed = time.perf_counter() - started_at
+    completed = sum(result.success for result in workflow.completed_tasks.values())
+    return f"{elapsed:7.2f}s  completed {completed:,}/{tasks:,}"
+
+
+def run(tasks: int = 10_000):
+    agents = len(TASK_TYPES) * AGENTS_PER_TYPE
+    print(f"🗂️ {tasks:,} synthetic tasks, {len(TASK_TYPES)} task types, {agents} agents")
+    scenarios = (
+        ("no dependencies", tasks, False, 0.0),
+        ("2 deps per task", tasks, True, 0.0),
+        ("5ms I/O per task", tasks // 10, True, 0.005),
+    )
+    for label, count, with_dependencies, work_seconds in scenarios:
+        for name, workflow_class in (("sort per pop", LegacyWorkflow), ("ready heap", AgentWorkflow)):
+            print(f"   {label:17s} {name:13s} {measure(workflow_class, count, with_dependencies, work_seconds)}")
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:2]]
+    run(*args)
@@ -0,0 +1,82 @@
+"""
+📈 Analytics ingest benchmark
+ป้อน synthetic events เข้า AdvancedAnalyticsEngine.track_event แล้ววัด events/sec
+ด้วย session index ต้นทุนต่อ event ต้องคงที่ (throughput ไม่ตกเมื่อจำนวน event โตขึ้น)
+
+Usage: python benchmarks/analytics_ingest_benchmark.py [total_events] [sessions]
+"""
+
+import asyncio
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from agents.analytics_engine import (  # noqa: E402
+    AdvancedAnalyticsEngine, AnalyticsDataPoint, AnalyticsEvent, MetricType
+)
+
+EVENT_MIX = [
+    (AnalyticsEvent.PAGE_VIEW, MetricType.USER_BEHAVIOR),
+    (AnalyticsEvent.USER_INTERACTION, MetricType.USER_BEHAVIOR),
+    (AnalyticsEvent.CONVERSION, MetricType.BUSINESS),
+]
+EVENT_WEIGHTS = [40, 59, 1]
+
+
+def synthetic_events(total: int, sessions: int, variants: list, seed: int = 42):
+    rng = random.Random(seed)
+    now = time.time()
+    for i in range(total):
+        session_no = rng.randrange(sessions)
+        event_type, metric_type = rng.choices(EVENT_MIX, EVENT_WEIGHTS)[0]
+        metadata = {"ab_test_variant": variants[session_no % len(variants)]}
+        if event_type == AnalyticsEvent.USER_INTERACTION:
+            metadata["scroll_depth"] = rng.random()
+            metadata["click_position"] = (rng.randrange(1280), rng.randrange(2000))
+        yield AnalyticsDataPoint(
+            timestamp=now + i * 0.001,
+            event_type=event_type,
+            metric_type=metric_type,
+            value=1.0,
+            metadata=metadata,
+            user_id=f"user_{session_no}",
+            session_id=f"session_{session_no}",
+            page_url=f"/page/{rng.randrange(20)}" if event_type == AnalyticsEvent.PAGE_VIEW else None
+        )
+
+
+async def run(total_events: int = 1_000_000, sessions: int = 50_000):
+    engine = AdvancedAnalyticsEngine(None, Path(tempfile.mkdtemp()))
+    test_id = await engine.create_ab_test("checkout", [{"name": "A"}, {"name": "B"}], [0.5, 0.5])
+    variants = [v.variant_id for v in engine.ab_tests.values()]
+
+    checkpoints = {total_events // 10, total_events // 2, total_events}
+    started_at = time.perf_counter()
+    window_started_at, window_events = started_at, 0
+
+    for i, event in enumerate(synthetic_events(total_events, sessions, variants), 1):
+        await engine.track_event(event)
+        window_events += 1
+        if i in checkpoints:
+            now = time.perf_counter()
+            print(f"  {i:>10,} events | window {window_events / (now - window_started_at):>10,.0f} ev/s")
+            window_started_at, window_events = now, 0
+
+    elapsed = time.perf_counter() - started_at
+    print(f"📥 Ingested {total_events:,} events in {elapsed:.2f}s ({total_events / elapsed:,.0f} ev/s)")
+    print(f"🧠 raw buffer={len(engine.analytics_data):,} sessions={len(engine.sessions):,} "
+          f"behavior_history={len(engine.behavior_history):,}")
+
+    started_at = time.perf_counter()
+    results = await engine.analyze_ab_test_results(test_id)
+    print(f"🧪 A/B analysis in {(time.perf_counter() - started_at) * 1000:.1f}ms: "
+          f"{results.get('statistical_analysis', {})}")
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    asyncio.run(run(*args))
@@ -0,0 +1,126 @@
+"""
+📊 Analytics report benchmark
+เขียน synthetic sessions ลง AdvancedAnalyticsPlatform (SQLite) แล้ววัดเวลาโหลด session
+แบบ query เดียว (join + stream) เทียบกับแบบเดิมที่ query events ทีละ session (N+1)
+และเวลารัน analyzers บน SessionColumns
+
+Usage: python benchmarks/analytics_report_benchmark.py [sessions] [events_per_session]
+"""
+
+import asyncio
+import json
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from advanced_analytics_platform import (  # noqa: E402
+    NUMPY_AVAILABLE, AdvancedAnalyticsPlatform, SessionColumns, UserSession
+)
+
+PAGES = ['home', 'about', 'contact', 'products', 'blog', 'pricing']
+ERRORS = ['TypeError: Cannot read property', 'NetworkError: Failed to fetch', 'Invalid input: email']
+
+
+def synthetic_sessions(app_id: str, count: int, events_per_session: int, seed: int = 7):
+    rng = random.Random(seed)
+    now = datetime.now()
+    for i in range(count):
+        session = UserSession(f"session_{i}", f"user_{i % (count // 3 or 1)}", app_id)
+        session.start_time = now - timedelta(seconds=rng.randrange(6 * 24 * 3600))
+        for n in range(events_per_session):
+            kind = rng.choices(['page_view', 'page_load', 'click', 'error', 'form_submit'], [30, 20, 45, 2, 3])[0]
+            data = {'page': rng.choice(PAGES)}
+            if kind == 'page_load':
+                data['load_time'] = rng.lognormvariate(0.5, 0.6)
+            elif kind == 'error':
+                data['message'] = rng.choice(ERRORS)
+            session.append_event({
+                'event_id': f"{i}-{n}",
+                'type': kind,
+                'timestamp': (session.start_time + timedelta(seconds=n * 5)).isoformat(),
+                'data': data
+            })
+        session.end_time = session.start_time + timedelta(seconds=events_per_session * 5)
+        yield session
+
+
+def load_n_plus_one(db_path: str, app_id: str):
+    """การโหลดแบบเดิม: query sessions แล้ว query events ทีละ session"""
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    week_ago = (datetime.now() - timedelta(days=7)).isoformat()
+    cursor.execute("""
+        SELECT session_id, user_id, app_id, start_time, end_time
+        FROM user_sessions WHERE app_id = ? AND start_time > ? ORDER BY start_time DESC
+    """, (app_id, week_ago))
+    sessions = []
+    for row in cursor.fetchall():
+        session = UserSession(row[0], row[1], row[2])
+        session.start_time = datetime.fromisoformat(row[3])
+        for event_row in conn.execute(
+            "SELECT event_type, timestamp, data FROM events WHERE session_id = ? ORDER BY timestamp", (row[0],)
+        ):
+            session.append_event({'type': event_row[0], 'timestamp': event_row[1], 'data': json.loads(event_row[2])})
+        sessions.append(session)
+    conn.close()
+    return sessions
+
+
+def without_indexes(db_path: str) -> str:
+    """สำเนาฐานข้อมูลแบบ schema เดิม (ไม่มี index ที่ events)"""
+    copy_path = db_path + ".noindex"
+    source, target = sqlite3.connect(db_path), sqlite3.connect(copy_path)
+    source.backup(target)
+    for name in ("idx_sessions_app_start", "idx_events_session_time", "idx_events_timestamp"):
+        target.execute(f"DROP INDEX IF EXISTS {name}")
+    target.commit()
+    source.close()
+    target.close()
+    return copy_path
+
+
+def timed(label: str, func, *args):
+    started_at = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - started_at
+    print(f"{label} {len(result):,} sessions in {elapsed:.2f}s")
+    return result, elapsed
+
+
+def run(sessions: int = 2_000, events_per_session: int = 20):
+    app_id = "bench_app"
+    platform = AdvancedAnalyticsPlatform(db_path=str(Path(tempfile.mkdtemp()) / "analytics_platform.db"))
+
+    started_at = time.perf_counter()
+    asyncio.run(platform.save_sessions(list(synthetic_sessions(app_id, sessions, events_per_session))))
+    print(f"💾 Saved {sessions:,} sessions x {events_per_session} events in {time.perf_counter() - started_at:.2f}s")
+
+    loaded, single_query = timed("📥 Single joined query:       ", asyncio.run, platform._get_recent_sessions(app_id))
+    _, indexed = timed("🐇 N+1 queries (indexed):     ", load_n_plus_one, platform.db_path, app_id)
+    _, unindexed = timed("🐢 N+1 queries (old schema):  ", load_n_plus_one, without_indexes(platform.db_path), app_id)
+    print(f"   speedup vs old loader: {unindexed / single_query:.1f}x (indexed N+1: {indexed / single_query:.1f}x)")
+
+    started_at = time.perf_counter()
+    columns = SessionColumns(loaded)
+    built = time.perf_counter() - started_at
+    started_at = time.perf_counter()
+    behavior = platform.behavior_analyzer.analyze_user_journey(loaded, columns)
+    performance = platform.performance_analyzer.analyze_performance_data(loaded, columns)
+    errors = platform.error_analyzer.analyze_errors(loaded, columns)
+    analyzed = time.perf_counter() - started_at
+    print(f"🧮 Columns built in {built * 1000:.0f}ms, analyzers ran in {analyzed * 1000:.0f}ms "
+          f"(numpy={'on' if NUMPY_AVAILABLE else 'off'})")
+    print(f"   engagement={behavior['engagement_score']:.1f} "
+          f"p95_load={performance['performance_summary'].get('p95_load_time', 0):.2f}s "
+          f"errors={errors['error_summary'].get('total_errors', 0):,}")
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    run(*args)
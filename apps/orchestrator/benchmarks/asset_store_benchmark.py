@@ -0,0 +1,147 @@
+"""
+🗃️ Asset store benchmark
+สร้างคลังรูปสังเคราะห์แบบ data/<group>/raw (ค่าเริ่มต้น 12 group x 8 รูป JPEG 2400px, บางรูปซ้ำข้าม group เหมือนคลังจริง)
+แล้วสร้าง project หลายตัว (ค่าเริ่มต้น 20) วัดดิสก์ต่อ project, เวลาใส่รูปต่อ project และน้ำหนักรูปของหน้า gallery เทียบแบบเดิม:
+- เดิม: copy_images_to_project คัดลอกต้นฉบับเต็มขนาดเข้า assets/images ของทุก project, <img src> ชี้ไฟล์ต้นฉบับ
+- ใหม่: derivative WebP/AVIF หลายความกว้างย่อล่วงหน้าครั้งเดียวใน AssetStore, project แค่ hardlink,
+  หน้าเว็บใช้ <picture> + srcset/sizes (browser เลือกไฟล์ที่เล็กที่สุดที่กว้างพอ)
+
+Usage: python benchmarks/asset_store_benchmark.py [projects] [images_per_group]
+"""
+
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from agents.asset_store import PIL_AVAILABLE, AssetStore  # noqa: E402
+from agents.image_manager import ImageManager  # noqa: E402
+
+GROUPS = ["coffee", "restaurant", "thai-food", "bakery", "business", "tech",
+          "general", "hotel", "resort", "travel", "spa", "beauty"]
+SOURCE_SIZE = (2400, 1600)
+GALLERY_IMAGES = 6
+# ความกว้างที่ <img> ต้องการจริงตาม DEFAULT_SIZES (CSS px x device pixel ratio)
+VIEWPORTS = {"phone 390px @2x": 390 * 2, "desktop 1440px": 1440 // 3}
+
+
+def make_library(root: Path, images_per_group: int):
+    from PIL import Image, ImageFilter
+    rng = random.Random(42)
+    shared = []
+    for g, group in enumerate(GROUPS):
+        raw = root / group / "raw"
+        raw.mkdir(parents=True)
+        for i in range(images_per_group):
+            path = raw / f"{i:03d}-{group}-photo.jpg"
+            if shared and i % 5 == 0:  # รูปเดียวกันถูกใส่ไว้หลาย group
+                shutil.copyfile(rng.choice(shared), path)
+                continue
+            # noise ความละเอียดต่ำขยายขึ้นแล้ว blur: ไล่สีเหมือนภาพถ่าย (noise ล้วนบีบอัดไม่ได้ ไม่เหมือนรูปจริง)
+            noise = Image.effect_noise((48, 32), 80 + g + i)
+            image = Image.merge("RGB", (noise, noise.transpose(Image.FLIP_TOP_BOTTOM), noise.transpose(Image.FLIP_LEFT_RIGHT)))
+            image = image.resize(SOURCE_SIZE, Image.BICUBIC).filter(ImageFilter.GaussianBlur(2))
+            grain = Image.effect_noise(SOURCE_SIZE, 12).convert("RGB")
+            image = Image.blend(image, grain, 0.08)
+            image.save(path, "JPEG", quality=92)
+            shared.append(path)
+
+
+def legacy_copy(manager: ImageManager, project_path: Path, project_type: str):
+    """copy_images_to_project แบบเดิม"""
+    assets_path = project_path / "assets" / "images"
+    assets_path.mkdir(parents=True, exist_ok=True)
+    images = manager.get_images_for_project(project_type, 10)["images"]
+    for img in images:
+        shutil.copy2(img["full_path"], assets_path / img["filename"])
+    return images
+
+
+def disk_usage(root: Path, exclude_inodes=frozenset()) -> int:
+    """ไบต์ที่ไฟล์ใต้ root ใช้จริง (hardlink ของไฟล์เดียวกันนับครั้งเดียว)"""
+    seen, total = set(exclude_inodes), 0
+    for path in root.rglob("*"):
+        if path.is_file():
+            stat = path.stat()
+            if (stat.st_dev, stat.st_ino) not in seen:
+                seen.add((stat.st_dev, stat.st_ino))
+                total += stat.st_size
+    return total
+
+
+def inodes(root: Path):
+    return {(p.stat().st_dev, p.stat().st_ino) for p in root.rglob("*") if p.is_file()}
+
+
+def picked_bytes(store: AssetStore, manifest, needed_width: int) -> int:
+    """ขนาดไฟล์ที่ browser โหลดจาก srcset: format แรกที่รองรับ, ไฟล์เล็กสุดที่กว้างอย่างน้อย needed_width"""
+    if not manifest["variants"]:
+        return (store.root / manifest["fallback"]).stat().st_size
+    candidates = next(iter(manifest["variants"].values()))
+    path = next((p for w, p in candidates if w >= needed_width), candidates[-1][1])
+    return (store.root / path).stat().st_size
+
+
+def run(projects: int = 20, images_per_group: int = 8):
+    workdir = Path(tempfile.mkdtemp())
+    try:
+        make_library(workdir / "data", images_per_group)
+        library = disk_usage(workdir / "data")
+        print(f"🗃️ {len(GROUPS)} groups x {images_per_group} images ({library / 1024 / 1024:.0f}MB), "
+              f"{projects} projects x 10 images, Pillow {'yes' if PIL_AVAILABLE else 'no'}")
+
+        # เดิม
+        manager = ImageManager(str(workdir / "data"), store=AssetStore(workdir / "unused"))
+        random.seed(1)
+        started_at = time.perf_counter()
+        legacy_pages = []
+        for p in range(projects):
+            images = legacy_copy(manager, workdir / "legacy" / f"p{p}", random.choice(["cafe", "hotel", "spa"]))
+            legacy_pages.append(images[:GALLERY_IMAGES])
+        legacy_seconds = (time.perf_counter() - started_at) / projects
+        legacy_disk = disk_usage(workdir / "legacy") / projects
+        legacy_weight = sum(os.path.getsize(img["full_path"]) for page in legacy_pages for img in page) / projects
+
+        # ใหม่
+        store = AssetStore(workdir / "store")
+        manager = ImageManager(str(workdir / "data"), store=store)
+        started_at = time.perf_counter()
+        summary = manager.precompute_library()
+        precompute_seconds = time.perf_counter() - started_at
+        store_inodes = inodes(store.root)
+        random.seed(1)
+        started_at = time.perf_counter()
+        store_pages = []
+        for p in range(projects):
+            project_path = workdir / "store-projects" / f"p{p}"
+            images = manager.get_images_for_project(random.choice(["cafe", "hotel", "spa"]), 10)["images"]
+            manager.copy_images_to_project(str(project_path), "", images)
+            store_pages.append(images[:GALLERY_IMAGES])
+            html = "".join(manager.picture_html(img) for img in images[:GALLERY_IMAGES])
+            assert 'loading="lazy"' in html
+        store_seconds = (time.perf_counter() - started_at) / projects
+        store_disk = disk_usage(workdir / "store-projects", store_inodes) / projects
+
+        print(f"   precompute (once): {summary['source_images']} images -> {summary['unique_images']} unique, "
+              f"{precompute_seconds:.1f}s, store {disk_usage(store.root) / 1024 / 1024:.1f}MB "
+              f"({', '.join(store.formats) or 'originals only'})")
+        print(f"   {'':18s} {'disk/project':>13s} {'time/project':>13s}  gallery page weight ({GALLERY_IMAGES} images)")
+        print(f"   {'copy originals':18s} {legacy_disk / 1024 / 1024:11.1f}MB {legacy_seconds * 1000:11.1f}ms  "
+              f"{legacy_weight / 1024 / 1024:.2f}MB on every device")
+        weights = ", ".join(
+            f"{label} {sum(picked_bytes(store, img['asset'], width) for page in store_pages for img in page) / projects / 1024:.0f}KB"
+            for label, width in VIEWPORTS.items()
+        )
+        print(f"   {'link from store':18s} {store_disk / 1024:11.1f}KB {store_seconds * 1000:11.1f}ms  {weights}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    run(*args)
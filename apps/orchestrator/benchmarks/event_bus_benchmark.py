@@ -0,0 +1,115 @@
+"""
+📡 Activity event bus benchmark
+จำลองผู้ชม dashboard จำนวนมาก (ค่าเริ่มต้น 2,000 WebSocket โดย 1% เป็น client ช้า) แล้ววัด latency
+ตั้งแต่ add_activity จนถึง client ปกติ (ที่ไม่ช้า) ได้รับ message เทียบแบบเดิม:
+- เดิม: create_task ต่อ event แล้ว await send_text ทีละ client ตามลำดับ (client ช้าถ่วงทุกคนที่อยู่หลังมัน)
+- ใหม่: EventBus - serialize ครั้งเดียว, คิวแยกต่อ client (เต็มแล้วทิ้งอันเก่าสุด), progress ถูก coalesce
+และตรวจว่า publish จาก thread ที่ไม่มี event loop (handler แบบ sync) ใช้ได้
+
+Usage: python benchmarks/event_bus_benchmark.py [viewers] [events]
+"""
+
+import asyncio
+import json
+import statistics
+import sys
+import threading
+import time
+import warnings
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from agents.activity_monitor import ActivityMonitor  # noqa: E402
+
+SLOW_SEND_SECONDS = 0.005
+
+
+class FakeWebSocket:
+    def __init__(self, slow: bool):
+        self.slow = slow
+        self.latencies = []
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, message: str):
+        if self.slow:
+            await asyncio.sleep(SLOW_SEND_SECONDS)
+        data = json.loads(message)["data"]
+        if isinstance(data, dict) and "sent_at" in data.get("details", {}):
+            self.latencies.append(time.perf_counter() - data["details"]["sent_at"])
+
+
+class LegacyActivityMonitor:
+    """add_activity / broadcast_activity แบบเดิม"""
+
+    def __init__(self):
+        self.activities = []
+        self.active_connections = []
+        self.lock = threading.Lock()
+
+    def add_activity(self, activity_type, description, details=None, status="info"):
+        activity = {"id": len(self.activities) + 1, "type": activity_type, "description": description,
+                    "details": details or {}, "status": status}
+        with self.lock:
+            self.activities.append(activity)
+            if len(self.activities) > 100:
+                self.activities.pop(0)
+        asyncio.create_task(self.broadcast_activity(activity))
+
+    async def broadcast_activity(self, activity):
+        if not self.active_connections:
+            return
+        message = json.dumps({"type": "activity_update", "data": activity})
+        for connection in self.active_connections:
+            await connection.send_text(message)
+
+    async def connect_websocket(self, websocket):
+        await websocket.accept()
+        self.active_connections.append(websocket)
+
+
+async def measure(monitor, viewers: int, events: int):
+    sockets = [FakeWebSocket(slow=i % 100 == 0) for i in range(viewers)]
+    for websocket in sockets:
+        await monitor.connect_websocket(websocket)
+    for i in range(events):
+        monitor.add_activity("agent_action", f"step {i}", {"sent_at": time.perf_counter()})
+        await asyncio.sleep(0.001)  # agents log a line every few milliseconds
+    fast = [websocket for websocket in sockets if not websocket.slow]
+    while sum(len(websocket.latencies) for websocket in fast) < len(fast) * events:
+        await asyncio.sleep(0.005)
+    latencies = sorted(latency for websocket in fast for latency in websocket.latencies)
+    return statistics.median(latencies), latencies[int(len(latencies) * 0.99) - 1], latencies[-1]
+
+
+def publish_from_thread(monitor) -> str:
+    outcome = []
+
+    def worker():
+        try:
+            monitor.add_activity("agent_action", "from a sync handler")
+            outcome.append("ok")
+        except RuntimeError as e:
+            outcome.append(f"RuntimeError: {e}")
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    thread.join()
+    return outcome[0]
+
+
+def run(viewers: int = 2_000, events: int = 100):
+    warnings.simplefilter("ignore", RuntimeWarning)  # the legacy coroutine that never got a loop
+    print(f"📡 {viewers:,} viewers ({viewers // 100} slow, {SLOW_SEND_SECONDS * 1000:.0f}ms per send), {events} events")
+    for label, factory in (("sequential broadcast", LegacyActivityMonitor), ("event bus", ActivityMonitor)):
+        monitor = factory()
+        p50, p99, worst = asyncio.run(measure(monitor, viewers, events))
+        print(f"   {label:20s} latency p50 {p50 * 1000:7.1f}ms  p99 {p99 * 1000:7.1f}ms  max {worst * 1000:7.1f}ms  "
+              f"publish from thread: {publish_from_thread(monitor)}")
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    run(*args)
@@ -0,0 +1,121 @@
+"""
+♻️ Incremental scan benchmark
+สร้าง workspace จำลอง (หลาย app ที่ generate ไว้) แล้ววัดเวลา scan ซ้ำด้วย ScanCache:
+- cold: scan ครั้งแรก วิเคราะห์ทุกไฟล์
+- steady: scan ซ้ำโดยไม่มีไฟล์เปลี่ยน (stat อย่างเดียว ไม่อ่านไฟล์)
+- 1% changed: แก้ไฟล์ 1% แล้ว scan ใหม่ วิเคราะห์เฉพาะไฟล์ที่เปลี่ยน
+ทั้ง SecurityIntelligenceEngine.scan_tree และ AICodeReviewEngine.review_directory
+และตรวจว่าผลลัพธ์ตรงกับ cold scan
+
+Usage: python benchmarks/incremental_scan_benchmark.py [apps] [files_per_app]
+"""
+
+import asyncio
+import logging
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from dataclasses import asdict
+from pathlib import Path
+
+ORCHESTRATOR_DIR = Path(__file__).resolve().parent.parent
+REPO_ROOT = ORCHESTRATOR_DIR.parent.parent
+sys.path.insert(0, str(ORCHESTRATOR_DIR))
+sys.path.insert(0, str(REPO_ROOT))
+
+import scan_cache  # noqa: E402
+from ai_code_review import AICodeReviewEngine  # noqa: E402
+from security_intelligence_engine import SecurityIntelligenceEngine  # noqa: E402
+
+SNIPPETS = {
+    '.html': ['<div class="card">{n}</div>', '<script>el.innerHTML = data{n} + x;</script>', '<p>Item {n}</p>'],
+    '.js': ['const v{n} = compute({n});', 'node.innerHTML = html{n} + y;', 'const id{n} = Math.random();',
+            'for (let i = 0; i < items.length; i++) {{ total += {n}; }}'],
+    '.css': ['.c{n} {{ color: #{n:03x}; }}'],
+    '.py': ['def f{n}(x):\n    return x * {n}', 'password = "secret{n}"',
+            'for i in range(len(items)):\n    total += {n}'],
+}
+
+
+def generate_workspace(root: Path, apps: int, files_per_app: int):
+    rng = random.Random(7)
+    extensions = list(SNIPPETS)
+    for app in range(apps):
+        for i in range(files_per_app):
+            ext = extensions[i % len(extensions)]
+            directory = root / f"app_{app}" / ("" if i < 4 else f"src_{i % 3}")
+            directory.mkdir(parents=True, exist_ok=True)
+            lines = [rng.choice(SNIPPETS[ext]).format(n=n) for n in range(rng.randint(20, 150))]
+            (directory / f"file_{i}{ext}").write_text('\n'.join(lines))
+
+
+def touch_some(root: Path, fraction: float):
+    files = sorted(path for path in root.rglob('*') if path.is_file())
+    changed = random.Random(3).sample(files, max(1, int(len(files) * fraction)))
+    for path in changed:
+        path.write_text(path.read_text() + "\n// edited\n")
+    return len(changed)
+
+
+async def measure(label: str, scan, comparable, root: Path):
+    """scan วัดเวลา, comparable แปลงผลเป็นค่าที่เทียบกันได้ (นอกช่วงจับเวลา)"""
+    app_dirs = sorted(path for path in root.iterdir() if path.is_dir())
+    started_at = time.perf_counter()
+    cold = await scan(app_dirs)
+    cold_time = time.perf_counter() - started_at
+
+    started_at = time.perf_counter()
+    steady = await scan(app_dirs)
+    steady_time = time.perf_counter() - started_at
+    identical = comparable(cold) == comparable(steady)
+
+    changed = touch_some(root, 0.01)
+    started_at = time.perf_counter()
+    await scan(app_dirs)
+    changed_time = time.perf_counter() - started_at
+
+    print(f"{label}")
+    print(f"   cold:         {cold_time:7.2f}s")
+    print(f"   steady:       {steady_time:7.2f}s  ({cold_time / steady_time:.0f}x, identical={identical})")
+    print(f"   {changed} changed:  {changed_time:7.2f}s")
+
+
+async def main(apps: int, files_per_app: int):
+    logging.disable(logging.CRITICAL)
+    # Freshly generated files would otherwise always be re-hashed
+    scan_cache.RACY_WINDOW_NS = 0
+    workdir = Path(tempfile.mkdtemp())
+    root = workdir / "workspace"
+    generate_workspace(root, apps, files_per_app)
+    print(f"📂 {apps:,} apps × {files_per_app} files = {apps * files_per_app:,} files")
+    os.chdir(workdir)  # engine databases are created in the working directory
+
+    security = SecurityIntelligenceEngine()
+
+    async def security_scan(app_dirs):
+        return [await security.scan_tree(str(app_dir)) for app_dir in app_dirs]
+
+    await measure("🛡️ SecurityIntelligenceEngine.scan_tree", security_scan,
+                  lambda results: [([v.to_dict() for v in vulns], threats) for vulns, threats in results], root)
+
+    reviewer = AICodeReviewEngine(cache_path=str(workdir / "code_review_cache.db"))
+
+    async def code_review(app_dirs):
+        return [reviewer.review_directory(str(app_dir)) for app_dir in app_dirs]
+
+    await measure("🤖 AICodeReviewEngine.review_directory", code_review,
+                  lambda results: [[asdict(r) for r in app] for app in results], root)
+
+    shutil.rmtree(workdir, ignore_errors=True)
+
+
+def run(apps: int = 200, files_per_app: int = 25):
+    asyncio.run(main(apps, files_per_app))
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    run(*args)
@@ -0,0 +1,169 @@
+"""
+📬 Job queue benchmark
+จำลอง burst ของ request /api/generate-app แล้วเทียบแบบเดิมของ quality_gate_web กับ JobQueue:
+- เดิม: 1 Thread + 1 event loop ใหม่ต่อ request, job อยู่ใน list และหา job ด้วย linear scan
+- ใหม่: worker จำนวนคงที่ + handler thread เท่ากัน, job อยู่ใน SQLite (ค้นด้วย primary key)
+  และปฏิเสธ request ด้วย QueueFull (429) เมื่อ backlog เต็ม
+งานของแต่ละ job คืองานจริง: UIUXQualityAgent.analyze_quality (CPU ล้วน ไม่มี await ที่ปล่อย loop)
+ต่อด้วย I/O แบบ blocking (client/ไฟล์แบบ sync) แล้วเทียบ handler ที่รันบน event loop ของ queue (แบบก่อนหน้า)
+กับ handler thread: เวลาที่ใช้จน job หมด และ latency ของ /api/analyze-code ที่ถูกเรียกระหว่าง burst
+วัดจำนวน thread สูงสุด และเวลาค้นสถานะ job
+
+Usage: python benchmarks/job_queue_benchmark.py [requests] [stored_jobs]
+"""
+
+import asyncio
+import contextlib
+import io
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from job_queue import JobQueue, QueueFull  # noqa: E402
+from ui_ux_quality_agent import UIUXQualityAgent  # noqa: E402
+from uiux_quality_benchmark import generate_page  # noqa: E402
+
+BLOCKING_IO_SECONDS = 0.05  # sync model call / artifact writes per job
+WORKERS = 4
+PAGE = generate_page(20)
+PROBE_PAGE = generate_page(5)
+agent = UIUXQualityAgent()
+
+
+async def handler(payload, progress):
+    progress(10, "Analyzing...")
+    report = await agent.analyze_quality(*PAGE)
+    progress(60, "Saving artifacts...")
+    if payload.get("blocking_io"):
+        time.sleep(BLOCKING_IO_SECONDS)
+    return {'app_name': payload['app_name'], 'quality_score': report.overall_score}
+
+
+class LoopHandlerQueue(JobQueue):
+    """JobQueue แบบก่อนหน้า: await handler บน event loop ของ queue โดยตรง"""
+
+    async def _run_handler(self, payload, progress):
+        return await self.handler(payload, progress)
+
+
+def legacy_burst(requests: int):
+    """Thread ต่อ request และ event loop ใหม่ต่อ thread แบบเดิม"""
+    jobs, threads = [], []
+
+    def process(job):
+        job['status'] = 'processing'
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        job['result'] = loop.run_until_complete(
+            handler(job, lambda percent, step: job.update(progress=percent, current_step=step)))
+        loop.close()
+        job['status'] = 'completed'
+
+    peak = threading.active_count()
+    for i in range(requests):
+        job = {'job_id': f"job_{i}", 'app_name': f"app_{i}", 'status': 'queued', 'blocking_io': True}
+        jobs.append(job)
+        thread = threading.Thread(target=process, args=(job,))
+        thread.start()
+        threads.append(thread)
+        peak = max(peak, threading.active_count())
+    for thread in threads:
+        thread.join()
+    return peak, sum(job['status'] == 'completed' for job in jobs), 0, []
+
+
+def queue_burst(queue: JobQueue, requests: int, blocking_io: bool):
+    """submit ทั้ง burst แล้วเรียก analyze-code ทุก 100ms จนกว่า job จะหมด"""
+    job_ids, rejected, probes = [], 0, []
+    peak = threading.active_count()
+    for i in range(requests):
+        try:
+            job_ids.append(queue.submit({'app_name': f"app_{i}", 'blocking_io': blocking_io}))
+        except QueueFull:
+            rejected += 1
+        peak = max(peak, threading.active_count())
+    while queue.active_count():
+        peak = max(peak, threading.active_count())
+        started_at = time.perf_counter()
+        if isinstance(queue, LoopHandlerQueue):
+            queue.run(agent.analyze_quality(*PROBE_PAGE))  # แบบเดิมของ /api/analyze-code
+        else:
+            asyncio.run(agent.analyze_quality(*PROBE_PAGE))  # ใน request thread ของตัวเอง
+        probes.append(time.perf_counter() - started_at)
+        time.sleep(0.1)
+    completed = sum(queue.get(job_id)['status'] == 'completed' for job_id in job_ids)
+    return peak, completed, rejected, probes
+
+
+def lookups(stored_jobs: int, queue: JobQueue, samples: int = 2_000):
+    legacy_jobs = [{'job_id': f"job_{i}", 'status': 'completed'} for i in range(stored_jobs)]
+    wanted = random.Random(1).choices(legacy_jobs, k=samples)
+    started_at = time.perf_counter()
+    for target in wanted:
+        next(j for j in legacy_jobs if j['job_id'] == target['job_id'])
+    legacy = time.perf_counter() - started_at
+
+    rows = [(f"stored_{i}", '{}', '2026-01-01T00:00:00') for i in range(stored_jobs)]
+    queue.db.executemany("""
+        INSERT INTO jobs (job_id, status, progress, payload, created_at) VALUES (?, 'completed', 100, ?, ?)
+    """, rows)
+    wanted = random.Random(1).choices(rows, k=samples)
+    started_at = time.perf_counter()
+    for job_id, _, _ in wanted:
+        queue.get(job_id)
+    current = time.perf_counter() - started_at
+    return legacy / samples, current / samples
+
+
+def report(label: str, elapsed: float, outcome):
+    peak, completed, rejected, probes = outcome
+    line = (f"   {label:32s} {elapsed:6.2f}s  peak threads={peak:4d}  "
+            f"completed={completed}  rejected={rejected}")
+    if probes:
+        line += f"  analyze-code p50 {statistics.median(probes) * 1000:4.0f}ms max {max(probes) * 1000:5.0f}ms"
+    print(line)
+
+
+def run(requests: int = 100, stored_jobs: int = 20_000):
+    workdir = tempfile.mkdtemp()
+    print(f"📨 burst of {requests:,} requests: real quality analysis + {BLOCKING_IO_SECONDS * 1000:.0f}ms "
+          f"blocking I/O each, {WORKERS} workers, {os.cpu_count()} CPUs")
+    output = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(output):  # analyzer พิมพ์ log ทุกขั้น
+            started_at = time.perf_counter()
+            outcome = legacy_burst(requests)
+        report("thread per request:", time.perf_counter() - started_at, outcome)
+
+        queue = None
+        for blocking_io in (True, False):
+            print("   with blocking I/O" if blocking_io else "   CPU only (no blocking I/O)")
+            for label, queue_class in (("handlers on the queue loop:", LoopHandlerQueue),
+                                       ("handler threads:", JobQueue)):
+                queue = queue_class(os.path.join(workdir, f"{queue_class.__name__}-{blocking_io}.db"), handler,
+                                    workers=WORKERS, max_pending=requests // 2)
+                queue.start()
+                with contextlib.redirect_stdout(output):
+                    started_at = time.perf_counter()
+                    outcome = queue_burst(queue, requests, blocking_io)
+                report(label, time.perf_counter() - started_at, outcome)
+
+        legacy, current = lookups(stored_jobs, queue)
+        print(f"🔎 job status lookup with {stored_jobs:,} jobs: list scan {legacy * 1e6:8.1f}µs, "
+              f"primary key {current * 1e6:6.1f}µs ({legacy / current:.0f}x)")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    run(*args)
@@ -0,0 +1,106 @@
+"""
+🌊 Plan streaming benchmark
+จำลอง LLM ที่ตอบแผนเว็บ {"slug", "files": [...]} ทีละ token (StubBackend) แล้ววัด time-to-first-byte,
+เวลาจนมี index.html บนดิสก์ (preview เปิดได้) และเวลารวม เทียบแบบเดิม:
+- เดิม: llm_gateway.complete() รอ JSON ทั้งก้อน -> json.loads -> เขียนทุกไฟล์
+- ใหม่: llm_gateway.stream() -> write_plan_stream เขียนแต่ละไฟล์ทันทีที่ object ของไฟล์ปิด
+และวัด throughput ของ PlanStreamParser เทียบ json.loads (overhead ของการ parse ทีละ chunk)
+
+Usage: python benchmarks/plan_stream_benchmark.py [generation_seconds] [files]
+"""
+
+import asyncio
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+os.environ.setdefault("LLM_CACHE_DISABLED", "1")
+
+from agents.llm_gateway import LLMGateway, StubBackend  # noqa: E402
+from agents.plan_stream import PlanStreamParser, write_plan_stream  # noqa: E402
+
+
+def make_plan(files: int) -> str:
+    names = ["index.html", "styles.css"] + [f"page_{i}.html" for i in range(files - 3)] + ["script.js"]
+    return json.dumps({
+        "slug": "myapp-benchmark",
+        "files": [{"path": name, "content": f"<!-- {name} -->\n" + "<div class=\"card\">สวัสดี \"AI\"</div>\n" * 120}
+                  for name in names],
+    }, ensure_ascii=False)
+
+
+class PlanBackend(StubBackend):
+    def __init__(self, latency: float, plan: str):
+        super().__init__(latency)
+        self.plan = plan
+
+    def _reply(self, request) -> str:
+        return self.plan
+
+
+async def legacy(gateway, webroot: Path, request: dict):
+    started_at = time.perf_counter()
+    plan = json.loads(await gateway.complete(**request))
+    first_byte = time.perf_counter() - started_at
+    outdir = webroot / plan["slug"]
+    preview = None
+    for f in plan["files"]:
+        target = outdir / f["path"]
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(f["content"], encoding="utf-8")
+        if f["path"] == "index.html":
+            preview = time.perf_counter() - started_at
+    return first_byte, preview, time.perf_counter() - started_at
+
+
+async def streaming(gateway, webroot: Path, request: dict):
+    started_at = time.perf_counter()
+    first_byte = preview = None
+    async for event in write_plan_stream(gateway.stream(**request), webroot):
+        if first_byte is None and event["event"] == "chunk":
+            first_byte = time.perf_counter() - started_at
+        if event["event"] == "file_written" and event["path"] == "index.html":
+            preview = time.perf_counter() - started_at
+    return first_byte, preview, time.perf_counter() - started_at
+
+
+def parser_throughput(plan: str, chunk_size: int = 16, rounds: int = 20):
+    started_at = time.perf_counter()
+    for _ in range(rounds):
+        parser = PlanStreamParser()
+        for i in range(0, len(plan), chunk_size):
+            parser.feed(plan[i:i + chunk_size])
+        parser.close()
+    incremental = time.perf_counter() - started_at
+    started_at = time.perf_counter()
+    for _ in range(rounds):
+        json.loads(plan)
+    whole = time.perf_counter() - started_at
+    size_mb = len(plan.encode()) * rounds / 1024 / 1024
+    return size_mb / incremental, size_mb / whole
+
+
+def run(generation_seconds: float = 10.0, files: int = 8):
+    plan = make_plan(files)
+    gateway = LLMGateway(backend=PlanBackend(generation_seconds, plan))
+    request = {"messages": [{"role": "user", "content": "ร้านกาแฟ"}], "response_format": {"type": "json_object"}}
+    print(f"🌊 plan {len(plan) / 1024:.0f}KB, {files} files, LLM generation {generation_seconds:.0f}s")
+    for label, generate in (("wait for whole JSON", legacy), ("streamed", streaming)):
+        webroot = Path(tempfile.mkdtemp())
+        first_byte, preview, total = asyncio.run(generate(gateway, webroot, request))
+        print(f"   {label:20s} first byte {first_byte:6.2f}s  index.html on disk {preview:6.2f}s  total {total:6.2f}s")
+        shutil.rmtree(webroot, ignore_errors=True)
+    incremental, whole = parser_throughput(plan)
+    print(f"   parser: incremental {incremental:6.1f}MB/s (16-char chunks) vs json.loads {whole:6.1f}MB/s")
+
+
+if __name__ == "__main__":
+    args = [float(sys.argv[1])] if len(sys.argv) > 1 else []
+    args += [int(a) for a in sys.argv[2:3]]
+    run(*args)
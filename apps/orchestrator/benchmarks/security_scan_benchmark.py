@@ -0,0 +1,122 @@
+"""
+🛡️ Security scan benchmark
+สร้างโปรเจกต์จำลอง (ค่าเริ่มต้น 5,000 ไฟล์ + bundle JS ขนาดใหญ่) แล้ววัดเวลา scan ของ
+SecurityIntelligenceEngine เทียบแบบเดิม:
+- เดิม: rglob 5 รอบ (ต่อ extension) + ThreatMonitor rglob อีกรอบ + อ่าน HTML ซ้ำตอนเช็ค config
+  และคำนวณเลขบรรทัดด้วย content[:match.start()].count('\\n')
+- ใหม่: scan_tree เดินไฟล์รอบเดียว อ่านแต่ละไฟล์ครั้งเดียว รันทั้ง 2 rule set บน process pool
+และตรวจว่าจำนวน vulnerabilities / threats ตรงกัน
+
+Usage: python benchmarks/security_scan_benchmark.py [files] [bundle_kb]
+"""
+
+import asyncio
+import logging
+import os
+import random
+import re
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from security_intelligence_engine import SecurityIntelligenceEngine  # noqa: E402
+
+SNIPPETS = {
+    '.html': ['<div class="card">{n}</div>', '<script>el.innerHTML = data{n};</script>',
+              '<a href="http://cdn{n}.example.com/lib.js">lib</a>', '<p>Item {n}</p>'],
+    '.js': ['const v{n} = compute({n});', 'node.innerHTML = html{n};', 'const id{n} = Math.random();',
+            'fetch("/api/{n}").then(r => r.json());', 'eval(payload{n});',
+            'track(document.cookie, {n});'],
+    '.css': ['.c{n} {{ color: #{n:03x}; }}', '.b{n} {{ background: url("http://img{n}.example.com/a.png"); }}'],
+    '.php': ['<?php echo $v{n}; ?>', '<?php shell_exec($_GET["c{n}"]); ?>'],
+    '.py': ['def f{n}(x):\n    return x * {n}', 'cursor.execute("SELECT * FROM t WHERE id = %s" % uid{n})',
+            'password = "secret{n}"'],
+}
+
+
+def generate_project(root: Path, files: int, bundle_kb: int):
+    rng = random.Random(42)
+    extensions = list(SNIPPETS)
+    for i in range(files):
+        ext = extensions[i % len(extensions)]
+        directory = root if ext == '.html' and i % 50 == 0 else root / f"module_{i % 40}" / f"part_{i % 7}"
+        directory.mkdir(parents=True, exist_ok=True)
+        lines = [rng.choice(SNIPPETS[ext]).format(n=n) for n in range(rng.randint(20, 120))]
+        (directory / f"file_{i}{ext}").write_text('\n'.join(lines))
+    # Generated bundles: long files with many matches far from the start
+    bundle_lines = [rng.choice(SNIPPETS['.js']).format(n=n) for n in range(bundle_kb * 1024 // 28)]
+    for i in range(4):
+        (root / "dist").mkdir(exist_ok=True)
+        (root / "dist" / f"bundle_{i}.js").write_text('\n'.join(bundle_lines))
+
+
+async def legacy_scan(engine: SecurityIntelligenceEngine, app_dir: Path):
+    """ขั้นตอนเดิมของ run_security_analysis: 3 traversal และอ่านไฟล์ซ้ำ"""
+    scanner, monitor = engine.scanner, engine.threat_monitor
+    vulnerabilities = []
+    for ext in ['*.html', '*.js', '*.css', '*.py', '*.php']:
+        for file_path in app_dir.rglob(ext):
+            content = file_path.read_text(encoding='utf-8', errors='ignore')
+            for info in scanner.vulnerability_patterns.values():
+                for pattern in info['patterns']:
+                    for match in re.finditer(pattern, content, re.IGNORECASE | re.MULTILINE):
+                        vulnerabilities.append((str(file_path), content[:match.start()].count('\n') + 1))
+    for html_file in app_dir.glob('*.html'):
+        content = html_file.read_text(encoding='utf-8', errors='ignore')
+        vulnerabilities.extend(scanner.check_html_configuration(html_file, content))
+
+    threats = []
+    for file_path in app_dir.rglob('*'):
+        if not file_path.is_file():
+            continue
+        for pattern in monitor.threat_patterns['suspicious_files']:
+            if re.search(pattern, str(file_path)):
+                threats.append(str(file_path))
+        if file_path.suffix in ['.html', '.js', '.php', '.py']:
+            content = file_path.read_text(encoding='utf-8', errors='ignore')
+            for threat_type, patterns in monitor.threat_patterns.items():
+                if threat_type == 'suspicious_files':
+                    continue
+                for pattern in patterns:
+                    if re.search(pattern, content, re.IGNORECASE):
+                        threats.append(str(file_path))
+    return vulnerabilities, threats
+
+
+async def timed(coro):
+    started_at = time.perf_counter()
+    result = await coro
+    return result, time.perf_counter() - started_at
+
+
+async def main(files: int, bundle_kb: int):
+    logging.disable(logging.CRITICAL)
+    root = Path(tempfile.mkdtemp()) / "app"
+    generate_project(root, files, bundle_kb)
+    print(f"📂 {files:,} files + 4 × {bundle_kb:,}KB bundles")
+
+    os.chdir(root.parent)  # the engine creates security_intelligence.db in the working directory
+    engine = SecurityIntelligenceEngine()
+    (old_vulns, old_threats), legacy = await timed(legacy_scan(engine, root))
+    print(f"   old (separate passes): {legacy:7.2f}s  vulns={len(old_vulns):,} threats={len(old_threats):,}")
+
+    # First scan of the tree: nothing cached yet, process pool startup included
+    (vulns, threats), current = await timed(engine.scan_tree(str(root)))
+    identical = len(vulns) == len(old_vulns) and len(threats) == len(old_threats)
+    print(f"   new (scan_tree):       {current:7.2f}s  vulns={len(vulns):,} threats={len(threats):,}")
+    print(f"   speedup: {legacy / current:.1f}x  identical={identical}")
+
+    shutil.rmtree(root.parent, ignore_errors=True)
+
+
+def run(files: int = 5_000, bundle_kb: int = 1_024):
+    asyncio.run(main(files, bundle_kb))
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    run(*args)
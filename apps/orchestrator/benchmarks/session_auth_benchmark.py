@@ -0,0 +1,96 @@
+"""
+🔐 Session auth benchmark
+วัด requests/sec ของ route /dashboard (Flask test client) และ validate_session เทียบแบบเดิม:
+- เดิม: query user_sessions (expires_at > now) ทุก request และ authenticate_user('', '') อีก 1 query
+- ใหม่: ตาราง session ในหน่วยความจำ (เขียนลง SQLite แบบ write-behind) และ cache ของ User
+ค่าเริ่มต้นใช้ session ในฐานข้อมูล 50,000 แถว (session ของผู้ใช้คนอื่น/หมดอายุที่ยังไม่ถูก sweep)
+
+Usage: python benchmarks/session_auth_benchmark.py [requests] [stored_sessions]
+"""
+
+import os
+import secrets
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def legacy_validate(manager):
+    def validate_session(session_id):
+        return manager.db.fetchvalue("""
+            SELECT user_id FROM user_sessions
+            WHERE session_id = ? AND expires_at > ? AND is_active = TRUE
+        """, (session_id, datetime.now().isoformat()))
+    return validate_session
+
+
+def legacy_get_user(manager):
+    def get_user(user_id):
+        manager.authenticate_user('', '')  # the extra lookup the dashboard used to make
+        return None
+    return get_user
+
+
+def requests_per_second(client, requests: int) -> float:
+    started_at = time.perf_counter()
+    for _ in range(requests):
+        response = client.get('/dashboard')
+        assert response.status_code == 200, response.status_code
+    return requests / (time.perf_counter() - started_at)
+
+
+def validations_per_second(validate, session_id: str, calls: int = 20_000) -> float:
+    started_at = time.perf_counter()
+    for _ in range(calls):
+        validate(session_id)
+    return calls / (time.perf_counter() - started_at)
+
+
+def run(requests: int = 2_000, stored_sessions: int = 50_000):
+    workdir = Path(tempfile.mkdtemp())
+    os.chdir(workdir)  # the platform module creates its databases in the working directory
+    os.environ['WORKSPACE_RECONCILE_INTERVAL'] = '0'
+    os.environ['SESSION_SWEEP_INTERVAL'] = '0'
+    import logging
+    logging.disable(logging.CRITICAL)
+    import multi_user_platform  # noqa: E402
+
+    manager = multi_user_platform.platform.user_manager
+    manager.register_user("bench_user", "bench@example.com", "password123")
+    now = datetime.now()
+    manager.db.executemany("""
+        INSERT INTO user_sessions (session_id, user_id, created_at, expires_at) VALUES (?, ?, ?, ?)
+    """, [(secrets.token_urlsafe(32), f"user_{i}", now.isoformat(),
+           (now + timedelta(hours=24 if i % 2 else -24)).isoformat()) for i in range(stored_sessions)])
+
+    client = multi_user_platform.app.test_client()
+    client.post('/login', data={'username': 'bench_user', 'password': 'password123'})
+    with client.session_transaction() as flask_session:
+        session_id = flask_session['session_id']
+    client.get('/dashboard')  # warm up templates and workspace
+    print(f"🔐 {stored_sessions:,} stored sessions, {requests:,} dashboard requests")
+
+    validate, get_user = manager.validate_session, manager.get_user
+    manager.db.flush()
+    manager.validate_session, manager.get_user = legacy_validate(manager), legacy_get_user(manager)
+    legacy_rps = requests_per_second(client, requests)
+    legacy_validations = validations_per_second(manager.validate_session, session_id)
+    print(f"   query per request: {legacy_rps:8,.0f} req/s  validate_session {legacy_validations:10,.0f}/s")
+
+    manager.validate_session, manager.get_user = validate, get_user
+    current_rps = requests_per_second(client, requests)
+    current_validations = validations_per_second(manager.validate_session, session_id)
+    print(f"   session table:     {current_rps:8,.0f} req/s  validate_session {current_validations:10,.0f}/s")
+    print(f"   speedup: dashboard {current_rps / legacy_rps:.1f}x, validation {current_validations / legacy_validations:.0f}x")
+
+    shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    run(*args)
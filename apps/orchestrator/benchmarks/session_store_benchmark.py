@@ -0,0 +1,97 @@
+"""
+🧠 Session store benchmark
+จำลองผู้ใช้จำนวนมาก (ค่าเริ่มต้น 5,000 คน คนละ 40 ข้อความ) คุยกับ ConversationalFlowManager แล้ววัด
+หน่วยความจำที่ process ถือไว้ (tracemalloc), ขนาด context ที่ส่งให้ LLM และเวลาโหลด session กลับจากดิสก์ เทียบแบบเดิม:
+- เดิม: dict ของ list ต่อ user_id เก็บทุกข้อความตลอดอายุ process, context = 10 ข้อความล่าสุดแบบไม่ตัดความยาว
+- ใหม่: SessionStore (LRU + idle TTL, spill ลง SQLite) + ConversationMemory (เก็บ N ล่าสุด + สรุปส่วนที่เก่ากว่า)
+
+Usage: python benchmarks/session_store_benchmark.py [users] [messages_per_user]
+"""
+
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from agents.conversational_flow import ConversationalFlowManager  # noqa: E402
+
+HOT_SESSIONS = 200
+
+
+def make_message(i: int):
+    role = "user" if i % 2 == 0 else "assistant"
+    content = f"ข้อความที่ {i} อยากได้เว็บร้านกาแฟโทนอบอุ่น มีเมนูและแผนที่ " + "รายละเอียด " * (20 if role == "user" else 150)
+    return {"role": role, "content": content, "timestamp": datetime.now(),
+            "intent": {"primary_intent": "create_website", "confidence": 0.8}}
+
+
+def legacy_context(history, last_n: int = 10) -> str:
+    lines = []
+    for msg in history[-last_n:]:
+        lines.append(f"{'ผู้ใช้' if msg['role'] == 'user' else 'AI'}: {msg['content']}")
+    return "\n".join(lines)
+
+
+def run_legacy(users: int, messages: int):
+    tracemalloc.start()
+    conversation_memory = {}
+    for u in range(users):
+        history = conversation_memory.setdefault(f"user-{u}", [])
+        for i in range(messages):
+            history.append(make_message(i))
+    resident = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    context = legacy_context(conversation_memory["user-0"])
+    return resident, len(context), None
+
+
+def run_store(users: int, messages: int):
+    manager = ConversationalFlowManager()
+    manager.sessions.max_sessions = HOT_SESSIONS
+    tracemalloc.start()
+    for u in range(users):
+        memory = manager.sessions.get(f"user-{u}").memory
+        for i in range(messages):
+            memory.append(make_message(i))
+    resident = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    # ผู้ใช้ที่ถูก spill ไปแล้วกลับมาคุยต่อ
+    rehydrate = []
+    for u in range(0, min(users - HOT_SESSIONS, 200)):
+        started_at = time.perf_counter()
+        manager.sessions.get(f"user-{u}")
+        rehydrate.append(time.perf_counter() - started_at)
+    context = manager._get_conversation_context("user-0")
+    return resident, len(context), statistics.median(rehydrate) if rehydrate else None
+
+
+def run(users: int = 5_000, messages: int = 40):
+    workdir = tempfile.mkdtemp()
+    os.environ["SESSION_STORE_PATH"] = os.path.join(workdir, "sessions.db")
+    print(f"🧠 {users:,} users x {messages} messages, {HOT_SESSIONS} sessions kept in memory")
+    try:
+        for label, scenario in (("dict of lists", run_legacy), ("session store", run_store)):
+            started_at = time.perf_counter()
+            resident, context_chars, rehydrate = scenario(users, messages)
+            elapsed = time.perf_counter() - started_at
+            line = (f"   {label:14s} resident {resident / 1024 / 1024:7.1f}MB  "
+                    f"context {context_chars:6,} chars  ({elapsed:5.1f}s)")
+            if rehydrate is not None:
+                line += f"  rehydrate p50 {rehydrate * 1000:.2f}ms"
+            print(line)
+        print(f"   on disk: {os.path.getsize(os.environ['SESSION_STORE_PATH']) / 1024 / 1024:.1f}MB")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    run(*args)
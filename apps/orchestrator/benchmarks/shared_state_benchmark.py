@@ -0,0 +1,123 @@
+"""
+🔗 Shared state benchmark (หลาย uvicorn worker)
+จำลอง worker หลาย process: แต่ละตัวเริ่ม workflow ของตัวเองแล้วตอบ /workflow-status ของ id แบบสุ่มจากทุก worker
+(เหมือน load balancer ส่ง request ไป worker ไหนก็ได้) วัด throughput รวมและนับคำตอบที่ผิด เทียบ:
+- memory: dict ใน process (แบบเดิม) worker ที่ไม่ได้เริ่ม workflow นั้นตอบว่า "in_progress" ตลอดไป
+- sqlite: SqliteStateBackend ไฟล์ WAL ที่ทุก worker เปิดร่วมกัน
+และวัด latency ของกิจกรรมจาก worker หนึ่งไปถึง dashboard ที่ต่อกับอีก worker (poll ผ่าน shared state)
+
+Usage: python benchmarks/shared_state_benchmark.py [workers] [requests_per_worker]
+"""
+
+import asyncio
+import hashlib
+import multiprocessing as mp
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+HANDLER_CPU_SECONDS = 0.001  # งาน CPU ต่อ request นอกเหนือจาก state (render/serialize)
+
+
+def handler_work():
+    deadline = time.perf_counter() + HANDLER_CPU_SECONDS
+    digest = b""
+    while time.perf_counter() < deadline:
+        digest = hashlib.sha256(digest).digest()
+
+
+def worker(kind: str, index: int, workers: int, requests: int, barrier, results):
+    from agents.shared_state import create_state_backend
+    state = create_state_backend(kind)
+    barrier.wait()
+    started_at = time.perf_counter()
+    for i in range(requests):
+        handler_work()
+        state.put("workflow", f"workflow-{index}-{i}", {"status": "completed", "worker": index})
+    barrier.wait()  # ทุก workflow เสร็จแล้ว จากนี้ทุก worker ต้องตอบ completed
+    wrong = 0
+    rng = random.Random(index)
+    for _ in range(requests):
+        handler_work()
+        result = state.get("workflow", f"workflow-{rng.randrange(workers)}-{rng.randrange(requests)}")
+        if result is None or result["status"] != "completed":
+            wrong += 1
+    results.put((time.perf_counter() - started_at, wrong))
+
+
+def measure(kind: str, workers: int, requests: int):
+    barrier = mp.Barrier(workers)
+    results = mp.Queue()
+    processes = [mp.Process(target=worker, args=(kind, i, workers, requests, barrier, results))
+                 for i in range(workers)]
+    for process in processes:
+        process.start()
+    outcomes = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    elapsed = max(seconds for seconds, _ in outcomes)
+    return workers * requests * 2 / elapsed, sum(wrong for _, wrong in outcomes)
+
+
+def publisher(events: int):
+    from agents.activity_monitor import activity_monitor
+    for i in range(events):
+        activity_monitor.add_activity("agent_action", f"step {i}", {"sent_at": time.time()})
+        time.sleep(0.01)
+
+
+async def relay_latency(events: int):
+    import json
+    from agents.activity_monitor import activity_monitor
+
+    latencies = []
+
+    class Dashboard:
+        async def accept(self):
+            pass
+
+        async def send_text(self, message: str):
+            data = json.loads(message)["data"]
+            if isinstance(data, dict) and "sent_at" in data.get("details", {}):
+                latencies.append(time.time() - data["details"]["sent_at"])
+
+    await activity_monitor.connect_websocket(Dashboard())
+    process = mp.Process(target=publisher, args=(events,))
+    process.start()
+    while process.is_alive() or len(latencies) < events:
+        await asyncio.sleep(0.05)
+        if not process.is_alive() and len(latencies) < events:
+            await asyncio.sleep(0.5)
+            break
+    process.join()
+    return len(latencies), statistics.median(latencies), max(latencies)
+
+
+def run(workers: int = 4, requests: int = 1_000):
+    workdir = tempfile.mkdtemp()
+    os.environ["STATE_DB_PATH"] = os.path.join(workdir, "state.db")
+    os.environ["STATE_BACKEND"] = "sqlite"
+    print(f"🔗 {workers} workers x {requests:,} workflow starts + {requests:,} status lookups, "
+          f"{HANDLER_CPU_SECONDS * 1000:.0f}ms CPU per request, {os.cpu_count()} CPUs")
+    try:
+        for kind in ("memory", "sqlite"):
+            for count in sorted({1, workers}):
+                throughput, wrong = measure(kind, count, requests)
+                print(f"   {kind:6s} {count} worker(s)  {throughput:8,.0f} req/s  wrong status answers {wrong:,}")
+        received, p50, worst = asyncio.run(relay_latency(100))
+        print(f"   activity from another worker: {received}/100 delivered, p50 {p50 * 1000:.0f}ms, max {worst * 1000:.0f}ms")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    mp.set_start_method("spawn")
+    args = [int(a) for a in sys.argv[1:3]]
+    run(*args)
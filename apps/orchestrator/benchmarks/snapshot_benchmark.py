@@ -0,0 +1,99 @@
+"""
+📸 Snapshot store benchmark
+สร้าง app จำลอง (ไฟล์ HTML/JS + รูปภาพ) แล้วเทียบ backup / rollback / deploy แบบเดิมกับ SnapshotStore:
+- เดิม: shutil.copytree ทั้ง app ทุกครั้ง และ rollback = rmtree โปรเจกต์จริงก่อน copy กลับ
+- ใหม่: เก็บเนื้อหาไฟล์ครั้งเดียวตาม hash, backup/deploy = hardlink tree,
+  rollback = สร้าง tree ใหม่ข้างๆ แล้วสลับ symlink (เว็บไม่หายระหว่าง rollback)
+วัดหลังแก้ไฟล์ 1% (รอบปกติของการแก้ bug) และตรวจว่าเนื้อหาหลัง rollback ตรงกับ backup
+
+Usage: python benchmarks/snapshot_benchmark.py [files] [image_kb]
+"""
+
+import filecmp
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import scan_cache  # noqa: E402
+from snapshot_store import SnapshotStore  # noqa: E402
+
+
+def generate_app(root: Path, files: int, image_kb: int):
+    rng = random.Random(5)
+    for i in range(files):
+        directory = root / f"section_{i % 20}"
+        directory.mkdir(parents=True, exist_ok=True)
+        if i % 5 == 0:
+            (directory / f"image_{i}.png").write_bytes(rng.randbytes(image_kb * 1024))
+        else:
+            (directory / f"page_{i}.html").write_text(f"<div>{i}</div>\n" * rng.randint(50, 400))
+
+
+def edit_some(root: Path, fraction: float):
+    files = sorted(path for path in root.rglob('*') if path.is_file() and path.suffix == '.html')
+    for path in random.Random(9).sample(files, max(1, int(len(files) * fraction))):
+        path.write_text(path.read_text() + "<!-- fix -->\n")
+
+
+def same_tree(a: Path, b: Path) -> bool:
+    comparison = filecmp.dircmp(a, b)
+    if comparison.left_only or comparison.right_only or comparison.diff_files:
+        return False
+    _, mismatch, errors = filecmp.cmpfiles(a, b, comparison.common_files, shallow=False)
+    return not mismatch and not errors and all(same_tree(a / d, b / d) for d in comparison.common_dirs)
+
+
+def timed(func):
+    started_at = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - started_at
+
+
+def run(files: int = 2_000, image_kb: int = 1_024):
+    scan_cache.RACY_WINDOW_NS = 0  # freshly generated files would otherwise always be re-hashed
+    workdir = Path(tempfile.mkdtemp())
+    live = workdir / "app" / "shop"
+    generate_app(live, files, image_kb)
+    size = sum(path.stat().st_size for path in live.rglob('*') if path.is_file())
+    print(f"📂 {files:,} files, {size / 1024 / 1024:.0f}MB")
+
+    # เดิม
+    legacy_backup = workdir / "legacy_backups" / "shop-1"
+    _, first_backup = timed(lambda: shutil.copytree(live, legacy_backup))
+    edit_some(live, 0.01)
+    _, backup = timed(lambda: shutil.copytree(live, workdir / "legacy_backups" / "shop-2"))
+
+    def legacy_rollback():
+        shutil.rmtree(live)  # the site is missing from here ...
+        shutil.copytree(legacy_backup, live)  # ... until here
+
+    _, rollback = timed(legacy_rollback)
+    _, deploy = timed(lambda: shutil.copytree(live, workdir / "legacy_deploy"))
+    print(f"   copytree:      first backup {first_backup:6.2f}s  backup {backup:6.2f}s  "
+          f"rollback {rollback:6.2f}s  deploy {deploy:6.2f}s")
+
+    # ใหม่
+    store = SnapshotStore(str(workdir / "_snapshots"))
+    backup_1 = workdir / "backups" / "shop-1"
+    _, first_backup = timed(lambda: store.materialize(store.snapshot(live), backup_1))
+    edit_some(live, 0.01)
+    _, backup = timed(lambda: store.materialize(store.snapshot(live), workdir / "backups" / "shop-2"))
+    _, rollback = timed(lambda: store.checkout(store.snapshot(backup_1), live, workdir / "_releases" / "shop"))
+    _, deploy = timed(lambda: store.materialize(store.snapshot(live), workdir / "deploy"))
+    print(f"   SnapshotStore: first backup {first_backup:6.2f}s  backup {backup:6.2f}s  "
+          f"rollback {rollback:6.2f}s  deploy {deploy:6.2f}s  (atomic swap)")
+    print(f"   rolled back to backup: {same_tree(live, backup_1)}  live is symlink: {os.path.islink(live)}")
+    print(f"   stats: {store.stats}")
+
+    shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    run(*args)
@@ -0,0 +1,137 @@
+"""
+🗄️ SQLite pool benchmark
+วัด ops/sec ของ hot path ที่อ่าน SQLite บ่อยที่สุด 2 ตัว:
+- vault key lookup (SecureVault.get_api_key: SELECT + UPDATE usage_count)
+- session validation (UserManager.validate_session: SELECT ตาม session_id)
+เทียบแบบเดิม (sqlite3.connect/close ทุก operation) กับ SQLitePool (connection ต่อ thread, WAL,
+statement cache) โดยใช้ schema และ SQL ชุดเดียวกับ module จริง
+
+Usage: python benchmarks/sqlite_pool_benchmark.py [ops] [rows]
+"""
+
+import os
+import secrets
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlite_pool import SQLitePool  # noqa: E402
+
+API_KEYS_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS api_keys (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT UNIQUE NOT NULL,
+        service TEXT NOT NULL,
+        encrypted_key BLOB NOT NULL,
+        hash_check TEXT NOT NULL,
+        permissions TEXT,
+        rate_limit INTEGER,
+        expires_at TIMESTAMP,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        last_used TIMESTAMP,
+        usage_count INTEGER DEFAULT 0,
+        is_active BOOLEAN DEFAULT 1
+    )
+"""
+
+SESSIONS_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS user_sessions (
+        session_id TEXT PRIMARY KEY,
+        user_id TEXT NOT NULL,
+        created_at TEXT NOT NULL,
+        expires_at TEXT NOT NULL,
+        is_active BOOLEAN DEFAULT TRUE
+    )
+"""
+
+KEY_SELECT = "SELECT encrypted_key, hash_check, expires_at, is_active FROM api_keys WHERE name = ?"
+KEY_TOUCH = "UPDATE api_keys SET last_used = CURRENT_TIMESTAMP, usage_count = usage_count + 1 WHERE name = ?"
+SESSION_SELECT = "SELECT user_id FROM user_sessions WHERE session_id = ? AND expires_at > ? AND is_active = TRUE"
+
+
+def seed(db_path: str, rows: int):
+    conn = sqlite3.connect(db_path)
+    conn.execute(API_KEYS_SCHEMA)
+    conn.execute(SESSIONS_SCHEMA)
+    conn.executemany(
+        "INSERT INTO api_keys (name, service, encrypted_key, hash_check) VALUES (?, ?, ?, ?)",
+        [(f"key_{i}", "openai", secrets.token_bytes(96), secrets.token_hex(32)) for i in range(rows)]
+    )
+    now, expires = datetime.now().isoformat(), (datetime.now() + timedelta(hours=24)).isoformat()
+    session_ids = [secrets.token_urlsafe(32) for _ in range(rows)]
+    conn.executemany(
+        "INSERT INTO user_sessions (session_id, user_id, created_at, expires_at) VALUES (?, ?, ?, ?)",
+        [(sid, f"user_{i}", now, expires) for i, sid in enumerate(session_ids)]
+    )
+    conn.commit()
+    conn.close()
+    return session_ids
+
+
+def key_lookup_per_connection(db_path: str, name: str):
+    """แบบเดิม: เปิด connection ใหม่ทุกครั้ง"""
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute(KEY_SELECT, (name,))
+    row = cursor.fetchone()
+    cursor.execute(KEY_TOUCH, (name,))
+    conn.commit()
+    conn.close()
+    return row
+
+
+def key_lookup_pooled(pool: SQLitePool, name: str):
+    row = pool.fetchone(KEY_SELECT, (name,))
+    pool.execute(KEY_TOUCH, (name,))
+    return row
+
+
+def session_per_connection(db_path: str, session_id: str):
+    conn = sqlite3.connect(db_path)
+    row = conn.execute(SESSION_SELECT, (session_id, datetime.now().isoformat())).fetchone()
+    conn.close()
+    return row
+
+
+def session_pooled(pool: SQLitePool, session_id: str):
+    return pool.fetchvalue(SESSION_SELECT, (session_id, datetime.now().isoformat()))
+
+
+def measure(label: str, func, target, keys, ops: int) -> float:
+    started_at = time.perf_counter()
+    for i in range(ops):
+        func(target, keys[i % len(keys)])
+    rate = ops / (time.perf_counter() - started_at)
+    print(f"{label} {rate:>10,.0f} ops/sec")
+    return rate
+
+
+def run(ops: int = 5_000, rows: int = 1_000):
+    workdir = tempfile.mkdtemp()
+    before_path, after_path = os.path.join(workdir, "before.db"), os.path.join(workdir, "after.db")
+    seed(before_path, rows)
+    session_ids = seed(after_path, rows)
+    pool = SQLitePool(after_path)
+    key_names = [f"key_{i}" for i in range(rows)]
+
+    print(f"🔑 Vault key lookup ({ops:,} ops, {rows:,} keys)")
+    before = measure("   connect per op:", key_lookup_per_connection, before_path, key_names, ops)
+    after = measure("   SQLitePool:    ", key_lookup_pooled, pool, key_names, ops)
+    print(f"   speedup: {after / before:.1f}x")
+
+    print(f"🎫 Session validation ({ops:,} ops, {rows:,} sessions)")
+    before = measure("   connect per op:", session_per_connection, before_path, session_ids, ops)
+    after = measure("   SQLitePool:    ", session_pooled, pool, session_ids, ops)
+    print(f"   speedup: {after / before:.1f}x")
+
+    pool.close()
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    run(*args)
@@ -0,0 +1,136 @@
+"""
+🌐 Static host benchmark
+Deploy app จำลองหลายตัวแล้วเทียบแบบเดิมของ LiveDeploymentSystem กับ StaticHost:
+- เดิม: หา port ด้วยการ bind ทีละ port แล้วเปิด `python -m http.server` 1 process ต่อ app
+- ใหม่: StaticHost ตัวเดียว (port เดียว) และ deploy = register route
+วัดเวลาจน app ทุกตัวตอบ request แรกได้, หน่วยความจำรวม (RSS) และ latency ของ request ซ้ำ
+(keep-alive + ETag revalidation)
+
+Usage: python benchmarks/static_host_benchmark.py [apps] [requests]
+"""
+
+import http.client
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from static_host import StaticHost, precompress_tree  # noqa: E402
+
+
+def generate_apps(root: Path, apps: int):
+    for i in range(apps):
+        app_dir = root / f"deploy_{i}"
+        (app_dir / "assets").mkdir(parents=True)
+        (app_dir / "index.html").write_text(f"<!DOCTYPE html><html><body><h1>App {i}</h1>" + "<p>content</p>" * 400)
+        (app_dir / "assets" / "app.js").write_text(f"console.log({i});\n" * 800)
+        precompress_tree(app_dir)
+
+
+def rss_kb(pid: int) -> int:
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            return next(int(line.split()[1]) for line in f if line.startswith('VmRSS:'))
+    except (OSError, StopIteration):
+        return 0
+
+
+def wait_until_serving(port: int, path: str):
+    while True:
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+            conn.request('GET', path)
+            conn.getresponse().read()
+            conn.close()
+            return
+        except OSError:
+            time.sleep(0.01)
+
+
+def legacy_deploy(root: Path, apps: int):
+    """port probing + process ต่อ app แบบเดิม"""
+    processes, ports = [], []
+    started_at = time.perf_counter()
+    for i in range(apps):
+        for port in range(18000, 19000):
+            if port in ports:
+                continue
+            try:
+                with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+                    s.bind(('localhost', port))
+                    break
+            except OSError:
+                continue
+        ports.append(port)
+        processes.append(subprocess.Popen(
+            [sys.executable, '-m', 'http.server', str(port), '--bind', '127.0.0.1',
+             '--directory', str(root / f"deploy_{i}")],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL))
+    for port in ports:
+        wait_until_serving(port, '/')
+    elapsed = time.perf_counter() - started_at
+    memory = sum(rss_kb(process.pid) for process in processes)
+    return processes, ports, elapsed, memory
+
+
+def repeat_requests(connection_for, paths, requests: int, revalidate: bool):
+    etags = {}
+    started_at = time.perf_counter()
+    for n in range(requests):
+        conn, path = connection_for(n % len(paths)), paths[n % len(paths)]
+        headers = {'Accept-Encoding': 'gzip'}
+        if revalidate and path in etags:
+            headers['If-None-Match'] = etags[path]
+        conn.request('GET', path, headers=headers)
+        response = conn.getresponse()
+        response.read()
+        if response.getheader('ETag'):
+            etags[path] = response.getheader('ETag')
+    return (time.perf_counter() - started_at) / requests
+
+
+def run(apps: int = 50, requests: int = 2_000):
+    workdir = Path(tempfile.mkdtemp())
+    generate_apps(workdir, apps)
+    print(f"🚀 {apps} deployments")
+
+    processes, ports, elapsed, memory = legacy_deploy(workdir, apps)
+    legacy_latency = repeat_requests(lambda i: http.client.HTTPConnection('127.0.0.1', ports[i]),
+                                     ['/index.html'] * apps, requests, revalidate=False)
+    print(f"   process per app: ready in {elapsed:6.2f}s  RSS {memory / 1024:7.1f}MB  "
+          f"{apps} ports  {legacy_latency * 1e6:7.0f}µs/request (new connection, full body)")
+    for process in processes:
+        process.terminate()
+    for process in processes:
+        process.wait()
+
+    host = StaticHost(host='127.0.0.1', port=0)
+    memory_before = rss_kb(os.getpid())
+    started_at = time.perf_counter()
+    host.start()
+    for i in range(apps):
+        host.register(f"app{i}", str(workdir / f"deploy_{i}"))
+    wait_until_serving(host.port, f"/apps/app{apps - 1}/")
+    elapsed = time.perf_counter() - started_at
+    memory = rss_kb(os.getpid()) - memory_before
+
+    connection = http.client.HTTPConnection('127.0.0.1', host.port)
+    paths = [f"/apps/app{i}/index.html" for i in range(apps)]
+    full = repeat_requests(lambda i: connection, paths, requests, revalidate=False)
+    revalidated = repeat_requests(lambda i: connection, paths, requests, revalidate=True)
+    print(f"   StaticHost:      ready in {elapsed:6.2f}s  RSS +{memory / 1024:6.1f}MB  "
+          f"1 port   {full * 1e6:7.0f}µs/request (keep-alive, gzip)  {revalidated * 1e6:5.0f}µs (304)")
+    print(f"   stats: {host.stats}")
+    host.stop()
+    shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    run(*args)
@@ -0,0 +1,112 @@
+"""
+🎯 Supervisor DAG benchmark
+จำลองเวลาของแต่ละ task (เท่ากับเวลารอ LLM) แล้ววัดเวลารวมของ workflow เทียบแบบเดิม:
+- เดิม: ทำทีละ task ตามลำดับ รอ dependency ด้วยการ poll ทุก 100ms
+- ใหม่: SupervisorAgent._run_dag - งานที่ไม่ขึ้นต่อกันรันพร้อมกัน ถูกปลุกด้วย future ของ dependency
+เวลาที่ดีที่สุดที่เป็นไปได้คือ critical path ของ DAG
+และวัดต้นทุนการสร้าง OpenAI client ใหม่ทุก task (แบบเดิม) เทียบใช้ตัวเดียวซ้ำ
+
+Usage: python benchmarks/supervisor_dag_benchmark.py [time_scale] [concurrent_workflows]
+"""
+
+import asyncio
+import contextlib
+import io
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from agents.supervisor_agent import SupervisorAgent, TaskStatus  # noqa: E402
+
+# วินาทีต่อ task (ก่อนคูณ time_scale)
+TASK_SECONDS = {
+    "requirement_analysis": 1.5,
+    "system_design": 1.5,
+    "code_generation": 4.0,
+    "quality_testing": 0.0,
+    "deployment": 0.1,
+    "enterprise_requirement_analysis": 2.0,
+    "enterprise_architecture": 0.0,
+    "frontend_development": 4.0,
+    "backend_development": 3.0,
+    "database_setup": 1.5,
+    "integration_testing": 0.0,
+    "professional_deployment": 0.1,
+}
+
+
+class SimulatedSupervisor(SupervisorAgent):
+    def __init__(self, scale: float):
+        super().__init__()
+        self.scale = scale
+
+    async def _assign_and_execute_task(self, task, tasks, context):
+        await asyncio.sleep(TASK_SECONDS[task.type] * self.scale)
+        return {"errors": [], "score": 100}
+
+
+async def legacy(supervisor: SimulatedSupervisor, tasks):
+    """_execute_workflow แบบเดิม (ทีละ task + poll dependency)"""
+    by_id = {task.id: task for task in tasks}
+    for task in tasks:
+        for dep in task.dependencies:
+            while by_id[dep].status not in (TaskStatus.COMPLETED, TaskStatus.FAILED):
+                await asyncio.sleep(0.1)
+        task.status = TaskStatus.IN_PROGRESS
+        await supervisor._assign_and_execute_task(task, by_id, {})
+        task.status = TaskStatus.COMPLETED
+
+
+def critical_path(tasks, scale: float) -> float:
+    finish = {}
+    for task in tasks:  # chain ถูกเรียงตามลำดับ dependency อยู่แล้ว
+        start = max((finish[dep] for dep in task.dependencies), default=0.0)
+        finish[task.id] = start + TASK_SECONDS[task.type] * scale
+    return max(finish.values())
+
+
+async def measure(scale: float, workflows: int):
+    supervisor = SimulatedSupervisor(scale)
+    supervisor.max_concurrent_tasks = 3 * workflows
+    for label, make_chain in (("standard", supervisor._create_task_chain),
+                              ("enterprise", supervisor._create_enterprise_task_chain)):
+        chains = [await make_chain("ร้านกาแฟ ระบบสมาชิก login") for _ in range(workflows)]
+        total = sum(TASK_SECONDS[task.type] * scale for task in chains[0])
+        started_at = time.perf_counter()
+        await asyncio.gather(*(legacy(supervisor, chain) for chain in chains))
+        sequential = time.perf_counter() - started_at
+
+        chains = [await make_chain("ร้านกาแฟ ระบบสมาชิก login") for _ in range(workflows)]
+        started_at = time.perf_counter()
+        await asyncio.gather(*(supervisor._run_dag(f"{label}-{i}", chain) for i, chain in enumerate(chains)))
+        dag = time.perf_counter() - started_at
+        durations = ", ".join(f"{task.id} {task.duration:.2f}s" for task in chains[0] if task.duration >= 0.05 * scale)
+        print(f"   {label:10s} sum of tasks {total:5.2f}s  critical path {critical_path(chains[0], scale):5.2f}s  "
+              f"sequential {sequential:5.2f}s  DAG {dag:5.2f}s")
+        print(f"              per-task timing: {durations}")
+
+
+def client_construction(rounds: int = 20) -> float:
+    from openai import OpenAI
+    started_at = time.perf_counter()
+    for _ in range(rounds):
+        OpenAI(api_key=os.getenv("OPENAI_API_KEY", "sk-benchmark"))
+    return (time.perf_counter() - started_at) / rounds
+
+
+def run(time_scale: float = 1.0, concurrent_workflows: int = 1):
+    print(f"🎯 simulated task latencies x{time_scale}, {concurrent_workflows} workflow(s) at once")
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):  # ซ่อน log ของ supervisor ทีละ task
+        asyncio.run(measure(time_scale, concurrent_workflows))
+    print("\n".join(line for line in output.getvalue().splitlines() if line.startswith("   ")))
+    print(f"   new OpenAI client per task: {client_construction() * 1000:.1f}ms each (pooled: once per process)")
+
+
+if __name__ == "__main__":
+    args = [float(sys.argv[1])] if len(sys.argv) > 1 else []
+    args += [int(a) for a in sys.argv[2:3]]
+    run(*args)
@@ -0,0 +1,97 @@
+"""
+🎨 UI/UX quality gate benchmark
+วัดเวลา UIUXQualityAgent.auto_fix_and_retry (5 iterations แบบ QualityGateSystem.validate_app)
+บนหน้าเว็บจำลองขนาดใกล้เคียง app ที่ generate จริง เทียบกับแบบเดิมที่
+- analyzer แต่ละตัว (visual, ux, responsive, performance, strengths, auto-fix) parse HTML เอง
+- ทุก iteration serialize HTML ที่แก้แล้วและ parse ใหม่ทั้งหมด (รวม cssutils)
+แบบเดิมจำลองด้วย analyzer ชุดเดียวกันแต่สร้าง QualityDocument ใหม่ทุกครั้ง และตรวจว่าผลลัพธ์ตรงกัน
+
+Usage: python benchmarks/uiux_quality_benchmark.py [sections] [rounds]
+"""
+
+import asyncio
+import contextlib
+import io
+import sys
+import time
+from dataclasses import asdict
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ui_ux_quality_agent import QualityDocument, UIUXQualityAgent  # noqa: E402
+
+ITERATIONS = 5
+
+
+def generate_page(sections: int):
+    body = []
+    css = ["body { font-family: Inter, sans-serif; color: #222; background: #fafafa; }"]
+    for i in range(sections):
+        body.append(f"""
+        <section class="block-{i}">
+            <h2>Section {i}</h2>
+            <p>Generated paragraph {i} with <a href="/p/{i}">a link</a> and <span>inline text</span>.</p>
+            <img src="/img/photo_{i}.png">
+            <div class="card"><div class="card-body"><p>Card {i}</p><button class="btn">Open</button></div></div>
+            <form><input type="text" name="q{i}"><label>Query</label><button type="submit">Go</button></form>
+            <div></div>
+        </section>""")
+        css.append(f".block-{i} {{ margin: {i % 24}px; padding: {i % 17}px; color: #{i % 4096:03x}; }}")
+        css.append(f".block-{i} h2 {{ font-size: {12 + i % 12}px; width: {200 + i}px; }}")
+    html = f"<!DOCTYPE html><html><head><title>App</title></head><body>{''.join(body)}</body></html>"
+    return html, "\n".join(css)
+
+
+async def legacy_auto_fix(agent: UIUXQualityAgent, html: str, css: str):
+    """ลำดับงานแบบเดิม: parse ใหม่ต่อ analyzer และต่อ iteration"""
+    for _ in range(ITERATIONS):
+        issues = []
+        issues += await agent.visual_analyzer.analyze_visual_quality(QualityDocument(html, css))
+        issues += await agent.ux_validator.validate_ux_patterns(QualityDocument(html, css))
+        issues += await agent.responsive_analyzer.analyze_responsive_design(QualityDocument(html, css))
+        issues += await agent.performance_analyzer.analyze_performance(QualityDocument(html, css))
+        score = agent._calculate_quality_score(issues)
+        agent._identify_strengths(QualityDocument(html, css), issues)
+        if agent._meets_quality_standards(issues, score):
+            break
+        doc = QualityDocument(html, css)
+        if not await agent.auto_fix_generator.generate_fixes(issues, doc):
+            break
+        html, css = doc.html, doc.css
+    return [asdict(issue) for issue in issues], html, css
+
+
+async def current_auto_fix(agent: UIUXQualityAgent, html: str, css: str):
+    report, code = await agent.auto_fix_and_retry(html, css, max_iterations=ITERATIONS)
+    return [asdict(issue) for issue in report.issues], code['html'], code['css']
+
+
+async def timed(func, agent, html, css, rounds: int):
+    started_at = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(rounds):
+            result = await func(agent, html, css)
+    return result, (time.perf_counter() - started_at) / rounds
+
+
+async def main(sections: int, rounds: int):
+    html, css = generate_page(sections)
+    print(f"📄 {sections} sections: HTML {len(html) / 1024:.0f}KB, CSS {len(css) / 1024:.0f}KB, "
+          f"up to {ITERATIONS} iterations")
+    agent = UIUXQualityAgent()
+
+    legacy_result, legacy = await timed(legacy_auto_fix, agent, html, css, rounds)
+    print(f"   parse per analyzer:  {legacy * 1000:8.1f}ms / app")
+    current_result, current = await timed(current_auto_fix, agent, html, css, rounds)
+    print(f"   QualityDocument:     {current * 1000:8.1f}ms / app")
+    print(f"   speedup: {legacy / current:.1f}x  identical={legacy_result == current_result}")
+
+
+def run(sections: int = 60, rounds: int = 3):
+    asyncio.run(main(sections, rounds))
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    run(*args)
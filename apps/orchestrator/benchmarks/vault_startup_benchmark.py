@@ -0,0 +1,91 @@
+"""
+🔐 Vault startup benchmark
+วัดเวลา cold start ของ SecureVault (ตอน container restart) เทียบกับแบบเดิมที่สร้าง RSA-4096 ใหม่
+และรัน PBKDF2 ทุกครั้งที่สร้าง instance
+- restart: process ใหม่เปิด vault เดิม (PBKDF2 1 ครั้ง, ไม่แตะ RSA)
+- warm: instance ที่สองใน process เดียวกัน (ใช้ derived key ที่ cache ไว้)
+- RSA: ครั้งแรกที่ใช้ asymmetric key (สร้าง + บันทึก) เทียบกับโหลดจาก keys_path
+
+Usage: python benchmarks/vault_startup_benchmark.py [restarts]
+"""
+
+import logging
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ORCHESTRATOR_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ORCHESTRATOR_DIR))
+
+from cryptography.hazmat.primitives.asymmetric import rsa  # noqa: E402
+
+from secure_vault import KDF_ITERATIONS, VAULT_KDF_SALT, SecureVault, derive_key  # noqa: E402
+
+MASTER_PASSWORD = "BenchMasterPassword123!"
+
+RESTART_SNIPPET = """
+import logging, sys, time
+sys.path.insert(0, {orchestrator!r})
+logging.disable(logging.CRITICAL)
+from secure_vault import SecureVault
+started_at = time.perf_counter()
+SecureVault(vault_path={vault_path!r}, master_password={password!r})
+print(time.perf_counter() - started_at)
+"""
+
+
+def timed(func, *args, **kwargs):
+    started_at = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - started_at
+
+
+def legacy_startup_cost() -> float:
+    """ต้นทุนที่ __init__ แบบเดิมจ่ายทุกครั้ง: PBKDF2 ที่ไม่ cache + สร้าง RSA-4096"""
+    _, kdf = timed(derive_key, MASTER_PASSWORD, b"legacy_" + VAULT_KDF_SALT)
+    _, keygen = timed(rsa.generate_private_key, public_exponent=65537, key_size=4096)
+    print(f"   PBKDF2 ({KDF_ITERATIONS:,} iterations): {kdf * 1000:8.1f}ms")
+    print(f"   RSA-4096 keygen:             {keygen * 1000:8.1f}ms")
+    return kdf + keygen
+
+
+def restart(vault_path: str) -> float:
+    snippet = RESTART_SNIPPET.format(orchestrator=str(ORCHESTRATOR_DIR), vault_path=vault_path,
+                                     password=MASTER_PASSWORD)
+    output = subprocess.run([sys.executable, "-c", snippet], capture_output=True, text=True, check=True)
+    return float(output.stdout.strip().splitlines()[-1])
+
+
+def run(restarts: int = 3):
+    logging.disable(logging.CRITICAL)
+    vault_path = str(Path(tempfile.mkdtemp()) / "secure_vault")
+
+    print("🐢 Old startup (every instantiation)")
+    legacy = legacy_startup_cost()
+    print(f"   total:                       {legacy * 1000:8.1f}ms")
+
+    print("🚀 New startup")
+    vault, first = timed(SecureVault, vault_path=vault_path, master_password=MASTER_PASSWORD)
+    print(f"   first start (new vault):     {first * 1000:8.1f}ms")
+    _, warm = timed(SecureVault, vault_path=vault_path, master_password=MASTER_PASSWORD)
+    print(f"   warm (same process):         {warm * 1000:8.1f}ms")
+
+    _, generated = timed(lambda: vault.public_key)
+    print(f"   first RSA use (generate):    {generated * 1000:8.1f}ms")
+
+    restart_times = [restart(vault_path) for _ in range(restarts)]
+    cold = min(restart_times)
+    print(f"   restart (new process, best of {restarts}): {cold * 1000:8.1f}ms")
+
+    reopened = SecureVault(vault_path=vault_path, master_password=MASTER_PASSWORD)
+    _, loaded = timed(lambda: reopened.public_key)
+    print(f"   first RSA use (load):        {loaded * 1000:8.1f}ms")
+
+    print(f"   restart speedup vs old startup: {legacy / cold:.1f}x")
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:2]]
+    run(*args)
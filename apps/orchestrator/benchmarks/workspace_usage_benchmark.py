@@ -0,0 +1,84 @@
+"""
+📊 Workspace usage benchmark
+สร้าง workspace ของ tenant ขนาดใหญ่ (ค่าเริ่มต้น 100 apps × 200 ไฟล์) แล้ววัดเวลาโหลดข้อมูล dashboard
+(list_apps + get_workspace_stats) เทียบแบบเดิม:
+- เดิม: os.walk + getsize ทั้ง workspace และเปิด app_manifest.json ทุก app ทุกครั้งที่โหลด
+- ใหม่: อ่านจาก index (workspace_apps / workspace_usage) ที่ create_app / write_file / delete_app อัปเดต
+และตรวจว่าขนาดรวม / จำนวน app ตรงกัน รวมถึงเวลา reconcile_usage (ตัวแก้ drift เบื้องหลัง)
+
+Usage: python benchmarks/workspace_usage_benchmark.py [apps] [files_per_app]
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def legacy_dashboard(workspace):
+    """list_apps + get_workspace_stats แบบเดิม"""
+    total_size = 0
+    for root, dirs, files in os.walk(workspace.user_workspace):
+        for file in files:
+            file_path = os.path.join(root, file)
+            if os.path.exists(file_path):
+                total_size += os.path.getsize(file_path)
+    for _ in range(2):  # dashboard() calls list_apps, then get_workspace_stats calls it again
+        apps = []
+        for app_dir in workspace.apps_dir.iterdir():
+            if app_dir.is_dir() and (app_dir / "app_manifest.json").exists():
+                with open(app_dir / "app_manifest.json") as f:
+                    apps.append(json.load(f))
+    return total_size / (1024 * 1024), len(apps)
+
+
+def current_dashboard(workspace):
+    apps = workspace.list_apps()
+    stats = workspace.get_workspace_stats()
+    return stats['total_size_mb'], len(apps)
+
+
+def timed(func, *args, rounds: int = 5):
+    started_at = time.perf_counter()
+    for _ in range(rounds):
+        result = func(*args)
+    return result, (time.perf_counter() - started_at) / rounds
+
+
+def run(apps: int = 100, files_per_app: int = 200):
+    workdir = Path(tempfile.mkdtemp())
+    os.chdir(workdir)  # the platform module creates its databases in the working directory
+    os.environ['WORKSPACE_RECONCILE_INTERVAL'] = '0'
+    from multi_user_platform import UserWorkspace  # noqa: E402
+
+    workspace = UserWorkspace("tenant", str(workdir / "workspaces"))
+    started_at = time.perf_counter()
+    for i in range(apps):
+        app_path = workspace.create_app(f"app {i}")
+        for n in range(files_per_app):
+            workspace.write_file(app_path, f"src/page_{n}.html", f"<p>{i}-{n}</p>\n" * (n % 40 + 1))
+    print(f"📂 {apps} apps × {files_per_app} files = {apps * files_per_app:,} files "
+          f"(written through the index in {time.perf_counter() - started_at:.1f}s)")
+
+    legacy_result, legacy = timed(legacy_dashboard, workspace)
+    print(f"   os.walk + manifests: {legacy * 1000:8.1f}ms / dashboard load")
+    current_result, current = timed(current_dashboard, workspace)
+    print(f"   usage index:         {current * 1000:8.1f}ms / dashboard load")
+    identical = abs(legacy_result[0] - current_result[0]) < 1e-9 and legacy_result[1] == current_result[1]
+    print(f"   speedup: {legacy / current:.0f}x  identical={identical}")
+
+    (workspace.user_workspace / "untracked.bin").write_bytes(b"0" * 4096)
+    drift, reconcile = timed(workspace.reconcile_usage, rounds=1)
+    print(f"   reconcile_usage:     {reconcile * 1000:8.1f}ms (drift corrected: {drift['drift_bytes']:+,} bytes)")
+
+    shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    run(*args)
@@ -1,15 +1,24 @@
 # apps/orchestrator/bug_guard.py
 from fastapi import APIRouter, Body
+from functools import lru_cache
 from pathlib import Path
-import os, shutil, time
+import os, time
+
+from snapshot_store import SnapshotStore
 
 router = APIRouter()
 WEB_ROOT = Path(os.getenv("WEB_ROOT", "/usr/share/nginx/html/app")).resolve()
 BK_ROOT = Path(os.getenv("BACKUP_ROOT", "/usr/share/nginx/html/_backups")).resolve()
+# Content store and rollback trees; keep them on the same filesystem as WEB_ROOT so files are hardlinked
+SNAPSHOT_ROOT = Path(os.getenv("SNAPSHOT_ROOT", str(BK_ROOT.parent/"_snapshots"))).resolve()
+RELEASE_ROOT = Path(os.getenv("RELEASE_ROOT", str(WEB_ROOT.parent/"_releases"))).resolve()
 
 def _proj(slug): return WEB_ROOT/slug
 def _bk_dir(slug): return BK_ROOT/slug
 
+@lru_cache(maxsize=None)
+def _store(): return SnapshotStore(str(SNAPSHOT_ROOT))
+
 @router.post("/bug/backup")
 def backup(body:dict=Body(...)):
     slug = (body.get("slug") or "").strip()
@@ -19,7 +28,9 @@ def backup(body:dict=Body(...)):
     dst = _bk_dir(slug); dst.mkdir(parents=True, exist_ok=True)
     tag = time.strftime("%Y%m%d-%H%M%S")
     out = dst/f"{slug}-{tag}"
-    shutil.copytree(src, out)
+    # Only content the store has not seen is copied; the backup itself is a hardlink tree
+    store = _store()
+    store.materialize(store.snapshot(src, exclude=()), out)
     return {"ok": True, "backup_path": str(out)}
 
 @router.post("/bug/rollback")
@@ -29,7 +40,7 @@ def rollback(body:dict=Body(...)):
     if not slug or not to: return {"ok": False, "error": "slug/backup_path required"}
     src = Path(to)
     if not src.exists(): return {"ok": False, "error": "backup not found"}
-    dst = _proj(slug)
-    if dst.exists(): shutil.rmtree(dst)
-    shutil.copytree(src, dst)
+    # Rebuilt beside the live project and swapped in with one rename; the site is never missing
+    store = _store()
+    store.checkout(store.snapshot(src, exclude=()), _proj(slug), RELEASE_ROOT/slug)
     return {"ok": True}
@@ -12,12 +12,13 @@ from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass, asdict
-import sqlite3
 import hashlib
 from collections import defaultdict, Counter
 import re
 import time
 
+from sqlite_pool import get_pool
+
 @dataclass
 class UserInteraction:
     """Records user interaction data"""
@@ -739,11 +740,8 @@ class IntelligentLearningSystem:
 
     def _init_database(self):
         """Initialize SQLite database for storing learning data"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Create tables
-        cursor.execute('''
+        self.db = get_pool(self.db_path, [
+        '''
         CREATE TABLE IF NOT EXISTS user_interactions (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             user_id TEXT NOT NULL,
@@ -753,9 +751,8 @@ class IntelligentLearningSystem:
             data TEXT NOT NULL,
             context TEXT
         )
-        ''')
-        
-        cursor.execute('''
+        ''',
+        '''
         CREATE TABLE IF NOT EXISTS user_profiles (
             user_id TEXT PRIMARY KEY,
             preferences TEXT NOT NULL,
@@ -765,9 +762,8 @@ class IntelligentLearningSystem:
             learning_weights TEXT NOT NULL,
             last_updated DATETIME NOT NULL
         )
-        ''')
-        
-        cursor.execute('''
+        ''',
+        '''
         CREATE TABLE IF NOT EXISTS learning_insights (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             insight_type TEXT NOT NULL,
@@ -777,10 +773,9 @@ class IntelligentLearningSystem:
             evidence TEXT NOT NULL,
             created_at DATETIME NOT NULL
         )
-        ''')
-        
-        conn.commit()
-        conn.close()
+        ''',
+        "CREATE INDEX IF NOT EXISTS idx_user_interactions_user ON user_interactions (user_id, timestamp)"
+        ])
 
     async def record_interaction(self, user_id: str, session_id: str, interaction_type: str, 
                                data: Dict[str, Any], context: Dict[str, Any] = None):
@@ -795,10 +790,7 @@ class IntelligentLearningSystem:
         )
         
         # Store in database
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
+        await self.db.aio.execute('''
         INSERT INTO user_interactions (user_id, session_id, interaction_type, timestamp, data, context)
         VALUES (?, ?, ?, ?, ?, ?)
         ''', (
@@ -810,9 +802,6 @@ class IntelligentLearningSystem:
             json.dumps(interaction.context)
         ))
         
-        conn.commit()
-        conn.close()
-        
         # Update user profile asynchronously
         await self._update_user_profile(user_id)
 
@@ -849,10 +838,7 @@ class IntelligentLearningSystem:
 
     async def _load_user_interactions(self, user_id: str, limit: int = 100) -> List[UserInteraction]:
         """Load user interactions from database"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
+        rows = await self.db.aio.fetchall('''
         SELECT user_id, session_id, interaction_type, timestamp, data, context
         FROM user_interactions
         WHERE user_id = ?
@@ -860,9 +846,6 @@ class IntelligentLearningSystem:
         LIMIT ?
         ''', (user_id, limit))
         
-        rows = cursor.fetchall()
-        conn.close()
-        
         interactions = []
         for row in rows:
             interactions.append(UserInteraction(
@@ -877,11 +860,8 @@ class IntelligentLearningSystem:
         return interactions
 
     async def _save_user_profile(self, profile: UserProfile):
-        """Save user profile to database"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
+        """Save user profile to database (write-behind; profiles live in self.user_profiles)"""
+        self.db.defer('''
         INSERT OR REPLACE INTO user_profiles 
         (user_id, preferences, coding_patterns, app_history, interaction_stats, learning_weights, last_updated)
         VALUES (?, ?, ?, ?, ?, ?, ?)
@@ -894,9 +874,6 @@ class IntelligentLearningSystem:
             json.dumps(profile.learning_weights),
             profile.last_updated.isoformat()
         ))
-        
-        conn.commit()
-        conn.close()
 
     async def get_personalized_recommendations(self, user_id: str, context: Dict[str, Any] = None) -> List[Dict[str, Any]]:
         """Get personalized recommendations for user"""
@@ -0,0 +1,268 @@
+"""
+Job Queue
+=========
+Persistent background jobs for the web front-ends (quality_gate_web).
+
+Jobs are rows in SQLite keyed by ``job_id``, so status lookups are a primary
+key read and queued work survives a restart.  A fixed number of worker
+coroutines on one event loop (owned by a single background thread) take jobs
+off the queue; each job's handler runs on a thread pool of the same size,
+so a handler that computes without awaiting does not hold up the other
+workers.  When too many jobs are waiting, ``submit`` raises ``QueueFull``
+instead of accepting more.
+"""
+
+import asyncio
+import inspect
+import json
+import logging
+import math
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional, Union
+
+from sqlite_pool import get_pool
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS jobs (
+        job_id TEXT PRIMARY KEY,
+        status TEXT NOT NULL,
+        progress INTEGER NOT NULL DEFAULT 0,
+        current_step TEXT,
+        payload TEXT NOT NULL,
+        result TEXT,
+        error TEXT,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        created_at TEXT NOT NULL,
+        started_at TEXT,
+        completed_at TEXT,
+        duration REAL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, created_at)",
+]
+
+ACTIVE_STATUSES = ('queued', 'processing')
+
+# Progress callback handed to job handlers: progress(percent, step)
+ProgressCallback = Callable[[int, str], None]
+JobHandler = Callable[[Dict[str, Any], ProgressCallback], Union[Awaitable[Any], Any]]
+
+
+class QueueFull(Exception):
+    """Raised by ``JobQueue.submit`` when ``max_pending`` jobs are already waiting"""
+
+    def __init__(self, pending: int, retry_after: int):
+        super().__init__(f"Job queue is full ({pending} jobs waiting)")
+        self.pending = pending
+        self.retry_after = retry_after
+
+
+class JobQueue:
+    """SQLite-backed job queue drained by ``workers`` coroutines on a shared event loop
+
+    ``handler(payload, progress)`` is called for each job on one of ``workers``
+    handler threads; a coroutine handler runs on that thread's own event loop.
+    Its return value must be JSON-serializable and is stored as the job result.  Jobs that were
+    queued or running when the process stopped are picked up again on start,
+    at most ``max_attempts`` times.
+    """
+
+    def __init__(self, db_path: str, handler: JobHandler, workers: int = 2, max_pending: int = 100,
+                 max_attempts: int = 3, retention_days: int = 7):
+        self.db = get_pool(db_path, SCHEMA)
+        self.handler = handler
+        self.workers = max(1, workers)
+        self.max_pending = max_pending
+        self.max_attempts = max_attempts
+        self.retention_days = retention_days
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._thread: Optional[threading.Thread] = None
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="job-handler")
+        self._handler_state = threading.local()
+        self._started = threading.Event()
+        self._start_lock = threading.Lock()
+        self._submit_lock = threading.Lock()
+
+    # ------------------------------------------------------------------ lifecycle
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        self.start()
+        return self._loop
+
+    def start(self):
+        """Start the event loop thread and workers (idempotent)"""
+        if self._thread is None:
+            with self._start_lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run_loop, daemon=True, name="job-queue")
+                    self._thread.start()
+        self._started.wait()
+
+    def _run_loop(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._queue = asyncio.Queue()
+        for job_id in self._recover():
+            self._queue.put_nowait(job_id)
+        for i in range(self.workers):
+            self._loop.create_task(self._worker(), name=f"job-worker-{i}")
+        self._loop.call_soon(self._started.set)
+        self._loop.run_forever()
+
+    def _recover(self):
+        """Requeue jobs interrupted by a restart and drop old finished ones; returns queued ids in order"""
+        cutoff = (datetime.now() - timedelta(days=self.retention_days)).isoformat()
+        with self.db.transaction() as conn:
+            conn.execute("DELETE FROM jobs WHERE status IN ('completed', 'failed') AND created_at < ?", (cutoff,))
+            conn.execute("""
+                UPDATE jobs SET status = 'failed', error = 'Interrupted too many times', completed_at = ?
+                WHERE status = 'processing' AND attempts >= ?
+            """, (datetime.now().isoformat(), self.max_attempts))
+            conn.execute("UPDATE jobs SET status = 'queued' WHERE status = 'processing'")
+        job_ids = [job_id for (job_id,) in self.db.fetchall(
+            "SELECT job_id FROM jobs WHERE status = 'queued' ORDER BY created_at")]
+        if job_ids:
+            logger.info(f"Resuming {len(job_ids)} queued jobs")
+        return job_ids
+
+    # ------------------------------------------------------------------ submitting
+
+    def submit(self, payload: Dict[str, Any]) -> str:
+        """Persist a job and hand it to the workers; raises QueueFull when the backlog is full"""
+        self.start()
+        with self._submit_lock:
+            pending = self.pending_count()
+            if pending >= self.max_pending:
+                raise QueueFull(pending, self.retry_after(pending))
+
+            job_id = f"job_{uuid.uuid4().hex}"
+            self.db.execute("""
+                INSERT INTO jobs (job_id, status, progress, current_step, payload, created_at)
+                VALUES (?, 'queued', 0, 'Waiting in queue...', ?, ?)
+            """, (job_id, json.dumps(payload), datetime.now().isoformat()))
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, job_id)
+        return job_id
+
+    def run(self, coro: Awaitable[Any], timeout: Optional[float] = None) -> Any:
+        """Run a coroutine on the shared loop from any other thread and wait for its result
+
+        Only for short coroutines that await: the loop also schedules every job.
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(timeout)
+
+    # ------------------------------------------------------------------ status
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        row = self.db.fetchone("""
+            SELECT job_id, status, progress, current_step, payload, result, error,
+                   created_at, started_at, completed_at
+            FROM jobs WHERE job_id = ?
+        """, (job_id,))
+        if not row:
+            return None
+
+        job = json.loads(row[4])
+        job.update({
+            'job_id': row[0],
+            'status': row[1],
+            'progress': row[2],
+            'current_step': row[3],
+            'created_at': row[7],
+        })
+        if row[8]:
+            job['started_at'] = row[8]
+        if row[5] is not None:
+            job['result'] = json.loads(row[5])
+        if row[6] is not None:
+            job['error'] = row[6]
+        if row[9]:
+            job['completed_at'] = row[9]
+        return job
+
+    def pending_count(self) -> int:
+        return self.db.fetchvalue("SELECT COUNT(*) FROM jobs WHERE status = 'queued'", default=0)
+
+    def active_count(self) -> int:
+        return self.db.fetchvalue(
+            "SELECT COUNT(*) FROM jobs WHERE status IN (?, ?)", ACTIVE_STATUSES, default=0)
+
+    def retry_after(self, pending: Optional[int] = None) -> int:
+        """Seconds until the backlog has room, estimated from recent job durations"""
+        if pending is None:
+            pending = self.pending_count()
+        average = self.db.fetchvalue("""
+            SELECT AVG(duration) FROM (
+                SELECT duration FROM jobs WHERE status = 'completed' AND duration IS NOT NULL
+                ORDER BY completed_at DESC LIMIT 20
+            )
+        """) or 30.0
+        backlog = max(1, pending - self.max_pending + 1)
+        return max(1, math.ceil(average * backlog / self.workers))
+
+    # ------------------------------------------------------------------ workers
+
+    async def _worker(self):
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._process(job_id)
+            except Exception as e:
+                logger.error(f"Job {job_id} could not be processed: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _process(self, job_id: str):
+        cursor = self.db.execute("""
+            UPDATE jobs SET status = 'processing', progress = 0, current_step = 'Starting...',
+                            attempts = attempts + 1, started_at = ?
+            WHERE job_id = ? AND status = 'queued'
+        """, (datetime.now().isoformat(), job_id))
+        if cursor.rowcount == 0:
+            return  # already picked up (duplicate enqueue after recovery)
+        payload = json.loads(self.db.fetchvalue("SELECT payload FROM jobs WHERE job_id = ?", (job_id,)))
+
+        def progress(percent: int, step: str):
+            # Batched; the status guard keeps a late flush from rewinding a finished job
+            self.db.defer("UPDATE jobs SET progress = ?, current_step = ? WHERE job_id = ? AND status = 'processing'",
+                          (int(percent), step, job_id))
+
+        started_at = time.perf_counter()
+        try:
+            result = await self._run_handler(payload, progress)
+        except Exception as e:
+            logger.error(f"Job {job_id} failed: {e}")
+            self.db.execute("""
+                UPDATE jobs SET status = 'failed', error = ?, completed_at = ?, duration = ?
+                WHERE job_id = ?
+            """, (str(e), datetime.now().isoformat(), time.perf_counter() - started_at, job_id))
+            return
+
+        self.db.execute("""
+            UPDATE jobs SET status = 'completed', progress = 100, current_step = 'Completed',
+                            result = ?, completed_at = ?, duration = ?
+            WHERE job_id = ?
+        """, (json.dumps(result, default=str), datetime.now().isoformat(), time.perf_counter() - started_at, job_id))
+
+    async def _run_handler(self, payload: Dict[str, Any], progress: ProgressCallback) -> Any:
+        return await self._loop.run_in_executor(self._executor, self._call_handler, payload, progress)
+
+    def _call_handler(self, payload: Dict[str, Any], progress: ProgressCallback) -> Any:
+        """Run the handler on a handler thread; coroutines use the thread's own (reused) event loop"""
+        result = self.handler(payload, progress)
+        if inspect.isawaitable(result):
+            loop = getattr(self._handler_state, 'loop', None)
+            if loop is None:
+                loop = self._handler_state.loop = asyncio.new_event_loop()
+                asyncio.set_event_loop(loop)
+            result = loop.run_until_complete(result)
+        return result
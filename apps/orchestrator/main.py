@@ -1,4 +1,4 @@
-import os, json
+import os, json, asyncio
 from pathlib import Path
 from datetime import datetime
 from typing import List, Dict, Any, Optional
@@ -25,15 +25,20 @@ from agents.requirement_analyzer import RequirementAnalyzer
 from agents.supervisor_agent import supervisor_agent
 from agents.conversational_flow import conversation_flow
 from agents.ai_mobile_app_generator import initialize_ai_mobile_generator
+from agents.llm_gateway import llm_gateway
+from agents.plan_stream import is_complete_plan, write_plan_stream
+from agents.shared_state import state_backend
+from agents.session_store import spill_all_stores
 
 WEBROOT = Path(os.getenv("WEBROOT", "/app/workspace/generated-app/apps/web"))
 WEBROOT.mkdir(parents=True, exist_ok=True)
 
 MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
 API_KEY = os.getenv("OPENAI_API_KEY")
-if not API_KEY:
+if not API_KEY and llm_gateway.backend.name != "stub":
     raise RuntimeError("OPENAI_API_KEY is required (no fallback / no templates).")
-client = OpenAI(api_key=API_KEY)
+# client แบบ sync ใช้เฉพาะ agent เดิมที่ยังเรียก SDK ตรง ๆ (รันผ่าน llm_gateway.run_blocking)
+client = OpenAI(api_key=API_KEY or "stub")
 
 # Initialize chat manager with our new system
 initialize_chat_manager(client)
@@ -69,9 +74,17 @@ async def health_check():
             "conversational_ai": "active",
             "chat_manager": "initialized",
             "multi_agent_system": "ready"
-        }
+        },
+        "state_backend": state_backend.name,
+        "pid": os.getpid()
     }
 
+@app.on_event("shutdown")
+async def shutdown_state():
+    """หยุด relay ของ activity monitor, commit กิจกรรมที่ยังค้างลง shared state และ spill session ลงดิสก์"""
+    await activity_monitor.stop()
+    await asyncio.to_thread(spill_all_stores)
+
 @app.websocket("/ws/activity")
 async def websocket_activity(websocket: WebSocket):
     """WebSocket endpoint สำหรับ real-time activity monitoring"""
@@ -83,6 +96,8 @@ async def websocket_activity(websocket: WebSocket):
             if data == "ping":
                 await websocket.send_text("pong")
     except WebSocketDisconnect:
+        pass
+    finally:
         activity_monitor.disconnect_websocket(websocket)
 
 class ChatReq(BaseModel):
@@ -149,8 +164,8 @@ SYSTEM = """
 - NO explanations, NO markdown, NO code fences - JSON เท่านั้น!
 """
 
-def _ask_ai_to_plan(user_msg: str) -> Dict[str, Any]:
-    rsp = client.chat.completions.create(
+def _plan_request(user_msg: str) -> Dict[str, Any]:
+    return dict(
         model=MODEL,
         temperature=0.3,
         response_format={"type":"json_object"},
@@ -158,8 +173,16 @@ def _ask_ai_to_plan(user_msg: str) -> Dict[str, Any]:
             {"role":"system", "content": SYSTEM},
             {"role":"user", "content": user_msg}
         ],
+        cache=True,
+        # แผนที่ไม่ผ่านการตรวจของ _ask_ai_to_plan ไม่ถูกเก็บ (ไม่อย่างนั้น prompt เดิมจะได้ 500/422 ซ้ำจนหมด TTL)
+        validate=is_complete_plan,
     )
-    txt = rsp.choices[0].message.content
+
+async def _ask_ai_to_plan(user_msg: str) -> Dict[str, Any]:
+    try:
+        txt = await llm_gateway.complete(**_plan_request(user_msg))
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="AI generation timed out")
     try:
         data = json.loads(txt)
     except Exception as e:
@@ -169,14 +192,14 @@ def _ask_ai_to_plan(user_msg: str) -> Dict[str, Any]:
     if "slug" not in data or "files" not in data or not isinstance(data["files"], list):
         raise HTTPException(status_code=422, detail="AI JSON missing required fields")
 
-    # บังคับรูปแบบ slug
+    # บังคับรูปแบบ slug (คำตอบจาก cache อาจมี slug ที่เคยใช้แล้ว - ห้ามเขียนทับโปรเจคเดิม)
     slug = data["slug"].strip()
-    if not slug or not slug.startswith("myapp-"):
+    if not slug or not slug.startswith("myapp-") or (WEBROOT / slug).exists():
         slug = "myapp-" + datetime.now().strftime("%Y%m%d-%H%M%S")
         data["slug"] = slug
 
     # บังคับมี index.html + styles.css
-    paths = { (f.get("path") or "").lower() for f in data["files"] if isinstance(f, dict) }
+    paths = { (f.get("path") or "").lstrip("/").strip().lower() for f in data["files"] if isinstance(f, dict) }
     if "index.html" not in paths or "styles.css" not in paths:
         raise HTTPException(status_code=422, detail="AI must provide at least index.html and styles.css")
 
@@ -204,7 +227,7 @@ def _write_files(plan: Dict[str, Any]) -> List[str]:
 
 @app.get("/health")
 def health():
-    return {"ok": True, "webroot": str(WEBROOT), "model": MODEL}
+    return {"ok": True, "webroot": str(WEBROOT), "model": MODEL, "llm_gateway": llm_gateway.get_stats()}
 
 class ChatRequest(BaseModel):
     message: str = Field(min_length=1)
@@ -225,7 +248,7 @@ async def chat_with_analyzer(req: ChatRequest):
     
     # Use requirement analyzer
     analyzer = requirement_analyzer
-    analysis = analyzer.analyze_initial_request(req.message)
+    analysis = await llm_gateway.run_blocking(analyzer.analyze_initial_request, req.message)
     
     if analysis.needs_clarification:
         log_agent_action("RequirementAnalyzer", "Asking for clarification")
@@ -236,11 +259,13 @@ async def chat_with_analyzer(req: ChatRequest):
     
     # If enough info, proceed with conversational agent
     design_agent = conversational_agent
-    conv_analysis = design_agent.analyze_request(req.message)
+    conv_analysis = await llm_gateway.run_blocking(design_agent.analyze_request, req.message)
     
     if conv_analysis.get("needs_clarification", False):
         questions = conv_analysis.get("conversational_questions", [])
-        response_text = questions[0] if questions else design_agent.generate_conversational_response(req.message)
+        response_text = questions[0] if questions else await llm_gateway.run_blocking(
+            design_agent.generate_conversational_response, req.message
+        )
         
         log_agent_action("ConversationalAgent", "Generated response")
         return ChatResponse(
@@ -250,7 +275,7 @@ async def chat_with_analyzer(req: ChatRequest):
     
     # Ready to generate code
     log_agent_action("CodeGeneration", "Starting code generation")
-    plan = _ask_ai_to_plan(req.message.strip())
+    plan = await _ask_ai_to_plan(req.message.strip())
     files = _write_files(plan)
     slug = plan["slug"]
     web_url = f"/app/{slug}/index.html"
@@ -265,7 +290,7 @@ async def chat_with_analyzer(req: ChatRequest):
     )
 
 @app.post("/chat/ai", response_model=ChatResp)
-def chat_ai(req: ChatReq):
+async def chat_ai(req: ChatReq):
     """Enhanced web generation with real-time progress tracking"""
     
     # Log start of generation
@@ -273,7 +298,7 @@ def chat_ai(req: ChatReq):
     
     # Step 1: AI Planning
     log_agent_action("WebGenerator", "📝 AI is analyzing requirements...")
-    plan = _ask_ai_to_plan(req.message.strip())
+    plan = await _ask_ai_to_plan(req.message.strip())
     
     # Log what AI planned
     log_agent_action("WebGenerator", f"🎨 AI planned website: {plan['slug']}")
@@ -328,7 +353,7 @@ async def websocket_chat_endpoint(websocket: WebSocket):
             
             # Send to OpenAI to decide what to do
             try:
-                response = client.chat.completions.create(
+                ai_response = await llm_gateway.complete(
                     model="gpt-4o-mini",
                     messages=[{
                         "role": "system", 
@@ -355,8 +380,7 @@ async def websocket_chat_endpoint(websocket: WebSocket):
                     max_tokens=200,
                     temperature=0.7
                 )
-                
-                ai_response = response.choices[0].message.content.strip()
+                ai_response = ai_response.strip()
                 
                 # Check if AI wants to create website/app
                 if ai_response.startswith("CREATE_WEBSITE:") or ai_response.startswith("CREATE_APP:"):
@@ -398,37 +422,49 @@ async def websocket_chat_endpoint(websocket: WebSocket):
                             "progress": step["progress"]
                         })
                     
-                    plan = _ask_ai_to_plan(project_desc)
-                    
-                    # Detailed file creation with realistic delays
-                    await websocket.send_json({
-                        "type": "status",
-                        "message": f"� สร้างไฟล์โปรเจค {len(plan['files'])} ไฟล์...", 
-                        "status": "creating_files",
-                        "progress": 75
-                    })
-                    
-                    # Show file creation progress
-                    for i, file_info in enumerate(plan["files"]):
-                        filename = file_info.get("path", f"file_{i}")
-                        file_type = filename.split('.')[-1] if '.' in filename else "file"
-                        
-                        # Different icons for different file types
-                        icon_map = {
-                            "html": "🌐", "css": "🎨", "js": "⚡", 
-                            "py": "🐍", "json": "📋", "md": "📝"
-                        }
-                        icon = icon_map.get(file_type, "📄")
-                        
-                        await websocket.send_json({
-                            "type": "status",
-                            "message": f"{icon} สร้าง {filename}...",
-                            "status": "writing_file", 
-                            "progress": 75 + (i * 15 // len(plan["files"]))
-                        })
-                        
-                    files = _write_files(plan)
-                    slug = plan["slug"]
+                    # Stream the plan: each file is written as soon as its JSON object closes
+                    icon_map = {
+                        "html": "🌐", "css": "🎨", "js": "⚡", 
+                        "py": "🐍", "json": "📋", "md": "📝"
+                    }
+                    slug, written_paths = None, set()
+                    async for event in write_plan_stream(llm_gateway.stream(**_plan_request(project_desc)), WEBROOT):
+                        if event["event"] == "chunk":
+                            await websocket.send_json({
+                                "type": "file_chunk",
+                                "path": event["path"],
+                                "content": event["text"]
+                            })
+                        elif event["event"] == "file_start":
+                            filename = event["path"]
+                            file_type = filename.split('.')[-1] if '.' in filename else "file"
+                            await websocket.send_json({
+                                "type": "status",
+                                "message": f"{icon_map.get(file_type, '📄')} สร้าง {filename}...",
+                                "status": "writing_file", 
+                                "progress": min(90, 75 + len(written_paths) * 5)
+                            })
+                        elif event["event"] == "file_written":
+                            rel = event["path"].lstrip("/").strip()
+                            written_paths.add(rel.lower())
+                            file_url = f"/app/{event['slug']}/{rel}"
+                            await websocket.send_json({
+                                "type": "file_ready",
+                                "path": event["path"],
+                                "url": file_url
+                            })
+                            if rel.lower() == "index.html":
+                                # Preview can load while the remaining files are still being generated
+                                await websocket.send_json({
+                                    "type": "preview_ready",
+                                    "preview_url": file_url,
+                                    "slug": event["slug"]
+                                })
+                        elif event["event"] == "done":
+                            slug = event["slug"]
+
+                    if "index.html" not in written_paths or "styles.css" not in written_paths:
+                        raise HTTPException(status_code=422, detail="AI must provide at least index.html and styles.css")
                     web_url = f"/app/{slug}/index.html"
                     
                     # Final status
@@ -546,8 +582,6 @@ async def create_instant_preview(user_request: str) -> str:
     
     # ใช้ OpenAI สร้าง HTML จริงๆ
     try:
-        client = OpenAI(api_key=API_KEY)
-        
         prompt = f"""
         สร้างเว็บไซต์ HTML สวยงามตามคำขอ: "{user_request}"
         
@@ -564,14 +598,13 @@ async def create_instant_preview(user_request: str) -> str:
         ตอบเฉพาะโค้ด HTML เท่านั้น:
         """
         
-        response = client.chat.completions.create(
+        html_content = await llm_gateway.complete(
             model=MODEL,
             messages=[{"role": "user", "content": prompt}],
             temperature=0.7,
             max_tokens=2000
         )
-        
-        html_content = response.choices[0].message.content.strip()
+        html_content = html_content.strip()
         
         # ทำความสะอาดโค้ด
         if "```html" in html_content:
@@ -737,9 +770,9 @@ async def enterprise_chat(req: EnterpriseChatReq):
 async def get_workflow_status(workflow_id: str):
     """ดูสถานะการทำงานของ Enterprise Workflow"""
     try:
-        # Get status from supervisor agent
-        if hasattr(supervisor_agent, 'workflow_results') and workflow_id in supervisor_agent.workflow_results:
-            result = supervisor_agent.workflow_results[workflow_id]
+        # Get status from supervisor agent (shared state: ตอบได้จากทุก worker)
+        result = supervisor_agent.get_workflow_result(workflow_id)
+        if result is not None:
             return {
                 "workflow_id": workflow_id,
                 "status": result.get("status", "unknown"),
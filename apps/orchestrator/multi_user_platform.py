@@ -13,15 +13,20 @@ import os
 import shutil
 import sqlite3
 import uuid
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple, Union
 import secrets
 import bcrypt
-from flask import Flask, request, jsonify, session, render_template_string
+from flask import Flask, request, jsonify, session, render_template, redirect
+from jinja2 import DictLoader
 import threading
 import time
-import subprocess
+
+from sqlite_pool import get_pool
+from snapshot_store import SnapshotStore
+from static_host import StaticHost, precompress_tree
 
 # Configure logging
 logging.basicConfig(
@@ -30,6 +35,48 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Per-user app manifests and byte counters, kept current by UserWorkspace writes
+# and corrected by UserWorkspace.reconcile_usage
+WORKSPACE_INDEX_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS workspace_apps (
+        app_path TEXT PRIMARY KEY,
+        user_id TEXT NOT NULL,
+        app_type TEXT,
+        created_at TEXT NOT NULL,
+        manifest TEXT NOT NULL,
+        size_bytes INTEGER NOT NULL DEFAULT 0,
+        file_count INTEGER NOT NULL DEFAULT 0
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS workspace_usage (
+        user_id TEXT PRIMARY KEY,
+        total_bytes INTEGER NOT NULL DEFAULT 0,
+        file_count INTEGER NOT NULL DEFAULT 0,
+        reconciled_at TEXT
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_workspace_apps_user ON workspace_apps (user_id, created_at)"
+]
+
+def _tree_usage(root: str) -> Tuple[int, int]:
+    """(bytes, files) under root"""
+    total_bytes = file_count = 0
+    pending = [root]
+    while pending:
+        try:
+            with os.scandir(pending.pop()) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        pending.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        total_bytes += entry.stat(follow_symlinks=False).st_size
+                        file_count += 1
+        except OSError:
+            continue
+    return total_bytes, file_count
+
 class User:
     """User model for multi-user system"""
     
@@ -65,10 +112,15 @@ class UserWorkspace:
         self.templates_dir = self.user_workspace / "templates"
         self.deployments_dir = self.user_workspace / "deployments"
         self.config_file = self.user_workspace / "workspace_config.json"
+        self.db = get_pool(self.workspace_root / "workspace_index.db", WORKSPACE_INDEX_SCHEMA)
         
         # Create workspace structure
         self._initialize_workspace()
         
+        # First time this workspace is seen by the index: import what is on disk
+        if self.db.fetchone("SELECT 1 FROM workspace_usage WHERE user_id = ?", (self.user_id,)) is None:
+            self.reconcile_usage()
+        
     def _initialize_workspace(self):
         """Initialize user workspace directory structure"""
         try:
@@ -102,6 +154,11 @@ class UserWorkspace:
     def create_app(self, app_name: str, app_type: str = 'web') -> str:
         """Create new app in user workspace"""
         try:
+            max_apps = self._settings().get('max_apps')
+            if max_apps is not None and self.get_workspace_stats()['total_apps'] >= max_apps:
+                logger.warning(f"User {self.user_id} reached the app limit ({max_apps})")
+                return ""
+            
             # Sanitize app name
             safe_app_name = "".join(c for c in app_name if c.isalnum() or c in ('-', '_')).lower()
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
@@ -126,8 +183,11 @@ class UserWorkspace:
                 'status': 'development'
             }
             
+            manifest_text = json.dumps(manifest, indent=2)
             with open(app_path / "app_manifest.json", 'w') as f:
-                json.dump(manifest, f, indent=2)
+                f.write(manifest_text)
+            
+            self._index_app(app_path, manifest, *_tree_usage(str(app_path)))
             
             logger.info(f"📱 Created app '{app_name}' for user {self.user_id}")
             return str(app_path)
@@ -136,40 +196,44 @@ class UserWorkspace:
             logger.error(f"Failed to create app for user {self.user_id}: {e}")
             return ""
     
+    def write_file(self, app_path: str, relative_path: str, content: Union[str, bytes]) -> Path:
+        """Write a file inside an app and update the usage counters"""
+        app_dir = Path(app_path)
+        file_path = app_dir / relative_path
+        if not os.path.abspath(file_path).startswith(os.path.abspath(app_dir) + os.sep):
+            raise ValueError(f"Refusing to write outside the app: {relative_path}")
+        
+        try:
+            previous_size, previous_files = file_path.stat().st_size, 1
+        except FileNotFoundError:
+            previous_size, previous_files = 0, 0
+        
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        if isinstance(content, bytes):
+            file_path.write_bytes(content)
+        else:
+            file_path.write_text(content, encoding='utf-8')
+        
+        self._adjust_usage(str(app_dir), file_path.stat().st_size - previous_size, 1 - previous_files)
+        return file_path
+    
     def list_apps(self) -> List[Dict[str, Any]]:
         """List all apps in user workspace"""
         apps = []
         
         try:
-            if not self.apps_dir.exists():
-                return apps
-                
-            for app_dir in self.apps_dir.iterdir():
-                if app_dir.is_dir():
-                    manifest_file = app_dir / "app_manifest.json"
-                    
-                    if manifest_file.exists():
-                        with open(manifest_file, 'r') as f:
-                            manifest = json.load(f)
-                            manifest['app_path'] = str(app_dir)
-                            apps.append(manifest)
-                    else:
-                        # Create manifest for directories without one
-                        apps.append({
-                            'app_name': app_dir.name,
-                            'app_type': 'web',
-                            'created_at': datetime.fromtimestamp(app_dir.stat().st_ctime).isoformat(),
-                            'user_id': self.user_id,
-                            'app_id': str(uuid.uuid4()),
-                            'version': '1.0.0',
-                            'status': 'legacy',
-                            'app_path': str(app_dir)
-                        })
+            for manifest, app_path in self.db.fetchall("""
+                SELECT manifest, app_path FROM workspace_apps
+                WHERE user_id = ? ORDER BY created_at DESC
+            """, (self.user_id,)):
+                app = json.loads(manifest)
+                app['app_path'] = app_path
+                apps.append(app)
             
         except Exception as e:
             logger.error(f"Failed to list apps for user {self.user_id}: {e}")
             
-        return sorted(apps, key=lambda x: x['created_at'], reverse=True)
+        return apps
     
     def delete_app(self, app_path: str) -> bool:
         """Delete app from user workspace"""
@@ -183,6 +247,7 @@ class UserWorkspace:
             
             if app_dir.exists():
                 shutil.rmtree(app_dir)
+                self._unindex_app(str(app_dir))
                 logger.info(f"🗑️ Deleted app at {app_path}")
                 return True
                 
@@ -192,7 +257,7 @@ class UserWorkspace:
         return False
     
     def get_workspace_stats(self) -> Dict[str, Any]:
-        """Get workspace statistics"""
+        """Get workspace statistics (from the usage index; nothing on disk is read)"""
         stats = {
             'total_apps': 0,
             'total_size_mb': 0,
@@ -202,54 +267,149 @@ class UserWorkspace:
         }
         
         try:
-            if not self.user_workspace.exists():
-                return stats
-            
-            # Calculate total size
-            total_size = 0
-            for root, dirs, files in os.walk(self.user_workspace):
-                for file in files:
-                    file_path = os.path.join(root, file)
-                    if os.path.exists(file_path):
-                        total_size += os.path.getsize(file_path)
-            
-            stats['total_size_mb'] = total_size / (1024 * 1024)
+            total_bytes = self.db.fetchvalue(
+                "SELECT total_bytes FROM workspace_usage WHERE user_id = ?", (self.user_id,), default=0)
+            stats['total_size_mb'] = total_bytes / (1024 * 1024)
             
             # Count apps and types
-            apps = self.list_apps()
-            stats['total_apps'] = len(apps)
-            
             app_types = {}
-            for app in apps:
-                app_type = app.get('app_type', 'unknown')
-                app_types[app_type] = app_types.get(app_type, 0) + 1
+            for app_type, count, latest in self.db.fetchall("""
+                SELECT app_type, COUNT(*), MAX(created_at) FROM workspace_apps
+                WHERE user_id = ? GROUP BY app_type
+            """, (self.user_id,)):
+                app_types[app_type or 'unknown'] = count
+                stats['total_apps'] += count
+                
+                # Last activity
+                if stats['last_activity'] is None or latest > stats['last_activity']:
+                    stats['last_activity'] = latest
             
             stats['app_types'] = app_types
             
-            # Last activity
-            if apps:
-                latest_app = max(apps, key=lambda x: x['created_at'])
-                stats['last_activity'] = latest_app['created_at']
-            
         except Exception as e:
             logger.error(f"Failed to get workspace stats: {e}")
             
         return stats
+    
+    def reconcile_usage(self) -> Dict[str, int]:
+        """Rebuild this user's index from disk, correcting drift from writes made
+        outside ``create_app``/``write_file``/``delete_app``; returns the byte drift"""
+        apps = []
+        if self.apps_dir.exists():
+            for entry in os.scandir(self.apps_dir):
+                if not entry.is_dir(follow_symlinks=False):
+                    continue
+                app_dir = Path(entry.path)
+                manifest_file = app_dir / "app_manifest.json"
+                try:
+                    with open(manifest_file, 'r') as f:
+                        manifest = json.load(f)
+                except (OSError, ValueError):
+                    # Directories without a manifest are listed as legacy apps
+                    manifest = {
+                        'app_name': app_dir.name,
+                        'app_type': 'web',
+                        'created_at': datetime.fromtimestamp(entry.stat().st_ctime).isoformat(),
+                        'user_id': self.user_id,
+                        'app_id': str(uuid.uuid4()),
+                        'version': '1.0.0',
+                        'status': 'legacy'
+                    }
+                apps.append((str(app_dir), manifest, *_tree_usage(str(app_dir))))
+        
+        total_bytes, file_count = _tree_usage(str(self.user_workspace))
+        
+        with self.db.transaction() as conn:
+            previous = conn.execute(
+                "SELECT total_bytes FROM workspace_usage WHERE user_id = ?", (self.user_id,)).fetchone()
+            known = {path: manifest for path, manifest in conn.execute(
+                "SELECT app_path, manifest FROM workspace_apps WHERE user_id = ?", (self.user_id,))}
+            conn.execute("DELETE FROM workspace_apps WHERE user_id = ?", (self.user_id,))
+            conn.executemany("""
+                INSERT INTO workspace_apps (app_path, user_id, app_type, created_at, manifest, size_bytes, file_count)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, [
+                # Keep the stored manifest for legacy apps so their generated app_id stays stable
+                (path, self.user_id, manifest.get('app_type'), manifest.get('created_at', ''),
+                 known[path] if manifest.get('status') == 'legacy' and path in known else json.dumps(manifest),
+                 size, files)
+                for path, manifest, size, files in apps
+            ])
+            conn.execute("""
+                INSERT OR REPLACE INTO workspace_usage (user_id, total_bytes, file_count, reconciled_at)
+                VALUES (?, ?, ?, ?)
+            """, (self.user_id, total_bytes, file_count, datetime.now().isoformat()))
+        
+        return {'total_bytes': total_bytes, 'drift_bytes': total_bytes - (previous[0] if previous else 0)}
+    
+    def _settings(self) -> Dict[str, Any]:
+        try:
+            with open(self.config_file, 'r') as f:
+                return json.load(f).get('settings', {})
+        except (OSError, ValueError):
+            return {}
+    
+    def _index_app(self, app_path: Path, manifest: Dict[str, Any], size_bytes: int, file_count: int):
+        with self.db.transaction() as conn:
+            conn.execute("""
+                INSERT OR REPLACE INTO workspace_apps (app_path, user_id, app_type, created_at, manifest, size_bytes, file_count)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, (str(app_path), self.user_id, manifest.get('app_type'), manifest['created_at'],
+                  json.dumps(manifest), size_bytes, file_count))
+            self._adjust_totals(conn, size_bytes, file_count)
+    
+    def _unindex_app(self, app_path: str):
+        with self.db.transaction() as conn:
+            row = conn.execute("SELECT size_bytes, file_count FROM workspace_apps WHERE app_path = ?",
+                               (app_path,)).fetchone()
+            if row:
+                conn.execute("DELETE FROM workspace_apps WHERE app_path = ?", (app_path,))
+                self._adjust_totals(conn, -row[0], -row[1])
+    
+    def _adjust_usage(self, app_path: str, bytes_delta: int, files_delta: int):
+        with self.db.transaction() as conn:
+            conn.execute("""
+                UPDATE workspace_apps SET size_bytes = size_bytes + ?, file_count = file_count + ?
+                WHERE app_path = ?
+            """, (bytes_delta, files_delta, app_path))
+            self._adjust_totals(conn, bytes_delta, files_delta)
+    
+    def _adjust_totals(self, conn, bytes_delta: int, files_delta: int):
+        conn.execute("""
+            UPDATE workspace_usage SET total_bytes = MAX(total_bytes + ?, 0), file_count = MAX(file_count + ?, 0)
+            WHERE user_id = ?
+        """, (bytes_delta, files_delta, self.user_id))
 
 class UserManager:
     """Manages user accounts and authentication"""
     
     def __init__(self, db_path: str = "multi_user_system.db"):
         self.db_path = db_path
+        self.session_ttl = timedelta(hours=24)  # 24 hour session
+        # In-memory session table (session_id -> (user_id, expires_at, checked_at timestamps)); the
+        # database is consulted on a miss, and again once an entry is older than session_recheck_interval
+        # so a logout in another worker takes effect there too
+        self._sessions: Dict[str, Tuple[str, float, float]] = {}
+        self.session_recheck_interval = float(os.getenv('SESSION_RECHECK_INTERVAL', '10'))
+        # Ids that missed memory and the database (session_id -> retry after); bogus or stale
+        # cookies would otherwise cost a query on every request
+        self._unknown_sessions: "OrderedDict[str, float]" = OrderedDict()
+        self.unknown_session_ttl = float(os.getenv('UNKNOWN_SESSION_TTL', '60'))
+        self.max_unknown_sessions = 10000
+        self._users: Dict[str, User] = {}
         self._init_database()
+        self._load_sessions()
+        
+        sweep_interval = float(os.getenv('SESSION_SWEEP_INTERVAL', '300'))
+        if sweep_interval > 0:
+            threading.Thread(target=self._sweep_loop, args=(sweep_interval,), daemon=True,
+                             name="session-sweeper").start()
         
     def _init_database(self):
         """Initialize user database"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute("""
+            self.db = get_pool(self.db_path, [
+                """
                 CREATE TABLE IF NOT EXISTS users (
                     user_id TEXT PRIMARY KEY,
                     username TEXT UNIQUE NOT NULL,
@@ -261,9 +421,8 @@ class UserManager:
                     is_active BOOLEAN DEFAULT TRUE,
                     user_settings TEXT DEFAULT '{}'
                 )
-            """)
-            
-            cursor.execute("""
+                """,
+                """
                 CREATE TABLE IF NOT EXISTS user_sessions (
                     session_id TEXT PRIMARY KEY,
                     user_id TEXT NOT NULL,
@@ -272,9 +431,8 @@ class UserManager:
                     is_active BOOLEAN DEFAULT TRUE,
                     FOREIGN KEY (user_id) REFERENCES users (user_id)
                 )
-            """)
-            
-            cursor.execute("""
+                """,
+                """
                 CREATE TABLE IF NOT EXISTS workspace_activity (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     user_id TEXT NOT NULL,
@@ -283,10 +441,11 @@ class UserManager:
                     timestamp TEXT NOT NULL,
                     FOREIGN KEY (user_id) REFERENCES users (user_id)
                 )
-            """)
-            
-            conn.commit()
-            conn.close()
+                """,
+                "CREATE INDEX IF NOT EXISTS idx_user_sessions_user ON user_sessions (user_id)",
+                "CREATE INDEX IF NOT EXISTS idx_user_sessions_expires ON user_sessions (expires_at)",
+                "CREATE INDEX IF NOT EXISTS idx_workspace_activity_user ON workspace_activity (user_id, timestamp)"
+            ])
             logger.info("👥 User management database initialized")
             
         except Exception as e:
@@ -305,17 +464,11 @@ class UserManager:
             # Generate user ID
             user_id = str(uuid.uuid4())
             
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute("""
+            self.db.execute("""
                 INSERT INTO users (user_id, username, email, password_hash, created_at)
                 VALUES (?, ?, ?, ?, ?)
             """, (user_id, username, email, password_hash, datetime.now().isoformat()))
             
-            conn.commit()
-            conn.close()
-            
             logger.info(f"👤 New user registered: {username} ({user_id})")
             return user_id
             
@@ -329,26 +482,18 @@ class UserManager:
     def authenticate_user(self, username: str, password: str) -> Optional[User]:
         """Authenticate user login"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute("""
+            row = self.db.fetchone("""
                 SELECT user_id, username, email, password_hash, created_at, last_login, workspace_path, is_active
                 FROM users 
                 WHERE username = ? AND is_active = TRUE
             """, (username,))
             
-            row = cursor.fetchone()
-            
             if row and bcrypt.checkpw(password.encode('utf-8'), row[3].encode('utf-8')):
                 # Update last login
-                cursor.execute("""
+                self.db.execute("""
                     UPDATE users SET last_login = ? WHERE user_id = ?
                 """, (datetime.now().isoformat(), row[0]))
                 
-                conn.commit()
-                conn.close()
-                
                 user = User(row[0], row[1], row[2], row[3])
                 user.created_at = datetime.fromisoformat(row[4]) if row[4] else None
                 user.last_login = datetime.fromisoformat(row[5]) if row[5] else None
@@ -358,29 +503,44 @@ class UserManager:
                 logger.info(f"🔐 User authenticated: {username}")
                 return user
             
-            conn.close()
             return None
             
         except Exception as e:
             logger.error(f"Authentication failed: {e}")
             return None
     
+    def get_user(self, user_id: str) -> Optional[User]:
+        """User by id (cached; users are only read here)"""
+        user = self._users.get(user_id)
+        if user is None:
+            row = self.db.fetchone("""
+                SELECT user_id, username, email, password_hash, created_at, last_login, workspace_path, is_active
+                FROM users WHERE user_id = ?
+            """, (user_id,))
+            if not row:
+                return None
+            user = User(row[0], row[1], row[2], row[3])
+            user.created_at = datetime.fromisoformat(row[4]) if row[4] else None
+            user.last_login = datetime.fromisoformat(row[5]) if row[5] else None
+            user.workspace_path = row[6]
+            user.is_active = row[7]
+            self._users[user_id] = user
+        return user
+    
     def create_session(self, user_id: str) -> str:
         """Create user session"""
         try:
             session_id = secrets.token_urlsafe(32)
-            expires_at = datetime.now() + timedelta(hours=24)  # 24 hour session
+            created_at = datetime.now()
+            expires_at = created_at + self.session_ttl
             
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute("""
+            self._sessions[session_id] = (user_id, expires_at.timestamp(), time.time())
+            # Written through (not deferred): other workers must find it on their first lookup,
+            # before a miss lands in their negative cache
+            self.db.execute("""
                 INSERT INTO user_sessions (session_id, user_id, created_at, expires_at)
                 VALUES (?, ?, ?, ?)
-            """, (session_id, user_id, datetime.now().isoformat(), expires_at.isoformat()))
-            
-            conn.commit()
-            conn.close()
+            """, (session_id, user_id, created_at.isoformat(), expires_at.isoformat()))
             
             return session_id
             
@@ -390,23 +550,76 @@ class UserManager:
     
     def validate_session(self, session_id: str) -> Optional[str]:
         """Validate user session and return user_id"""
+        if not session_id:
+            return None
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                SELECT user_id FROM user_sessions 
-                WHERE session_id = ? AND expires_at > ? AND is_active = TRUE
-            """, (session_id, datetime.now().isoformat()))
-            
-            row = cursor.fetchone()
-            conn.close()
-            
-            return row[0] if row else None
+            now = time.time()
+            entry = self._sessions.get(session_id)
+            if entry is None or now - entry[2] >= self.session_recheck_interval:
+                retry_after = self._unknown_sessions.get(session_id)
+                if retry_after is not None and retry_after > now:
+                    return None
+                # Created by another process, or revoked by one since it was last checked
+                row = self.db.fetchone("""
+                    SELECT user_id, expires_at FROM user_sessions
+                    WHERE session_id = ? AND is_active = TRUE
+                """, (session_id,))
+                if not row:
+                    self._sessions.pop(session_id, None)
+                    self._remember_unknown(session_id)
+                    return None
+                self._unknown_sessions.pop(session_id, None)
+                entry = self._sessions[session_id] = (row[0], datetime.fromisoformat(row[1]).timestamp(), now)
+            
+            user_id, expires_at, _ = entry
+            return user_id if expires_at > now else None
             
         except Exception as e:
             logger.error(f"Session validation failed: {e}")
             return None
+    
+    def _remember_unknown(self, session_id: str):
+        self._unknown_sessions[session_id] = time.time() + self.unknown_session_ttl
+        self._unknown_sessions.move_to_end(session_id)
+        while len(self._unknown_sessions) > self.max_unknown_sessions:
+            self._unknown_sessions.popitem(last=False)
+    
+    def revoke_session(self, session_id: str):
+        """End a session (logout)"""
+        self._sessions.pop(session_id, None)
+        # Negative cache first, then written through: a later lookup here must not reach a row
+        # that still reads active, and other workers see it on their next recheck
+        self._remember_unknown(session_id)
+        self.db.execute("UPDATE user_sessions SET is_active = FALSE WHERE session_id = ?", (session_id,))
+    
+    def sweep_expired_sessions(self) -> int:
+        """Drop expired sessions from memory and the database; returns how many were dropped from memory"""
+        now = time.time()
+        expired = [session_id for session_id, (_, expires_at, _) in list(self._sessions.items()) if expires_at <= now]
+        for session_id in expired:
+            self._sessions.pop(session_id, None)
+        self.db.defer("DELETE FROM user_sessions WHERE expires_at <= ? OR is_active = FALSE",
+                      (datetime.now().isoformat(),))
+        return len(expired)
+    
+    def _load_sessions(self):
+        try:
+            now = time.time()
+            for session_id, user_id, expires_at in self.db.fetchall("""
+                SELECT session_id, user_id, expires_at FROM user_sessions
+                WHERE expires_at > ? AND is_active = TRUE
+            """, (datetime.now().isoformat(),)):
+                self._sessions[session_id] = (user_id, datetime.fromisoformat(expires_at).timestamp(), now)
+        except Exception as e:
+            logger.error(f"Loading sessions failed: {e}")
+    
+    def _sweep_loop(self, interval: float):
+        while True:
+            time.sleep(interval)
+            try:
+                self.sweep_expired_sessions()
+            except Exception as e:
+                logger.error(f"Session sweep failed: {e}")
 
 class LiveDeploymentSystem:
     """System for live deployment of generated apps"""
@@ -415,6 +628,15 @@ class LiveDeploymentSystem:
         self.deployment_root = Path(deployment_root)
         self.deployment_root.mkdir(parents=True, exist_ok=True)
         self.active_deployments = {}
+        # Deployments are hardlink trees of this content store (same filesystem as the deployments)
+        self.snapshot_store = SnapshotStore(str(self.deployment_root / "_store"))
+        
+        # Every deployment is a route on one shared server (started on first deploy)
+        self.static_host = StaticHost(
+            host=os.getenv('LIVE_DEPLOY_HOST', '0.0.0.0'),
+            port=int(os.getenv('LIVE_DEPLOY_PORT', '8000')),
+            public_host=os.getenv('LIVE_DEPLOY_PUBLIC_HOST', 'localhost')
+        )
         
     def deploy_app(self, user_id: str, app_path: str, domain_name: str = None) -> Dict[str, Any]:
         """Deploy app to live environment"""
@@ -432,14 +654,14 @@ class LiveDeploymentSystem:
             
             # Create deployment directory
             deployment_path = self.deployment_root / f"deploy_{deployment_id}"
-            deployment_path.mkdir(parents=True, exist_ok=True)
             
             # Copy app files to deployment
             self._copy_app_files(app_dir, deployment_path)
+            precompress_tree(deployment_path)
             
-            # Start web server for this deployment
-            port = self._get_available_port()
-            server_process = self._start_web_server(deployment_path, port)
+            # Route the deployment on the shared static host
+            self.static_host.start()
+            url = self.static_host.register(deployment_id, str(deployment_path), [domain_name])
             
             deployment_info = {
                 'deployment_id': deployment_id,
@@ -447,21 +669,20 @@ class LiveDeploymentSystem:
                 'app_path': str(app_path),
                 'deployment_path': str(deployment_path),
                 'domain_name': domain_name,
-                'port': port,
-                'url': f"http://localhost:{port}",
+                'port': self.static_host.port,
+                'url': url,
                 'deployed_at': datetime.now().isoformat(),
-                'status': 'active',
-                'process': server_process
+                'status': 'active'
             }
             
             self.active_deployments[deployment_id] = deployment_info
             
-            logger.info(f"🚀 App deployed: {domain_name} at port {port}")
+            logger.info(f"🚀 App deployed: {domain_name} at {url}")
             
             return {
                 'success': True,
                 'deployment_id': deployment_id,
-                'url': f"http://localhost:{port}",
+                'url': url,
                 'domain_name': domain_name,
                 'deployed_at': deployment_info['deployed_at']
             }
@@ -471,68 +692,28 @@ class LiveDeploymentSystem:
             return {'success': False, 'error': str(e)}
     
     def _copy_app_files(self, source: Path, destination: Path):
-        """Copy app files to deployment directory"""
+        """Snapshot app files into the store and materialize them at the deployment directory"""
         try:
-            for item in source.iterdir():
-                if item.is_file():
-                    shutil.copy2(item, destination)
-                elif item.is_dir() and item.name not in ['.git', '__pycache__', 'node_modules']:
-                    shutil.copytree(item, destination / item.name, dirs_exist_ok=True)
+            # Only files the store has not seen are copied; the rest are hardlinked
+            self.snapshot_store.materialize(self.snapshot_store.snapshot(source), destination)
+            destination.mkdir(parents=True, exist_ok=True)
                     
         except Exception as e:
             logger.error(f"File copy failed: {e}")
     
-    def _get_available_port(self) -> int:
-        """Get available port for deployment"""
-        import socket
-        
-        # Start from port 8000 and find available port
-        for port in range(8000, 9000):
-            try:
-                with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-                    s.bind(('localhost', port))
-                    return port
-            except OSError:
-                continue
-                
-        return 8080  # Fallback port
-    
-    def _start_web_server(self, deployment_path: Path, port: int):
-        """Start web server for deployment"""
-        try:
-            # Use Python's built-in HTTP server
-            cmd = [
-                'python', '-m', 'http.server', str(port),
-                '--directory', str(deployment_path)
-            ]
-            
-            process = subprocess.Popen(
-                cmd,
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.DEVNULL,
-                creationflags=subprocess.CREATE_NEW_PROCESS_GROUP if os.name == 'nt' else 0
-            )
-            
-            return process
-            
-        except Exception as e:
-            logger.error(f"Failed to start web server: {e}")
-            return None
-    
     def stop_deployment(self, deployment_id: str) -> bool:
         """Stop a live deployment"""
         try:
             if deployment_id in self.active_deployments:
                 deployment = self.active_deployments[deployment_id]
                 
-                # Stop server process
-                if deployment.get('process'):
-                    deployment['process'].terminate()
+                # Stop serving it
+                self.static_host.unregister(deployment_id)
                 
                 # Clean up deployment directory
                 deployment_path = Path(deployment['deployment_path'])
                 if deployment_path.exists():
-                    shutil.rmtree(deployment_path)
+                    self.snapshot_store.remove_tree(deployment_path)
                 
                 # Remove from active deployments
                 del self.active_deployments[deployment_id]
@@ -551,9 +732,8 @@ class LiveDeploymentSystem:
         
         for deployment_id, deployment in self.active_deployments.items():
             if deployment['user_id'] == user_id:
-                # Check if process is still running
-                process = deployment.get('process')
-                status = 'active' if process and process.poll() is None else 'stopped'
+                # Check if it is still being served
+                status = 'active' if self.static_host.running and deployment_id in self.static_host.routes else 'stopped'
                 
                 user_deployments.append({
                     'deployment_id': deployment_id,
@@ -576,6 +756,22 @@ class MultiUserPlatform:
         
         # Initialize workspace root
         Path(workspace_root).mkdir(parents=True, exist_ok=True)
+        
+        # Background correction of usage counters for writes made behind the workspace's back
+        self.reconcile_interval = float(os.getenv('WORKSPACE_RECONCILE_INTERVAL', '3600'))
+        if self.reconcile_interval > 0:
+            threading.Thread(target=self._reconcile_loop, daemon=True, name="workspace-reconciler").start()
+    
+    def _reconcile_loop(self):
+        while True:
+            time.sleep(self.reconcile_interval)
+            for user_id, workspace in list(self.user_workspaces.items()):
+                try:
+                    drift = workspace.reconcile_usage()
+                    if drift['drift_bytes']:
+                        logger.info(f"Workspace usage for {user_id} corrected by {drift['drift_bytes']:+,} bytes")
+                except Exception as e:
+                    logger.error(f"Workspace reconcile failed for {user_id}: {e}")
     
     def get_user_workspace(self, user_id: str) -> UserWorkspace:
         """Get or create user workspace"""
@@ -601,11 +797,8 @@ class MultiUserPlatform:
             app_files = await generate_app_files(app_description)
             
             # Save files to user workspace
-            app_dir = Path(app_path) / "src"
-            
             for filename, content in app_files.items():
-                file_path = app_dir / filename
-                file_path.write_text(content, encoding='utf-8')
+                workspace.write_file(app_path, f"src/{filename}", content)
             
             logger.info(f"📱 Generated app for user {user_id}: {app_description}")
             
@@ -878,16 +1071,26 @@ DASHBOARD_TEMPLATE = """
 </html>
 """
 
+# Served by name so Jinja compiles each template once instead of on every request
+app.jinja_loader = DictLoader({'login.html': LOGIN_TEMPLATE, 'dashboard.html': DASHBOARD_TEMPLATE})
+
+def _current_user_id() -> Optional[str]:
+    """user_id of the request's session; an invalid or expired session is cleared from the cookie"""
+    user_id = platform.user_manager.validate_session(session.get('session_id'))
+    if not user_id and 'session_id' in session:
+        session.clear()
+    return user_id
+
 # Flask Routes
 @app.route('/')
 def login_page():
-    if 'session_id' in session:
+    if _current_user_id():
         return redirect('/dashboard')
-    return render_template_string(LOGIN_TEMPLATE, show_register=False)
+    return render_template('login.html', show_register=False)
 
 @app.route('/register')
 def register_page():
-    return render_template_string(LOGIN_TEMPLATE, show_register=True)
+    return render_template('login.html', show_register=True)
 
 @app.route('/login', methods=['POST'])
 def login():
@@ -902,7 +1105,7 @@ def login():
         session['user_id'] = user.user_id
         return redirect('/dashboard')
     else:
-        return render_template_string(LOGIN_TEMPLATE, 
+        return render_template('login.html', 
                                     show_register=False, 
                                     message="Invalid username or password",
                                     error=True)
@@ -916,32 +1119,31 @@ def register():
     user_id = platform.user_manager.register_user(username, email, password)
     
     if user_id:
-        return render_template_string(LOGIN_TEMPLATE,
+        return render_template('login.html',
                                     show_register=False,
                                     message="Account created successfully! Please sign in.",
                                     error=False)
     else:
-        return render_template_string(LOGIN_TEMPLATE,
+        return render_template('login.html',
                                     show_register=True,
                                     message="Username or email already exists",
                                     error=True)
 
 @app.route('/logout', methods=['POST'])
 def logout():
+    if 'session_id' in session:
+        platform.user_manager.revoke_session(session['session_id'])
     session.clear()
     return redirect('/')
 
 @app.route('/dashboard')
 def dashboard():
-    if 'session_id' not in session:
-        return redirect('/')
-    
-    user_id = session.get('user_id')
+    user_id = _current_user_id()
     if not user_id:
         return redirect('/')
     
     # Get user info
-    user = platform.user_manager.authenticate_user('', '')  # This needs improvement
+    user = platform.user_manager.get_user(user_id)
     
     # Get workspace data
     workspace = platform.get_user_workspace(user_id)
@@ -950,9 +1152,9 @@ def dashboard():
     deployments = platform.deployment_system.list_user_deployments(user_id)
     
     # Create user object for template
-    user_info = {'username': f"User {user_id[:8]}"}  # Simplified for now
+    user_info = {'username': user.username if user else f"User {user_id[:8]}"}
     
-    return render_template_string(DASHBOARD_TEMPLATE,
+    return render_template('dashboard.html',
                                 user=user_info,
                                 apps=apps,
                                 stats=stats,
@@ -960,10 +1162,10 @@ def dashboard():
 
 @app.route('/create_app', methods=['POST'])
 def create_app():
-    if 'session_id' not in session:
+    user_id = _current_user_id()
+    if not user_id:
         return redirect('/')
     
-    user_id = session.get('user_id')
     app_description = request.form['app_description']
     
     # Generate app asynchronously (simplified for web context)
@@ -977,16 +1179,16 @@ def create_app():
 <html><head><title>{app_description}</title></head>
 <body><h1>{app_description}</h1><p>Your app is ready!</p></body></html>"""
         
-        (Path(app_path) / "src" / "index.html").write_text(html_content)
+        workspace.write_file(app_path, "src/index.html", html_content)
     
     return redirect('/dashboard')
 
 @app.route('/deploy_app', methods=['POST'])
 def deploy_app():
-    if 'session_id' not in session:
+    user_id = _current_user_id()
+    if not user_id:
         return redirect('/')
     
-    user_id = session.get('user_id')
     app_path = request.form['app_path']
     
     # Deploy app
@@ -996,7 +1198,7 @@ def deploy_app():
 
 @app.route('/stop_deployment', methods=['POST'])
 def stop_deployment():
-    if 'session_id' not in session:
+    if not _current_user_id():
         return redirect('/')
     
     deployment_id = request.form['deployment_id']
@@ -1006,10 +1208,10 @@ def stop_deployment():
 
 @app.route('/delete_app', methods=['POST'])
 def delete_app():
-    if 'session_id' not in session:
+    user_id = _current_user_id()
+    if not user_id:
         return redirect('/')
     
-    user_id = session.get('user_id')
     app_path = request.form['app_path']
     
     workspace = platform.get_user_workspace(user_id)
@@ -0,0 +1,303 @@
+"""
+Pattern Scanner
+===============
+Compiled multi-pattern scanning for the code analyzers (ai_code_review,
+SecurityIntelligenceEngine, SmartErrorPreventionEngine).
+
+Patterns are compiled once per scanner.  Finding candidate lines is one pass
+over the whole buffer: patterns that start with a literal (``cursor.execute``,
+``innerHTML``...) are located with ``str.find``, and the rest are folded into
+one alternation that is rewritten so no match can cross a newline.  Patterns
+are then re-run only on their candidate lines, so results are identical to
+the old "for line: for pattern: re.search" loops.
+"""
+
+import re
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+# Constructs whose meaning changes when a pattern runs inside a larger buffer / alternation
+_UNINDEXABLE = re.compile(r'\\[1-9]|\(\?P=|\\[AZz]')
+
+_CONFINED_ESCAPES = {'s': r'[^\S\n]', 'W': r'[^\w\n]', 'D': r'[^\d\n]'}
+
+_REGEX_META = set('.^$*+?{}[]()|\\')
+
+# Characters that re.IGNORECASE matches against ASCII letters but str.lower() leaves alone
+_CASEFOLD_EXTRA = str.maketrans({'\u017f': 's', '\u0131': 'i'})
+
+MIN_LITERAL_LENGTH = 3
+
+
+@dataclass
+class PatternHit:
+    """One pattern match: rule key, pattern position within the rule, 1-based line number"""
+    rule: str
+    pattern_index: int
+    line_number: int
+    match: re.Match
+
+
+def confine_to_line(pattern: str) -> str:
+    """Rewrite a regex so that none of its matches can span a newline
+
+    ``\\s``, ``\\W``, ``\\D`` and negated character classes are the only
+    constructs (besides a literal ``\\n``) that can consume a newline without
+    DOTALL; each is narrowed to exclude it.
+    """
+    out = []
+    i, n = 0, len(pattern)
+    while i < n:
+        char = pattern[i]
+        if char == '\\' and i + 1 < n:
+            escape = pattern[i + 1]
+            out.append(_CONFINED_ESCAPES.get(escape, pattern[i:i + 2]))
+            i += 2
+        elif char == '[':
+            end, body, negated = _read_class(pattern, i)
+            out.append(_confine_class(body, negated))
+            i = end
+        else:
+            out.append(char)
+            i += 1
+    return ''.join(out)
+
+
+def required_prefix(pattern: str) -> str:
+    """Literal text every match of pattern starts with ('' when there is none)"""
+    if _has_top_level_alternation(pattern):
+        return ''
+    literal = []
+    i, n = 0, len(pattern)
+    while i < n:
+        char = pattern[i]
+        if char == '\\':
+            if i + 1 >= n or pattern[i + 1].isalnum():
+                break
+            char, step = pattern[i + 1], 2
+        elif char in _REGEX_META:
+            break
+        else:
+            step = 1
+        # An optional character ends the guaranteed prefix
+        if i + step < n and pattern[i + step] in '?*{':
+            break
+        literal.append(char)
+        i += step
+    return ''.join(literal)
+
+
+def _has_top_level_alternation(pattern: str) -> bool:
+    i, n = 0, len(pattern)
+    while i < n:
+        char = pattern[i]
+        if char == '\\':
+            i += 2
+        elif char == '[':
+            i = _read_class(pattern, i)[0]
+        elif char == '|':
+            return True
+        else:
+            i += 1
+    return False
+
+
+def _read_class(pattern: str, start: int) -> Tuple[int, str, bool]:
+    """Return (index after ']', class body, negated) for the class opening at start"""
+    i = start + 1
+    negated = pattern.startswith('^', i)
+    if negated:
+        i += 1
+    body_start = i
+    if pattern.startswith(']', i):  # leading ']' is a literal
+        i += 1
+    while i < len(pattern) and pattern[i] != ']':
+        i += 2 if pattern[i] == '\\' else 1
+    return i + 1, pattern[body_start:i], negated
+
+
+def _confine_class(body: str, negated: bool) -> str:
+    if negated:
+        return f'[^{body}\\n]'
+
+    # Python has no class subtraction: split out the escapes that include '\n'
+    kept, extra = [], []
+    i = 0
+    while i < len(body):
+        if body[i] == '\\' and i + 1 < len(body):
+            escape = body[i + 1]
+            if escape in _CONFINED_ESCAPES:
+                extra.append(_CONFINED_ESCAPES[escape])
+            else:
+                kept.append(body[i:i + 2])
+            i += 2
+        else:
+            kept.append(body[i])
+            i += 1
+    if not extra:
+        return f'[{body}]'
+    parts = ([f"[{''.join(kept)}]"] if kept else []) + extra
+    return '(?:' + '|'.join(parts) + ')'
+
+
+def _alternation(patterns: Sequence[str], flags: int) -> Optional[re.Pattern]:
+    if not patterns:
+        return None
+    try:
+        return re.compile('|'.join(f'(?:{p})' for p in patterns), flags)
+    except re.error:
+        return None
+
+
+class LineIndex:
+    """Maps buffer offsets to 1-based line numbers in O(log n)"""
+
+    def __init__(self, content: str):
+        newlines = []
+        position = content.find('\n')
+        while position != -1:
+            newlines.append(position)
+            position = content.find('\n', position + 1)
+        self._newlines = newlines
+
+    def line_of(self, offset: int) -> int:
+        return bisect_right(self._newlines, offset - 1) + 1
+
+
+@dataclass
+class _Entry:
+    rule: str
+    index: int
+    regex: re.Pattern
+    literal: str = ''        # prefilter by substring
+    filtered: bool = False   # prefilter by the shared line alternation
+    # neither: unindexable, checked on every line
+
+
+class PatternScanner:
+    """Precompiled rule set: ``{rule: [regex, ...]}``
+
+    ``scan_lines`` keeps per-line semantics (each pattern searched within one
+    line); ``scan`` keeps whole-buffer ``finditer`` semantics and skips rules
+    that the prefilter proves cannot match.
+    """
+
+    def __init__(self, rules: Dict[str, Sequence[str]], flags: int = 0):
+        self.flags = flags
+        self._casefold = bool(flags & re.IGNORECASE)
+        self._entries: List[_Entry] = []
+        filtered_patterns: List[str] = []
+
+        for rule, patterns in rules.items():
+            for index, pattern in enumerate(patterns):
+                entry = _Entry(rule, index, re.compile(pattern, flags))
+                if not _UNINDEXABLE.search(pattern):
+                    literal = required_prefix(pattern)
+                    if len(literal) >= MIN_LITERAL_LENGTH:
+                        entry.literal = literal.lower() if self._casefold else literal
+                    else:
+                        entry.filtered = True
+                        filtered_patterns.append(confine_to_line(pattern))
+                self._entries.append(entry)
+
+        self._line_filter = _alternation(filtered_patterns, flags | re.MULTILINE)
+        if self._line_filter is None:
+            # Patterns that cannot share one alternation are checked on every line
+            for entry in self._entries:
+                entry.filtered = False
+        self._literals = sorted({entry.literal for entry in self._entries if entry.literal})
+        self._every_line = any(not entry.literal and not entry.filtered for entry in self._entries)
+
+        self._by_rule: Dict[str, List[_Entry]] = {}
+        for entry in self._entries:
+            self._by_rule.setdefault(entry.rule, []).append(entry)
+
+    def _fold(self, content: str) -> str:
+        return content.lower().translate(_CASEFOLD_EXTRA) if self._casefold else content
+
+    def candidate_lines(self, content: str) -> List[int]:
+        """1-based numbers of lines where the shared alternation matches"""
+        if self._line_filter is None:
+            return []
+        search = self._line_filter.search
+        lines: List[int] = []
+        line_no, position = 0, 0
+        while True:
+            match = search(content, position)
+            if match is None:
+                break
+            line_no += content.count('\n', position, match.start())
+            lines.append(line_no + 1)
+            line_end = content.find('\n', match.start())
+            if line_end == -1:
+                break
+            position = line_end + 1
+            line_no += 1
+        return lines
+
+    def literal_lines(self, content: str) -> Dict[str, Set[int]]:
+        """Lines containing each literal prefix (case-folded for IGNORECASE scanners)"""
+        if not self._literals:
+            return {}
+        haystack = self._fold(content)
+        line_index = LineIndex(haystack)
+        found: Dict[str, Set[int]] = {}
+        for literal in self._literals:
+            lines: Set[int] = set()
+            position = haystack.find(literal)
+            while position != -1:
+                lines.add(line_index.line_of(position))
+                line_end = haystack.find('\n', position)
+                if line_end == -1:
+                    break
+                position = haystack.find(literal, line_end + 1)
+            found[literal] = lines
+        return found
+
+    def scan_lines(self, content: str, all_matches: bool = False) -> Iterator[PatternHit]:
+        """Per-line matching in line, rule, pattern order
+
+        Yields the first match of each pattern on a line, or every match when
+        ``all_matches`` is set (``re.finditer`` on the line).
+        """
+        lines = content.split('\n')
+        filtered = set(self.candidate_lines(content))
+        by_literal = self.literal_lines(content)
+
+        if self._every_line:
+            line_numbers = range(1, len(lines) + 1)
+        else:
+            line_numbers = sorted(filtered.union(*by_literal.values()))
+
+        for line_no in line_numbers:
+            line = lines[line_no - 1]
+            for entry in self._entries:
+                if entry.literal:
+                    if line_no not in by_literal[entry.literal]:
+                        continue
+                elif entry.filtered and line_no not in filtered:
+                    continue
+                if all_matches:
+                    for match in entry.regex.finditer(line):
+                        yield PatternHit(entry.rule, entry.index, line_no, match)
+                else:
+                    match = entry.regex.search(line)
+                    if match:
+                        yield PatternHit(entry.rule, entry.index, line_no, match)
+
+    def scan(self, content: str) -> Iterator[PatternHit]:
+        """Whole-buffer ``finditer`` for every pattern, in rule and pattern order"""
+        haystack = None
+        line_index = None
+        for entries in self._by_rule.values():
+            if all(entry.literal for entry in entries):
+                if haystack is None:
+                    haystack = self._fold(content)
+                if not any(entry.literal in haystack for entry in entries):
+                    continue
+            for entry in entries:
+                for match in entry.regex.finditer(content):
+                    if line_index is None:
+                        line_index = LineIndex(content)
+                    yield PatternHit(entry.rule, entry.index, line_index.line_of(match.start()), match)
@@ -9,7 +9,6 @@ import asyncio
 import json
 import logging
 import os
-import sqlite3
 import subprocess
 import time
 import psutil
@@ -22,6 +21,10 @@ import threading
 import statistics
 from collections import defaultdict, deque
 
+from scan_cache import ScanCache, ruleset_version, tree_fingerprint
+from sqlite_pool import get_pool
+from streaming_stats import StreamingMetric
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -29,11 +32,16 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Bump when the report/optimization rules change, so unchanged apps are analyzed again
+PERFORMANCE_RULESET_REVISION = 1
+
 class PerformanceMetrics:
     """Collects and manages performance metrics"""
     
     def __init__(self):
-        self.metrics = defaultdict(list)
+        # Recent raw samples (for trends) + bounded streaming stats (1 min buckets, 6h window)
+        self.metrics = defaultdict(lambda: deque(maxlen=1000))
+        self.streams = defaultdict(lambda: StreamingMetric(bucket_seconds=60, num_buckets=360))
         self.thresholds = {
             'load_time': 3.0,  # seconds
             'memory_usage': 512,  # MB
@@ -52,27 +60,24 @@ class PerformanceMetrics:
             'value': value,
             'timestamp': timestamp
         })
-        
-        # Keep only last 1000 metrics per type
-        if len(self.metrics[metric_type]) > 1000:
-            self.metrics[metric_type] = self.metrics[metric_type][-1000:]
+        self.streams[metric_type].add(value, timestamp.timestamp())
     
     def get_average(self, metric_type: str, duration_minutes: int = 60) -> float:
         """Get average metric value for specified duration"""
-        cutoff_time = datetime.now() - timedelta(minutes=duration_minutes)
-        values = [
-            m['value'] for m in self.metrics[metric_type]
-            if m['timestamp'] > cutoff_time
-        ]
-        return statistics.mean(values) if values else 0.0
+        return self.streams[metric_type].mean(seconds=duration_minutes * 60)
+    
+    def get_percentiles(self, metric_type: str, duration_minutes: int = 60) -> Dict[str, float]:
+        """Get p50/p95/p99 of a metric for specified duration"""
+        return self.streams[metric_type].percentiles(50, 95, 99, seconds=duration_minutes * 60)
     
     def get_trend(self, metric_type: str) -> str:
         """Analyze trend for a metric (improving, degrading, stable)"""
         if len(self.metrics[metric_type]) < 10:
             return "insufficient_data"
             
-        recent_values = [m['value'] for m in self.metrics[metric_type][-10:]]
-        older_values = [m['value'] for m in self.metrics[metric_type][-20:-10]]
+        history = list(self.metrics[metric_type])
+        recent_values = [m['value'] for m in history[-10:]]
+        older_values = [m['value'] for m in history[-20:-10]]
         
         if not older_values:
             return "insufficient_data"
@@ -493,13 +498,15 @@ class PerformanceIntelligenceAgent:
         # Initialize database
         self._init_database()
         
+        # Tree fingerprint of each app at its last analysis; unchanged apps are skipped
+        self.analysis_cache = ScanCache(self.db_path, 'workspace_performance',
+                                        ruleset_version(PERFORMANCE_RULESET_REVISION))
+        
     def _init_database(self):
         """Initialize performance database"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute("""
+            self.db = get_pool(self.db_path, [
+                """
                 CREATE TABLE IF NOT EXISTS performance_reports (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     timestamp TEXT NOT NULL,
@@ -509,9 +516,8 @@ class PerformanceIntelligenceAgent:
                     recommendations TEXT,
                     status TEXT DEFAULT 'active'
                 )
-            """)
-            
-            cursor.execute("""
+                """,
+                """
                 CREATE TABLE IF NOT EXISTS optimization_history (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     timestamp TEXT NOT NULL,
@@ -521,10 +527,9 @@ class PerformanceIntelligenceAgent:
                     after_metrics TEXT,
                     improvement TEXT
                 )
-            """)
-            
-            conn.commit()
-            conn.close()
+                """,
+                "CREATE INDEX IF NOT EXISTS idx_performance_reports_timestamp ON performance_reports (timestamp)"
+            ])
             logger.info("📊 Performance database initialized")
             
         except Exception as e:
@@ -567,6 +572,10 @@ class PerformanceIntelligenceAgent:
             app_dirs = [d for d in Path(workspace_path).iterdir() if d.is_dir()]
             
             for app_dir in app_dirs[-3:]:  # Analyze last 3 apps
+                cache_key = os.path.abspath(app_dir)
+                if self.analysis_cache.get(cache_key, tree_fingerprint(cache_key)) is not None:
+                    continue  # Nothing changed since the last analysis
+                
                 logger.info(f"🔍 Analyzing performance for {app_dir.name}")
                 
                 # Generate performance report
@@ -577,6 +586,12 @@ class PerformanceIntelligenceAgent:
                     optimization_result = await self.optimizer.optimize_application(str(app_dir))
                     await self._save_optimization_result(optimization_result)
                 
+                # Fingerprint after optimizing, which rewrites files
+                self.analysis_cache.put(cache_key, tree_fingerprint(cache_key), {
+                    'timestamp': report['timestamp'],
+                    'needs_optimization': report['needs_optimization']
+                })
+                
         except Exception as e:
             logger.error(f"Workspace analysis failed: {e}")
     
@@ -618,10 +633,7 @@ class PerformanceIntelligenceAgent:
     async def _save_performance_report(self, report: Dict[str, Any]):
         """Save performance report to database"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute("""
+            await self.db.aio.execute("""
                 INSERT INTO performance_reports 
                 (timestamp, app_path, report_type, metrics, recommendations)
                 VALUES (?, ?, ?, ?, ?)
@@ -633,19 +645,13 @@ class PerformanceIntelligenceAgent:
                 json.dumps(report['recommendations'])
             ))
             
-            conn.commit()
-            conn.close()
-            
         except Exception as e:
             logger.error(f"Failed to save performance report: {e}")
     
     async def _save_optimization_result(self, result: Dict[str, Any]):
         """Save optimization result to database"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute("""
+            await self.db.aio.execute("""
                 INSERT INTO optimization_history 
                 (timestamp, app_path, optimizations, before_metrics, after_metrics, improvement)
                 VALUES (?, ?, ?, ?, ?, ?)
@@ -657,9 +663,6 @@ class PerformanceIntelligenceAgent:
                 json.dumps(result['after_metrics']),
                 json.dumps(result['improvement'])
             ))
-            
-            conn.commit()
-            conn.close()
             logger.info("💾 Optimization result saved to database")
             
         except Exception as e:
@@ -679,22 +682,21 @@ class PerformanceIntelligenceAgent:
             dashboard['system_metrics'] = {
                 'cpu_avg': self.resource_monitor.metrics.get_average('cpu_usage'),
                 'memory_avg': self.resource_monitor.metrics.get_average('memory_usage'),
+                'cpu_percentiles': self.resource_monitor.metrics.get_percentiles('cpu_usage'),
+                'memory_percentiles': self.resource_monitor.metrics.get_percentiles('memory_usage'),
                 'cpu_trend': self.resource_monitor.metrics.get_trend('cpu_usage'),
                 'memory_trend': self.resource_monitor.metrics.get_trend('memory_usage')
             }
             
             # Recent reports
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute("""
+            rows = await self.db.aio.fetchall("""
                 SELECT timestamp, app_path, metrics, recommendations 
                 FROM performance_reports 
                 ORDER BY timestamp DESC 
                 LIMIT 10
             """)
             
-            for row in cursor.fetchall():
+            for row in rows:
                 dashboard['recent_reports'].append({
                     'timestamp': row[0],
                     'app_path': row[1],
@@ -702,8 +704,6 @@ class PerformanceIntelligenceAgent:
                     'recommendations': json.loads(row[3]) if row[3] else []
                 })
             
-            conn.close()
-            
         except Exception as e:
             logger.error(f"Dashboard generation failed: {e}")
             
@@ -8,13 +8,21 @@ import asyncio
 import json
 import os
 import shutil
+import threading
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Callable, Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass
 
 from ui_ux_quality_agent import UIUXQualityAgent, QualityReport
 
+# progress(percent, step): reports how far an app has got through generation and the quality gate
+ProgressCallback = Callable[[int, str], None]
+
+
+def _no_progress(percent: int, step: str):
+    pass
+
 @dataclass
 class AppGenerationResult:
     """Result from app generation process"""
@@ -47,7 +55,7 @@ class QualityGateSystem:
         }
         self.processing_history = []
 
-    async def validate_app(self, app_result: AppGenerationResult) -> QualityGateResult:
+    async def validate_app(self, app_result: AppGenerationResult, progress: ProgressCallback = _no_progress) -> QualityGateResult:
         """Validate generated app through quality gate"""
         start_time = datetime.now()
         print(f"\n🚪 Quality Gate: Validating {app_result.app_name} ({app_result.app_type})")
@@ -78,13 +86,23 @@ class QualityGateSystem:
         
         # Run quality analysis with auto-fix
         print("🔍 Running comprehensive quality analysis...")
+        max_iterations = self.quality_standards['auto_fix_attempts']
+        progress(25, 'Analyzing quality...')
+
+        def on_iteration(iteration: int, report: QualityReport):
+            step = 'Validating standards...' if report.passed else 'Applying fixes...'
+            progress(25 + 60 * iteration // max(max_iterations, 1),
+                     f"{step} (iteration {iteration}/{max_iterations}, score {report.overall_score:.1f})")
+
         final_report, fixed_code = await self.quality_agent.auto_fix_and_retry(
             html_content, 
             css_content, 
-            max_iterations=self.quality_standards['auto_fix_attempts']
+            max_iterations=max_iterations,
+            on_iteration=on_iteration
         )
         
         # Check if meets our higher standards
+        progress(85, 'Validating standards...')
         passed = self._meets_production_standards(final_report)
         
         processing_time = (datetime.now() - start_time).total_seconds()
@@ -175,12 +193,14 @@ class QualityGateSystem:
             major_count <= self.quality_standards['max_major_issues']
         )
 
-    async def process_with_quality_gate(self, app_result: AppGenerationResult, save_artifacts: bool = True) -> Tuple[bool, Dict[str, Any]]:
+    async def process_with_quality_gate(self, app_result: AppGenerationResult, save_artifacts: bool = True,
+                                        progress: ProgressCallback = _no_progress) -> Tuple[bool, Dict[str, Any]]:
         """Process app through complete quality gate pipeline"""
         # Validate through quality gate
-        gate_result = await self.validate_app(app_result)
+        gate_result = await self.validate_app(app_result, progress)
         
         if save_artifacts:
+            progress(90, 'Saving artifacts...')
             await self._save_processing_artifacts(app_result, gate_result)
         
         # Prepare response
@@ -247,6 +267,7 @@ class IntegratedAppGenerator:
     
     def __init__(self):
         self.quality_gate = QualityGateSystem()
+        self._stats_lock = threading.Lock()  # jobs finish on several handler threads
         self.generation_stats = {
             'total_apps': 0,
             'passed_quality_gate': 0,
@@ -254,7 +275,8 @@ class IntegratedAppGenerator:
             'average_score': 0.0
         }
 
-    async def generate_app_with_quality_control(self, app_type: str, requirements: str, app_name: str = None) -> Dict[str, Any]:
+    async def generate_app_with_quality_control(self, app_type: str, requirements: str, app_name: str = None,
+                                                progress: ProgressCallback = _no_progress) -> Dict[str, Any]:
         """Generate app with automatic quality control"""
         if not app_name:
             app_name = f"app_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
@@ -263,21 +285,23 @@ class IntegratedAppGenerator:
         print(f"📋 Requirements: {requirements}")
         
         # Generate app (simplified for demo)
+        progress(5, 'Generating code...')
         app_result = await self._generate_app_code(app_type, requirements, app_name)
         
         # Process through quality gate
-        passed, response = await self.quality_gate.process_with_quality_gate(app_result)
+        passed, response = await self.quality_gate.process_with_quality_gate(app_result, progress=progress)
         
         # Update stats
-        self.generation_stats['total_apps'] += 1
-        if passed:
-            self.generation_stats['passed_quality_gate'] += 1
-        else:
-            self.generation_stats['failed_quality_gate'] += 1
-        
-        if response['quality_score'] > 0:
-            total_scores = (self.generation_stats['average_score'] * (self.generation_stats['total_apps'] - 1) + response['quality_score'])
-            self.generation_stats['average_score'] = total_scores / self.generation_stats['total_apps']
+        with self._stats_lock:
+            self.generation_stats['total_apps'] += 1
+            if passed:
+                self.generation_stats['passed_quality_gate'] += 1
+            else:
+                self.generation_stats['failed_quality_gate'] += 1
+            
+            if response['quality_score'] > 0:
+                total_scores = (self.generation_stats['average_score'] * (self.generation_stats['total_apps'] - 1) + response['quality_score'])
+                self.generation_stats['average_score'] = total_scores / self.generation_stats['total_apps']
         
         # Prepare final response
         final_response = {
@@ -4,14 +4,14 @@ Comprehensive web dashboard for monitoring and controlling UI/UX quality gate sy
 """
 
 from flask import Flask, render_template, request, jsonify, send_file
+import asyncio
 import json
 import os
 from datetime import datetime, timedelta
 from pathlib import Path
-import asyncio
-from threading import Thread
 import time
 
+from job_queue import JobQueue, QueueFull
 from quality_gate_integration import IntegratedAppGenerator, QualityGateSystem
 from ui_ux_quality_agent import UIUXQualityAgent
 
@@ -25,7 +25,6 @@ quality_agent = UIUXQualityAgent()
 
 # In-memory storage for demo (would use database in production)
 quality_reports = []
-processing_queue = []
 system_metrics = {
     'total_processed': 0,
     'passed_count': 0,
@@ -54,7 +53,7 @@ def system_status():
         'total_apps': stats['total_apps_generated'],
         'pass_rate': stats['quality_gate_pass_rate'],
         'average_score': stats['average_quality_score'],
-        'queue_size': len(processing_queue),
+        'queue_size': job_queue.active_count(),
         'recent_reports': len(recent_reports),
         'system_health': 'excellent' if float(stats['quality_gate_pass_rate'].replace('%', '')) > 80 else 'good'
     })
@@ -87,20 +86,19 @@ def generate_app_api():
     requirements = data.get('requirements', '')
     app_name = data.get('app_name', f'app_{int(time.time())}')
     
-    # Add to processing queue
-    job_id = f"job_{int(time.time())}"
-    processing_queue.append({
-        'job_id': job_id,
-        'app_type': app_type,
-        'requirements': requirements,
-        'app_name': app_name,
-        'status': 'queued',
-        'created_at': datetime.now().isoformat()
-    })
-    
-    # Start async processing
-    thread = Thread(target=process_app_generation, args=(job_id, app_type, requirements, app_name))
-    thread.start()
+    # Add to processing queue; the worker pool picks it up
+    try:
+        job_id = job_queue.submit({
+            'app_type': app_type,
+            'requirements': requirements,
+            'app_name': app_name
+        })
+    except QueueFull as e:
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'retry_after': e.retry_after
+        }), 429, {'Retry-After': str(e.retry_after)}
     
     return jsonify({
         'success': True,
@@ -112,7 +110,7 @@ def generate_app_api():
 @app.route('/api/job-status/<job_id>')
 def get_job_status(job_id):
     """Get job processing status"""
-    job = next((j for j in processing_queue if j['job_id'] == job_id), None)
+    job = job_queue.get(job_id)
     
     if not job:
         return jsonify({'error': 'Job not found'}), 404
@@ -156,15 +154,9 @@ def analyze_code_api():
     html_content = data.get('html', '')
     css_content = data.get('css', '')
     
-    # Run async analysis in thread
-    def run_analysis():
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        return loop.run_until_complete(quality_agent.analyze_quality(html_content, css_content))
-    
-    thread = Thread(target=run_analysis)
-    thread.start()
-    thread.join()
+    # Analyzed in this request thread: the analysis is CPU-bound, so on the job queue's
+    # loop it would wait behind (and hold up) queued generation jobs
+    asyncio.run(quality_agent.analyze_quality(html_content, css_content))
     
     # For demo, return mock analysis
     return jsonify({
@@ -199,60 +191,36 @@ def view_report(report_id):
     
     return render_template('quality_report.html', report=report)
 
-def process_app_generation(job_id, app_type, requirements, app_name):
-    """Process app generation in background thread"""
-    # Update job status
-    job = next(j for j in processing_queue if j['job_id'] == job_id)
-    job['status'] = 'processing'
-    job['progress'] = 0
+async def process_app_generation(job, progress):
+    """Job handler: generate an app through the quality gate, reporting progress as it goes"""
+    app_name = job['app_name']
+    app_type = job['app_type']
+    result = await app_generator.generate_app_with_quality_control(
+        app_type, job['requirements'], app_name, progress=progress
+    )
     
-    try:
-        # Simulate processing steps
-        job['progress'] = 20
-        job['current_step'] = 'Generating code...'
-        time.sleep(1)
-        
-        job['progress'] = 40
-        job['current_step'] = 'Analyzing quality...'
-        time.sleep(1)
-        
-        job['progress'] = 60
-        job['current_step'] = 'Applying fixes...'
-        time.sleep(1)
-        
-        job['progress'] = 80
-        job['current_step'] = 'Validating standards...'
-        time.sleep(1)
-        
-        # Run actual app generation
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        result = loop.run_until_complete(
-            app_generator.generate_app_with_quality_control(app_type, requirements, app_name)
-        )
-        
-        job['progress'] = 100
-        job['status'] = 'completed'
-        job['result'] = result
-        job['completed_at'] = datetime.now().isoformat()
-        
-        # Add to quality reports
-        quality_reports.insert(0, {
-            'id': f"report_{int(time.time())}",
-            'app_name': app_name,
-            'app_type': app_type,
-            'quality_score': result['quality_score'],
-            'passed': result['quality_gate_passed'],
-            'timestamp': datetime.now().isoformat(),
-            'processing_time': result['processing_time'],
-            'iterations': result['auto_fix_iterations'],
-            'recommendations': result['recommendations']
-        })
-        
-    except Exception as e:
-        job['status'] = 'failed'
-        job['error'] = str(e)
-        job['completed_at'] = datetime.now().isoformat()
+    # Add to quality reports
+    quality_reports.insert(0, {
+        'id': f"report_{int(time.time() * 1000)}",
+        'app_name': app_name,
+        'app_type': app_type,
+        'quality_score': result['quality_score'],
+        'passed': result['quality_gate_passed'],
+        'timestamp': datetime.now().isoformat(),
+        'processing_time': result['processing_time'],
+        'iterations': result['auto_fix_iterations'],
+        'recommendations': result['recommendations']
+    })
+    
+    return result
+
+# Persistent job queue; QUALITY_GATE_WORKERS handler threads run jobs side by side
+job_queue = JobQueue(
+    os.getenv('QUALITY_GATE_JOBS_DB', 'quality_gate_jobs.db'),
+    process_app_generation,
+    workers=int(os.getenv('QUALITY_GATE_WORKERS', '2')),
+    max_pending=int(os.getenv('QUALITY_GATE_MAX_PENDING', '100'))
+)
 
 def create_templates():
     """Create HTML templates for the web interface"""
@@ -781,6 +749,8 @@ def create_templates():
                     startProgressTracking();
                     
                     showAlert('App generation started! Monitoring progress...', 'success');
+                } else if (response.status === 429) {
+                    showAlert(`Generation queue is full, please retry in ${result.retry_after}s`, 'error');
                 } else {
                     showAlert('Failed to start app generation', 'error');
                 }
@@ -0,0 +1,226 @@
+"""
+Scan Cache
+==========
+Persistent per-file analysis results for the code scanners
+(SecurityIntelligenceEngine, SmartErrorPreventionEngine, AICodeReviewEngine,
+PerformanceIntelligenceAgent), so repeated scans only re-analyze what changed.
+
+One row per (scope, path) holds the content hash and ruleset version the
+results were computed with; a row is reused only while both still match.
+Size and mtime are stored alongside so an untouched file is recognized from
+``stat()`` alone, without being read or hashed.  Whole directories are keyed
+by ``tree_fingerprint`` instead of a content hash.  Content passed in memory
+rather than read from disk is keyed by ``content_key`` (path plus hash).
+"""
+
+import hashlib
+import json
+import os
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional, Set, Tuple, Union
+
+from sqlite_pool import get_pool
+
+SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS scan_results (
+        scope TEXT NOT NULL,
+        path TEXT NOT NULL,
+        content_hash TEXT NOT NULL,
+        ruleset TEXT NOT NULL,
+        size INTEGER,
+        mtime_ns INTEGER,
+        results TEXT NOT NULL,
+        scanned_at TEXT NOT NULL,
+        PRIMARY KEY (scope, path)
+    )
+    """
+]
+
+# A file modified this recently may change again within the same mtime tick,
+# so its stat() is not trusted and the next lookup re-hashes it
+RACY_WINDOW_NS = 2_000_000_000
+
+
+def content_hash(content: Union[str, bytes]) -> str:
+    if isinstance(content, str):
+        content = content.encode('utf-8', 'surrogatepass')
+    return hashlib.blake2b(content, digest_size=16).hexdigest()
+
+
+def content_key(path: str, digest: str) -> str:
+    """Cache key for content that is not read from ``path`` on disk (e.g. generated files
+    passed in memory): the same relative path in different projects gets separate entries
+    instead of overwriting one another"""
+    return f"{path}\0{digest}"
+
+
+def ruleset_version(*parts: Any) -> str:
+    """Stable digest of the rule definitions an analyzer runs with"""
+    encoded = json.dumps(parts, sort_keys=True, default=lambda value: sorted(value)
+                         if isinstance(value, (set, frozenset)) else repr(value))
+    return hashlib.sha256(encoded.encode()).hexdigest()[:16]
+
+
+def read_source(path: str) -> Tuple[os.stat_result, bytes]:
+    """stat() then read, in that order, so a later change is never hidden behind the stored mtime"""
+    stat = os.stat(path)
+    with open(path, 'rb') as f:
+        return stat, f.read()
+
+
+def decode_source(data: bytes, errors: str = 'ignore') -> str:
+    """Same text as ``read_text(encoding='utf-8', errors=errors)`` (universal newlines)"""
+    return data.decode('utf-8', errors).replace('\r\n', '\n').replace('\r', '\n')
+
+
+def tree_fingerprint(root: str) -> str:
+    """Digest of every file's relative path, size and mtime under root (stat only, nothing is read)"""
+    entries = []
+    pending = [root]
+    while pending:
+        directory = pending.pop()
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        pending.append(entry.path)
+                    elif entry.is_file():
+                        stat = entry.stat()
+                        entries.append(f"{os.path.relpath(entry.path, root)}\0{stat.st_size}\0{stat.st_mtime_ns}")
+        except OSError:
+            entries.append(f"{os.path.relpath(directory, root)}\0unreadable")
+    entries.sort()
+    return content_hash('\n'.join(entries))
+
+
+class ScanCache:
+    """Results of one analyzer (``scope``) for one ruleset version
+
+    Results must be JSON-serializable; callers convert their issue objects to
+    dicts on ``put`` and back after ``get``.
+    """
+
+    def __init__(self, db_path: str, scope: str, ruleset: str):
+        self.db = get_pool(db_path, SCHEMA)
+        self.scope = scope
+        self.ruleset = ruleset
+        self.stats = {'hits': 0, 'misses': 0, 'rehashed': 0}
+        # Rows written with defer() and possibly not flushed yet, so this scan's
+        # own lookups see them without forcing a flush; cleared once it holds a batch
+        self._unflushed: Dict[str, tuple] = {}
+
+    def _row(self, path: str) -> Optional[tuple]:
+        row = self._unflushed.get(path)
+        if row is not None:
+            return row
+        return self.db.fetchone("""
+            SELECT content_hash, ruleset, size, mtime_ns, results
+            FROM scan_results WHERE scope = ? AND path = ?
+        """, (self.scope, path))
+
+    def _remember(self, path: str, row: tuple):
+        if len(self._unflushed) >= self.db.batch_size:
+            self.db.flush()
+            self._unflushed.clear()
+        self._unflushed[path] = row
+
+    def get(self, path: str, digest: str) -> Optional[Any]:
+        """Cached results for path if they were computed from content with this hash"""
+        row = self._row(path)
+        if row and row[0] == digest and row[1] == self.ruleset:
+            self.stats['hits'] += 1
+            return json.loads(row[4])
+        self.stats['misses'] += 1
+        return None
+
+    def get_file(self, path: str) -> Optional[Any]:
+        """Cached results for the file at path if it is unchanged on disk
+
+        An unchanged size and mtime is trusted; otherwise the file is re-hashed
+        and, if its content is the same, the stored stat is refreshed.
+        """
+        row = self._row(path)
+        if not row or row[1] != self.ruleset:
+            self.stats['misses'] += 1
+            return None
+
+        try:
+            stat = os.stat(path)
+            if row[3] is not None and (stat.st_size, stat.st_mtime_ns) == (row[2], row[3]):
+                self.stats['hits'] += 1
+                return json.loads(row[4])
+
+            stat, data = read_source(path)
+        except OSError:
+            self.stats['misses'] += 1
+            return None
+
+        if content_hash(data) != row[0]:
+            self.stats['misses'] += 1
+            return None
+
+        self.stats['hits'] += 1
+        self.stats['rehashed'] += 1
+        size, mtime_ns = self._trusted_stat(stat)
+        self.db.defer("UPDATE scan_results SET size = ?, mtime_ns = ? WHERE scope = ? AND path = ?",
+                      (size, mtime_ns, self.scope, path))
+        self._remember(path, (row[0], row[1], size, mtime_ns, row[4]))
+        return json.loads(row[4])
+
+    def put(self, path: str, digest: str, results: Any, stat: Optional[os.stat_result] = None):
+        """Store results computed from content with this hash
+
+        ``stat`` must be taken before the content was read (see ``read_source``);
+        without it the entry can only be matched by hash.
+        """
+        size, mtime_ns = self._trusted_stat(stat) if stat is not None else (None, None)
+        encoded = json.dumps(results)
+        self.db.defer("""
+            INSERT OR REPLACE INTO scan_results
+            (scope, path, content_hash, ruleset, size, mtime_ns, results, scanned_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, (self.scope, path, digest, self.ruleset, size, mtime_ns, encoded,
+              datetime.now().isoformat()))
+        self._remember(path, (digest, self.ruleset, size, mtime_ns, encoded))
+
+    def prune(self, prefix: str, live_paths: Iterable[str]) -> int:
+        """Drop entries under prefix for files that no longer exist; returns how many"""
+        live = set(live_paths)
+        self.db.flush()
+        self._unflushed.clear()
+        # Range scan over the primary key: every string starting with prefix sorts before prefix + U+10FFFF
+        stale = [(self.scope, path) for (path,) in self.db.fetchall(
+            "SELECT path FROM scan_results WHERE scope = ? AND path >= ? AND path < ?",
+            (self.scope, prefix, prefix + '\U0010ffff')
+        ) if path not in live]
+        if stale:
+            self.db.executemany("DELETE FROM scan_results WHERE scope = ? AND path = ?", stale)
+        return len(stale)
+
+    def hashes(self, prefix: str) -> Set[str]:
+        """Content hashes of the entries under prefix"""
+        self.db.flush()
+        self._unflushed.clear()
+        return {digest for (digest,) in self.db.fetchall(
+            "SELECT content_hash FROM scan_results WHERE scope = ? AND path >= ? AND path < ?",
+            (self.scope, prefix, prefix + '\U0010ffff')
+        )}
+
+    def expire(self, max_age_seconds: float) -> int:
+        """Drop entries of this scope scanned more than max_age_seconds ago; returns how many
+
+        For content-keyed entries (see ``content_key``), which are never pruned by path.
+        """
+        self.db.flush()
+        self._unflushed.clear()
+        cutoff = datetime.fromtimestamp(time.time() - max_age_seconds).isoformat()
+        return self.db.execute("DELETE FROM scan_results WHERE scope = ? AND scanned_at < ?",
+                               (self.scope, cutoff)).rowcount
+
+    @staticmethod
+    def _trusted_stat(stat: os.stat_result) -> Tuple[int, Optional[int]]:
+        if time.time_ns() - stat.st_mtime_ns < RACY_WINDOW_NS:
+            return stat.st_size, None
+        return stat.st_size, stat.st_mtime_ns
@@ -16,11 +16,55 @@ from cryptography.fernet import Fernet
 from cryptography.hazmat.primitives import hashes, serialization
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 from cryptography.hazmat.primitives.asymmetric import rsa, padding
-import sqlite3
 import logging
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 import re
 from pathlib import Path
+import threading
+import time
+import atexit
+import weakref
+
+from sqlite_pool import get_pool
+
+VAULT_KDF_SALT = b'secure_vault_salt_2025'
+BACKUP_KDF_SALT = b'backup_salt_2025'
+KDF_ITERATIONS = 100000
+
+# Derived keys are held for the process lifetime so PBKDF2 runs once per password/salt
+_derived_keys: Dict[bytes, bytes] = {}
+_derived_keys_lock = threading.Lock()
+
+
+def derive_key(password: str, salt: bytes, iterations: int = KDF_ITERATIONS) -> bytes:
+    """PBKDF2-SHA256 Fernet key for password/salt, computed once per process"""
+    cache_key = hashlib.sha256(salt + b'\0' + str(iterations).encode() + b'\0' + password.encode()).digest()
+    with _derived_keys_lock:
+        cached = _derived_keys.get(cache_key)
+    if cached is not None:
+        return cached
+    
+    kdf = PBKDF2HMAC(
+        algorithm=hashes.SHA256(),
+        length=32,
+        salt=salt,
+        iterations=iterations,
+    )
+    derived = base64.urlsafe_b64encode(kdf.derive(password.encode()))
+    with _derived_keys_lock:
+        _derived_keys[cache_key] = derived
+    return derived
+
+
+# Usage counters are flushed in the background; flush whatever is left on shutdown
+_open_vaults: "weakref.WeakSet[SecureVault]" = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_open_vaults():
+    for vault in list(_open_vaults):
+        vault.flush_usage_stats()
+
 
 class SecureVault:
     """
@@ -37,7 +81,8 @@ class SecureVault:
     - Secure backup/restore
     """
     
-    def __init__(self, vault_path: str = None, master_password: str = None):
+    def __init__(self, vault_path: str = None, master_password: str = None,
+                 secret_cache_ttl: float = 30.0, usage_flush_interval: float = 5.0):
         self.vault_path = vault_path or os.path.join(os.getcwd(), "secure_vault")
         self.db_path = os.path.join(self.vault_path, "vault.db")
         self.keys_path = os.path.join(self.vault_path, "keys")
@@ -58,6 +103,16 @@ class SecureVault:
         # Initialize database
         self._initialize_database()
         
+        # Hot-path state: short-TTL cache of decrypted secrets and in-memory usage counters
+        self.secret_cache_ttl = secret_cache_ttl
+        self.usage_flush_interval = usage_flush_interval
+        self._secret_cache: Dict[Tuple[str, str], Tuple[float, str]] = {}
+        self._pending_usage: Dict[Tuple[str, str], List[Any]] = {}
+        self._usage_lock = threading.Lock()
+        self._usage_flusher: Optional[threading.Thread] = None
+        self._closed = False
+        _open_vaults.add(self)
+        
         self.logger.info("Secure Vault initialized successfully")
     
     def _setup_logging(self):
@@ -75,7 +130,7 @@ class SecureVault:
         self.logger = logging.getLogger('SecureVault')
     
     def _initialize_encryption(self):
-        """Initialize encryption keys and ciphers"""
+        """Initialize encryption keys and ciphers (the RSA keypair is loaded lazily)"""
         try:
             # Generate or load master key
             master_key_file = os.path.join(self.keys_path, "master.key")
@@ -85,14 +140,8 @@ class SecureVault:
                 with open(master_key_file, 'rb') as f:
                     encrypted_key = f.read()
                 
-                # Derive key from password
-                kdf = PBKDF2HMAC(
-                    algorithm=hashes.SHA256(),
-                    length=32,
-                    salt=b'secure_vault_salt_2025',
-                    iterations=100000,
-                )
-                password_key = base64.urlsafe_b64encode(kdf.derive(self.master_password.encode()))
+                # Derive key from password (cached for the process lifetime)
+                password_key = derive_key(self.master_password, VAULT_KDF_SALT)
                 
                 # Decrypt master key
                 f = Fernet(password_key)
@@ -103,13 +152,7 @@ class SecureVault:
                 self.master_key = Fernet.generate_key()
                 
                 # Encrypt master key with password
-                kdf = PBKDF2HMAC(
-                    algorithm=hashes.SHA256(),
-                    length=32,
-                    salt=b'secure_vault_salt_2025',
-                    iterations=100000,
-                )
-                password_key = base64.urlsafe_b64encode(kdf.derive(self.master_password.encode()))
+                password_key = derive_key(self.master_password, VAULT_KDF_SALT)
                 
                 f = Fernet(password_key)
                 encrypted_key = f.encrypt(self.master_key)
@@ -128,27 +171,69 @@ class SecureVault:
             # Initialize Fernet cipher
             self.cipher = Fernet(self.master_key)
             
-            # Generate RSA key pair for asymmetric encryption
-            self.private_key = rsa.generate_private_key(
-                public_exponent=65537,
-                key_size=4096,
-            )
-            self.public_key = self.private_key.public_key()
+            # RSA keypair is generated/loaded on first asymmetric use (see private_key)
+            self._private_key = None
+            self._rsa_lock = threading.Lock()
             
-            self.logger.info("Encryption system initialized with AES-256 and RSA-4096")
+            self.logger.info("Encryption system initialized with AES-256 (RSA-4096 on demand)")
             
         except Exception as e:
             self.logger.error(f"Failed to initialize encryption: {e}")
             raise
     
+    @property
+    def private_key(self) -> rsa.RSAPrivateKey:
+        """RSA-4096 private key, loaded from keys_path or generated once and persisted encrypted"""
+        if self._private_key is None:
+            with self._rsa_lock:
+                if self._private_key is None:
+                    self._private_key = self._load_or_create_rsa_key()
+        return self._private_key
+    
+    @property
+    def public_key(self) -> rsa.RSAPublicKey:
+        return self.private_key.public_key()
+    
+    def _load_or_create_rsa_key(self) -> rsa.RSAPrivateKey:
+        """Load the persisted keypair; without a master password the keypair is in-memory only"""
+        rsa_key_file = os.path.join(self.keys_path, "rsa_private.pem.enc")
+        persistent = bool(self.master_password)
+        
+        if persistent and os.path.exists(rsa_key_file):
+            with open(rsa_key_file, 'rb') as f:
+                pem = self.cipher.decrypt(f.read())
+            # Fernet already authenticated the key material, so skip the slow RSA consistency check
+            private_key = serialization.load_pem_private_key(pem, password=None,
+                                                             unsafe_skip_rsa_key_validation=True)
+            self.logger.info("RSA keypair loaded")
+            return private_key
+        
+        private_key = rsa.generate_private_key(
+            public_exponent=65537,
+            key_size=4096,
+        )
+        
+        if persistent:
+            pem = private_key.private_bytes(
+                encoding=serialization.Encoding.PEM,
+                format=serialization.PrivateFormat.PKCS8,
+                encryption_algorithm=serialization.NoEncryption(),
+            )
+            tmp_file = f"{rsa_key_file}.tmp"
+            fd = os.open(tmp_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'wb') as f:
+                f.write(self.cipher.encrypt(pem))
+            os.replace(tmp_file, rsa_key_file)
+            self.logger.info("New RSA keypair generated and saved")
+        
+        return private_key
+    
     def _initialize_database(self):
         """Initialize SQLite database with secure schema"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
             # Create tables
-            cursor.execute("""
+            self.db = get_pool(self.db_path, [
+                """
                 CREATE TABLE IF NOT EXISTS credentials (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     name TEXT UNIQUE NOT NULL,
@@ -163,9 +248,8 @@ class SecureVault:
                     expires_at TIMESTAMP,
                     is_active BOOLEAN DEFAULT 1
                 )
-            """)
-            
-            cursor.execute("""
+                """,
+                """
                 CREATE TABLE IF NOT EXISTS users (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     username TEXT UNIQUE NOT NULL,
@@ -179,9 +263,8 @@ class SecureVault:
                     failed_attempts INTEGER DEFAULT 0,
                     locked_until TIMESTAMP
                 )
-            """)
-            
-            cursor.execute("""
+                """,
+                """
                 CREATE TABLE IF NOT EXISTS access_logs (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     user_id INTEGER,
@@ -193,9 +276,8 @@ class SecureVault:
                     timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                     details TEXT
                 )
-            """)
-            
-            cursor.execute("""
+                """,
+                """
                 CREATE TABLE IF NOT EXISTS api_keys (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     name TEXT UNIQUE NOT NULL,
@@ -210,10 +292,8 @@ class SecureVault:
                     usage_count INTEGER DEFAULT 0,
                     is_active BOOLEAN DEFAULT 1
                 )
-            """)
-            
-            conn.commit()
-            conn.close()
+                """
+            ])
             
             self.logger.info("Database initialized successfully")
             
@@ -232,17 +312,11 @@ class SecureVault:
             salt = bcrypt.gensalt()
             password_hash = bcrypt.hashpw(password.encode('utf-8'), salt)
             
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute("""
+            self.db.execute("""
                 INSERT INTO users (username, email, password_hash, salt, role)
                 VALUES (?, ?, ?, ?, ?)
             """, (username, email, password_hash.decode('utf-8'), salt.decode('utf-8'), role))
             
-            conn.commit()
-            conn.close()
-            
             self.logger.info(f"User {username} created successfully with role {role}")
             return True
             
@@ -253,16 +327,11 @@ class SecureVault:
     def authenticate_user(self, username: str, password: str) -> Dict[str, Any]:
         """Authenticate user with secure password verification"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute("""
+            user = self.db.fetchone("""
                 SELECT id, username, email, password_hash, role, is_active, failed_attempts, locked_until
                 FROM users WHERE username = ?
             """, (username,))
             
-            user = cursor.fetchone()
-            
             if not user:
                 self.logger.warning(f"Authentication failed: User {username} not found")
                 return {"success": False, "message": "Invalid credentials"}
@@ -282,15 +351,12 @@ class SecureVault:
             # Verify password
             if bcrypt.checkpw(password.encode('utf-8'), password_hash.encode('utf-8')):
                 # Reset failed attempts and update last login
-                cursor.execute("""
+                self.db.execute("""
                     UPDATE users 
                     SET last_login = CURRENT_TIMESTAMP, failed_attempts = 0, locked_until = NULL
                     WHERE id = ?
                 """, (user_id,))
                 
-                conn.commit()
-                conn.close()
-                
                 self.logger.info(f"User {username} authenticated successfully")
                 return {
                     "success": True,
@@ -309,15 +375,12 @@ class SecureVault:
                 if failed_attempts >= 5:
                     locked_until = datetime.now() + timedelta(minutes=30)
                 
-                cursor.execute("""
+                self.db.execute("""
                     UPDATE users 
                     SET failed_attempts = ?, locked_until = ?
                     WHERE id = ?
                 """, (failed_attempts, locked_until, user_id))
                 
-                conn.commit()
-                conn.close()
-                
                 self.logger.warning(f"Authentication failed: Invalid password for user {username}")
                 return {"success": False, "message": "Invalid credentials"}
                 
@@ -335,19 +398,14 @@ class SecureVault:
             # Create hash for integrity check
             hash_check = hashlib.sha256(api_key.encode('utf-8')).hexdigest()
             
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute("""
+            self.db.execute("""
                 INSERT OR REPLACE INTO api_keys 
                 (name, service, encrypted_key, hash_check, permissions, rate_limit, expires_at)
                 VALUES (?, ?, ?, ?, ?, ?, ?)
             """, (name, service, encrypted_key, hash_check, 
                   json.dumps(permissions) if permissions else None,
                   rate_limit, expires_at))
-            
-            conn.commit()
-            conn.close()
+            self._invalidate_secret('api_keys', name)
             
             self.logger.info(f"API key {name} for service {service} stored successfully")
             return True
@@ -357,18 +415,18 @@ class SecureVault:
             return False
     
     def get_api_key(self, name: str) -> Optional[str]:
-        """Retrieve and decrypt API key"""
+        """Retrieve and decrypt API key (served from memory while cached)"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            cached = self._get_cached_secret('api_keys', name)
+            if cached is not None:
+                self._record_usage('api_keys', name)
+                return cached
             
-            cursor.execute("""
+            result = self.db.fetchone("""
                 SELECT encrypted_key, hash_check, expires_at, is_active
                 FROM api_keys WHERE name = ?
             """, (name,))
             
-            result = cursor.fetchone()
-            
             if not result:
                 self.logger.warning(f"API key {name} not found")
                 return None
@@ -393,15 +451,9 @@ class SecureVault:
                 self.logger.error(f"API key {name} integrity check failed")
                 return None
             
-            # Update usage statistics
-            cursor.execute("""
-                UPDATE api_keys 
-                SET last_used = CURRENT_TIMESTAMP, usage_count = usage_count + 1
-                WHERE name = ?
-            """, (name,))
-            
-            conn.commit()
-            conn.close()
+            # Update usage statistics (flushed in batches)
+            self._cache_secret('api_keys', name, decrypted_key, expires_at)
+            self._record_usage('api_keys', name)
             
             self.logger.info(f"API key {name} retrieved successfully")
             return decrypted_key
@@ -421,18 +473,13 @@ class SecureVault:
             # Create hash for integrity check
             hash_check = hashlib.sha256(data_json.encode('utf-8')).hexdigest()
             
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute("""
+            self.db.execute("""
                 INSERT OR REPLACE INTO credentials 
                 (name, type, encrypted_data, hash_check, tags, expires_at)
                 VALUES (?, ?, ?, ?, ?, ?)
             """, (name, credential_type, encrypted_data, hash_check,
                   json.dumps(tags) if tags else None, expires_at))
-            
-            conn.commit()
-            conn.close()
+            self._invalidate_secret('credentials', name)
             
             self.logger.info(f"Credential {name} of type {credential_type} stored successfully")
             return True
@@ -442,18 +489,18 @@ class SecureVault:
             return False
     
     def get_credential(self, name: str) -> Optional[Dict[str, Any]]:
-        """Retrieve and decrypt credentials"""
+        """Retrieve and decrypt credentials (served from memory while cached)"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            cached = self._get_cached_secret('credentials', name)
+            if cached is not None:
+                self._record_usage('credentials', name)
+                return json.loads(cached)
             
-            cursor.execute("""
+            result = self.db.fetchone("""
                 SELECT encrypted_data, hash_check, expires_at, is_active
                 FROM credentials WHERE name = ?
             """, (name,))
             
-            result = cursor.fetchone()
-            
             if not result:
                 self.logger.warning(f"Credential {name} not found")
                 return None
@@ -478,15 +525,9 @@ class SecureVault:
                 self.logger.error(f"Credential {name} integrity check failed")
                 return None
             
-            # Update access statistics
-            cursor.execute("""
-                UPDATE credentials 
-                SET accessed_at = CURRENT_TIMESTAMP, access_count = access_count + 1
-                WHERE name = ?
-            """, (name,))
-            
-            conn.commit()
-            conn.close()
+            # Update access statistics (flushed in batches)
+            self._cache_secret('credentials', name, decrypted_data, expires_at)
+            self._record_usage('credentials', name)
             
             credential_data = json.loads(decrypted_data)
             self.logger.info(f"Credential {name} retrieved successfully")
@@ -499,25 +540,21 @@ class SecureVault:
     def list_credentials(self, credential_type: str = None) -> List[Dict[str, Any]]:
         """List stored credentials (without sensitive data)"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            self.flush_usage_stats()
             
             if credential_type:
-                cursor.execute("""
+                results = self.db.fetchall("""
                     SELECT name, type, created_at, updated_at, accessed_at, 
                            access_count, tags, expires_at, is_active
                     FROM credentials WHERE type = ? AND is_active = 1
                 """, (credential_type,))
             else:
-                cursor.execute("""
+                results = self.db.fetchall("""
                     SELECT name, type, created_at, updated_at, accessed_at, 
                            access_count, tags, expires_at, is_active
                     FROM credentials WHERE is_active = 1
                 """)
             
-            results = cursor.fetchall()
-            conn.close()
-            
             credentials = []
             for row in results:
                 credentials.append({
@@ -541,25 +578,21 @@ class SecureVault:
     def list_api_keys(self, service: str = None) -> List[Dict[str, Any]]:
         """List stored API keys (without sensitive data)"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            self.flush_usage_stats()
             
             if service:
-                cursor.execute("""
+                results = self.db.fetchall("""
                     SELECT name, service, permissions, rate_limit, expires_at,
                            created_at, last_used, usage_count, is_active
                     FROM api_keys WHERE service = ? AND is_active = 1
                 """, (service,))
             else:
-                cursor.execute("""
+                results = self.db.fetchall("""
                     SELECT name, service, permissions, rate_limit, expires_at,
                            created_at, last_used, usage_count, is_active
                     FROM api_keys WHERE is_active = 1
                 """)
             
-            results = cursor.fetchall()
-            conn.close()
-            
             api_keys = []
             for row in results:
                 api_keys.append({
@@ -580,6 +613,95 @@ class SecureVault:
             self.logger.error(f"Failed to list API keys: {e}")
             return []
     
+    def _get_cached_secret(self, table: str, name: str) -> Optional[str]:
+        entry = self._secret_cache.get((table, name))
+        if entry is None:
+            return None
+        if time.monotonic() >= entry[0]:
+            self._secret_cache.pop((table, name), None)
+            return None
+        return entry[1]
+    
+    def _cache_secret(self, table: str, name: str, plaintext: str, expires_at: Optional[str]):
+        """Cache a decrypted secret for secret_cache_ttl seconds, never past its own expiry"""
+        if self.secret_cache_ttl <= 0:
+            return
+        ttl = self.secret_cache_ttl
+        if expires_at:
+            ttl = min(ttl, (datetime.fromisoformat(expires_at) - datetime.now()).total_seconds())
+        self._secret_cache[(table, name)] = (time.monotonic() + ttl, plaintext)
+    
+    def _invalidate_secret(self, table: str, name: str):
+        self._secret_cache.pop((table, name), None)
+    
+    def _record_usage(self, table: str, name: str):
+        """Count a read in memory; the background flusher writes the totals"""
+        used_at = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')  # same format as CURRENT_TIMESTAMP
+        with self._usage_lock:
+            pending = self._pending_usage.get((table, name))
+            if pending is None:
+                self._pending_usage[(table, name)] = [1, used_at]
+            else:
+                pending[0] += 1
+                pending[1] = used_at
+            
+            if self._usage_flusher is None and not self._closed:
+                self._usage_flusher = threading.Thread(target=self._usage_flush_loop,
+                                                       args=(weakref.ref(self), self.usage_flush_interval),
+                                                       daemon=True, name="vault-usage-flush")
+                self._usage_flusher.start()
+    
+    @staticmethod
+    def _usage_flush_loop(vault_ref: "weakref.ref[SecureVault]", interval: float):
+        # Holds only a weak reference between flushes, so an unused vault can still be collected
+        while True:
+            time.sleep(interval)
+            vault = vault_ref()
+            if vault is None or vault._closed:
+                return
+            vault.flush_usage_stats()
+            del vault
+    
+    def close(self):
+        """Flush usage counters and stop the background flusher"""
+        self._closed = True
+        self.flush_usage_stats()
+        self.db.flush()
+        _open_vaults.discard(self)
+    
+    def flush_usage_stats(self) -> int:
+        """Write accumulated usage counters in one transaction; returns how many rows were updated"""
+        with self._usage_lock:
+            pending, self._pending_usage = self._pending_usage, {}
+        if not pending:
+            return 0
+        
+        api_keys = [(used_at, count, name) for (table, name), (count, used_at) in pending.items()
+                    if table == 'api_keys']
+        credentials = [(used_at, count, name) for (table, name), (count, used_at) in pending.items()
+                       if table == 'credentials']
+        try:
+            with self.db.transaction() as conn:
+                conn.executemany("""
+                    UPDATE api_keys 
+                    SET last_used = ?, usage_count = usage_count + ?
+                    WHERE name = ?
+                """, api_keys)
+                conn.executemany("""
+                    UPDATE credentials 
+                    SET accessed_at = ?, access_count = access_count + ?
+                    WHERE name = ?
+                """, credentials)
+        except Exception as e:
+            # Put the counts back so the next flush retries them
+            with self._usage_lock:
+                for key, (count, used_at) in pending.items():
+                    current = self._pending_usage.setdefault(key, [0, used_at])
+                    current[0] += count
+            self.logger.error(f"Failed to flush usage statistics: {e}")
+            return 0
+        return len(pending)
+    
     def rotate_key(self, name: str) -> bool:
         """Rotate encryption key for specific credential"""
         try:
@@ -597,17 +719,12 @@ class SecureVault:
             encrypted_data = new_cipher.encrypt(data_json.encode('utf-8'))
             hash_check = hashlib.sha256(data_json.encode('utf-8')).hexdigest()
             
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute("""
+            self.db.execute("""
                 UPDATE credentials 
                 SET encrypted_data = ?, hash_check = ?, updated_at = CURRENT_TIMESTAMP
                 WHERE name = ?
             """, (encrypted_data, hash_check, name))
-            
-            conn.commit()
-            conn.close()
+            self._invalidate_secret('credentials', name)
             
             self.logger.info(f"Key rotated successfully for credential {name}")
             return True
@@ -623,16 +740,13 @@ class SecureVault:
             os.makedirs(backup_path, exist_ok=True)
             
             # Generate backup encryption key from password
-            kdf = PBKDF2HMAC(
-                algorithm=hashes.SHA256(),
-                length=32,
-                salt=b'backup_salt_2025',
-                iterations=100000,
-            )
-            backup_key = base64.urlsafe_b64encode(kdf.derive(password.encode()))
+            backup_key = derive_key(password, BACKUP_KDF_SALT)
             backup_cipher = Fernet(backup_key)
             
-            # Backup database
+            # Backup database (write pending usage counters and fold the WAL into the main file first)
+            self.flush_usage_stats()
+            self.db.flush()
+            self.db.fetchone("PRAGMA wal_checkpoint(TRUNCATE)")
             with open(self.db_path, 'rb') as f:
                 db_data = f.read()
             
@@ -685,29 +799,20 @@ class SecureVault:
     def get_vault_stats(self) -> Dict[str, Any]:
         """Get vault statistics and health information"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
             # Count credentials
-            cursor.execute("SELECT COUNT(*) FROM credentials WHERE is_active = 1")
-            total_credentials = cursor.fetchone()[0]
+            total_credentials = self.db.fetchvalue("SELECT COUNT(*) FROM credentials WHERE is_active = 1")
             
             # Count API keys
-            cursor.execute("SELECT COUNT(*) FROM api_keys WHERE is_active = 1")
-            total_api_keys = cursor.fetchone()[0]
+            total_api_keys = self.db.fetchvalue("SELECT COUNT(*) FROM api_keys WHERE is_active = 1")
             
             # Count users
-            cursor.execute("SELECT COUNT(*) FROM users WHERE is_active = 1")
-            total_users = cursor.fetchone()[0]
+            total_users = self.db.fetchvalue("SELECT COUNT(*) FROM users WHERE is_active = 1")
             
             # Get recent access logs
-            cursor.execute("""
+            recent_access = self.db.fetchvalue("""
                 SELECT COUNT(*) FROM access_logs 
                 WHERE timestamp > datetime('now', '-24 hours')
             """)
-            recent_access = cursor.fetchone()[0]
-            
-            conn.close()
             
             return {
                 "total_credentials": total_credentials,
@@ -9,7 +9,6 @@ import asyncio
 import json
 import logging
 import os
-import sqlite3
 import hashlib
 import re
 import base64
@@ -20,7 +19,14 @@ from typing import Dict, List, Optional, Tuple, Any, Set
 import subprocess
 import secrets
 import uuid
+import threading
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from pattern_scanner import PatternScanner
+from scan_cache import ScanCache, content_hash, decode_source, read_source, ruleset_version
+from sqlite_pool import get_pool
 
 # Configure logging
 logging.basicConfig(
@@ -29,6 +35,36 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# File types read by each rule set
+VULNERABILITY_EXTENSIONS = {'.html', '.js', '.css', '.py', '.php'}
+THREAT_CONTENT_EXTENSIONS = {'.html', '.js', '.php', '.py'}
+CONTENT_EXTENSIONS = VULNERABILITY_EXTENSIONS | THREAT_CONTENT_EXTENSIONS
+
+# Bump when the analysis code (not the pattern tables) changes, to invalidate cached scan results
+SECURITY_RULESET_REVISION = 1
+
+# Trees smaller than this are scanned inline; process startup would cost more than it saves
+PARALLEL_SCAN_MIN_FILES = int(os.getenv("SECURITY_SCAN_PARALLEL_MIN_FILES", "200"))
+SCAN_BATCH_SIZE = 64
+
+
+def walk_files(app_dir: Path) -> List[Path]:
+    """Every regular file under app_dir, collected in one scandir pass"""
+    files = []
+    pending = [str(app_dir)]
+    while pending:
+        try:
+            with os.scandir(pending.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        pending.append(entry.path)
+                    elif entry.is_file():
+                        files.append(Path(entry.path))
+        except OSError as e:
+            logger.warning(f"Skipping unreadable directory during scan: {e}")
+    files.sort()
+    return files
+
 class SecurityVulnerability:
     """Represents a security vulnerability"""
     
@@ -58,13 +94,27 @@ class SecurityVulnerability:
             'fix_suggestion': self.fix_suggestion,
             'auto_fixable': self.auto_fixable
         }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'SecurityVulnerability':
+        vulnerability = cls(data['vuln_id'], data['severity'], data['category'], data['description'],
+                            data['file_path'], data['line_number'])
+        vulnerability.detected_at = datetime.fromisoformat(data['detected_at'])
+        vulnerability.fixed = data['fixed']
+        vulnerability.fix_suggestion = data['fix_suggestion']
+        vulnerability.auto_fixable = data['auto_fixable']
+        return vulnerability
 
 class VulnerabilityScanner:
     """Scans code for security vulnerabilities"""
     
-    def __init__(self):
-        self.vulnerability_patterns = self._load_vulnerability_patterns()
+    def __init__(self, vulnerability_patterns: Optional[Dict[str, Dict]] = None):
+        self.vulnerability_patterns = vulnerability_patterns or self._load_vulnerability_patterns()
         self.security_headers = self._load_security_headers()
+        self.pattern_scanner = PatternScanner(
+            {vuln_type: info['patterns'] for vuln_type, info in self.vulnerability_patterns.items()},
+            re.IGNORECASE | re.MULTILINE
+        )
         
     def _load_vulnerability_patterns(self) -> Dict[str, Dict]:
         """Load vulnerability detection patterns"""
@@ -163,11 +213,10 @@ class VulnerabilityScanner:
             app_dir = Path(app_path)
             
             # Scan different file types
-            for file_pattern in ['*.html', '*.js', '*.css', '*.py', '*.php']:
-                for file_path in app_dir.rglob(file_pattern):
-                    if file_path.is_file():
-                        file_vulns = await self._scan_file(file_path)
-                        vulnerabilities.extend(file_vulns)
+            for file_path in walk_files(app_dir):
+                if file_path.suffix in VULNERABILITY_EXTENSIONS:
+                    file_vulns = await self._scan_file(file_path)
+                    vulnerabilities.extend(file_vulns)
             
             # Check for missing security configurations
             config_vulns = await self._check_security_configuration(app_dir)
@@ -182,37 +231,35 @@ class VulnerabilityScanner:
     
     async def _scan_file(self, file_path: Path) -> List[SecurityVulnerability]:
         """Scan individual file for vulnerabilities"""
-        vulnerabilities = []
-        
         try:
             content = file_path.read_text(encoding='utf-8', errors='ignore')
-            lines = content.splitlines()
-            
-            for vuln_type, vuln_info in self.vulnerability_patterns.items():
-                for pattern in vuln_info['patterns']:
-                    matches = re.finditer(pattern, content, re.IGNORECASE | re.MULTILINE)
-                    
-                    for match in matches:
-                        # Find line number
-                        line_num = content[:match.start()].count('\n') + 1
-                        
-                        vuln_id = f"{vuln_type}_{hashlib.md5(str(match.group()).encode()).hexdigest()[:8]}"
-                        
-                        vulnerability = SecurityVulnerability(
-                            vuln_id,
-                            vuln_info['severity'],
-                            vuln_type,
-                            vuln_info['description'],
-                            str(file_path),
-                            line_num
-                        )
-                        vulnerability.fix_suggestion = vuln_info['fix']
-                        vulnerability.auto_fixable = vuln_type in ['insecure_random', 'unsafe_url']
-                        
-                        vulnerabilities.append(vulnerability)
-            
+            return self.scan_content(file_path, content)
         except Exception as e:
             logger.error(f"File scan failed for {file_path}: {e}")
+            return []
+    
+    def scan_content(self, file_path: Path, content: str) -> List[SecurityVulnerability]:
+        """Vulnerabilities in already-read file content"""
+        vulnerabilities = []
+        
+        for hit in self.pattern_scanner.scan(content):
+            vuln_type = hit.rule
+            vuln_info = self.vulnerability_patterns[vuln_type]
+            
+            vuln_id = f"{vuln_type}_{hashlib.md5(str(hit.match.group()).encode()).hexdigest()[:8]}"
+            
+            vulnerability = SecurityVulnerability(
+                vuln_id,
+                vuln_info['severity'],
+                vuln_type,
+                vuln_info['description'],
+                str(file_path),
+                hit.line_number
+            )
+            vulnerability.fix_suggestion = vuln_info['fix']
+            vulnerability.auto_fixable = vuln_type in ['insecure_random', 'unsafe_url']
+            
+            vulnerabilities.append(vulnerability)
             
         return vulnerabilities
     
@@ -226,36 +273,43 @@ class VulnerabilityScanner:
             
             for html_file in html_files:
                 content = html_file.read_text(encoding='utf-8', errors='ignore')
-                
-                # Check for missing meta security tags
-                if '<meta http-equiv="Content-Security-Policy"' not in content:
-                    vulnerability = SecurityVulnerability(
-                        f"missing_csp_{html_file.name}",
-                        'medium',
-                        'missing_security_header',
-                        'Missing Content Security Policy',
-                        str(html_file)
-                    )
-                    vulnerability.fix_suggestion = 'Add CSP meta tag to prevent XSS attacks'
-                    vulnerability.auto_fixable = True
-                    vulnerabilities.append(vulnerability)
-                
-                if '<meta http-equiv="X-Content-Type-Options"' not in content:
-                    vulnerability = SecurityVulnerability(
-                        f"missing_nosniff_{html_file.name}",
-                        'low',
-                        'missing_security_header',
-                        'Missing X-Content-Type-Options header',
-                        str(html_file)
-                    )
-                    vulnerability.fix_suggestion = 'Add X-Content-Type-Options: nosniff'
-                    vulnerability.auto_fixable = True
-                    vulnerabilities.append(vulnerability)
+                vulnerabilities.extend(self.check_html_configuration(html_file, content))
             
         except Exception as e:
             logger.error(f"Security configuration check failed: {e}")
             
         return vulnerabilities
+    
+    def check_html_configuration(self, html_file: Path, content: str) -> List[SecurityVulnerability]:
+        """Missing security meta tags in a top-level HTML page"""
+        vulnerabilities = []
+        
+        # Check for missing meta security tags
+        if '<meta http-equiv="Content-Security-Policy"' not in content:
+            vulnerability = SecurityVulnerability(
+                f"missing_csp_{html_file.name}",
+                'medium',
+                'missing_security_header',
+                'Missing Content Security Policy',
+                str(html_file)
+            )
+            vulnerability.fix_suggestion = 'Add CSP meta tag to prevent XSS attacks'
+            vulnerability.auto_fixable = True
+            vulnerabilities.append(vulnerability)
+        
+        if '<meta http-equiv="X-Content-Type-Options"' not in content:
+            vulnerability = SecurityVulnerability(
+                f"missing_nosniff_{html_file.name}",
+                'low',
+                'missing_security_header',
+                'Missing X-Content-Type-Options header',
+                str(html_file)
+            )
+            vulnerability.fix_suggestion = 'Add X-Content-Type-Options: nosniff'
+            vulnerability.auto_fixable = True
+            vulnerabilities.append(vulnerability)
+            
+        return vulnerabilities
 
 class SecurityFixer:
     """Automatically fixes security vulnerabilities"""
@@ -390,9 +444,14 @@ class SecurityFixer:
 class ThreatMonitor:
     """Monitors for security threats and suspicious activities"""
     
-    def __init__(self):
-        self.threat_patterns = self._load_threat_patterns()
+    def __init__(self, threat_patterns: Optional[Dict[str, List[str]]] = None):
+        self.threat_patterns = threat_patterns or self._load_threat_patterns()
         self.monitoring_active = False
+        self._compiled_patterns = {
+            threat_type: [(pattern, re.compile(pattern, 0 if threat_type == 'suspicious_files' else re.IGNORECASE))
+                          for pattern in patterns]
+            for threat_type, patterns in self.threat_patterns.items()
+        }
         
     def _load_threat_patterns(self) -> Dict[str, List[str]]:
         """Load threat detection patterns"""
@@ -425,7 +484,7 @@ class ThreatMonitor:
             app_dir = Path(app_path)
             
             # Scan files for threats
-            for file_path in app_dir.rglob('*'):
+            for file_path in walk_files(app_dir):
                 if file_path.is_file():
                     file_threats = await self._scan_file_for_threats(file_path)
                     threats.extend(file_threats)
@@ -442,41 +501,53 @@ class ThreatMonitor:
         threats = []
         
         try:
-            # Check file extension
-            for pattern in self.threat_patterns['suspicious_files']:
-                if re.search(pattern, str(file_path)):
-                    threats.append({
-                        'type': 'suspicious_file',
-                        'severity': 'medium',
-                        'description': f'Suspicious file type: {file_path.suffix}',
-                        'file_path': str(file_path),
-                        'recommendation': 'Review file necessity and contents'
-                    })
+            threats.extend(self.check_file_name(file_path))
             
             # Check file contents
-            if file_path.suffix in ['.html', '.js', '.php', '.py']:
+            if file_path.suffix in THREAT_CONTENT_EXTENSIONS:
                 content = file_path.read_text(encoding='utf-8', errors='ignore')
-                
-                # Scan for malicious patterns
-                for threat_type, patterns in self.threat_patterns.items():
-                    if threat_type == 'suspicious_files':
-                        continue
-                        
-                    for pattern in patterns:
-                        if re.search(pattern, content, re.IGNORECASE):
-                            threats.append({
-                                'type': threat_type,
-                                'severity': 'high' if threat_type == 'backdoor_patterns' else 'medium',
-                                'description': f'Detected {threat_type} pattern',
-                                'file_path': str(file_path),
-                                'pattern': pattern,
-                                'recommendation': 'Manual review required - potential security threat'
-                            })
+                threats.extend(self.scan_content(file_path, content))
                             
         except Exception as e:
             logger.error(f"Threat scan failed for {file_path}: {e}")
             
         return threats
+    
+    def check_file_name(self, file_path: Path) -> List[Dict[str, Any]]:
+        """Threats implied by the file type alone"""
+        threats = []
+        for _, regex in self._compiled_patterns['suspicious_files']:
+            if regex.search(str(file_path)):
+                threats.append({
+                    'type': 'suspicious_file',
+                    'severity': 'medium',
+                    'description': f'Suspicious file type: {file_path.suffix}',
+                    'file_path': str(file_path),
+                    'recommendation': 'Review file necessity and contents'
+                })
+        return threats
+    
+    def scan_content(self, file_path: Path, content: str) -> List[Dict[str, Any]]:
+        """Malicious/backdoor patterns in already-read file content"""
+        threats = []
+        
+        # Scan for malicious patterns
+        for threat_type, patterns in self._compiled_patterns.items():
+            if threat_type == 'suspicious_files':
+                continue
+                
+            for pattern, regex in patterns:
+                if regex.search(content):
+                    threats.append({
+                        'type': threat_type,
+                        'severity': 'high' if threat_type == 'backdoor_patterns' else 'medium',
+                        'description': f'Detected {threat_type} pattern',
+                        'file_path': str(file_path),
+                        'pattern': pattern,
+                        'recommendation': 'Manual review required - potential security threat'
+                    })
+                    
+        return threats
 
 class SecurityReporter:
     """Generates security reports and recommendations"""
@@ -620,14 +691,18 @@ class SecurityIntelligenceEngine:
         
         # Initialize database
         self._init_database()
+        
+        # Per-file results of previous scans, reused while file and rules are unchanged
+        self.result_cache = ScanCache(self.db_path, 'security', ruleset_version(
+            SECURITY_RULESET_REVISION, self.scanner.vulnerability_patterns, self.threat_monitor.threat_patterns,
+            VULNERABILITY_EXTENSIONS, THREAT_CONTENT_EXTENSIONS
+        ))
     
     def _init_database(self):
         """Initialize security database"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute("""
+            self.db = get_pool(self.db_path, [
+                """
                 CREATE TABLE IF NOT EXISTS security_scans (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     app_path TEXT NOT NULL,
@@ -637,9 +712,8 @@ class SecurityIntelligenceEngine:
                     security_score INTEGER,
                     report_data TEXT NOT NULL
                 )
-            """)
-            
-            cursor.execute("""
+                """,
+                """
                 CREATE TABLE IF NOT EXISTS vulnerabilities (
                     id TEXT PRIMARY KEY,
                     app_path TEXT NOT NULL,
@@ -652,9 +726,8 @@ class SecurityIntelligenceEngine:
                     fixed BOOLEAN DEFAULT FALSE,
                     fix_suggestion TEXT
                 )
-            """)
-            
-            cursor.execute("""
+                """,
+                """
                 CREATE TABLE IF NOT EXISTS security_events (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     event_type TEXT NOT NULL,
@@ -664,10 +737,9 @@ class SecurityIntelligenceEngine:
                     timestamp TEXT NOT NULL,
                     data TEXT
                 )
-            """)
-            
-            conn.commit()
-            conn.close()
+                """,
+                "CREATE INDEX IF NOT EXISTS idx_security_scans_timestamp ON security_scans (scan_timestamp)"
+            ])
             logger.info("🛡️ Security Intelligence database initialized")
             
         except Exception as e:
@@ -687,12 +759,9 @@ class SecurityIntelligenceEngine:
         }
         
         try:
-            # Scan for vulnerabilities
-            vulnerabilities = await self.scanner.scan_application(app_path)
+            # Scan for vulnerabilities and threats (one traversal, each file read once)
+            vulnerabilities, threats = await self.scan_tree(app_path)
             analysis_result['vulnerabilities'] = vulnerabilities
-            
-            # Scan for threats
-            threats = await self.threat_monitor.scan_for_threats(app_path)
             analysis_result['threats'] = threats
             
             # Auto-fix vulnerabilities if enabled
@@ -716,35 +785,99 @@ class SecurityIntelligenceEngine:
             
         return analysis_result
     
+    async def scan_tree(self, app_path: str) -> Tuple[List[SecurityVulnerability], List[Dict[str, Any]]]:
+        """Run the vulnerability and threat rule sets over every file of the app in one pass
+        
+        Files unchanged since the previous scan reuse its cached results; the rest
+        are analyzed, on a process pool when there are many of them.
+        """
+        app_dir = Path(app_path)
+        files = walk_files(app_dir)
+        per_file: List[Optional[Tuple[List[SecurityVulnerability], List[Dict[str, Any]]]]] = [None] * len(files)
+        cache_keys = {}
+        pending = []
+        
+        for index, file_path in enumerate(files):
+            if file_path.suffix not in CONTENT_EXTENSIONS:
+                per_file[index] = ([], self.threat_monitor.check_file_name(file_path))
+                continue
+            cache_keys[index] = os.path.abspath(file_path)
+            cached = self.result_cache.get_file(cache_keys[index])
+            if cached is not None and cached['top_level'] == (file_path.parent == app_dir):
+                for item in cached['vulnerabilities'] + cached['threats']:
+                    item['file_path'] = str(file_path)
+                per_file[index] = ([SecurityVulnerability.from_dict(v) for v in cached['vulnerabilities']],
+                                   cached['threats'])
+            else:
+                pending.append(index)
+        
+        analyzed = await self._analyze_files([files[index] for index in pending], app_dir)
+        for index, (file_vulns, file_threats, source) in zip(pending, analyzed):
+            per_file[index] = (file_vulns, file_threats)
+            if source is not None:
+                digest, stat = source
+                self.result_cache.put(cache_keys[index], digest, {
+                    'top_level': files[index].parent == app_dir,
+                    'vulnerabilities': [v.to_dict() for v in file_vulns],
+                    'threats': file_threats
+                }, stat)
+        self.result_cache.prune(os.path.join(os.path.abspath(app_dir), ''), cache_keys.values())
+        
+        vulnerabilities = [v for file_vulns, _ in per_file for v in file_vulns]
+        threats = [t for _, file_threats in per_file for t in file_threats]
+        logger.info(f"🔍 Scanned {len(files)} files ({len(pending)} changed) - {len(vulnerabilities)} vulnerabilities, "
+                    f"{len(threats)} threats")
+        return vulnerabilities, threats
+    
+    async def _analyze_files(self, files: List[Path], app_dir: Path) -> List[tuple]:
+        """analyze_security_file for each file, in order; batched over the process pool for large sets"""
+        # Workers rebuild the rules from their definitions; subclasses with custom scanning run inline
+        if (len(files) >= PARALLEL_SCAN_MIN_FILES and _scan_workers() > 1
+                and type(self.scanner) is VulnerabilityScanner and type(self.threat_monitor) is ThreatMonitor):
+            loop = asyncio.get_running_loop()
+            definitions = (self.scanner.vulnerability_patterns, self.threat_monitor.threat_patterns)
+            rules_version = ruleset_version(*definitions)
+            batches = [[str(path) for path in files[i:i + SCAN_BATCH_SIZE]]
+                       for i in range(0, len(files), SCAN_BATCH_SIZE)]
+            try:
+                results = await asyncio.gather(*[
+                    loop.run_in_executor(_get_process_pool(), _analyze_security_batch, batch, str(app_dir),
+                                         rules_version, definitions)
+                    for batch in batches
+                ])
+                return [result for batch_results in results for result in batch_results]
+            except (BrokenProcessPool, OSError) as e:
+                logger.warning(f"Process pool unavailable, scanning inline: {e}")
+                _reset_process_pool()
+        
+        return [analyze_security_file(file_path, app_dir, self.scanner, self.threat_monitor) for file_path in files]
+    
     async def _save_analysis_results(self, analysis_result: Dict[str, Any]):
         """Save analysis results to database"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
             report = analysis_result['report']
             
-            # Save scan summary
-            cursor.execute("""
-                INSERT INTO security_scans 
-                (app_path, scan_timestamp, vulnerabilities_found, vulnerabilities_fixed, security_score, report_data)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, (
-                analysis_result['app_path'],
-                analysis_result['timestamp'],
-                len(analysis_result['vulnerabilities']),
-                analysis_result['auto_fixes_applied'],
-                report.get('security_score', 0),
-                json.dumps(report)
-            ))
-            
-            # Save individual vulnerabilities
-            for vuln in analysis_result['vulnerabilities']:
-                cursor.execute("""
+            def _write(conn):
+                # Save scan summary
+                conn.execute("""
+                    INSERT INTO security_scans 
+                    (app_path, scan_timestamp, vulnerabilities_found, vulnerabilities_fixed, security_score, report_data)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                """, (
+                    analysis_result['app_path'],
+                    analysis_result['timestamp'],
+                    len(analysis_result['vulnerabilities']),
+                    analysis_result['auto_fixes_applied'],
+                    report.get('security_score', 0),
+                    json.dumps(report)
+                ))
+                
+                # Save individual vulnerabilities in one batch
+                conn.executemany("""
                     INSERT OR REPLACE INTO vulnerabilities 
                     (id, app_path, severity, category, description, file_path, line_number, detected_at, fixed, fix_suggestion)
                     VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
+                """, [(
                     vuln.vuln_id,
                     analysis_result['app_path'],
                     vuln.severity,
@@ -755,10 +888,9 @@ class SecurityIntelligenceEngine:
                     vuln.detected_at.isoformat(),
                     vuln.fixed,
                     vuln.fix_suggestion
-                ))
+                ) for vuln in analysis_result['vulnerabilities']])
             
-            conn.commit()
-            conn.close()
+            await self.db.aio.transaction(_write)
             
         except Exception as e:
             logger.error(f"Failed to save analysis results: {e}")
@@ -775,11 +907,8 @@ class SecurityIntelligenceEngine:
         }
         
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
             # Get recent scans
-            cursor.execute("""
+            rows = await self.db.aio.fetchall("""
                 SELECT app_path, scan_timestamp, vulnerabilities_found, vulnerabilities_fixed, security_score
                 FROM security_scans 
                 ORDER BY scan_timestamp DESC 
@@ -787,7 +916,7 @@ class SecurityIntelligenceEngine:
             """)
             
             recent_scores = []
-            for row in cursor.fetchall():
+            for row in rows:
                 scan_data = {
                     'app_path': row[0],
                     'timestamp': row[1],
@@ -803,22 +932,89 @@ class SecurityIntelligenceEngine:
                 dashboard['overall_security_score'] = sum(recent_scores) / len(recent_scores)
             
             # Get vulnerability statistics
-            cursor.execute("""
+            dashboard['vulnerability_trends'] = dict(await self.db.aio.fetchall("""
                 SELECT severity, COUNT(*) 
                 FROM vulnerabilities 
                 WHERE NOT fixed 
                 GROUP BY severity
-            """)
-            
-            dashboard['vulnerability_trends'] = dict(cursor.fetchall())
-            
-            conn.close()
+            """))
             
         except Exception as e:
             logger.error(f"Dashboard generation failed: {e}")
             
         return dashboard
 
+def analyze_security_file(file_path: Path, app_dir: Path, scanner: VulnerabilityScanner, threat_monitor: ThreatMonitor
+                          ) -> Tuple[List[SecurityVulnerability], List[Dict[str, Any]], Optional[Tuple[str, os.stat_result]]]:
+    """Read one file once and run every security rule set that applies to it
+    
+    Returns (vulnerabilities, threats, source) where source is the content hash
+    and pre-read stat of what was analyzed (None when the content was not read).
+    """
+    vulnerabilities: List[SecurityVulnerability] = []
+    threats = threat_monitor.check_file_name(file_path)
+    
+    suffix = file_path.suffix
+    if suffix not in CONTENT_EXTENSIONS:
+        return vulnerabilities, threats, None
+    
+    try:
+        stat, data = read_source(str(file_path))
+    except OSError as e:
+        logger.error(f"File scan failed for {file_path}: {e}")
+        return vulnerabilities, threats, None
+    content = decode_source(data)
+    
+    if suffix in VULNERABILITY_EXTENSIONS:
+        vulnerabilities.extend(scanner.scan_content(file_path, content))
+    if suffix == '.html' and file_path.parent == app_dir:
+        vulnerabilities.extend(scanner.check_html_configuration(file_path, content))
+    if suffix in THREAT_CONTENT_EXTENSIONS:
+        threats.extend(threat_monitor.scan_content(file_path, content))
+    return vulnerabilities, threats, (content_hash(data), stat)
+
+
+# Process pool workers compile the engine's rule definitions once per ruleset version
+_worker_rules: Dict[str, Tuple[VulnerabilityScanner, ThreatMonitor]] = {}
+
+
+def _analyze_security_batch(paths: List[str], app_dir: str, rules_version: str,
+                            definitions: Tuple[Dict[str, Dict], Dict[str, List[str]]]):
+    rules = _worker_rules.get(rules_version)
+    if rules is None:
+        vulnerability_patterns, threat_patterns = definitions
+        _worker_rules.clear()
+        rules = _worker_rules[rules_version] = (VulnerabilityScanner(vulnerability_patterns),
+                                                ThreatMonitor(threat_patterns))
+    scanner, threat_monitor = rules
+    return [analyze_security_file(Path(path), Path(app_dir), scanner, threat_monitor) for path in paths]
+
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+_process_pool_lock = threading.Lock()
+
+
+def _scan_workers() -> int:
+    return int(os.getenv("SECURITY_SCAN_WORKERS", "0")) or os.cpu_count() or 1
+
+
+def _get_process_pool() -> ProcessPoolExecutor:
+    global _process_pool
+    if _process_pool is None:
+        with _process_pool_lock:
+            if _process_pool is None:
+                _process_pool = ProcessPoolExecutor(max_workers=_scan_workers())
+    return _process_pool
+
+
+def _reset_process_pool():
+    global _process_pool
+    with _process_pool_lock:
+        pool, _process_pool = _process_pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
 # Main execution
 async def main():
     """Main function to demonstrate Security Intelligence Engine"""
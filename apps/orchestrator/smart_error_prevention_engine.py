@@ -15,10 +15,18 @@ from pathlib import Path
 from typing import Dict, List, Any, Optional, Tuple, Set
 from dataclasses import dataclass, asdict
 from collections import defaultdict, Counter
-import sqlite3
 import threading
 from concurrent.futures import ThreadPoolExecutor
 
+from pattern_scanner import PatternScanner
+from scan_cache import ScanCache, content_hash, content_key, ruleset_version
+from sqlite_pool import get_pool
+
+# Bump when the analysis code (not the pattern tables) changes, to invalidate cached file results
+ANALYZER_RULESET_REVISION = 1
+# Cached results are keyed by content, so entries for old file versions are expired by age
+RESULT_CACHE_MAX_AGE = 7 * 24 * 3600
+
 @dataclass
 class ErrorPattern:
     """Represents a detected error pattern"""
@@ -65,6 +73,48 @@ class CodeAnalyzer:
         self.css_patterns = self._init_css_patterns()
         self.js_patterns = self._init_js_patterns()
         self.cross_file_patterns = self._init_cross_file_patterns()
+        
+        # duplicate_id and missing_viewport are whole-document checks, not line patterns
+        self.html_scanner = self._build_scanner(
+            [p for p in self.html_patterns if p['name'] not in ('duplicate_id', 'missing_viewport')],
+            re.IGNORECASE
+        )
+        self.css_scanner = self._build_scanner(self.css_patterns)
+        self.js_scanner = self._build_scanner(self.js_patterns)
+        self._patterns_by_id = {p['pattern_id']: p for p in
+                                self.html_patterns + self.css_patterns + self.js_patterns}
+        self._pattern_order = {pattern_id: order for order, pattern_id in enumerate(self._patterns_by_id)}
+        
+        # Optional persistent per-file results (set by SmartErrorPreventionEngine)
+        self.result_cache: Optional[ScanCache] = None
+
+    @property
+    def ruleset_version(self) -> str:
+        return ruleset_version(ANALYZER_RULESET_REVISION, self.html_patterns, self.css_patterns, self.js_patterns)
+
+    @staticmethod
+    def _build_scanner(patterns: List[Dict[str, Any]], flags: int = 0) -> PatternScanner:
+        return PatternScanner({p['pattern_id']: [p['regex']] for p in patterns}, flags)
+
+    def _scan_issues(self, scanner: PatternScanner, file_path: str, content: str) -> List[CodeIssue]:
+        """Every per-line match of the scanner's patterns, ordered pattern by pattern"""
+        hits = sorted(scanner.scan_lines(content, all_matches=True),
+                      key=lambda hit: self._pattern_order[hit.rule])
+        issues = []
+        for hit in hits:
+            pattern = self._patterns_by_id[hit.rule]
+            issues.append(CodeIssue(
+                issue_id=f"{pattern['pattern_id']}_{hash(file_path)}_{hit.line_number}_{hit.match.start()}",
+                file_path=file_path,
+                line_number=hit.line_number,
+                column=hit.match.start(),
+                issue_type=pattern['name'],
+                severity=pattern['severity'],
+                message=f"{pattern['description']}: {hit.match.group()}",
+                fix_suggestion=pattern['fix'],
+                pattern_id=pattern['pattern_id']
+            ))
+        return issues
 
     def _init_html_patterns(self) -> List[Dict[str, Any]]:
         """Initialize HTML error patterns"""
@@ -237,16 +287,28 @@ class CodeAnalyzer:
         # Analyze individual files
         for file_path, content in files.items():
             file_extension = Path(file_path).suffix.lower()
+            if file_extension not in ('.html', '.css', '.js'):
+                continue
+            
+            key = digest = None
+            if self.result_cache is not None:
+                # files arrive in memory, so the entry is keyed by path and content hash together
+                digest = content_hash(content)
+                key = content_key(file_path, digest)
+                cached = self.result_cache.get(key, digest)
+                if cached is not None:
+                    all_issues.extend(CodeIssue(**issue) for issue in cached)
+                    continue
             
             if file_extension == '.html':
                 issues = await self._analyze_html(file_path, content)
             elif file_extension == '.css':
                 issues = await self._analyze_css(file_path, content)
-            elif file_extension == '.js':
-                issues = await self._analyze_js(file_path, content)
             else:
-                continue
+                issues = await self._analyze_js(file_path, content)
             
+            if digest is not None:
+                self.result_cache.put(key, digest, [asdict(issue) for issue in issues])
             all_issues.extend(issues)
         
         # Analyze cross-file dependencies
@@ -260,6 +322,9 @@ class CodeAnalyzer:
         issues = []
         lines = content.split('\n')
         
+        # Line patterns in one scan; whole-document checks below
+        issues.extend(self._scan_issues(self.html_scanner, file_path, content))
+        
         for pattern in self.html_patterns:
             if pattern['name'] == 'duplicate_id':
                 # Special handling for duplicate IDs
@@ -279,52 +344,16 @@ class CodeAnalyzer:
                         fix_suggestion=pattern['fix'],
                         pattern_id=pattern['pattern_id']
                     ))
-            else:
-                # Regular pattern matching
-                for line_num, line in enumerate(lines, 1):
-                    matches = re.finditer(pattern['regex'], line, re.IGNORECASE)
-                    for match in matches:
-                        issues.append(CodeIssue(
-                            issue_id=f"{pattern['pattern_id']}_{hash(file_path)}_{line_num}_{match.start()}",
-                            file_path=file_path,
-                            line_number=line_num,
-                            column=match.start(),
-                            issue_type=pattern['name'],
-                            severity=pattern['severity'],
-                            message=f"{pattern['description']}: {match.group()}",
-                            fix_suggestion=pattern['fix'],
-                            pattern_id=pattern['pattern_id']
-                        ))
         
         return issues
 
     async def _analyze_css(self, file_path: str, content: str) -> List[CodeIssue]:
         """Analyze CSS content for issues"""
-        issues = []
-        lines = content.split('\n')
-        
-        for pattern in self.css_patterns:
-            for line_num, line in enumerate(lines, 1):
-                matches = re.finditer(pattern['regex'], line)
-                for match in matches:
-                    issues.append(CodeIssue(
-                        issue_id=f"{pattern['pattern_id']}_{hash(file_path)}_{line_num}_{match.start()}",
-                        file_path=file_path,
-                        line_number=line_num,
-                        column=match.start(),
-                        issue_type=pattern['name'],
-                        severity=pattern['severity'],
-                        message=f"{pattern['description']}: {match.group()}",
-                        fix_suggestion=pattern['fix'],
-                        pattern_id=pattern['pattern_id']
-                    ))
-        
-        return issues
+        return self._scan_issues(self.css_scanner, file_path, content)
 
     async def _analyze_js(self, file_path: str, content: str) -> List[CodeIssue]:
         """Analyze JavaScript content for issues"""
         issues = []
-        lines = content.split('\n')
         
         # Try AST parsing for more advanced analysis
         try:
@@ -344,21 +373,7 @@ class CodeAnalyzer:
             ))
         
         # Pattern-based analysis
-        for pattern in self.js_patterns:
-            for line_num, line in enumerate(lines, 1):
-                matches = re.finditer(pattern['regex'], line)
-                for match in matches:
-                    issues.append(CodeIssue(
-                        issue_id=f"{pattern['pattern_id']}_{hash(file_path)}_{line_num}_{match.start()}",
-                        file_path=file_path,
-                        line_number=line_num,
-                        column=match.start(),
-                        issue_type=pattern['name'],
-                        severity=pattern['severity'],
-                        message=f"{pattern['description']}: {match.group()}",
-                        fix_suggestion=pattern['fix'],
-                        pattern_id=pattern['pattern_id']
-                    ))
+        issues.extend(self._scan_issues(self.js_scanner, file_path, content))
         
         return issues
 
@@ -887,13 +902,14 @@ class SmartErrorPreventionEngine:
         }
         
         self._init_database()
+        self.code_analyzer.result_cache = ScanCache(self.db_path, 'error_prevention',
+                                                    self.code_analyzer.ruleset_version)
+        self.code_analyzer.result_cache.expire(RESULT_CACHE_MAX_AGE)
 
     def _init_database(self):
         """Initialize database for error prevention data"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
+        self.db = get_pool(self.db_path, [
+        '''
         CREATE TABLE IF NOT EXISTS error_analyses (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             timestamp DATETIME NOT NULL,
@@ -904,9 +920,8 @@ class SmartErrorPreventionEngine:
             analysis_time REAL NOT NULL,
             success_rate REAL NOT NULL
         )
-        ''')
-        
-        cursor.execute('''
+        ''',
+        '''
         CREATE TABLE IF NOT EXISTS error_patterns (
             pattern_id TEXT PRIMARY KEY,
             pattern_type TEXT NOT NULL,
@@ -915,10 +930,8 @@ class SmartErrorPreventionEngine:
             last_seen DATETIME NOT NULL,
             fix_success_rate REAL NOT NULL
         )
-        ''')
-        
-        conn.commit()
-        conn.close()
+        '''
+        ])
 
     async def comprehensive_analysis(self, files: Dict[str, str], auto_fix: bool = True) -> Dict[str, Any]:
         """Perform comprehensive error analysis and prevention"""
@@ -1005,11 +1018,8 @@ class SmartErrorPreventionEngine:
     async def _save_analysis_result(self, file_count: int, issues_detected: int, 
                                   issues_fixed: int, predictions_made: int, 
                                   analysis_time: float, success_rate: float):
-        """Save analysis result to database"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
+        """Save analysis result to database (batched write-behind, off the analysis path)"""
+        self.db.defer('''
         INSERT INTO error_analyses 
         (timestamp, file_count, issues_detected, issues_fixed, predictions_made, analysis_time, success_rate)
         VALUES (?, ?, ?, ?, ?, ?, ?)
@@ -1022,9 +1032,6 @@ class SmartErrorPreventionEngine:
             analysis_time,
             success_rate
         ))
-        
-        conn.commit()
-        conn.close()
 
     def _generate_recommendations(self, issues: List[CodeIssue], 
                                 predictions: List[PredictiveAlert]) -> List[str]:
@@ -0,0 +1,271 @@
+"""
+Snapshot Store
+==============
+Content-addressed copies of app directories for deployments, backups and
+rollbacks (LiveDeploymentSystem, bug_guard).
+
+File contents are stored once under ``objects/`` by hash; a snapshot is a
+manifest (relative path -> hash) and is materialized as a tree of hardlinks
+to those objects, so taking or materializing a snapshot only writes the
+files whose content the store has not seen yet.  Hashes are remembered per
+path by size and mtime (``ScanCache``), so unchanged files are not re-read.
+
+Objects no tree links to any more are deleted by ``collect_garbage``.
+``remove_tree`` (and so every checkout that replaces a release) runs it on
+just the objects the removed tree linked; a full sweep of ``objects/`` is
+left to maintenance jobs.
+
+Hardlinked trees share inodes with the store and must not be edited in
+place.  Trees that are edited (the live project) are produced by
+``checkout``, which links unchanged files from the current tree, copies the
+rest (reflinked where the filesystem supports it) and swaps the new tree in
+with an atomic symlink replace.
+"""
+
+import errno
+import os
+import shutil
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+from scan_cache import ScanCache, content_hash, read_source
+
+try:
+    import fcntl
+    FICLONE = 0x40049409  # linux/fs.h: _IOW(0x94, 9, int)
+except ImportError:
+    fcntl = None
+
+SNAPSHOT_EXCLUDE = frozenset({'.git', '__pycache__', 'node_modules'})
+
+# Errors for which a hardlink falls back to a copy (other filesystem, link limit, no link support)
+LINK_FALLBACK_ERRNOS = {errno.EXDEV, errno.EMLINK, errno.EPERM, errno.ENOTSUP, errno.EACCES}
+
+# Objects stored or referenced by a snapshot this recently are kept by garbage collection,
+# so a snapshot taken right before it can still be materialized
+GC_GRACE_SECONDS = 600
+
+
+def walk_tree(root: Path, exclude: Iterable[str] = SNAPSHOT_EXCLUDE) -> Iterator[Tuple[str, str]]:
+    """(absolute path, relative path) of every regular file under root, skipping excluded directory names"""
+    root = str(root)
+    exclude = set(exclude)
+    skip = len(os.path.join(root, ''))
+    pending = [root]
+    while pending:
+        directory = pending.pop()
+        with os.scandir(directory) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in exclude:
+                        pending.append(entry.path)
+                elif entry.is_file():
+                    yield entry.path, entry.path[skip:]
+
+
+def clone_file(source: str, destination: str):
+    """Copy a file, sharing its blocks (reflink) when the filesystem supports it"""
+    if fcntl is not None:
+        with open(source, 'rb') as src, open(destination, 'wb') as dst:
+            try:
+                fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+                return
+            except OSError:
+                pass
+    shutil.copyfile(source, destination)
+
+
+class _DirectoryMaker:
+    """Target paths under root, creating each parent directory once"""
+
+    def __init__(self, root: str):
+        self.root = root
+        self.created = set()
+
+    def prepare(self, relative: str) -> str:
+        target = os.path.join(self.root, relative)
+        parent = os.path.dirname(target)
+        if parent not in self.created:
+            os.makedirs(parent, exist_ok=True)
+            self.created.add(parent)
+        return target
+
+
+class SnapshotStore:
+    """Object store plus path -> hash index rooted at one directory
+
+    Keep the store on the same filesystem as the trees it materializes;
+    otherwise hardlinks fall back to copies.
+    """
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+        self.objects = self.root / 'objects'
+        self.objects.mkdir(parents=True, exist_ok=True)
+        self._objects = str(self.objects)
+        self.index = ScanCache(str(self.root / 'index.db'), 'snapshot_files', 'blake2b-16')
+        self.stats = {'hashed': 0, 'stored': 0, 'linked': 0, 'copied': 0, 'collected': 0}
+
+    def object_path(self, digest: str) -> str:
+        return os.path.join(self._objects, digest[:2], digest)
+
+    # ------------------------------------------------------------------ snapshots
+
+    def hash_tree(self, root: Path, exclude: Iterable[str] = SNAPSHOT_EXCLUDE) -> Dict[str, Tuple[str, str]]:
+        """relative path -> (hash, absolute path) for every file under root (nothing is stored)"""
+        files = {}
+        for path, relative in walk_tree(os.path.realpath(root), exclude):
+            files[relative] = (self._hash_file(path), path)
+        return files
+
+    def snapshot(self, source: Path, exclude: Iterable[str] = SNAPSHOT_EXCLUDE) -> Dict[str, str]:
+        """Store the content of every file under source; returns its manifest (relative path -> hash)"""
+        manifest = {}
+        for path, relative in walk_tree(os.path.realpath(source), exclude):
+            digest = self._hash_file(path)
+            obj = self.object_path(digest)
+            if not self._object_exists(obj):
+                stat, data = read_source(path)
+                if content_hash(data) != digest:
+                    # Changed since it was indexed
+                    digest = content_hash(data)
+                    self.index.put(path, digest, digest, stat)
+                    obj = self.object_path(digest)
+                self._store_object(obj, data)
+            manifest[relative] = digest
+        return manifest
+
+    def materialize(self, manifest: Dict[str, str], destination: Path):
+        """Build destination as a hardlink tree of the manifest's objects (read-only use only)"""
+        directories = _DirectoryMaker(os.path.realpath(destination))
+        for relative, digest in manifest.items():
+            target = directories.prepare(relative)
+            self._link_or_copy(self.object_path(digest), target)
+            self.index.put(target, digest, digest, os.stat(target))
+
+    def checkout(self, manifest: Dict[str, str], live: Path, releases: Path) -> Path:
+        """Make live (a directory or a symlink to one) show manifest, swapping it in atomically
+
+        The new tree is built under releases: files whose content is already in
+        the current live tree are hardlinked from it, the rest are copied from
+        the store.  Each live file is linked into at most one path; other paths
+        with the same content get their own copy, because the live tree is
+        edited in place and duplicates must not change together.  live then becomes a symlink to the new tree via rename, so
+        readers see either the old or the new tree.  The first checkout of a
+        plain directory moves it aside right before the rename.
+        """
+        live, releases = Path(live), Path(releases)
+        releases.mkdir(parents=True, exist_ok=True)
+        releases = releases.resolve()
+        release = releases / f"{live.name}-{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        release.mkdir()
+        directories = _DirectoryMaker(str(release))
+        current = {}
+        if live.exists():
+            for digest, path in self.hash_tree(live).values():
+                current.setdefault(digest, []).append(path)
+
+        for relative, digest in manifest.items():
+            target = directories.prepare(relative)
+            if current.get(digest):
+                self._link_or_copy(current[digest].pop(), target)
+            else:
+                # The live tree is edited in place, so it never shares inodes with the store
+                clone_file(self.object_path(digest), target)
+                self.stats['copied'] += 1
+            self.index.put(str(target), digest, digest, os.stat(target))
+
+        swap = live.parent / f".{live.name}.swap-{uuid.uuid4().hex[:6]}"
+        os.symlink(release, swap, target_is_directory=True)
+        previous = None
+        if live.is_symlink():
+            previous = Path(os.path.realpath(live))
+            if previous.parent != releases:
+                previous = None  # not a release of ours; leave it alone
+        elif live.exists():
+            self.index.prune(os.path.realpath(live) + os.sep, ())
+            previous = live.parent / f".{live.name}.replaced-{uuid.uuid4().hex[:6]}"
+            os.rename(live, previous)
+        os.replace(swap, live)
+
+        if previous is not None:
+            self.remove_tree(previous)
+        return release
+
+    def remove_tree(self, tree: Path, collect: bool = True):
+        """Delete a materialized tree and forget its index entries, then drop its objects nothing else links to"""
+        prefix = os.path.realpath(tree) + os.sep
+        digests = self.index.hashes(prefix) if collect else ()
+        shutil.rmtree(tree, ignore_errors=True)
+        self.index.prune(prefix, ())
+        if collect:
+            self.collect_garbage(digests=digests)
+
+    def collect_garbage(self, grace: float = GC_GRACE_SECONDS, digests: Optional[Iterable[str]] = None) -> int:
+        """Delete objects no tree links to any more; returns how many
+
+        Only the objects for ``digests`` are checked when given; otherwise the
+        whole store is walked.  Objects stored or referenced by a snapshot in
+        the last ``grace`` seconds are kept: the snapshot may not have been
+        materialized yet.
+        """
+        removed = 0
+        cutoff = time.time() - grace
+        if digests is None:
+            paths = (path for path, _ in walk_tree(self.objects, ()))
+        else:
+            paths = (self.object_path(digest) for digest in digests)
+        for path in paths:
+            try:
+                stat = os.stat(path)
+                if stat.st_nlink == 1 and stat.st_mtime < cutoff:
+                    os.unlink(path)
+                    removed += 1
+            except FileNotFoundError:
+                pass  # collected by another process
+        self.stats['collected'] += removed
+        return removed
+
+    # ------------------------------------------------------------------ files
+
+    def _hash_file(self, path: str) -> str:
+        digest = self.index.get_file(path)
+        if digest is None:
+            stat, data = read_source(path)
+            digest = content_hash(data)
+            self.index.put(path, digest, digest, stat)
+            self.stats['hashed'] += 1
+        return digest
+
+    @staticmethod
+    def _object_exists(obj: str) -> bool:
+        try:
+            stat = os.stat(obj)
+        except FileNotFoundError:
+            return False
+        if stat.st_nlink == 1:
+            # Only the store holds it: mark it as referenced so garbage collection keeps it
+            # until the snapshot is materialized (linked objects are left alone; their mtime
+            # is shared with the trees that link them)
+            os.utime(obj)
+        return True
+
+    def _store_object(self, obj: str, data: bytes):
+        os.makedirs(os.path.dirname(obj), exist_ok=True)
+        temp = f"{obj}.{uuid.uuid4().hex[:6]}.tmp"
+        with open(temp, 'wb') as f:
+            f.write(data)
+        os.replace(temp, obj)
+        self.stats['stored'] += 1
+
+    def _link_or_copy(self, source: str, target: str):
+        try:
+            os.link(source, target)
+            self.stats['linked'] += 1
+        except OSError as e:
+            if e.errno not in LINK_FALLBACK_ERRNOS:
+                raise
+            clone_file(source, target)
+            self.stats['copied'] += 1
@@ -0,0 +1,354 @@
+"""
+SQLite Connection Pool
+======================
+Shared persistence layer for orchestrator subsystems: per-thread pooled
+connections in WAL mode, prepared-statement reuse, batched (write-behind)
+writes and an async wrapper for use from coroutines.
+
+Connections of threads that have exited (e.g. Flask ``threaded=True``
+request threads) are reclaimed into a bounded idle queue and handed to the
+next new thread, so the number of open connections follows the number of
+live threads rather than the number of threads ever started.
+"""
+
+import asyncio
+import atexit
+import logging
+import os
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+from itertools import groupby
+from operator import itemgetter
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+)
+
+
+class SQLitePool:
+    """Per-thread pooled connections to one SQLite database.
+
+    Each thread keeps one long-lived connection, so the sqlite3 statement cache
+    (``cached_statements``) turns repeated SQL into prepared-statement reuse.
+    When a thread exits its connection goes back to an idle queue (at most
+    ``max_idle`` are kept open) for the next thread that needs one.
+    Writes can go straight through ``execute``/``transaction`` or be queued with
+    ``defer`` and applied in batches by a background flusher.
+    """
+
+    def __init__(self, db_path: str, schema: Sequence[str] = (), batch_size: int = 500,
+                 flush_interval: float = 0.5, cached_statements: int = 256, timeout: float = 5.0,
+                 max_idle: int = 8):
+        self.db_path = str(db_path)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.cached_statements = cached_statements
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.pid = os.getpid()
+
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._local = threading.local()
+        self._owners: Dict[threading.Thread, sqlite3.Connection] = {}
+        self._idle: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+
+        self._pending: List[Tuple[str, tuple]] = []
+        self._pending_lock = threading.Lock()
+        # Held across swap + commit + requeue, so flush() returns only after any in-flight batch lands
+        self._flush_lock = threading.RLock()
+        self._flush_event = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+        self._closed = False
+        self._aio: Optional["AsyncSQLitePool"] = None
+
+        self.stats = {'connections': 0, 'reused_connections': 0, 'closed_connections': 0,
+                      'deferred_writes': 0, 'flushes': 0, 'flush_errors': 0, 'dropped_writes': 0}
+
+        if schema:
+            self.apply_schema(schema)
+
+    # ------------------------------------------------------------------ connections
+
+    def connection(self) -> sqlite3.Connection:
+        """Connection owned by the calling thread (opened on first use)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            with self._lock:
+                self._reclaim_dead_threads()
+                conn = self._idle.pop() if self._idle else None
+                if conn is not None:
+                    self.stats['reused_connections'] += 1
+            if conn is None:
+                conn = sqlite3.connect(self.db_path, timeout=self.timeout, check_same_thread=False,
+                                       cached_statements=self.cached_statements)
+                for pragma in DEFAULT_PRAGMAS:
+                    conn.execute(pragma)
+                with self._lock:
+                    self.stats['connections'] += 1
+            with self._lock:
+                self._owners[threading.current_thread()] = conn
+            self._local.conn = conn
+            self._local.depth = 0
+        return conn
+
+    def _reclaim_dead_threads(self):
+        """Move connections of exited threads to the idle queue, closing any beyond max_idle (holds _lock)"""
+        dead = [thread for thread in self._owners if not thread.is_alive()]
+        for thread in dead:
+            conn = self._owners.pop(thread)
+            try:
+                if conn.in_transaction:  # the thread died inside a transaction
+                    conn.rollback()
+                if len(self._idle) < self.max_idle:
+                    self._idle.append(conn)
+                    continue
+                conn.close()
+            except sqlite3.Error:
+                pass
+            self.stats['closed_connections'] += 1
+
+    @contextmanager
+    def transaction(self):
+        """Commit on success, roll back on error; nested blocks join the outer transaction"""
+        conn = self.connection()
+        depth = self._local.depth
+        self._local.depth = depth + 1
+        try:
+            yield conn
+            if depth == 0:
+                conn.commit()
+        except BaseException:
+            if depth == 0:
+                conn.rollback()
+            raise
+        finally:
+            self._local.depth = depth
+
+    def apply_schema(self, statements: Iterable[str]):
+        with self.transaction() as conn:
+            for statement in statements:
+                conn.execute(statement)
+
+    # ------------------------------------------------------------------ queries
+
+    def execute(self, sql: str, params: Sequence[Any] = ()) -> sqlite3.Cursor:
+        with self.transaction() as conn:
+            return conn.execute(sql, params)
+
+    def executemany(self, sql: str, seq_of_params: Iterable[Sequence[Any]]) -> sqlite3.Cursor:
+        with self.transaction() as conn:
+            return conn.executemany(sql, seq_of_params)
+
+    def fetchone(self, sql: str, params: Sequence[Any] = ()) -> Optional[tuple]:
+        return self.connection().execute(sql, params).fetchone()
+
+    def fetchall(self, sql: str, params: Sequence[Any] = ()) -> List[tuple]:
+        return self.connection().execute(sql, params).fetchall()
+
+    def fetchvalue(self, sql: str, params: Sequence[Any] = (), default: Any = None) -> Any:
+        row = self.fetchone(sql, params)
+        return row[0] if row else default
+
+    # ------------------------------------------------------------------ batched writes
+
+    def defer(self, sql: str, params: Sequence[Any] = ()):
+        """Queue a write; queued writes are applied in order, in one transaction per batch"""
+        with self._pending_lock:
+            self._pending.append((sql, tuple(params)))
+            self.stats['deferred_writes'] += 1
+            full = len(self._pending) >= self.batch_size
+        self._ensure_flusher()
+        if full:
+            self._flush_event.set()
+
+    def flush(self) -> int:
+        """Apply queued writes now; returns how many were written.
+
+        Acts as a barrier: when it returns, every write deferred before the call has been
+        committed (or re-queued on error), including a batch the flusher thread had in flight.
+        """
+        with self._flush_lock:
+            return self._flush_pending()
+
+    def _flush_pending(self) -> int:
+        with self._pending_lock:
+            pending, self._pending = self._pending, []
+        if not pending:
+            return 0
+
+        try:
+            with self.transaction() as conn:
+                # Consecutive writes with the same SQL go through one executemany
+                for sql, group in groupby(pending, key=itemgetter(0)):
+                    conn.executemany(sql, [params for _, params in group])
+            self.stats['flushes'] += 1
+            return len(pending)
+        except sqlite3.OperationalError as e:
+            # Locked/busy/disk errors are transient: keep the batch, ahead of writes queued since
+            self.stats['flush_errors'] += 1
+            self._requeue(pending)
+            logger.error(f"Deferred write flush failed for {self.db_path}, {len(pending)} writes re-queued: {e}")
+            return 0
+        except sqlite3.Error as e:
+            # A write the database rejects (constraint, bad SQL) must not take the rest of the batch with it
+            self.stats['flush_errors'] += 1
+            logger.error(f"Deferred write batch failed for {self.db_path}, applying {len(pending)} writes one by one: {e}")
+            return self._flush_one_by_one(pending)
+
+    def _requeue(self, writes: List[Tuple[str, tuple]]):
+        with self._pending_lock:
+            self._pending[:0] = writes
+
+    def _flush_one_by_one(self, pending: List[Tuple[str, tuple]]) -> int:
+        written = 0
+        for index, (sql, params) in enumerate(pending):
+            try:
+                with self.transaction() as conn:
+                    conn.execute(sql, params)
+                written += 1
+            except sqlite3.OperationalError as e:
+                self._requeue(pending[index:])
+                logger.error(f"Deferred write flush failed for {self.db_path}, "
+                             f"{len(pending) - index} writes re-queued: {e}")
+                break
+            except sqlite3.Error as e:
+                self.stats['dropped_writes'] += 1
+                logger.error(f"Deferred write rejected by {self.db_path}: {e} ({sql} {params!r})")
+        return written
+
+    def _ensure_flusher(self):
+        if self._flusher is None:
+            with self._lock:
+                if self._flusher is None:
+                    self._flusher = threading.Thread(target=self._flush_loop, daemon=True,
+                                                     name=f"sqlite-flush-{os.path.basename(self.db_path)}")
+                    self._flusher.start()
+
+    def _flush_loop(self):
+        while not self._closed:
+            self._flush_event.wait(self.flush_interval)
+            self._flush_event.clear()
+            self.flush()
+
+    # ------------------------------------------------------------------ lifecycle
+
+    @property
+    def aio(self) -> "AsyncSQLitePool":
+        if self._aio is None:
+            self._aio = AsyncSQLitePool(self)
+        return self._aio
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._pending_lock:
+            pending = len(self._pending)
+        with self._lock:
+            open_connections = len(self._owners) + len(self._idle)
+        return {'db_path': self.db_path, 'pending_writes': pending, 'open_connections': open_connections, **self.stats}
+
+    def close(self):
+        """Flush queued writes and close every pooled connection"""
+        self.flush()
+        self._closed = True
+        self._flush_event.set()
+        with self._lock:
+            connections = list(self._owners.values()) + self._idle
+            self._owners, self._idle = {}, []
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+        self._local = threading.local()
+
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=int(os.getenv("SQLITE_POOL_WORKERS", "4")),
+                                               thread_name_prefix="sqlite-pool")
+    return _executor
+
+
+class AsyncSQLitePool:
+    """Coroutine wrapper: runs pool calls on a small worker pool (one connection per worker)"""
+
+    def __init__(self, pool: SQLitePool):
+        self.pool = pool
+
+    async def run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_executor(), partial(func, *args, **kwargs))
+
+    async def execute(self, sql: str, params: Sequence[Any] = ()) -> sqlite3.Cursor:
+        return await self.run(self.pool.execute, sql, params)
+
+    async def executemany(self, sql: str, seq_of_params: Iterable[Sequence[Any]]) -> sqlite3.Cursor:
+        return await self.run(self.pool.executemany, sql, list(seq_of_params))
+
+    async def fetchone(self, sql: str, params: Sequence[Any] = ()) -> Optional[tuple]:
+        return await self.run(self.pool.fetchone, sql, params)
+
+    async def fetchall(self, sql: str, params: Sequence[Any] = ()) -> List[tuple]:
+        return await self.run(self.pool.fetchall, sql, params)
+
+    async def fetchvalue(self, sql: str, params: Sequence[Any] = (), default: Any = None) -> Any:
+        return await self.run(self.pool.fetchvalue, sql, params, default)
+
+    async def transaction(self, func: Callable[[sqlite3.Connection], Any]) -> Any:
+        """Run func(conn) inside one transaction on a worker thread"""
+        def _run():
+            with self.pool.transaction() as conn:
+                return func(conn)
+        return await self.run(_run)
+
+
+_pools: Dict[str, SQLitePool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_path: str, schema: Sequence[str] = (), **options) -> SQLitePool:
+    """Shared pool per database file; schema statements (CREATE ... IF NOT EXISTS) are applied every call.
+
+    ``options`` (batch_size, flush_interval, ...) are passed to SQLitePool by the
+    call that creates the pool and ignored afterwards.
+    A process forked after the pool was opened gets a pool of its own.
+    """
+    key = os.path.abspath(str(db_path))
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is not None and pool.pid != os.getpid():
+            pool = None  # connections and the flusher thread do not survive fork
+        if pool is None:
+            pool = _pools[key] = SQLitePool(db_path, **options)
+    if schema:
+        pool.apply_schema(schema)
+    return pool
+
+
+@atexit.register
+def _flush_all_pools():
+    with _pools_lock:
+        pools = list(_pools.values())
+    for pool in pools:
+        try:
+            pool.flush()
+        except Exception as e:
+            logger.error(f"Final flush failed for {pool.db_path}: {e}")
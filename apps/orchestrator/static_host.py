@@ -0,0 +1,330 @@
+"""
+Static Host
+===========
+One in-process asyncio HTTP server for every live deployment
+(LiveDeploymentSystem), replacing a ``python -m http.server`` process and a
+port per app.
+
+Deployments are routes: ``/apps/<route_id>/...`` on the shared port, or any
+path when the request's Host header is one of the route's host names.
+Registering or removing a route is a dict update.  Files are sent with
+``loop.sendfile`` (zero-copy where the platform supports it) and carry
+ETag/Last-Modified validators; ``precompress_tree`` writes .gz/.br siblings
+that are served to clients accepting those encodings.
+"""
+
+import asyncio
+import email.utils
+import gzip
+import logging
+import mimetypes
+import os
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+from urllib.parse import unquote, urlsplit
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    brotli = None
+    BROTLI_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+ROUTE_PREFIX = '/apps/'
+KEEPALIVE_TIMEOUT = 15.0
+MAX_HEADERS = 100
+
+COMPRESSIBLE_SUFFIXES = {'.html', '.htm', '.css', '.js', '.mjs', '.json', '.svg', '.txt', '.xml', '.map', '.md'}
+MIN_COMPRESS_SIZE = 512
+
+# (Accept-Encoding token, file suffix), in order of preference
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+REASONS = {200: 'OK', 301: 'Moved Permanently', 304: 'Not Modified', 400: 'Bad Request',
+           404: 'Not Found', 405: 'Method Not Allowed', 500: 'Internal Server Error'}
+
+
+def precompress_tree(root: Path) -> int:
+    """Write .gz (and .br when brotli is installed) next to compressible files; returns files written"""
+    written = 0
+    for directory, _, files in os.walk(root):
+        for name in files:
+            path = Path(directory) / name
+            if path.suffix.lower() not in COMPRESSIBLE_SUFFIXES:
+                continue
+            data = path.read_bytes()
+            if len(data) < MIN_COMPRESS_SIZE:
+                continue
+            variants = [('.gz', gzip.compress(data, compresslevel=9, mtime=0))]
+            if BROTLI_AVAILABLE:
+                variants.append(('.br', brotli.compress(data)))
+            for suffix, compressed in variants:
+                # Only worth keeping when it actually saves bytes
+                if len(compressed) < len(data):
+                    # Replaced rather than rewritten: deployed files may be hardlinks shared with other trees
+                    temp = Path(f"{path}{suffix}.tmp")
+                    temp.write_bytes(compressed)
+                    os.replace(temp, f"{path}{suffix}")
+                    written += 1
+    return written
+
+
+@dataclass
+class Route:
+    route_id: str
+    root: str
+    hostnames: Tuple[str, ...] = field(default_factory=tuple)
+
+
+class StaticHost:
+    """Serves the registered routes from one port on a background event loop thread"""
+
+    def __init__(self, host: str = '0.0.0.0', port: int = 8000, public_host: str = 'localhost'):
+        self.host = host
+        self.port = port
+        self.public_host = public_host
+        self.routes: Dict[str, Route] = {}
+        self.hostnames: Dict[str, Route] = {}
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._thread: Optional[threading.Thread] = None
+        self._started = threading.Event()
+        self._start_error: Optional[BaseException] = None
+        self._start_lock = threading.Lock()
+        self.stats = {'requests': 0, 'not_modified': 0, 'compressed': 0, 'bytes_sent': 0}
+
+    # ------------------------------------------------------------------ routes
+
+    def register(self, route_id: str, root: str, hostnames: Iterable[str] = ()) -> str:
+        """Serve root under /apps/<route_id>/ (and at / for the host names); returns its URL"""
+        route = Route(route_id, os.path.realpath(root), tuple(name.lower() for name in hostnames))
+        self.routes[route_id] = route
+        for name in route.hostnames:
+            self.hostnames[name] = route
+        return self.url_for(route_id)
+
+    def unregister(self, route_id: str) -> bool:
+        route = self.routes.pop(route_id, None)
+        if route is None:
+            return False
+        for name in route.hostnames:
+            if self.hostnames.get(name) is route:
+                del self.hostnames[name]
+        return True
+
+    def url_for(self, route_id: str) -> str:
+        return f"http://{self.public_host}:{self.port}{ROUTE_PREFIX}{route_id}/"
+
+    @property
+    def running(self) -> bool:
+        return self._server is not None and self._server.is_serving()
+
+    # ------------------------------------------------------------------ lifecycle
+
+    def start(self):
+        """Bind the port and start serving (idempotent); raises OSError if the port is taken
+
+        A failed start leaves the host stopped, so a later call tries to bind again.
+        """
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run_loop, daemon=True, name="static-host")
+                self._thread.start()
+            self._started.wait()
+            error = self._start_error
+            if error is not None:
+                self._thread.join()
+                self._thread = None
+                self._start_error = None
+                self._started.clear()
+                raise error
+
+    def stop(self):
+        if self._loop is not None and self._server is not None:
+            self._loop.call_soon_threadsafe(self._server.close)
+
+    def _run_loop(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        try:
+            self._server = self._loop.run_until_complete(
+                asyncio.start_server(self._handle_connection, self.host, self.port))
+        except OSError as e:
+            self._loop.close()
+            self._loop = None
+            self._start_error = e
+            self._started.set()
+            return
+        if self.port == 0:
+            self.port = self._server.sockets[0].getsockname()[1]
+        logger.info(f"🌐 Static host serving deployments on port {self.port}")
+        self._started.set()
+        self._loop.run_forever()
+
+    # ------------------------------------------------------------------ HTTP
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request_line = await asyncio.wait_for(reader.readline(), KEEPALIVE_TIMEOUT)
+                if not request_line:
+                    break
+                parts = request_line.decode('latin-1').split()
+
+                headers = {}
+                for _ in range(MAX_HEADERS):
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                else:
+                    await self._send_status(writer, 400, keep_alive=False)
+                    break
+
+                if len(parts) != 3:
+                    await self._send_status(writer, 400, keep_alive=False)
+                    break
+                method, target, version = parts
+                keep_alive = (headers.get('connection', '').lower() != 'close'
+                              if version == 'HTTP/1.1' else headers.get('connection', '').lower() == 'keep-alive')
+                if method not in ('GET', 'HEAD'):
+                    # Request bodies are never read, so the connection cannot be reused
+                    await self._send_status(writer, 405, {'Allow': 'GET, HEAD'}, keep_alive=False)
+                    break
+
+                self.stats['requests'] += 1
+                await self._serve(writer, method, target, headers, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError,
+                ConnectionError, ValueError):
+            pass
+        except Exception as e:
+            logger.error(f"Static host request failed: {e}")
+        finally:
+            writer.close()
+
+    def _resolve(self, host: str, path: str) -> Tuple[Optional[Route], str]:
+        """Route and route-relative path for a request"""
+        route = self.hostnames.get(host.rsplit(':', 1)[0].lower()) if host else None
+        if route is not None:
+            return route, path
+        if path.startswith(ROUTE_PREFIX):
+            route_id, slash, rest = path[len(ROUTE_PREFIX):].partition('/')
+            route = self.routes.get(route_id)
+            if route is not None:
+                return route, slash + rest
+        return None, path
+
+    async def _serve(self, writer: asyncio.StreamWriter, method: str, target: str,
+                     headers: Dict[str, str], keep_alive: bool):
+        def status(code: int, extra: Optional[Dict[str, str]] = None):
+            return self._send_status(writer, code, extra, keep_alive, with_body=method != 'HEAD')
+
+        path = unquote(urlsplit(target).path)
+        route, relative = self._resolve(headers.get('host', ''), path)
+        if route is None:
+            return await status(404)
+        if not relative:
+            # /apps/<id> -> /apps/<id>/ so relative links in index.html resolve
+            return await status(301, {'Location': path + '/'})
+
+        file_path = os.path.realpath(os.path.join(route.root, relative.lstrip('/')))
+        if file_path != route.root and not file_path.startswith(route.root + os.sep):
+            return await status(404)
+        try:
+            stat = os.stat(file_path)
+            if os.path.isdir(file_path):
+                if not path.endswith('/'):
+                    return await status(301, {'Location': path + '/'})
+                file_path = os.path.join(file_path, 'index.html')
+                stat = os.stat(file_path)
+        except OSError:
+            return await status(404)
+
+        etag = f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+        response_headers = {
+            'ETag': etag,
+            'Last-Modified': email.utils.formatdate(stat.st_mtime, usegmt=True),
+            'Cache-Control': 'no-cache',
+        }
+        if self._not_modified(headers, etag, stat.st_mtime):
+            self.stats['not_modified'] += 1
+            return await status(304, response_headers)
+
+        content_type, _ = mimetypes.guess_type(file_path)
+        response_headers['Content-Type'] = content_type or 'application/octet-stream'
+
+        send_path, size = file_path, stat.st_size
+        if os.path.splitext(file_path)[1].lower() in COMPRESSIBLE_SUFFIXES:
+            response_headers['Vary'] = 'Accept-Encoding'
+            variant = self._compressed_variant(file_path, stat, headers.get('accept-encoding', ''))
+            if variant:
+                encoding, send_path, size = variant
+                response_headers['Content-Encoding'] = encoding
+                self.stats['compressed'] += 1
+
+        response_headers['Content-Length'] = str(size)
+        writer.write(self._head(200, response_headers, keep_alive))
+        if method == 'HEAD':
+            return await writer.drain()
+
+        await writer.drain()
+        with open(send_path, 'rb') as f:
+            sent = await asyncio.get_running_loop().sendfile(writer.transport, f, 0, size)
+        self.stats['bytes_sent'] += sent
+
+    @staticmethod
+    def _not_modified(headers: Dict[str, str], etag: str, mtime: float) -> bool:
+        if 'if-none-match' in headers:
+            return etag in [tag.strip() for tag in headers['if-none-match'].split(',')] \
+                or headers['if-none-match'].strip() == '*'
+        since = headers.get('if-modified-since')
+        if since:
+            try:
+                return int(mtime) <= email.utils.parsedate_to_datetime(since).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    @staticmethod
+    def _compressed_variant(file_path: str, stat: os.stat_result, accept_encoding: str):
+        accepted = {token.split(';')[0].strip().lower() for token in accept_encoding.split(',')}
+        for encoding, suffix in ENCODINGS:
+            if encoding not in accepted:
+                continue
+            try:
+                variant_stat = os.stat(file_path + suffix)
+            except OSError:
+                continue
+            # A variant older than its source is stale
+            if variant_stat.st_mtime_ns >= stat.st_mtime_ns:
+                return encoding, file_path + suffix, variant_stat.st_size
+        return None
+
+    @staticmethod
+    def _head(status: int, headers: Dict[str, str], keep_alive: bool) -> bytes:
+        lines = [f"HTTP/1.1 {status} {REASONS.get(status, '')}",
+                 f"Date: {email.utils.formatdate(usegmt=True)}",
+                 "Server: static-host",
+                 f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+        lines.extend(f"{name}: {value}" for name, value in headers.items())
+        return ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1')
+
+    async def _send_status(self, writer: asyncio.StreamWriter, status: int,
+                           headers: Optional[Dict[str, str]] = None, keep_alive: bool = True,
+                           with_body: bool = True):
+        headers = dict(headers or {})
+        body = b''
+        if status != 304:
+            body = f"{status} {REASONS.get(status, '')}\n".encode()
+            headers.setdefault('Content-Type', 'text/plain; charset=utf-8')
+            headers['Content-Length'] = str(len(body))
+        writer.write(self._head(status, headers, keep_alive) + (body if with_body else b''))
+        await writer.drain()
@@ -0,0 +1,298 @@
+"""
+Streaming Statistics
+====================
+Bounded-memory statistics for metric streams: a log-bucketed quantile sketch
+(DDSketch / HDR-histogram style, relative-error guarantee) and a time-bucketed
+rolling window for windowed counts, means and quantiles.
+"""
+
+import math
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+
+class QuantileSketch:
+    """Quantile sketch with bounded relative error.
+
+    Values are counted in logarithmic buckets, so each quantile estimate is within
+    ``relative_accuracy`` of a real sample value. ``add`` is O(1) and a quantile
+    query walks the bucket list, whose size is capped by ``max_buckets`` (the
+    lowest buckets are merged when the cap is hit). Not thread-safe on its own.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01, max_buckets: int = 2048,
+                 min_value: float = 1e-9):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be between 0 and 1")
+
+        self.relative_accuracy = relative_accuracy
+        self.max_buckets = max_buckets
+        self.min_value = min_value
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+
+        self._positive: Dict[int, int] = {}
+        self._negative: Dict[int, int] = {}
+        self._zero_count = 0
+        self._positive_keys: Optional[List[int]] = None
+        self._negative_keys: Optional[List[int]] = None
+
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def _key(self, magnitude: float) -> int:
+        return math.ceil(math.log(magnitude) / self._log_gamma)
+
+    def _value(self, key: int) -> float:
+        return 2 * self._gamma ** key / (self._gamma + 1)
+
+    def add(self, value: float, count: int = 1):
+        """Add a value (optionally with a multiplicity)"""
+        value = float(value)
+        if math.isnan(value):
+            return
+
+        if value > self.min_value:
+            key = self._key(value)
+            if key not in self._positive:
+                self._positive_keys = None
+                self._positive[key] = 0
+            self._positive[key] += count
+        elif value < -self.min_value:
+            key = self._key(-value)
+            if key not in self._negative:
+                self._negative_keys = None
+                self._negative[key] = 0
+            self._negative[key] += count
+        else:
+            self._zero_count += count
+
+        self.count += count
+        self.total += value * count
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+        if len(self._positive) + len(self._negative) > self.max_buckets:
+            self._collapse()
+
+    def extend(self, values: Iterable[float]):
+        for value in values:
+            self.add(value)
+
+    def merge(self, other: "QuantileSketch"):
+        """Fold another sketch (same relative_accuracy) into this one"""
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches with different relative_accuracy")
+
+        for key, count in other._positive.items():
+            if key not in self._positive:
+                self._positive_keys = None
+                self._positive[key] = 0
+            self._positive[key] += count
+        for key, count in other._negative.items():
+            if key not in self._negative:
+                self._negative_keys = None
+                self._negative[key] = 0
+            self._negative[key] += count
+
+        self._zero_count += other._zero_count
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+        if len(self._positive) + len(self._negative) > self.max_buckets:
+            self._collapse()
+
+    def _collapse(self):
+        # Merge the buckets closest to zero; large values (the tail we care about) keep full accuracy
+        while len(self._positive) + len(self._negative) > self.max_buckets:
+            store = self._negative if len(self._negative) > 1 else self._positive
+            lowest, next_lowest = sorted(store)[:2]
+            store[next_lowest] += store.pop(lowest)
+        self._positive_keys = None
+        self._negative_keys = None
+
+    def quantile(self, q: float) -> float:
+        """Estimate the q-quantile (0 <= q <= 1), interpolating between ranks; 0.0 when empty"""
+        if self.count == 0:
+            return 0.0
+        if q <= 0:
+            return self.min
+        if q >= 1:
+            return self.max
+
+        rank = q * (self.count - 1)
+        lower_rank = int(rank)
+        lower = self._value_at_rank(lower_rank)
+        if rank == lower_rank:
+            return lower
+        upper = self._value_at_rank(lower_rank + 1)
+        return lower + (upper - lower) * (rank - lower_rank)
+
+    def _value_at_rank(self, rank: int) -> float:
+        if self._positive_keys is None:
+            self._positive_keys = sorted(self._positive)
+        if self._negative_keys is None:
+            self._negative_keys = sorted(self._negative, reverse=True)
+
+        if rank <= 0:
+            return self.min
+        if rank >= self.count - 1:
+            return self.max
+
+        seen = 0
+        for key in self._negative_keys:
+            seen += self._negative[key]
+            if seen > rank:
+                return max(self.min, -self._value(key))
+
+        seen += self._zero_count
+        if seen > rank:
+            return 0.0
+
+        for key in self._positive_keys:
+            seen += self._positive[key]
+            if seen > rank:
+                return min(self.max, max(self.min, self._value(key)))
+
+        return self.max
+
+    def percentiles(self, *percentiles: float) -> Dict[str, float]:
+        """e.g. percentiles(50, 95, 99) -> {'p50': ..., 'p95': ..., 'p99': ...}"""
+        return {f"p{p:g}": self.quantile(p / 100) for p in percentiles}
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def __len__(self) -> int:
+        return self.count
+
+
+class _WindowBucket:
+    __slots__ = ("epoch", "count", "total", "sketch")
+
+    def __init__(self, epoch: int, sketch: Optional[QuantileSketch]):
+        self.epoch = epoch
+        self.count = 0
+        self.total = 0.0
+        self.sketch = sketch
+
+
+class RollingWindow:
+    """Time-bucketed rolling window.
+
+    Samples are grouped into ``num_buckets`` slots of ``bucket_seconds`` each. Slots
+    are recycled as time moves on, so memory is fixed no matter how long the process
+    runs, and windowed queries cost O(num_buckets) instead of O(samples). Windows are
+    aligned to bucket boundaries. Not thread-safe on its own.
+    """
+
+    def __init__(self, bucket_seconds: float = 10.0, num_buckets: int = 360,
+                 relative_accuracy: float = 0.01, track_quantiles: bool = True):
+        self.bucket_seconds = bucket_seconds
+        self.num_buckets = num_buckets
+        self.relative_accuracy = relative_accuracy
+        self.track_quantiles = track_quantiles
+        self._buckets: List[Optional[_WindowBucket]] = [None] * num_buckets
+
+    @property
+    def horizon(self) -> float:
+        """Longest window that can be queried, in seconds"""
+        return self.bucket_seconds * self.num_buckets
+
+    def add(self, value: float, timestamp: Optional[float] = None):
+        now = time.time() if timestamp is None else timestamp
+        epoch = int(now // self.bucket_seconds)
+        slot = epoch % self.num_buckets
+
+        bucket = self._buckets[slot]
+        if bucket is None or bucket.epoch != epoch:
+            if bucket is not None and bucket.epoch > epoch:
+                return  # Older than the horizon - its slot already holds newer data
+            sketch = QuantileSketch(self.relative_accuracy) if self.track_quantiles else None
+            bucket = self._buckets[slot] = _WindowBucket(epoch, sketch)
+
+        bucket.count += 1
+        bucket.total += value
+        if bucket.sketch is not None:
+            bucket.sketch.add(value)
+
+    def _live_buckets(self, seconds: Optional[float], now: Optional[float]) -> Iterable[_WindowBucket]:
+        now = time.time() if now is None else now
+        seconds = self.horizon if seconds is None else min(seconds, self.horizon)
+        newest = int(now // self.bucket_seconds)
+        oldest = max(int((now - seconds) // self.bucket_seconds), newest - self.num_buckets + 1)
+        for bucket in self._buckets:
+            if bucket is not None and oldest <= bucket.epoch <= newest:
+                yield bucket
+
+    def count(self, seconds: Optional[float] = None, now: Optional[float] = None) -> int:
+        return sum(bucket.count for bucket in self._live_buckets(seconds, now))
+
+    def total(self, seconds: Optional[float] = None, now: Optional[float] = None) -> float:
+        return sum(bucket.total for bucket in self._live_buckets(seconds, now))
+
+    def mean(self, seconds: Optional[float] = None, now: Optional[float] = None) -> float:
+        count = total = 0
+        for bucket in self._live_buckets(seconds, now):
+            count += bucket.count
+            total += bucket.total
+        return total / count if count else 0.0
+
+    def sketch(self, seconds: Optional[float] = None, now: Optional[float] = None) -> QuantileSketch:
+        """Merged quantile sketch of the window"""
+        merged = QuantileSketch(self.relative_accuracy)
+        for bucket in self._live_buckets(seconds, now):
+            if bucket.sketch is not None:
+                merged.merge(bucket.sketch)
+        return merged
+
+    def quantile(self, q: float, seconds: Optional[float] = None, now: Optional[float] = None) -> float:
+        return self.sketch(seconds, now).quantile(q)
+
+
+class StreamingMetric:
+    """Thread-safe metric stream: lifetime quantile sketch + rolling window"""
+
+    def __init__(self, bucket_seconds: float = 10.0, num_buckets: int = 360,
+                 relative_accuracy: float = 0.01):
+        self.lifetime = QuantileSketch(relative_accuracy)
+        self.window = RollingWindow(bucket_seconds, num_buckets, relative_accuracy)
+        self.last: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def add(self, value: float, timestamp: Optional[float] = None):
+        with self._lock:
+            self.lifetime.add(value)
+            self.window.add(value, timestamp)
+            self.last = value
+
+    def mean(self, seconds: Optional[float] = None) -> float:
+        """Mean over the last ``seconds`` (None = lifetime)"""
+        with self._lock:
+            if seconds is None:
+                return self.lifetime.mean
+            return self.window.mean(seconds)
+
+    def percentiles(self, *percentiles: float, seconds: Optional[float] = None) -> Dict[str, float]:
+        """Percentiles over the last ``seconds`` (None = lifetime)"""
+        percentiles = percentiles or (50, 95, 99)
+        with self._lock:
+            sketch = self.lifetime if seconds is None else self.window.sketch(seconds)
+            return sketch.percentiles(*percentiles)
+
+    def summary(self, seconds: Optional[float] = None) -> Dict[str, float]:
+        with self._lock:
+            sketch = self.lifetime if seconds is None else self.window.sketch(seconds)
+            return {
+                'count': sketch.count,
+                'mean': sketch.mean,
+                'min': sketch.min if sketch.count else 0.0,
+                'max': sketch.max if sketch.count else 0.0,
+                **sketch.percentiles(50, 95, 99),
+            }
@@ -5,22 +5,30 @@ before preview with automated correction loop.
 """
 
 import asyncio
+import heapq
 import json
 import re
 import time
 import os
+from collections import defaultdict
 from datetime import datetime
+from operator import itemgetter
 from pathlib import Path
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Callable, Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass
 import base64
 from bs4 import BeautifulSoup
+from bs4.element import Tag
 import cssutils
 import logging
 
 # Suppress CSS warnings
 cssutils.log.setLevel(logging.ERROR)
 
+# 'lxml' parses several times faster than the stdlib parser but builds a slightly
+# different tree for malformed markup (e.g. it always adds <html>/<body>)
+HTML_PARSER = os.getenv("UIUX_HTML_PARSER", "html.parser")
+
 @dataclass
 class QualityIssue:
     """Represents a UI/UX quality issue"""
@@ -41,6 +49,78 @@ class QualityReport:
     recommendations: List[str]
     timestamp: str
 
+def _style_declarations(css_content: str) -> List[Tuple[str, str]]:
+    """(property, value) of every top-level style rule, in source order"""
+    try:
+        css_sheet = cssutils.parseString(css_content)
+    except:
+        return []
+    return [(prop.name, prop.value)
+            for rule in css_sheet if rule.type == rule.STYLE_RULE
+            for prop in rule.style]
+
+class QualityDocument:
+    """One page (HTML DOM + CSS declarations) parsed once and shared by every analyzer
+    
+    Auto-fixes patch ``soup`` / append CSS in place and call ``mark_modified``,
+    so the next analysis pass reuses the tree instead of re-parsing serialized markup.
+    """
+    
+    def __init__(self, html_content: str, css_content: str = '', js_content: str = '', parser: str = HTML_PARSER):
+        self.soup = BeautifulSoup(html_content, parser)
+        self.css = css_content
+        self.js = js_content
+        self._html: Optional[str] = html_content
+        self._elements: Optional[List[Tag]] = None
+        self._by_name: Optional[Dict[str, List[Tuple[int, Tag]]]] = None
+        self._declarations: Optional[List[Tuple[str, str]]] = None
+    
+    @property
+    def html(self) -> str:
+        """Current markup; serialized only after a fix changed the tree"""
+        if self._html is None:
+            self._html = str(self.soup)
+        return self._html
+    
+    @property
+    def elements(self) -> List[Tag]:
+        """Every element in document order (``soup.find_all(True)``)"""
+        if self._elements is None:
+            self._elements = self.soup.find_all(True)
+            self._by_name = defaultdict(list)
+            for position, tag in enumerate(self._elements):
+                self._by_name[tag.name].append((position, tag))
+        return self._elements
+    
+    def tags(self, *names: str) -> List[Tag]:
+        """Elements with any of the given names in document order, from the element index"""
+        self.elements
+        if len(names) == 1:
+            return [tag for _, tag in self._by_name.get(names[0], ())]
+        return [tag for _, tag in heapq.merge(*(self._by_name.get(name, ()) for name in names), key=itemgetter(0))]
+    
+    def find_meta(self, name: str) -> Optional[Tag]:
+        return next((meta for meta in self.tags('meta') if meta.get('name') == name), None)
+    
+    @property
+    def style_declarations(self) -> List[Tuple[str, str]]:
+        if self._declarations is None:
+            self._declarations = _style_declarations(self.css)
+        return self._declarations
+    
+    def append_css(self, css_content: str):
+        """Append rules; only the new text is parsed"""
+        self.css += css_content
+        if self._declarations is not None:
+            self._declarations.extend(_style_declarations(css_content))
+    
+    def mark_modified(self, structure: bool = False):
+        """Record an in-place change to ``soup``; ``structure`` when elements were added or removed"""
+        self._html = None
+        if structure:
+            self._elements = None
+            self._by_name = None
+
 class VisualQualityAnalyzer:
     """Analyzes visual design quality including colors, typography, spacing, layout"""
     
@@ -65,43 +145,32 @@ class VisualQualityAnalyzer:
             'grid_alignment': True
         }
 
-    async def analyze_visual_quality(self, html_content: str, css_content: str) -> List[QualityIssue]:
+    async def analyze_visual_quality(self, doc: QualityDocument) -> List[QualityIssue]:
         """Analyze visual design quality"""
         issues = []
         
-        # Parse HTML and CSS
-        soup = BeautifulSoup(html_content, 'html.parser')
-        
-        try:
-            css_sheet = cssutils.parseString(css_content)
-        except:
-            css_sheet = None
-        
         # Color Analysis
-        issues.extend(await self._analyze_colors(soup, css_sheet))
+        issues.extend(await self._analyze_colors(doc))
         
         # Typography Analysis
-        issues.extend(await self._analyze_typography(soup, css_sheet))
+        issues.extend(await self._analyze_typography(doc))
         
         # Spacing and Layout Analysis
-        issues.extend(await self._analyze_spacing_layout(soup, css_sheet))
+        issues.extend(await self._analyze_spacing_layout(doc))
         
         # Visual Hierarchy Analysis
-        issues.extend(await self._analyze_visual_hierarchy(soup, css_sheet))
+        issues.extend(await self._analyze_visual_hierarchy(doc))
         
         return issues
 
-    async def _analyze_colors(self, soup, css_sheet) -> List[QualityIssue]:
+    async def _analyze_colors(self, doc: QualityDocument) -> List[QualityIssue]:
         """Analyze color usage and contrast"""
         issues = []
         colors_used = set()
         
-        if css_sheet:
-            for rule in css_sheet:
-                if rule.type == rule.STYLE_RULE:
-                    for prop in rule.style:
-                        if 'color' in prop.name or 'background' in prop.name:
-                            colors_used.add(prop.value)
+        for name, value in doc.style_declarations:
+            if 'color' in name or 'background' in name:
+                colors_used.add(value)
         
         # Check color count
         if len(colors_used) > self.color_standards['max_colors']:
@@ -114,7 +183,7 @@ class VisualQualityAnalyzer:
             ))
         
         # Check for sufficient contrast (simulated analysis)
-        text_elements = soup.find_all(['p', 'span', 'div', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6'])
+        text_elements = doc.tags('p', 'span', 'div', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6')
         if len(text_elements) > 10:  # If many text elements without explicit contrast consideration
             issues.append(QualityIssue(
                 category='accessibility',
@@ -126,24 +195,21 @@ class VisualQualityAnalyzer:
         
         return issues
 
-    async def _analyze_typography(self, soup, css_sheet) -> List[QualityIssue]:
+    async def _analyze_typography(self, doc: QualityDocument) -> List[QualityIssue]:
         """Analyze typography quality"""
         issues = []
         font_families = set()
         font_sizes = []
         
-        if css_sheet:
-            for rule in css_sheet:
-                if rule.type == rule.STYLE_RULE:
-                    for prop in rule.style:
-                        if prop.name == 'font-family':
-                            font_families.add(prop.value)
-                        elif prop.name == 'font-size':
-                            try:
-                                size = float(re.findall(r'\d+', prop.value)[0])
-                                font_sizes.append(size)
-                            except:
-                                pass
+        for name, value in doc.style_declarations:
+            if name == 'font-family':
+                font_families.add(value)
+            elif name == 'font-size':
+                try:
+                    size = float(re.findall(r'\d+', value)[0])
+                    font_sizes.append(size)
+                except:
+                    pass
         
         # Check font family count
         if len(font_families) > self.typography_standards['max_font_families']:
@@ -166,7 +232,7 @@ class VisualQualityAnalyzer:
             ))
         
         # Check heading hierarchy
-        headings = soup.find_all(['h1', 'h2', 'h3', 'h4', 'h5', 'h6'])
+        headings = doc.tags('h1', 'h2', 'h3', 'h4', 'h5', 'h6')
         heading_levels = [int(h.name[1]) for h in headings]
         if heading_levels and (min(heading_levels) != 1 or not self._is_sequential(heading_levels)):
             issues.append(QualityIssue(
@@ -179,28 +245,25 @@ class VisualQualityAnalyzer:
         
         return issues
 
-    async def _analyze_spacing_layout(self, soup, css_sheet) -> List[QualityIssue]:
+    async def _analyze_spacing_layout(self, doc: QualityDocument) -> List[QualityIssue]:
         """Analyze spacing and layout quality"""
         issues = []
         margins = []
         paddings = []
         
-        if css_sheet:
-            for rule in css_sheet:
-                if rule.type == rule.STYLE_RULE:
-                    for prop in rule.style:
-                        if 'margin' in prop.name:
-                            try:
-                                value = float(re.findall(r'\d+', prop.value)[0])
-                                margins.append(value)
-                            except:
-                                pass
-                        elif 'padding' in prop.name:
-                            try:
-                                value = float(re.findall(r'\d+', prop.value)[0])
-                                paddings.append(value)
-                            except:
-                                pass
+        for name, declared in doc.style_declarations:
+            if 'margin' in name:
+                try:
+                    value = float(re.findall(r'\d+', declared)[0])
+                    margins.append(value)
+                except:
+                    pass
+            elif 'padding' in name:
+                try:
+                    value = float(re.findall(r'\d+', declared)[0])
+                    paddings.append(value)
+                except:
+                    pass
         
         # Check for consistent spacing
         if margins and len(set(margins)) > 5:
@@ -223,12 +286,12 @@ class VisualQualityAnalyzer:
         
         return issues
 
-    async def _analyze_visual_hierarchy(self, soup, css_sheet) -> List[QualityIssue]:
+    async def _analyze_visual_hierarchy(self, doc: QualityDocument) -> List[QualityIssue]:
         """Analyze visual hierarchy and information architecture"""
         issues = []
         
         # Check for proper use of headings
-        headings = soup.find_all(['h1', 'h2', 'h3', 'h4', 'h5', 'h6'])
+        headings = doc.tags('h1', 'h2', 'h3', 'h4', 'h5', 'h6')
         if len(headings) == 0:
             issues.append(QualityIssue(
                 category='ux',
@@ -239,8 +302,8 @@ class VisualQualityAnalyzer:
             ))
         
         # Check for navigation elements
-        nav_elements = soup.find_all(['nav', 'menu']) + soup.find_all(class_=re.compile(r'nav|menu'))
-        if len(nav_elements) == 0 and len(soup.find_all('a')) > 3:
+        nav_elements = doc.tags('nav', 'menu') + doc.soup.find_all(class_=re.compile(r'nav|menu'))
+        if len(nav_elements) == 0 and len(doc.tags('a')) > 3:
             issues.append(QualityIssue(
                 category='ux',
                 severity='major',
@@ -270,32 +333,31 @@ class UXValidator:
             'required_feedback': True
         }
 
-    async def validate_ux_patterns(self, html_content: str, css_content: str) -> List[QualityIssue]:
+    async def validate_ux_patterns(self, doc: QualityDocument) -> List[QualityIssue]:
         """Validate UX patterns and usability"""
         issues = []
-        soup = BeautifulSoup(html_content, 'html.parser')
         
         # Navigation UX
-        issues.extend(await self._validate_navigation(soup))
+        issues.extend(await self._validate_navigation(doc))
         
         # Form UX
-        issues.extend(await self._validate_forms(soup))
+        issues.extend(await self._validate_forms(doc))
         
         # Interaction UX
-        issues.extend(await self._validate_interactions(soup))
+        issues.extend(await self._validate_interactions(doc))
         
         # Content UX
-        issues.extend(await self._validate_content(soup))
+        issues.extend(await self._validate_content(doc))
         
         return issues
 
-    async def _validate_navigation(self, soup) -> List[QualityIssue]:
+    async def _validate_navigation(self, doc: QualityDocument) -> List[QualityIssue]:
         """Validate navigation usability"""
         issues = []
         
         # Check for navigation menu
-        nav_elements = soup.find_all(['nav', 'menu'])
-        links = soup.find_all('a')
+        nav_elements = doc.tags('nav', 'menu')
+        links = doc.tags('a')
         
         if len(links) > 5 and len(nav_elements) == 0:
             issues.append(QualityIssue(
@@ -307,7 +369,7 @@ class UXValidator:
             ))
         
         # Check for breadcrumbs on complex sites
-        if len(links) > 10 and not soup.find(class_=re.compile(r'breadcrumb')):
+        if len(links) > 10 and not doc.soup.find(class_=re.compile(r'breadcrumb')):
             issues.append(QualityIssue(
                 category='ux',
                 severity='minor',
@@ -318,10 +380,10 @@ class UXValidator:
         
         return issues
 
-    async def _validate_forms(self, soup) -> List[QualityIssue]:
+    async def _validate_forms(self, doc: QualityDocument) -> List[QualityIssue]:
         """Validate form usability"""
         issues = []
-        forms = soup.find_all('form')
+        forms = doc.tags('form')
         
         for i, form in enumerate(forms):
             inputs = form.find_all(['input', 'select', 'textarea'])
@@ -360,13 +422,12 @@ class UXValidator:
         
         return issues
 
-    async def _validate_interactions(self, soup) -> List[QualityIssue]:
+    async def _validate_interactions(self, doc: QualityDocument) -> List[QualityIssue]:
         """Validate interaction patterns"""
         issues = []
         
         # Check for interactive elements
-        buttons = soup.find_all('button')
-        clickable_elements = soup.find_all(class_=re.compile(r'button|btn|click'))
+        buttons = doc.tags('button')
         
         # Check button text clarity
         for i, button in enumerate(buttons):
@@ -380,7 +441,7 @@ class UXValidator:
                 ))
         
         # Check for loading states indication
-        if len(buttons) > 0 and not soup.find(class_=re.compile(r'loading|spinner')):
+        if len(buttons) > 0 and not doc.soup.find(class_=re.compile(r'loading|spinner')):
             issues.append(QualityIssue(
                 category='ux',
                 severity='minor',
@@ -391,12 +452,12 @@ class UXValidator:
         
         return issues
 
-    async def _validate_content(self, soup) -> List[QualityIssue]:
+    async def _validate_content(self, doc: QualityDocument) -> List[QualityIssue]:
         """Validate content presentation"""
         issues = []
         
         # Check for alt text on images
-        images = soup.find_all('img')
+        images = doc.tags('img')
         images_without_alt = [img for img in images if not img.get('alt')]
         
         if images_without_alt:
@@ -409,7 +470,8 @@ class UXValidator:
             ))
         
         # Check for empty elements
-        empty_elements = soup.find_all(lambda tag: tag.name in ['div', 'span', 'p'] and not tag.get_text(strip=True) and not tag.find_all())
+        empty_elements = [tag for tag in doc.tags('div', 'span', 'p')
+                          if tag.find(True) is None and not tag.get_text(strip=True)]
         if empty_elements:
             issues.append(QualityIssue(
                 category='visual',
@@ -431,13 +493,13 @@ class ResponsiveAnalyzer:
             'desktop': 1200
         }
 
-    async def analyze_responsive_design(self, html_content: str, css_content: str) -> List[QualityIssue]:
+    async def analyze_responsive_design(self, doc: QualityDocument) -> List[QualityIssue]:
         """Analyze responsive design implementation"""
         issues = []
+        css_content = doc.css
         
         # Check for viewport meta tag
-        soup = BeautifulSoup(html_content, 'html.parser')
-        viewport_meta = soup.find('meta', attrs={'name': 'viewport'})
+        viewport_meta = doc.find_meta('viewport')
         
         if not viewport_meta:
             issues.append(QualityIssue(
@@ -475,14 +537,13 @@ class ResponsiveAnalyzer:
 class PerformanceAnalyzer:
     """Analyzes performance-related UI issues"""
     
-    async def analyze_performance(self, html_content: str, css_content: str) -> List[QualityIssue]:
+    async def analyze_performance(self, doc: QualityDocument) -> List[QualityIssue]:
         """Analyze performance implications of UI code"""
         issues = []
-        
-        soup = BeautifulSoup(html_content, 'html.parser')
+        css_content = doc.css
         
         # Check for large images without optimization
-        images = soup.find_all('img')
+        images = doc.tags('img')
         for i, img in enumerate(images):
             src = img.get('src', '')
             if src and not any(format in src.lower() for format in ['webp', 'avif']):
@@ -506,7 +567,7 @@ class PerformanceAnalyzer:
             ))
         
         # Check for inline styles
-        inline_styles = soup.find_all(style=True)
+        inline_styles = [tag for tag in doc.elements if tag.has_attr('style')]
         if len(inline_styles) > 5:
             issues.append(QualityIssue(
                 category='performance',
@@ -521,67 +582,61 @@ class PerformanceAnalyzer:
 class AutoFixGenerator:
     """Generates automatic fixes for common UI/UX issues"""
     
-    async def generate_fixes(self, issues: List[QualityIssue], html_content: str, css_content: str) -> Dict[str, str]:
-        """Generate automatic fixes for detected issues"""
-        fixes = {
-            'html': html_content,
-            'css': css_content,
-            'js': '',
-            'applied_fixes': []
-        }
-        
-        soup = BeautifulSoup(html_content, 'html.parser')
+    async def generate_fixes(self, issues: List[QualityIssue], doc: QualityDocument) -> List[str]:
+        """Apply automatic fixes for detected issues to doc in place; returns the fixes applied"""
+        applied_fixes = []
+        soup = doc.soup
         modified = False
         
         for issue in issues:
             if issue.severity in ['critical', 'major']:
                 if 'viewport meta tag' in issue.issue.lower():
                     # Add viewport meta tag
-                    if not soup.find('meta', attrs={'name': 'viewport'}):
+                    if not doc.find_meta('viewport'):
                         if soup.head:
                             viewport_tag = soup.new_tag('meta', attrs={
                                 'name': 'viewport',
                                 'content': 'width=device-width, initial-scale=1.0'
                             })
                             soup.head.insert(0, viewport_tag)
+                            doc.mark_modified(structure=True)
                             modified = True
-                            fixes['applied_fixes'].append('Added viewport meta tag')
+                            applied_fixes.append('Added viewport meta tag')
                 
                 elif 'images without alt text' in issue.issue.lower():
                     # Add alt text to images
-                    images = soup.find_all('img')
+                    images = doc.tags('img')
                     for i, img in enumerate(images):
                         if not img.get('alt'):
                             img['alt'] = f'Image {i+1}'
+                            doc.mark_modified()
                             modified = True
                     if modified:
-                        fixes['applied_fixes'].append('Added alt text to images')
+                        applied_fixes.append('Added alt text to images')
                 
                 elif 'no headings found' in issue.issue.lower():
                     # Add main heading if missing
-                    if not soup.find(['h1', 'h2', 'h3', 'h4', 'h5', 'h6']):
-                        body = soup.find('body')
+                    if not doc.tags('h1', 'h2', 'h3', 'h4', 'h5', 'h6'):
+                        body = next(iter(doc.tags('body')), None)
                         if body and body.get_text(strip=True):
                             h1_tag = soup.new_tag('h1')
                             h1_tag.string = 'Main Content'
                             body.insert(0, h1_tag)
+                            doc.mark_modified(structure=True)
                             modified = True
-                            fixes['applied_fixes'].append('Added main heading')
-        
-        if modified:
-            fixes['html'] = str(soup)
+                            applied_fixes.append('Added main heading')
         
         # CSS fixes
-        css_fixes = await self._generate_css_fixes(issues, css_content)
+        css_fixes = await self._generate_css_fixes(issues)
         if css_fixes:
-            fixes['css'] = css_fixes
-            fixes['applied_fixes'].extend(['Applied CSS improvements'])
+            doc.append_css(css_fixes)
+            applied_fixes.extend(['Applied CSS improvements'])
         
-        return fixes
+        return applied_fixes
 
-    async def _generate_css_fixes(self, issues: List[QualityIssue], css_content: str) -> str:
-        """Generate CSS fixes for common issues"""
-        fixed_css = css_content
+    async def _generate_css_fixes(self, issues: List[QualityIssue]) -> str:
+        """CSS to append for common issues ('' when none apply)"""
+        fixed_css = ''
         
         # Add responsive base if missing media queries
         if any('media queries' in issue.issue.lower() for issue in issues):
@@ -642,28 +697,32 @@ class UIUXQualityAgent:
 
     async def analyze_quality(self, html_content: str, css_content: str = '', js_content: str = '') -> QualityReport:
         """Perform comprehensive UI/UX quality analysis"""
+        return await self.analyze_document(QualityDocument(html_content, css_content, js_content))
+
+    async def analyze_document(self, doc: QualityDocument) -> QualityReport:
+        """Quality analysis of an already-parsed page"""
         print("🔍 Starting UI/UX Quality Analysis...")
         
         all_issues = []
         
         # Visual Quality Analysis
         print("   Analyzing visual design...")
-        visual_issues = await self.visual_analyzer.analyze_visual_quality(html_content, css_content)
+        visual_issues = await self.visual_analyzer.analyze_visual_quality(doc)
         all_issues.extend(visual_issues)
         
         # UX Pattern Validation
         print("   Validating UX patterns...")
-        ux_issues = await self.ux_validator.validate_ux_patterns(html_content, css_content)
+        ux_issues = await self.ux_validator.validate_ux_patterns(doc)
         all_issues.extend(ux_issues)
         
         # Responsive Design Analysis
         print("   Checking responsive design...")
-        responsive_issues = await self.responsive_analyzer.analyze_responsive_design(html_content, css_content)
+        responsive_issues = await self.responsive_analyzer.analyze_responsive_design(doc)
         all_issues.extend(responsive_issues)
         
         # Performance Analysis
         print("   Analyzing performance impact...")
-        performance_issues = await self.performance_analyzer.analyze_performance(html_content, css_content)
+        performance_issues = await self.performance_analyzer.analyze_performance(doc)
         all_issues.extend(performance_issues)
         
         # Calculate quality score
@@ -673,7 +732,7 @@ class UIUXQualityAgent:
         passed = self._meets_quality_standards(all_issues, score)
         
         # Generate strengths and recommendations
-        strengths = self._identify_strengths(html_content, css_content, all_issues)
+        strengths = self._identify_strengths(doc, all_issues)
         recommendations = self._generate_recommendations(all_issues)
         
         report = QualityReport(
@@ -717,18 +776,18 @@ class UIUXQualityAgent:
             total_count <= self.quality_standards['max_total_issues']
         )
 
-    def _identify_strengths(self, html_content: str, css_content: str, issues: List[QualityIssue]) -> List[str]:
+    def _identify_strengths(self, doc: QualityDocument, issues: List[QualityIssue]) -> List[str]:
         """Identify positive aspects of the UI/UX"""
         strengths = []
-        soup = BeautifulSoup(html_content, 'html.parser')
+        css_content = doc.css
         
         # Check for semantic HTML
-        semantic_tags = soup.find_all(['header', 'nav', 'main', 'section', 'article', 'aside', 'footer'])
+        semantic_tags = doc.tags('header', 'nav', 'main', 'section', 'article', 'aside', 'footer')
         if semantic_tags:
             strengths.append("Good use of semantic HTML elements")
         
         # Check for proper heading structure
-        headings = soup.find_all(['h1', 'h2', 'h3', 'h4', 'h5', 'h6'])
+        headings = doc.tags('h1', 'h2', 'h3', 'h4', 'h5', 'h6')
         if headings and not any('heading hierarchy' in issue.issue.lower() for issue in issues):
             strengths.append("Well-structured heading hierarchy")
         
@@ -737,7 +796,7 @@ class UIUXQualityAgent:
             strengths.append("Responsive design implementation")
         
         # Check for accessibility features
-        if soup.find_all(attrs={'aria-label': True}) or soup.find_all(attrs={'role': True}):
+        if any(tag.has_attr('aria-label') or tag.has_attr('role') for tag in doc.elements):
             strengths.append("Accessibility attributes present")
         
         # Check for consistent styling
@@ -773,13 +832,16 @@ class UIUXQualityAgent:
         
         return recommendations
 
-    async def auto_fix_and_retry(self, html_content: str, css_content: str = '', js_content: str = '', max_iterations: int = 3) -> Tuple[QualityReport, Dict[str, str]]:
-        """Automatically fix issues and retry analysis until quality standards are met"""
+    async def auto_fix_and_retry(self, html_content: str, css_content: str = '', js_content: str = '', max_iterations: int = 3,
+                                 on_iteration: Optional[Callable[[int, QualityReport], None]] = None) -> Tuple[QualityReport, Dict[str, str]]:
+        """Automatically fix issues and retry analysis until quality standards are met
+
+        ``on_iteration(iteration, report)`` is called after each analysis pass.
+        """
         print("🔄 Starting auto-fix and quality validation loop...")
         
-        current_html = html_content
-        current_css = css_content
-        current_js = js_content
+        # Parsed once; fixes patch this document instead of re-parsing the page each iteration
+        doc = QualityDocument(html_content, css_content, js_content)
         iteration = 0
         all_applied_fixes = []
         
@@ -788,10 +850,12 @@ class UIUXQualityAgent:
             print(f"\n📊 Quality Analysis - Iteration {iteration}")
             
             # Analyze current quality
-            report = await self.analyze_quality(current_html, current_css, current_js)
+            report = await self.analyze_document(doc)
             
             print(f"   Quality Score: {report.overall_score:.1f}/100")
             print(f"   Issues Found: {len(report.issues)} ({len([i for i in report.issues if i.severity == 'critical'])} critical, {len([i for i in report.issues if i.severity == 'major'])} major)")
+            if on_iteration:
+                on_iteration(iteration, report)
             
             if report.passed:
                 print("✅ Quality standards met!")
@@ -800,23 +864,20 @@ class UIUXQualityAgent:
             print("❌ Quality standards not met. Applying automatic fixes...")
             
             # Generate and apply fixes
-            fixes = await self.auto_fix_generator.generate_fixes(report.issues, current_html, current_css)
+            applied_fixes = await self.auto_fix_generator.generate_fixes(report.issues, doc)
             
-            if fixes['applied_fixes']:
-                current_html = fixes['html']
-                current_css = fixes['css']
-                current_js = fixes.get('js', current_js)
-                all_applied_fixes.extend(fixes['applied_fixes'])
+            if applied_fixes:
+                all_applied_fixes.extend(applied_fixes)
                 
-                print(f"   Applied fixes: {', '.join(fixes['applied_fixes'])}")
+                print(f"   Applied fixes: {', '.join(applied_fixes)}")
             else:
                 print("   No automatic fixes available for remaining issues")
                 break
         
         final_code = {
-            'html': current_html,
-            'css': current_css,
-            'js': current_js,
+            'html': doc.html,
+            'css': doc.css,
+            'js': doc.js,
             'applied_fixes': all_applied_fixes,
             'iterations': iteration
         }
@@ -4,6 +4,7 @@
 สร้างแอปจริงจาก Chat พร้อม Effects น่าตื่นเต้น!
 """
 import os
+import sys
 import json
 import asyncio
 import uuid
@@ -12,6 +13,7 @@ from datetime import datetime
 from pathlib import Path
 from typing import Dict, Any, List, Optional
 import shutil
+import tempfile
 
 # Load environment variables
 from dotenv import load_dotenv
@@ -40,6 +42,23 @@ try:
 except Exception as _ge:
     GEMINI_AVAILABLE = False
 
+# Shared LLM response cache (apps/orchestrator/agents/llm_cache.py)
+try:
+    sys.path.append(str(Path(__file__).parent / "apps" / "orchestrator"))
+    from agents.llm_cache import LLMResponseCache, llm_cache
+    LLM_CACHE_AVAILABLE = True
+except ImportError as _ce:
+    LLM_CACHE_AVAILABLE = False
+    print(f"⚠️ LLM cache unavailable: {_ce}")
+
+# Shared responsive image store (apps/orchestrator/agents/asset_store.py)
+try:
+    from agents.asset_store import IMAGE_EXTENSIONS, asset_store
+    ASSET_STORE_AVAILABLE = True
+except ImportError as _ae:
+    ASSET_STORE_AVAILABLE = False
+    print(f"⚠️ Asset store unavailable: {_ae}")
+
 class ChatRequest(BaseModel):
     message: str
     session_id: Optional[str] = None
@@ -133,14 +152,21 @@ class RealAI:
 
 ส่งกลับเฉพาะโค้ด HTML เต็ม ไม่ต้องคำอธิบาย:"""
 
-                response = self.client.chat.completions.create(
-                    model="gpt-4o-mini",  # ใช้ model ที่เหมาะสมกว่า
-                    messages=[{"role": "user", "content": prompt}],
-                    temperature=0.3,
-                    max_tokens=4000
-                )
-                
-                ai_code = response.choices[0].message.content.strip()
+                messages = [{"role": "user", "content": prompt}]
+                cache_key = LLMResponseCache.make_key("gpt-4o-mini", 0.3, messages, max_tokens=4000) if LLM_CACHE_AVAILABLE else None
+                ai_code = llm_cache.get(cache_key) if cache_key else None
+                if ai_code is None:
+                    response = self.client.chat.completions.create(
+                        model="gpt-4o-mini",  # ใช้ model ที่เหมาะสมกว่า
+                        messages=messages,
+                        temperature=0.3,
+                        max_tokens=4000
+                    )
+                    ai_code = response.choices[0].message.content.strip()
+                    if cache_key:
+                        llm_cache.set(cache_key, ai_code)
+                else:
+                    print(f"⚡ LLM cache hit for {app_name}")
                 
                 # ทำความสะอาดโค้ดที่ AI ส่งมา
                 if ai_code.startswith('```html'):
@@ -736,6 +762,23 @@ app.mount("/sites", StaticFiles(directory=str(SITES_WEBROOT), html=True), name="
 if Path('data').exists():
     app.mount("/data", StaticFiles(directory='data'), name="data")
 
+# Shared image derivatives: generated apps link here instead of shipping the /data originals
+ASSET_STORE_URL = "/asset-store"
+if ASSET_STORE_AVAILABLE:
+    asset_store.root.mkdir(parents=True, exist_ok=True)
+    app.mount(ASSET_STORE_URL, StaticFiles(directory=str(asset_store.root)), name="asset_store")
+    if Path('data').exists():
+        # Precompute derivatives of data/**/raw in the background; already-stored images are only hashed
+        import threading
+        threading.Thread(
+            target=lambda: asset_store.precompute(
+                p for p in Path('data').rglob('*')
+                if p.is_file() and p.suffix.lower() in IMAGE_EXTENSIONS and p.parent.name == 'raw'
+            ),
+            name="asset-precompute",
+            daemon=True,
+        ).start()
+
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
     print(f"❌ Validation Error: {exc}")
@@ -749,6 +792,107 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
         }
     )
 
+# File streaming budgets: server ส่ง chunk ไม่เกิน STREAM_CHUNK_BYTES หรือทุก STREAM_FLUSH_INTERVAL วินาที
+# ส่วน typing effect ให้ client เล่นเองที่ TYPING_RENDER_RATE ตัวอักษร/วินาที (0 = แสดงทันที)
+STREAM_CHUNK_BYTES = int(os.getenv("STREAM_CHUNK_BYTES", "16384"))
+STREAM_FLUSH_INTERVAL = float(os.getenv("STREAM_FLUSH_INTERVAL", "0.1"))
+TYPING_RENDER_RATE = int(os.getenv("TYPING_RENDER_RATE", "4000"))
+
+# mkstemp สร้างไฟล์เป็น 0600 และ os.replace คง mode นั้นไว้ จึงต้องตั้ง mode ให้เหมือน open() ปกติ
+# (อ่าน umask ครั้งเดียวตอน import เพราะ os.umask ต้อง set แล้ว set คืน ซึ่งไม่ thread-safe)
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+GENERATED_FILE_MODE = 0o666 & ~_UMASK
+
+
+class StreamingFileWriter:
+    """เขียนไฟล์ด้วยการเปิดครั้งเดียว (temp file + rename แบบ atomic)
+    และส่งเนื้อหาให้ client เป็น chunk รวมตามงบ byte/เวลา แทนการส่งทีละบรรทัด"""
+
+    def __init__(self, websocket: Optional[WebSocket], full_path: Path, display_path: str,
+                 total_chars: int = 0, write: bool = True,
+                 chunk_bytes: int = None, flush_interval: float = None):
+        self.websocket = websocket
+        self.full_path = full_path
+        self.display_path = display_path
+        self.total_chars = total_chars
+        self.write_to_disk = write
+        self.chunk_bytes = chunk_bytes or STREAM_CHUNK_BYTES
+        self.flush_interval = STREAM_FLUSH_INTERVAL if flush_interval is None else flush_interval
+
+        self._buffer: List[str] = []
+        self._buffer_bytes = 0
+        self._sent_chars = 0
+        self._last_flush = time.monotonic()
+        self._file = None
+        self._tmp_path: Optional[Path] = None
+        self.frames_sent = 0
+
+    def open(self):
+        if self.write_to_disk:
+            self.full_path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=str(self.full_path.parent), prefix=f".{self.full_path.name}.", suffix=".tmp")
+            self._tmp_path = Path(tmp)
+            os.fchmod(fd, GENERATED_FILE_MODE)  # ให้ nginx/preview อ่านไฟล์ที่ generate ได้
+            self._file = os.fdopen(fd, 'w', encoding='utf-8', newline='')
+        return self
+
+    def write_text(self, text: str):
+        """เขียนข้อความลง temp file อย่างเดียว (ไม่ stream ไปที่ client)"""
+        if self._file:
+            self._file.write(text)
+
+    async def write(self, text: str):
+        """เขียนข้อความ (จะเรียกทีละส่วนหรือทั้งไฟล์ก็ได้)"""
+        self.write_text(text)
+        if not self.websocket:
+            return
+        for piece in text.splitlines(keepends=True):
+            self._buffer.append(piece)
+            self._buffer_bytes += len(piece.encode('utf-8'))
+            if (self._buffer_bytes >= self.chunk_bytes
+                    or time.monotonic() - self._last_flush >= self.flush_interval):
+                await self._flush()
+
+    async def _flush(self):
+        if not self._buffer or not self.websocket:
+            return
+        chunk = ''.join(self._buffer)
+        self._buffer.clear()
+        self._buffer_bytes = 0
+        self._sent_chars += len(chunk)
+        self._last_flush = time.monotonic()
+        progress = (self._sent_chars / self.total_chars * 100) if self.total_chars else 100
+        await self.websocket.send_json({
+            "type": "typing_chunk",
+            "file": self.display_path,
+            "chunk": chunk,
+            "progress": min(progress, 100)
+        })
+        self.frames_sent += 1
+
+    async def close(self):
+        """ส่ง chunk ที่ค้าง แล้ว rename temp file ทับไฟล์จริง"""
+        await self._flush()
+        self.commit()
+
+    def commit(self):
+        """ปิด temp file แล้ว os.replace ทับไฟล์จริง (ใช้ตรงๆ ได้เมื่อไม่มี websocket)"""
+        if self._file:
+            self._file.close()
+            self._file = None
+            os.replace(self._tmp_path, self.full_path)
+            self._tmp_path = None
+
+    def abort(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+        if self._tmp_path and self._tmp_path.exists():
+            self._tmp_path.unlink()
+        self._tmp_path = None
+
+
 # แล้ว AI
 real_ai = RealAI()
 
@@ -795,10 +939,16 @@ class ExcitingLovableAI:
 
     # ---------- Utility helpers ----------
     def _safe_write(self, base_dir: Path, rel_path: str, content: str):
+        """เขียนไฟล์แบบ atomic ผ่าน StreamingFileWriter (temp file ในโฟลเดอร์เดียวกัน แล้ว os.replace)
+        ผู้อ่าน/preview ที่เปิดไฟล์ระหว่าง build จะเห็นแต่ไฟล์เก่าหรือไฟล์ใหม่ที่ครบ ไม่เห็นไฟล์ครึ่งๆ"""
         file_path = base_dir / rel_path
-        file_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(content)
+        writer = StreamingFileWriter(None, file_path, rel_path).open()
+        try:
+            writer.write_text(content)
+            writer.commit()
+        except BaseException:
+            writer.abort()
+            raise
         return file_path
 
     def _zip_app(self, app_dir: Path) -> Path:
@@ -1545,8 +1695,10 @@ window.addEventListener('load', ()=>{
         return {"files": list(created_files.keys()), "http_entry": http_entry, "zip_path": str(zip_path)}
 
     def _discover_local_images(self, limit: int = 40) -> List[str]:
-        """Return list of served /data/* image URLs if data directory exists.
-        Looks for data/**/raw/*.(png|jpg|jpeg|gif|webp)
+        """Return list of served image URLs if data directory exists.
+        Looks for data/**/raw/*.(png|jpg|jpeg|gif|webp); images already precomputed into the
+        shared asset store are served as their resized derivative under /asset-store instead of
+        the full-size /data original. Duplicate images (same content) are listed once.
         """
         root = Path('data')
         if not root.exists():
@@ -1556,6 +1708,14 @@ window.addEventListener('load', ()=>{
         try:
             for p in root.rglob('*'):
                 if p.is_file() and p.suffix.lower() in exts and ('/raw/' in str(p).replace('\\','/') or str(p).lower().endswith('/raw')):
+                    manifest = asset_store.lookup(p) if ASSET_STORE_AVAILABLE else None
+                    if manifest:
+                        web_path = asset_store.url(manifest, ASSET_STORE_URL)
+                        if web_path not in results:
+                            results.append(web_path)
+                        if len(results) >= limit:
+                            break
+                        continue
                     web_path = '/' + str(p).replace('\\', '/').lstrip('/')
                     if not web_path.startswith('/data/'):
                         web_path = '/data/' + str(p).replace('\\','/')
@@ -1566,39 +1726,31 @@ window.addEventListener('load', ()=>{
             pass
         return results
 
-    async def _create_file_with_typing(self, websocket: WebSocket, file_path: str, content: str, description: str):
-        """สร้างไฟล์พร้อม typing effect"""
+    async def _create_file_with_typing(self, websocket: WebSocket, file_path: str, content: str, description: str,
+                                       write: bool = True, render_rate: int = None):
+        """สร้างไฟล์พร้อม typing effect
+        เขียนไฟล์ครั้งเดียวแบบ atomic และส่งโค้ดเป็น chunk รวม; ความเร็วพิมพ์ให้ client เล่นตาม render_rate
+        write=False ใช้เมื่อไฟล์ถูกเขียนลงดิสก์ไปแล้ว (ส่งให้ client อย่างเดียว)"""
+        writer = StreamingFileWriter(
+            websocket,
+            self.workspace_dir / file_path,
+            file_path,
+            total_chars=len(content),
+            write=write
+        )
         try:
             # แสดงสถานะเริ่มสร้างไฟล์
             await websocket.send_json({
                 "type": "file_start",
                 "file": file_path,
-                "description": description
+                "description": description,
+                "total_chars": len(content),
+                "render_rate": TYPING_RENDER_RATE if render_rate is None else render_rate
             })
             
-            # สร้างไฟล์จริง
-            full_path = self.workspace_dir / file_path
-            full_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            # เขียนไฟล์ทีละบรรทัด พร้อม delay
-            lines = content.split('\n')
-            
-            for i, line in enumerate(lines):
-                # เขียนไฟล์
-                mode = 'w' if i == 0 else 'a'
-                with open(full_path, mode, encoding='utf-8') as f:
-                    f.write(line + '\n')
-                
-                # ส่งข้อมูลแบบ realtime
-                await websocket.send_json({
-                    "type": "typing_line",
-                    "file": file_path,
-                    "line": line,
-                    "progress": (i + 1) / len(lines) * 100
-                })
-                
-                # Delay เพื่อให้ดู exciting
-                await asyncio.sleep(0.01)  # เร็วกว่าเดิมเพื่อ UX ที่ดี
+            writer.open()
+            await writer.write(content)
+            await writer.close()
             
             # ส่งสัญญาณเสร็จสิ้น
             await websocket.send_json({
@@ -1608,6 +1760,7 @@ window.addEventListener('load', ()=>{
             })
             
         except Exception as e:
+            writer.abort()
             await websocket.send_json({
                 "type": "error",
                 "message": f"❌ Error creating {file_path}: {str(e)}"
@@ -1649,13 +1802,12 @@ window.addEventListener('load', ()=>{
             app_dir = self.workspace_dir / app_name
             app_dir.mkdir(parents=True, exist_ok=True)
             build_info = self.build_project(app_dir, plan)
-            # สตรีมโค้ดทีละไฟล์เพื่อ UX
+            # สตรีมโค้ดทีละไฟล์เพื่อ UX (build_project เขียนไฟล์ลงดิสก์แล้ว จึงส่งให้ client อย่างเดียว)
             for rel in build_info['files']:
                 full = app_dir / rel
                 with open(full, 'r', encoding='utf-8') as f:
                     content = f.read()
-                await self._create_file_with_typing(websocket, f"{app_name}/{rel}", content, f"สร้างไฟล์ {rel}")
-                await asyncio.sleep(0.05)
+                await self._create_file_with_typing(websocket, f"{app_name}/{rel}", content, f"สร้างไฟล์ {rel}", write=False)
             # ส่ง preview ถ้ามีหน้า index.html
             if build_info.get('http_entry'):
                 index_file = app_dir / build_info['http_entry']
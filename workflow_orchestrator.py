@@ -261,9 +261,11 @@ class RequirementsGatherer:
         return await self._call_openai(question_prompt)
     
     async def _call_openai(self, prompt: str) -> str:
-        """เรียก OpenAI API"""
+        """เรียก OpenAI API (ไม่ cache: temperature 0.7 ตั้งใจให้คำถามต่างกันในแต่ละครั้ง)
+        client เป็นแบบ sync จึงเรียกใน thread แยก ไม่ block event loop"""
         try:
-            response = client.chat.completions.create(
+            response = await asyncio.to_thread(
+                client.chat.completions.create,
                 model="gpt-4o-mini",
                 messages=[{"role": "user", "content": prompt}],
                 max_tokens=1000,